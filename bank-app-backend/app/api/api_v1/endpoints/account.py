@@ -12,6 +12,7 @@ from app.db.base import get_db
 from app.db.models.user import Account, AppData
 from app.services.pin_verification_service import PinVerificationService
 from app.services.restoration_limit_service import RestorationLimitService
+from app.services.principal_cache import AuthenticatedCustomer
 from app.api.api_v1.endpoints.transactions import get_current_customer
 
 router = APIRouter()
@@ -39,7 +40,7 @@ class ActivateRestorationLimitsRequest(BaseModel):
 @router.post("/account/set-pin", response_model=PinSetupResponse)
 def set_atm_pin(
     request: PinSetupRequest,
-    current_customer: AppData = Depends(get_current_customer),
+    current_customer: AuthenticatedCustomer = Depends(get_current_customer),
     db: Session = Depends(get_db),
 ):
     """
@@ -80,7 +81,7 @@ def set_atm_pin(
 
 @router.get("/account/pin-status")
 def get_pin_status(
-    current_customer: AppData = Depends(get_current_customer),
+    current_customer: AuthenticatedCustomer = Depends(get_current_customer),
     db: Session = Depends(get_db),
 ):
     """
@@ -107,7 +108,7 @@ def get_pin_status(
 
 @router.post("/account/reset-pin-attempts")
 def reset_pin_attempts(
-    current_customer: AppData = Depends(get_current_customer),
+    current_customer: AuthenticatedCustomer = Depends(get_current_customer),
     db: Session = Depends(get_db),
 ):
     """
@@ -136,7 +137,7 @@ def reset_pin_attempts(
 
 @router.get("/account/restoration-status", response_model=RestorationStatusResponse)
 def get_restoration_status(
-    current_customer: AppData = Depends(get_current_customer),
+    current_customer: AuthenticatedCustomer = Depends(get_current_customer),
     db: Session = Depends(get_db),
 ):
     """
@@ -159,7 +160,7 @@ def get_restoration_status(
 @router.post("/account/activate-restoration-limits")
 def activate_restoration_limits(
     request: ActivateRestorationLimitsRequest,
-    current_customer: AppData = Depends(get_current_customer),
+    current_customer: AuthenticatedCustomer = Depends(get_current_customer),
     db: Session = Depends(get_db),
 ):
     """
@@ -192,7 +193,7 @@ def activate_restoration_limits(
 
 @router.post("/account/remove-restoration-limits")
 def remove_restoration_limits(
-    current_customer: AppData = Depends(get_current_customer),
+    current_customer: AuthenticatedCustomer = Depends(get_current_customer),
     db: Session = Depends(get_db),
 ):
     """
@@ -211,6 +212,7 @@ def remove_restoration_limits(
         
         app_data.is_restoration_limited = False
         app_data.restoration_limit_expires_at = None
+        app_data.restoration_spent = Decimal("0.00")
         app_data.updated_at = datetime.now(timezone.utc)
         db.commit()
         
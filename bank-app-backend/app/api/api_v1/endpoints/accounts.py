@@ -1,71 +1,64 @@
 # --- File: app/api/api_v1/endpoints/accounts.py ---
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.base import get_db
+from app.core.config import settings
+from app.db.async_base import get_async_read_db
+from app.db.base import get_read_db, read_router, ReplicaSessions, SessionLocal
 from app.services import account_service
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from datetime import datetime
+import csv
+import io
+import json
 
 router = APIRouter()
 
+CSV_FIELDS = ["id", "account_number", "description", "amount", "type", "date", "terminal_id"]
+
+def _page_size(limit: Optional[int]) -> int:
+    if limit is None:
+        return settings.TRANSACTION_PAGE_SIZE
+    return max(1, min(limit, settings.TRANSACTION_MAX_PAGE_SIZE))
+
+def _account_payload(db: Session, acc, recent_limit: int) -> Dict[str, Any]:
+    transaction_list, next_cursor = account_service.get_transactions_page(db, acc.account_number, limit=recent_limit)
+    return {
+        "account_number": acc.account_number,
+        "account_type": acc.account_type,
+        "balance": float(acc.balance),  # Ensure it's a float
+        "customer_id": acc.customer_id,  # Include customer_id for reference
+        "transactions": transaction_list,
+        # Continue with /account/{account_number}/transactions?cursor=...
+        "transactions_next_cursor": next_cursor
+    }
+
 @router.get("/accounts/{customer_id}")
-def get_customer_accounts(customer_id: str, db: Session = Depends(get_db)) -> List[Dict[str, Any]]:
+async def get_customer_accounts(
+    customer_id: str,
+    recent_transactions: int = Query(settings.ACCOUNT_SUMMARY_RECENT_TRANSACTIONS, ge=0, le=100),
+    db: AsyncSession = Depends(get_async_read_db)
+) -> List[Dict[str, Any]]:
     """
-    Fetches all accounts and their recent transactions for a customer.
-    Returns a list of accounts with their details and transactions.
+    Fetches all accounts for a customer with their most recent transactions.
+    Older transactions are available from the paginated transactions endpoint.
     """
     try:
-        # Get all accounts for the customer
-        accounts = account_service.get_accounts_by_customer_id(db, customer_id)
-        
-        # Debug log
-        print(f"Found {len(accounts)} accounts for customer {customer_id}")
-        
-        if not accounts:
-            # Optional: Create a default account if none exists
-            # You can uncomment this if you want to auto-create accounts
-            # account = account_service.create_account_for_customer(db, customer_id)
-            # account_service.seed_dummy_transactions(db, account.account_number)
-            # accounts = [account]
-            return []
-
-        # Structure the response - include all accounts
-        response_data = []
-        for acc in accounts:
-            # Fetch transactions by account_number
-            transactions = account_service.get_transactions_by_account_number(db, acc.account_number)
-            
-            # Convert transactions to dict format (avoiding SQLAlchemy object serialization issues)
-            transaction_list = []
-            for t in transactions:
-                transaction_list.append({
-                    "id": t.id if hasattr(t, 'id') else None,
-                    "account_number": t.account_number,
-                    "description": t.description,
-                    "amount": float(t.amount),  # Ensure it's a float
-                    "type": t.type,
-                    "date": t.date.isoformat() if t.date else None,
-                    "terminal_id": t.terminal_id if hasattr(t, 'terminal_id') else None
-                })
-            
-            account_data = {
-                "account_number": acc.account_number,
-                "account_type": acc.account_type,
-                "balance": float(acc.balance),  # Ensure it's a float
-                "customer_id": acc.customer_id,  # Include customer_id for reference
-                "transactions": transaction_list
-            }
-            response_data.append(account_data)
-        
-        print(f"Returning {len(response_data)} accounts in response")
-        return response_data
-        
+        # Accounts and their latest transactions in a single round trip
+        return await account_service.get_accounts_overview_async(db, customer_id, recent_transactions)
+
     except Exception as e:
         print(f"Error fetching accounts for customer {customer_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch accounts: {str(e)}")
 
 
 @router.get("/account/{account_number}")
-def get_account_details(account_number: str, db: Session = Depends(get_db)):
+def get_account_details(
+    account_number: str,
+    recent_transactions: int = Query(settings.ACCOUNT_SUMMARY_RECENT_TRANSACTIONS, ge=0, le=100),
+    db: Session = Depends(get_read_db)
+):
     """
     Fetches details for a specific account by account number.
     This can be used when a user selects a specific account.
@@ -74,30 +67,9 @@ def get_account_details(account_number: str, db: Session = Depends(get_db)):
         account = account_service.get_account_by_number(db, account_number)
         if not account:
             raise HTTPException(status_code=404, detail="Account not found")
-        
-        transactions = account_service.get_transactions_by_account_number(db, account_number)
-        
-        # Convert transactions to dict format
-        transaction_list = []
-        for t in transactions:
-            transaction_list.append({
-                "id": t.id if hasattr(t, 'id') else None,
-                "account_number": t.account_number,
-                "description": t.description,
-                "amount": float(t.amount),
-                "type": t.type,
-                "date": t.date.isoformat() if t.date else None,
-                "terminal_id": t.terminal_id if hasattr(t, 'terminal_id') else None
-            })
-        
-        return {
-            "account_number": account.account_number,
-            "account_type": account.account_type,
-            "balance": float(account.balance),
-            "customer_id": account.customer_id,
-            "transactions": transaction_list
-        }
-        
+
+        return _account_payload(db, account, recent_transactions)
+
     except HTTPException:
         raise
     except Exception as e:
@@ -105,6 +77,93 @@ def get_account_details(account_number: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Failed to fetch account details: {str(e)}")
 
 
+@router.get("/account/{account_number}/transactions")
+def get_account_transactions(
+    account_number: str,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    type: Optional[str] = Query(None, pattern="^(credit|debit)$"),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Paginated transaction history, newest first. Pass the returned next_cursor
+    back as `cursor` for the next page; filters must stay the same between pages.
+    """
+    try:
+        page_size = _page_size(limit)
+        transactions, next_cursor = account_service.get_transactions_page(
+            db, account_number, limit=page_size, cursor=cursor,
+            start_date=start_date, end_date=end_date, txn_type=type
+        )
+        return {
+            "account_number": account_number,
+            "transactions": transactions,
+            "count": len(transactions),
+            "limit": page_size,
+            "next_cursor": next_cursor
+        }
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        print(f"Error fetching transactions for account {account_number}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to fetch transactions: {str(e)}")
+
+
+@router.get("/account/{account_number}/transactions/stream")
+def stream_account_transactions(
+    account_number: str,
+    request: Request,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    type: Optional[str] = Query(None, pattern="^(credit|debit)$")
+):
+    """
+    Stream the full (filtered) transaction history as NDJSON or CSV, archived
+    months included. Rows are read from a server-side cursor and written out in
+    chunks, so memory use does not grow with the size of the history.
+    """
+    chunk_size = settings.TRANSACTION_STREAM_CHUNK_SIZE
+    replica = read_router.route(request)
+
+    def generate():
+        # The request-scoped session is closed before the body is streamed, so use our own
+        db = ReplicaSessions[replica.name]() if replica else SessionLocal()
+        try:
+            rows = account_service.iter_statement_transactions(
+                db, account_number, chunk_size,
+                start_date=start_date, end_date=end_date, txn_type=type
+            )
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDS) if format == "csv" else None
+            if writer:
+                writer.writeheader()
 
+            pending = 0
+            for row in rows:
+                if writer:
+                    writer.writerow(row)
+                else:
+                    buffer.write(json.dumps(row) + "\n")
+                pending += 1
+                if pending >= chunk_size:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+                    pending = 0
 
+            if buffer.tell():
+                yield buffer.getvalue()
+        finally:
+            db.close()
 
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"transactions_{account_number}.{'csv' if format == 'csv' else 'ndjson'}"
+    return StreamingResponse(
+        generate(),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
@@ -29,11 +29,16 @@
 
 # Enhanced app data endpoints with dashboard device information - COMPLETE FILE
 from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.base import get_db
+from app.db.async_base import get_async_read_db
+from app.db.base import get_db, get_read_db
 from app.schemas.app_data import AppAccessRevokeRequest
 from app.services import app_data_service
 from app.services.seedkey_attempt_service import SeedkeyAttemptService
+from app.services.device_event_service import migrate_other_details
+from app.services.security_summary_service import security_summary
+from typing import Optional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -97,35 +102,84 @@ def revoke_customer_access(
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
 
 @router.get("/appdata/{customer_id}/device-history")
-def get_customer_device_history(
+async def get_customer_device_history(
     customer_id: str,
     limit: int = 10,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Get device history for a customer including registrations, restorations, logins, etc.
+    Pass the returned next_cursor back as `cursor` to fetch the next (older) page.
     """
     try:
         if not customer_id or len(customer_id.strip()) == 0:
             raise HTTPException(status_code=400, detail="Invalid customer ID format")
         
-        device_history = app_data_service.get_customer_device_history(
+        device_history, next_cursor = await app_data_service.get_customer_device_history_page_async(
             db, 
             customer_id.strip(), 
-            limit=min(limit, 50)  # Cap at 50 entries
+            limit=min(limit, 50),  # Cap at 50 entries
+            cursor=cursor
         )
         
         return {
             "status": "success",
             "customer_id": customer_id,
             "device_history": device_history,
-            "total_entries": len(device_history)
+            "total_entries": len(device_history),
+            "next_cursor": next_cursor
         }
         
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching device history for customer {customer_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch device history: {str(e)}")
 
+@router.post("/appdata/device-events/migrate")
+def migrate_device_events(
+    batch_size: int = 200,
+    max_batches: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    One-off admin endpoint: move legacy app_data.other_details arrays into
+    device_events / signature_templates. Safe to re-run until nothing is left.
+    """
+    try:
+        report = migrate_other_details(db, batch_size=max(1, min(batch_size, 1000)), max_batches=max_batches)
+        return {
+            "status": "success",
+            **report
+        }
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Device event migration failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Device event migration failed: {str(e)}")
+
+@router.post("/appdata/security-summary/rebuild")
+def rebuild_security_summaries(
+    customer_id: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Recompute materialized security summaries from device_events, for one
+    customer or for all of them (admin endpoint, used for backfill).
+    """
+    try:
+        report = security_summary.rebuild(db, customer_id=customer_id.strip() if customer_id else None)
+        return {
+            "status": "success",
+            **report
+        }
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Security summary rebuild failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Security summary rebuild failed: {str(e)}")
+
 @router.get("/appdata/{customer_id}/registered-restored-devices")
 def get_registered_restored_devices(
     customer_id: str,
@@ -183,7 +237,7 @@ def get_registered_restored_devices(
 @router.get("/appdata/{customer_id}/security-summary")
 def get_customer_security_summary(
     customer_id: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get comprehensive security summary for a customer including device history, 
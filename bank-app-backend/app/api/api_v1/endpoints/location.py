@@ -1,12 +1,17 @@
 # --- File: bank-app-backend/app/api/api_v1/endpoints/location.py ---
 from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, Field
 from typing import Optional, List
+from datetime import datetime, timedelta
 import uuid
 
+from app.db.async_base import get_async_read_db
 from app.db.base import get_db
-from app.services.location_service import LocationService
+from app.services.location_service import LocationService, get_user_location_history_async
+from app.services.impossible_travel_service import impossible_travel_detector
+from app.services.location_stats_service import location_stats
 
 router = APIRouter()
 
@@ -25,6 +30,7 @@ class LocationResponse(BaseModel):
     location: Optional[dict] = None
     distance_km: Optional[float] = None
     ip_changed: Optional[bool] = None
+    impossible_travel: Optional[bool] = None
     action: Optional[str] = None
 
 class LocationHistoryResponse(BaseModel):
@@ -34,7 +40,7 @@ class LocationHistoryResponse(BaseModel):
     total_count: int
 
 @router.post("/location/validate", response_model=LocationResponse)
-async def validate_user_location(
+def validate_user_location(
     request_data: LocationValidationRequest,
     request: Request,
     db: Session = Depends(get_db)
@@ -42,6 +48,7 @@ async def validate_user_location(
     """
     Validate user's current location against their session baseline.
     Detects potential session hijacking based on IP and location changes.
+    Plain def: the sync session queries/commit and the IP lookup run in the threadpool.
     """
     print(f"\n🌍 LOCATION VALIDATION for user {request_data.customer_unique_id}")
     
@@ -61,7 +68,7 @@ async def validate_user_location(
         gps_coords = (request_data.latitude, request_data.longitude)
     
     try:
-        result = await location_service.validate_location(
+        result = location_service.validate_location(
             customer_id=request_data.customer_unique_id,
             session_id=request_data.session_id,
             ip_address=ip_address,
@@ -81,7 +88,7 @@ async def validate_user_location(
 async def get_location_history(
     customer_id: uuid.UUID,
     limit: int = 10,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Get user's location history for security monitoring.
@@ -89,8 +96,7 @@ async def get_location_history(
     print(f"\n📍 LOCATION HISTORY for user {customer_id}")
     
     try:
-        location_service = LocationService(db)
-        locations = location_service.get_user_location_history(customer_id, limit)
+        locations = await get_user_location_history_async(db, customer_id, limit)
         
         return LocationHistoryResponse(
             success=True,
@@ -105,8 +111,40 @@ async def get_location_history(
             detail=f"Failed to get location history: {str(e)}"
         )
 
+@router.get("/location/impossible-travel/audit")
+def audit_impossible_travel(
+    hours: Optional[int] = None,
+    limit: int = 100,
+    db: Session = Depends(get_db)
+):
+    """
+    Scan the user_locations table for physically impossible movement (admin endpoint).
+    Restrict the scan to the last N hours with `hours`, or omit it for a full audit.
+    """
+    print(f"\n✈️  IMPOSSIBLE TRAVEL AUDIT - window: {hours or 'all'} hours")
+    
+    try:
+        since = datetime.utcnow() - timedelta(hours=hours) if hours else None
+        report = impossible_travel_detector.scan_location_history(
+            db,
+            since=since,
+            max_violations=min(limit, 1000)
+        )
+        
+        return {
+            "success": True,
+            **report
+        }
+        
+    except Exception as e:
+        print(f"❌ Impossible travel audit error: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Impossible travel audit failed: {str(e)}"
+        )
+
 @router.post("/location/cleanup")
-async def cleanup_old_locations(
+def cleanup_old_locations(
     hours: int = 24,
     db: Session = Depends(get_db)
 ):
@@ -133,23 +171,27 @@ async def cleanup_old_locations(
         )
 
 @router.get("/location/health")
-async def location_service_health(db: Session = Depends(get_db)):
+def location_service_health(db: Session = Depends(get_db)):
     """
     Check location service health and statistics.
+    Counters are maintained incrementally, so this is a primary-key read
+    rather than a scan of user_locations.
+
+    unique_users_tracked comes from the HyperLogLog of the worker that served
+    the request. Each worker seeds its sketch at startup and then only sees
+    its own inserts, so workers can report different (lagging) estimates;
+    POST /location/stats/rebuild reseeds the worker that handles it.
     """
     try:
-        from app.services.location_service import UserLocation
-        
-        # Get some basic statistics
-        total_records = db.query(UserLocation).count()
-        flagged_records = db.query(UserLocation).filter(UserLocation.is_flagged == True).count()
-        unique_users = db.query(UserLocation.customer_unique_id).distinct().count()
+        stats = location_stats.snapshot(db)
         
         return {
             "service_status": "healthy",
-            "total_location_records": total_records,
-            "flagged_records": flagged_records,
-            "unique_users_tracked": unique_users,
+            "total_location_records": stats["total_records"],
+            "flagged_records": stats["flagged_records"],
+            "unique_users_tracked": stats["unique_users_estimate"],
+            "unique_users_is_estimate": True,
+            "stats_ready": stats["counters_ready"] and stats["unique_users_ready"],
             "service_ready": True
         }
         
@@ -158,4 +200,29 @@ async def location_service_health(db: Session = Depends(get_db)):
         raise HTTPException(
             status_code=500,
             detail=f"Health check failed: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+@router.post("/location/stats/rebuild")
+def rebuild_location_stats(db: Session = Depends(get_db)):
+    """
+    Recompute the location counters and distinct-user sketch from the table (admin endpoint).
+    Runs full scans; use it for bootstrap or repair, not for monitoring.
+    """
+    print(f"\n📊 LOCATION STATS REBUILD")
+    
+    try:
+        counters = location_stats.rebuild_counters(db)
+        unique_users = location_stats.seed_distinct_users(db)
+        
+        return {
+            "success": True,
+            **counters,
+            "unique_users_estimate": unique_users
+        }
+        
+    except Exception as e:
+        print(f"❌ Location stats rebuild failed: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Location stats rebuild failed: {str(e)}"
+        )
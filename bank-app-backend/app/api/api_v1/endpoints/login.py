@@ -1,14 +1,18 @@
 # --- File: app/api/api_v1/endpoints/login.py ---
 from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from pydantic import EmailStr
 from datetime import datetime, timedelta
 import jwt
+from app.db.async_base import get_async_read_db
 from app.db.base import get_db
 from app.services import fido_seedkey_service
 from app.services.sms_service import SMSService
 from app.services.login_attempt_service import LoginAttemptService
 from app.services.seedkey_attempt_service import SeedkeyAttemptService
+from app.services.principal_cache import principal_cache
+from bank_common.timing import StageTimer
 from app.schemas.user import FidoLoginStartRequest, FidoLoginFinishRequest, SeedkeyVerificationRequest, LogoutRequest
 from app.core.config import settings
 import logging
@@ -263,6 +267,7 @@ def verify_seedkey(
     db: Session = Depends(get_db)
 ):
     """Verify the seed key signature, issue a JWT, and update login metadata."""
+    timer = StageTimer("login")
     device_info = get_device_info(http_request)
     
     try:
@@ -284,9 +289,11 @@ def verify_seedkey(
                     "lockout_info": lockout_info
                 }
             )
+        timer.mark("lockout_check")
         
         # Verify seed key signature
         result = fido_seedkey_service.verify_seedkey_signature(db, request.customer_id, request.challenge, request.public_key)
+        timer.mark("signature_verify")
         
         # Generate JWT
         payload = {
@@ -310,6 +317,7 @@ def verify_seedkey(
             device_info["user_agent"], device_info["device_info"],
             device_info["location"]
         )
+        timer.mark("login_metadata")
         
         # Add device info for successful login
         SeedkeyAttemptService.add_device_info_to_other_details(
@@ -325,6 +333,7 @@ def verify_seedkey(
                 "jwt_issued": True
             }
         )
+        timer.mark("device_tracking")
         
         # Send SMS notification for successful login
         try:
@@ -335,6 +344,7 @@ def verify_seedkey(
         except Exception as sms_error:
             logger.error(f"Failed to send login success SMS: {str(sms_error)}")
             # Don't fail login due to SMS issues
+        timer.mark("sms")
 
         return {
             "status": "login_success",
@@ -424,10 +434,10 @@ def verify_seedkey(
 
 # New endpoint to check lockout status
 @router.get("/login/status/{customer_id}")
-def get_login_status(customer_id: str, db: Session = Depends(get_db)):
+async def get_login_status(customer_id: str, db: AsyncSession = Depends(get_async_read_db)):
     """Get current login status and lockout information"""
     try:
-        lockout_info = LoginAttemptService.get_lockout_info(db, customer_id)
+        lockout_info = await LoginAttemptService.get_lockout_info_async(db, customer_id)
         return lockout_info
     except Exception as e:
         logger.error(f"Failed to get login status: {str(e)}")
@@ -483,6 +493,7 @@ def logout_user(
 ):
     """Handle user logout and decrease logged in devices count"""
     device_info = get_device_info(http_request)
+    principal_cache.invalidate(request.customer_id)
     try:
         # Decrease the logged in devices count
         success = fido_seedkey_service.decrease_login_metadata(db, request.customer_id)
@@ -0,0 +1,96 @@
+# --- File: app/api/api_v1/endpoints/metrics.py ---
+from fastapi import APIRouter
+import logging
+
+from app.core.access_log import access_log
+from bank_common.memory import memory_report
+from bank_common.timing import stage_metrics
+from app.db.base import read_router
+from bank_common.pool import pool_metrics
+from app.services.fraud_service import fraud_predictor
+from app.services.model_store import model_store
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+@router.get("/metrics/stages")
+def get_stage_metrics():
+    """
+    Per-stage latency histograms for the instrumented pipelines
+    (transfer, login, restore): count, average, p50/p95/p99 and max in ms.
+    """
+    return {
+        "status": "success",
+        "pipelines": stage_metrics.snapshot()
+    }
+
+@router.post("/metrics/stages/reset")
+def reset_stage_metrics():
+    """Clear all stage histograms (admin endpoint)."""
+    stage_metrics.reset()
+    logger.info("Stage metrics reset")
+    return {"status": "success"}
+
+@router.get("/metrics/routes")
+def get_route_metrics():
+    """
+    Per-route latency histograms and status-class counts for every request
+    seen by this worker, plus the access-log sampling settings.
+    """
+    return {
+        "status": "success",
+        **access_log.snapshot()
+    }
+
+@router.post("/metrics/routes/reset")
+def reset_route_metrics():
+    """Clear the per-route request metrics (admin endpoint)."""
+    access_log.reset()
+    logger.info("Route metrics reset")
+    return {"status": "success"}
+
+@router.get("/metrics/pool")
+def get_pool_metrics():
+    """
+    Connection pool telemetry per engine (primary, replica, async_*): size,
+    connections in use, overflow in use, checkout wait histogram, checkout
+    timeouts, new connections and invalidations.
+    """
+    return {
+        "status": "success",
+        "pools": pool_metrics.snapshot()
+    }
+
+@router.post("/metrics/pool/reset")
+def reset_pool_metrics():
+    """Clear the pool counters and wait histograms (admin endpoint)."""
+    pool_metrics.reset()
+    logger.info("Pool metrics reset")
+    return {"status": "success"}
+
+@router.get("/metrics/replicas")
+def get_replica_metrics():
+    """
+    Read-replica routing: per-replica lag and eligibility, and how read-only
+    requests were routed (replica:<name>, primary:sticky, primary:lagging,
+    primary:no_replica).
+    """
+    return {
+        "status": "success",
+        **read_router.snapshot()
+    }
+
+@router.get("/metrics/memory")
+def get_memory_metrics():
+    """
+    Memory of the worker serving this request: RSS / PSS and private vs shared
+    bytes (Linux /proc), per file for the shared model store, plus which model
+    artifacts it has mapped. Sum PSS over the workers (scripts/worker_memory.py)
+    for the real footprint.
+    """
+    return {
+        "status": "success",
+        "shared_model_weights": fraud_predictor.shared_weights,
+        "attached_models": model_store.attached(),
+        **memory_report([model_store.root])
+    }
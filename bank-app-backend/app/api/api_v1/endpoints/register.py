@@ -130,7 +130,7 @@ def verify_otp(request: OTPVerificationRequest, http_request: Request, db: Sessi
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/register/complete")
-async def complete_registration(customer_data: CustomerCreate, http_request: Request, db: Session = Depends(get_db)):
+def complete_registration(customer_data: CustomerCreate, http_request: Request, db: Session = Depends(get_db)):
     device_info = get_device_info(http_request)
     try:
         # Decrypt the incoming encrypted fields
@@ -208,7 +208,7 @@ async def complete_registration(customer_data: CustomerCreate, http_request: Req
         raise HTTPException(status_code=500, detail=f"Registration failed: {str(e)}")
 
 @router.post("/register/device-check")
-async def device_check(data: dict, http_request: Request, db: Session = Depends(get_db)):
+def device_check(data: dict, http_request: Request, db: Session = Depends(get_db)):
     device_info = get_device_info(http_request)
     try:
         if not data or 'phoneNumber' not in data or 'customerId' not in data or 'checkType' not in data:
@@ -280,7 +280,7 @@ async def device_check(data: dict, http_request: Request, db: Session = Depends(
         raise HTTPException(status_code=500, detail=f"Device check failed: {str(e)}")
 
 @router.post("/register/signature")
-async def register_signature(data: dict, http_request: Request, db: Session = Depends(get_db)):
+def register_signature(data: dict, http_request: Request, db: Session = Depends(get_db)):
     device_info = get_device_info(http_request)
     try:
         if not data or 'phoneNumber' not in data or 'customerId' not in data or 'signature' not in data:
@@ -297,24 +297,24 @@ async def register_signature(data: dict, http_request: Request, db: Session = De
         img = signature_service.preprocess_signature(signature_data)
         features = signature_service.extract_all_features(img)
         
-        # Store unencrypted features in app_data.other_details
+        # Make sure the customer/phone pair exists before storing the template
         query = text("""
             UPDATE app_data
-            SET other_details = :other_details,
-                updated_at = :updated_at
+            SET updated_at = :updated_at
             WHERE customer_id = :customer_id AND phone_number = :phone_number
             RETURNING id
         """)
         result = db.execute(query, {
             "customer_id": customer_id,
             "phone_number": phone_number,
-            "other_details": json.dumps([{"signature": features}]),
             "updated_at": datetime.utcnow()
         }).fetchone()
         
         if not result:
             raise HTTPException(status_code=404, detail="App data not found for customer")
         
+        # Store unencrypted features in signature_templates
+        signature_service.save_signature_template(db, customer_id, features)
         db.commit()
         return {"status": "Signature registered successfully"}
         
@@ -326,7 +326,7 @@ async def register_signature(data: dict, http_request: Request, db: Session = De
         raise HTTPException(status_code=500, detail=f"Signature registration failed: {str(e)}")
 
 @router.post("/register/fido-start")
-async def fido_start_registration(data: dict, http_request: Request, db: Session = Depends(get_db)):
+def fido_start_registration(data: dict, http_request: Request, db: Session = Depends(get_db)):
     device_info = get_device_info(http_request)
     try:
         if not data or 'customer_id' not in data:
@@ -346,7 +346,7 @@ async def fido_start_registration(data: dict, http_request: Request, db: Session
         raise HTTPException(status_code=500, detail=f"FIDO registration start failed: {str(e)}")
 
 @router.post("/register/fido-seedkey")
-async def register_fido_seedkey_route(data: dict, http_request: Request, db: Session = Depends(get_db)):
+def register_fido_seedkey_route(data: dict, http_request: Request, db: Session = Depends(get_db)):
     device_info = get_device_info(http_request)
     try:
         if not data or 'phoneNumber' not in data or 'customerId' not in data or 'fidoData' not in data or 'seedData' not in data:
@@ -370,9 +370,9 @@ async def register_fido_seedkey_route(data: dict, http_request: Request, db: Ses
             raise HTTPException(status_code=422, detail=f"Decryption failed: {str(e)}")
         
         # Complete FIDO and seedkey registration
-        await register_fido_seedkey(db, phone_number, customer_id, fido_data, seed_data)
+        register_fido_seedkey(db, phone_number, customer_id, fido_data, seed_data)
         
-        # Add device info to other_details for registration tracking
+        # Record a device event for registration tracking
         try:
             SeedkeyAttemptService.add_device_info_to_other_details(
                 db=db,
@@ -415,7 +415,7 @@ async def register_fido_seedkey_route(data: dict, http_request: Request, db: Ses
         raise HTTPException(status_code=500, detail=f"FIDO2 and seed key registration failed: {str(e)}")
 
 @router.post("/register/device-complete")
-async def complete_device_verification(data: PhoneVerificationRequest, http_request: Request, db: Session = Depends(get_db)):
+def complete_device_verification(data: PhoneVerificationRequest, http_request: Request, db: Session = Depends(get_db)):
     device_info = get_device_info(http_request)
     try:
         phone_number = otp_service.decrypt_data(data.encrypted_phone_number)
@@ -445,7 +445,7 @@ async def complete_device_verification(data: PhoneVerificationRequest, http_requ
 
 # Keep existing endpoints for customer phone and verification
 @router.get("/customer/{customer_id}/phone")
-async def get_customer_phone(customer_id: str, db: Session = Depends(get_db)):
+def get_customer_phone(customer_id: str, db: Session = Depends(get_db)):
     """Get phone number for a customer by customer_id from app_data table."""
     try:
         if not customer_id or len(customer_id.strip()) == 0:
@@ -479,7 +479,7 @@ async def get_customer_phone(customer_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @router.get("/customer/{customer_id}/verify")
-async def verify_customer_exists(customer_id: str, db: Session = Depends(get_db)):
+def verify_customer_exists(customer_id: str, db: Session = Depends(get_db)):
     """Verify if a customer exists and has valid app access."""
     try:
         if not customer_id or len(customer_id.strip()) == 0:
@@ -8,6 +8,8 @@ from app.services.otp_service import decrypt_phone_number, check_phone_number, d
 from app.services.restoration_limit_service import RestorationLimitService
 from app.services.sms_service import SMSService
 from app.services.seedkey_attempt_service import SeedkeyAttemptService
+from app.services.principal_cache import principal_cache
+from bank_common.timing import StageTimer
 from webauthn.helpers import bytes_to_base64url, base64url_to_bytes
 from app.services import signature_service
 from app.db.models.user import AppData, Seedkey, Passkey, SeedkeyAttempt
@@ -45,6 +47,7 @@ def get_device_info(request: Request) -> dict:
 
 def post_restoration_setup(db: Session, customer_id: str) -> dict:
     """Setup post-restoration security measures"""
+    principal_cache.invalidate(customer_id)
     try:
         # Activate restoration limits
         limits_activated = RestorationLimitService.activate_restoration_limits(
@@ -68,7 +71,7 @@ def post_restoration_setup(db: Session, customer_id: str) -> dict:
         }
 
 @router.post("/restore/check")
-async def check_restoration_phone(request: PhoneVerificationRequest, http_request: Request, db: Session = Depends(get_db)):
+def check_restoration_phone(request: PhoneVerificationRequest, http_request: Request, db: Session = Depends(get_db)):
     device_info = get_device_info(http_request)
     try:
         # Decrypt the phone number
@@ -123,7 +126,7 @@ async def check_restoration_phone(request: PhoneVerificationRequest, http_reques
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @router.post("/restore/complete")
-async def complete_restoration(customer_data: CustomerCreate, http_request: Request, db: Session = Depends(get_db)):
+def complete_restoration(customer_data: CustomerCreate, http_request: Request, db: Session = Depends(get_db)):
     device_info = get_device_info(http_request)
     try:
         # Decrypt the incoming encrypted fields
@@ -190,7 +193,7 @@ async def complete_restoration(customer_data: CustomerCreate, http_request: Requ
         raise HTTPException(status_code=500, detail=f"Restoration failed: {str(e)}")
 
 @router.post("/restore/fido-start")
-async def fido_start_restoration(data: FidoLoginStartRequest, http_request: Request, db: Session = Depends(get_db)):
+def fido_start_restoration(data: FidoLoginStartRequest, http_request: Request, db: Session = Depends(get_db)):
     device_info = get_device_info(http_request)
     try:
         customer_id = decrypt_data(data.customer_id)
@@ -204,7 +207,8 @@ async def fido_start_restoration(data: FidoLoginStartRequest, http_request: Requ
         raise HTTPException(status_code=500, detail=f"FIDO restoration start failed: {str(e)}")
 
 @router.post("/restore/fido-seedkey")
-async def restore_fido_seedkey(data: dict, http_request: Request, db: Session = Depends(get_db)):
+def restore_fido_seedkey(data: dict, http_request: Request, db: Session = Depends(get_db)):
+    timer = StageTimer("restore")
     device_info = get_device_info(http_request)
     ip_address = device_info["ip_address"]
     user_agent = device_info["user_agent"]
@@ -231,6 +235,7 @@ async def restore_fido_seedkey(data: dict, http_request: Request, db: Session =
             }
         except ValueError as e:
             raise HTTPException(status_code=422, detail=f"Decryption failed: {str(e)}")
+        timer.mark("decrypt")
         
         # FIXED: Check lockout status FIRST before any processing
         is_locked, unlock_time = SeedkeyAttemptService.is_seedkey_locked(db, customer_id)
@@ -311,6 +316,7 @@ async def restore_fido_seedkey(data: dict, http_request: Request, db: Session =
         # SUCCESS: Reset failed attempts and continue with restoration
         SeedkeyAttemptService.check_and_update_failed_attempts(db, customer_id, True)
         logger.info(f"Seedkey restoration verification successful for customer {customer_id}")
+        timer.mark("seedkey_verify")
         
         try:
             credential_id_bytes = base64url_to_bytes(fido_data['credentialId'])
@@ -328,6 +334,7 @@ async def restore_fido_seedkey(data: dict, http_request: Request, db: Session =
         )
         db.add(passkey)
         db.commit()
+        timer.mark("passkey_commit")
         
         logger.info(f"Account restoration completed successfully for customer: {customer_id}")
         logger.info(f"Activating post-restoration security limits for customer: {customer_id}")
@@ -338,6 +345,7 @@ async def restore_fido_seedkey(data: dict, http_request: Request, db: Session =
             logger.info(f"Post-restoration limits activated successfully: {customer_id}")
         else:
             logger.warning(f"Failed to activate post-restoration limits: {customer_id}")
+        timer.mark("restoration_limits")
         
         SeedkeyAttemptService.add_device_info_to_other_details(
             db=db,
@@ -352,6 +360,7 @@ async def restore_fido_seedkey(data: dict, http_request: Request, db: Session =
                 "restoration_limits_activated": restoration_setup["limits_activated"]
             }
         )
+        timer.mark("device_tracking")
         
         try:
             SMSService.send_restoration_notification(
@@ -365,6 +374,7 @@ async def restore_fido_seedkey(data: dict, http_request: Request, db: Session =
             logger.info(f"Restoration SMS sent successfully for customer {customer_id}")
         except Exception as sms_error:
             logger.error(f"Failed to send restoration SMS for customer {customer_id}: {str(sms_error)}")
+        timer.mark("sms")
         
         return {
             "status": "FIDO2 and seed key restored successfully",
@@ -389,7 +399,7 @@ async def restore_fido_seedkey(data: dict, http_request: Request, db: Session =
     
 
 @router.post("/restore/check-signature")
-async def check_signature(data: dict, http_request: Request, db: Session = Depends(get_db)):
+def check_signature(data: dict, http_request: Request, db: Session = Depends(get_db)):
     device_info = get_device_info(http_request)
     try:
         if not data or 'phoneNumber' not in data or 'customerId' not in data:
@@ -402,7 +412,7 @@ async def check_signature(data: dict, http_request: Request, db: Session = Depen
             raise HTTPException(status_code=422, detail=f"Decryption failed: {str(e)}")
         
         query = text("""
-            SELECT other_details
+            SELECT id
             FROM app_data
             WHERE customer_id = :customer_id AND phone_number = :phone_number
         """)
@@ -414,14 +424,7 @@ async def check_signature(data: dict, http_request: Request, db: Session = Depen
         if not result:
             raise HTTPException(status_code=404, detail="App data not found for this customer")
         
-        other_details = result.other_details
-        signature_exists = False
-        
-        if other_details:
-            for item in other_details:
-                if 'signature' in item:
-                    signature_exists = True
-                    break
+        signature_exists = signature_service.get_signature_template(db, customer_id) is not None
         
         return {
             "status": "success",
@@ -438,7 +441,7 @@ async def check_signature(data: dict, http_request: Request, db: Session = Depen
 
 
 @router.post("/restore/signature")
-async def verify_signature(data: dict, http_request: Request, db: Session = Depends(get_db)):
+def verify_signature(data: dict, http_request: Request, db: Session = Depends(get_db)):
     device_info = get_device_info(http_request)
     try:
         if not data or 'phoneNumber' not in data or 'customerId' not in data or 'signature' not in data:
@@ -457,7 +460,7 @@ async def verify_signature(data: dict, http_request: Request, db: Session = Depe
         
         # Fetch stored signature features
         query = text("""
-            SELECT other_details
+            SELECT id
             FROM app_data
             WHERE customer_id = :customer_id AND phone_number = :phone_number
         """)
@@ -469,11 +472,7 @@ async def verify_signature(data: dict, http_request: Request, db: Session = Depe
         if not result:
             raise HTTPException(status_code=404, detail="App data not found")
         
-        stored_features = None
-        for item in result.other_details:
-            if 'signature' in item:
-                stored_features = item['signature']
-                break
+        stored_features = signature_service.get_signature_template(db, customer_id)
         
         if not stored_features:
             raise HTTPException(status_code=404, detail="Stored signature not found")
@@ -496,7 +495,7 @@ async def verify_signature(data: dict, http_request: Request, db: Session = Depe
         raise HTTPException(status_code=500, detail=f"Signature verification failed: {str(e)}")
 
 @router.post("/restore/verify-seedkey")
-async def verify_seedkey(data: dict, http_request: Request, db: Session = Depends(get_db)):
+def verify_seedkey(data: dict, http_request: Request, db: Session = Depends(get_db)):
     device_info = get_device_info(http_request)
     try:
         if not data or 'phoneNumber' not in data or 'customerId' not in data or 'seedData' not in data:
@@ -600,7 +599,7 @@ async def verify_seedkey(data: dict, http_request: Request, db: Session = Depend
         raise HTTPException(status_code=500, detail=f"Seed key verification failed: {str(e)}")
 
 @router.get("/restore/seedkey-status/{customer_id}")
-async def get_seedkey_status(customer_id: str, db: Session = Depends(get_db)):
+def get_seedkey_status(customer_id: str, db: Session = Depends(get_db)):
     """Get current seedkey lockout status for a customer"""
     try:
         lockout_info = SeedkeyAttemptService.get_seedkey_lockout_info(db, customer_id)
@@ -616,7 +615,7 @@ async def get_seedkey_status(customer_id: str, db: Session = Depends(get_db)):
 
 
 @router.post("/restore/log-mnemonic-attempt")
-async def log_mnemonic_attempt(data: MnemonicAttemptRequest, http_request: Request, db: Session = Depends(get_db)):
+def log_mnemonic_attempt(data: MnemonicAttemptRequest, http_request: Request, db: Session = Depends(get_db)):
     """Log a mnemonic verification attempt for CLIENT-SIDE failures (invalid format, derivation errors)"""
     try:
         customer_id = data.customerId
@@ -0,0 +1,98 @@
+# --- File: app/api/api_v1/endpoints/retention.py ---
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import datetime
+import logging
+
+from app.db.base import get_db
+from app.services.retention_service import retention_service
+from app.services.transaction_partition_service import transaction_partitions
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+@router.get("/retention/status")
+def get_retention_status():
+    """
+    Show retention policies and the metrics of the last purge per table
+    (rows deleted, rows per second, scan time, time spent taking row locks,
+    rows skipped because another transaction held them, lock timeouts).
+    """
+    return {
+        "status": "success",
+        **retention_service.status()
+    }
+
+@router.post("/retention/run")
+def run_retention(
+    table: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Run retention now for one table or for all of them (admin endpoint).
+    """
+    try:
+        if table:
+            policy = retention_service.get_policy(table)
+            if not policy:
+                raise HTTPException(status_code=404, detail=f"No retention policy for table '{table}'")
+            reports = {table: retention_service.purge(db, policy)}
+        else:
+            reports = retention_service.run_all(db)
+        
+        return {
+            "status": "success",
+            "reports": reports
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Retention run failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Retention run failed: {str(e)}")
+
+@router.get("/retention/transactions")
+def get_transaction_partitions(db: Session = Depends(get_db)):
+    """
+    Monthly partitions of the transactions table (estimated rows, size) and the
+    months already moved to the compressed archive tier.
+    """
+    return {
+        "status": "success",
+        **transaction_partitions.status(db)
+    }
+
+@router.post("/retention/transactions/{month}/{action}")
+def move_transaction_month(
+    month: str,
+    action: str,
+    db: Session = Depends(get_db)
+):
+    """
+    Archive one month of transactions (YYYY-MM) to the cold tier, or restore an
+    archived month into a hot partition (admin endpoint).
+    """
+    try:
+        month_date = datetime.strptime(month, "%Y-%m").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Month must be formatted as YYYY-MM")
+    if action not in ("archive", "restore"):
+        raise HTTPException(status_code=404, detail=f"Unknown action '{action}'")
+
+    try:
+        if action == "archive":
+            report = transaction_partitions.archive_partition(db, month_date)
+        else:
+            report = transaction_partitions.restore_partition(db, month_date)
+        return {
+            "status": "success",
+            "report": report
+        }
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Transaction {action} of {month} failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Transaction {action} failed: {str(e)}")
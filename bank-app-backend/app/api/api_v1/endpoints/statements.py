@@ -0,0 +1,161 @@
+# --- File: app/api/api_v1/endpoints/statements.py ---
+import os
+import re
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from sqlalchemy.orm import Session
+import logging
+
+from app.core.config import settings
+from app.db.base import get_db
+from app.services import account_service
+from app.services.statement_export_service import EXPORT_FORMATS, statement_exports
+from app.services.principal_cache import AuthenticatedCustomer
+from app.api.api_v1.endpoints.transactions import get_current_customer
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+class StatementExportRequest(BaseModel):
+    account_number: str = Field(..., description="Account to export")
+    start_date: datetime = Field(..., description="Inclusive start of the statement period")
+    end_date: datetime = Field(..., description="Exclusive end of the statement period")
+    format: str = Field("csv", pattern="^(csv|json)$", description="csv, or json for PDF rendering")
+
+def _owned_job(db: Session, job_id: str, customer: AuthenticatedCustomer):
+    job = statement_exports.get_job(db, job_id)
+    if not job or job.customer_id != customer.customer_id:
+        raise HTTPException(status_code=404, detail="Export not found")
+    return job
+
+def _iter_file(path: str, start: int, length: int):
+    with open(path, "rb") as fh:
+        fh.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = fh.read(min(DOWNLOAD_CHUNK_BYTES, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+def _parse_range(range_header: str, file_size: int):
+    """Return (start, end) for a single 'bytes=' range, or None if the header is not usable."""
+    match = RANGE_PATTERN.match(range_header.strip())
+    if not match or (not match.group(1) and not match.group(2)):
+        return None
+    if match.group(1):
+        start = int(match.group(1))
+        end = int(match.group(2)) if match.group(2) else file_size - 1
+    else:
+        # Suffix range: last N bytes
+        start = max(file_size - int(match.group(2)), 0)
+        end = file_size - 1
+    return start, min(end, file_size - 1)
+
+@router.post("/statements/exports", status_code=202)
+def create_statement_export(
+    request: StatementExportRequest,
+    current_customer: AuthenticatedCustomer = Depends(get_current_customer),
+    db: Session = Depends(get_db)
+):
+    """
+    Queue a statement export for one of the customer's accounts. Poll the
+    returned job's status and download the file once it is completed.
+    """
+    if request.end_date <= request.start_date:
+        raise HTTPException(status_code=400, detail="end_date must be after start_date")
+    if (request.end_date - request.start_date).days > settings.STATEMENT_EXPORT_MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Statement period cannot exceed {settings.STATEMENT_EXPORT_MAX_RANGE_DAYS} days"
+        )
+
+    account = account_service.get_account_by_number(db, request.account_number)
+    if not account or account.customer_id != current_customer.customer_id:
+        raise HTTPException(status_code=404, detail="Account not found")
+
+    try:
+        job = statement_exports.enqueue(
+            db,
+            customer_id=current_customer.customer_id,
+            account_number=request.account_number,
+            start_date=request.start_date,
+            end_date=request.end_date,
+            export_format=request.format
+        )
+        return {
+            "status": "success",
+            "export": statement_exports.job_to_dict(job)
+        }
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to queue statement export: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to queue statement export: {str(e)}")
+
+@router.get("/statements/exports/{job_id}")
+def get_statement_export(
+    job_id: str,
+    current_customer: AuthenticatedCustomer = Depends(get_current_customer),
+    db: Session = Depends(get_db)
+):
+    """Status of an export job (queued, running, completed, failed)."""
+    job = _owned_job(db, job_id, current_customer)
+    return {
+        "status": "success",
+        "export": statement_exports.job_to_dict(job)
+    }
+
+@router.get("/statements/exports/{job_id}/download")
+def download_statement_export(
+    job_id: str,
+    range: Optional[str] = Header(None),
+    current_customer: AuthenticatedCustomer = Depends(get_current_customer),
+    db: Session = Depends(get_db)
+):
+    """
+    Download a completed export. Supports single HTTP byte ranges so large
+    files can be fetched in parts or resumed.
+    """
+    job = _owned_job(db, job_id, current_customer)
+    if job.status != "completed":
+        raise HTTPException(status_code=409, detail=f"Export is {job.status}")
+    if not job.file_path or not os.path.exists(job.file_path):
+        raise HTTPException(status_code=410, detail="Export file is no longer available")
+
+    file_size = os.path.getsize(job.file_path)
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f"attachment; filename=statement_{job.account_number}_{job.job_id}.{job.format}"
+    }
+    media_type = EXPORT_FORMATS[job.format]
+
+    byte_range = _parse_range(range, file_size) if range else None
+    if range and (byte_range is None or byte_range[0] >= file_size or byte_range[0] > byte_range[1]):
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{file_size}"}
+        )
+
+    if byte_range is None:
+        headers["Content-Length"] = str(file_size)
+        return StreamingResponse(_iter_file(job.file_path, 0, file_size), media_type=media_type, headers=headers)
+
+    start, end = byte_range
+    length = end - start + 1
+    headers["Content-Range"] = f"bytes {start}-{end}/{file_size}"
+    headers["Content-Length"] = str(length)
+    return StreamingResponse(
+        _iter_file(job.file_path, start, length),
+        status_code=206,
+        media_type=media_type,
+        headers=headers
+    )
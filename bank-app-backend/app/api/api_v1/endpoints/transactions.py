@@ -19,8 +19,8 @@
 
 # from app.core.config import settings
 # from app.db.base import get_db
-# from app.db.models.user import Account, Transaction, AppData
-# from app.schemas.transactions import TransactionCreateRequest
+# from app.db.models.user import Account, Transaction
+# from app.schemas.transactions import TransactionCreateRequest, BulkTransferRequest
 # from app.services import feature_service
 # from app.services.fraud_service import fraud_predictor
 # from app.services.pin_verification_service import PinVerificationService
@@ -169,7 +169,7 @@
 # def create_transaction(
 #     request: TransactionCreateRequest,
 #     background_tasks: BackgroundTasks,
-#     current_customer: AppData = Depends(get_current_customer),
+#     current_customer: AuthenticatedCustomer = Depends(get_current_customer),
 #     db: Session = Depends(get_db),
 # ):
 #     """Execute a transfer with enhanced PIN + FIDO2 authentication support"""
@@ -575,7 +575,7 @@
 # @router.post("/transactions/test-fraud")
 # def test_fraud_detection(
 #     request: TransactionCreateRequest,
-#     current_customer: AppData = Depends(get_current_customer),
+#     current_customer: AuthenticatedCustomer = Depends(get_current_customer),
 #     db: Session = Depends(get_db),
 # ):
 #     """Test fraud detection without executing transaction"""
@@ -628,7 +628,7 @@
 # @router.post("/transactions/verify-pin", response_model=PinVerificationResponse)
 # def verify_atm_pin(
 #     request: PinVerificationRequest,
-#     current_customer: AppData = Depends(get_current_customer),
+#     current_customer: AuthenticatedCustomer = Depends(get_current_customer),
 #     db: Session = Depends(get_db),
 # ):
 #     """Verify ATM PIN for re-authentication flow"""
@@ -670,23 +670,32 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from decimal import Decimal
 import logging
-from typing import Annotated, Dict, List, Tuple, Optional
+from typing import Annotated, Any, Callable, Dict, List, Tuple, Optional
 
 import jwt
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Header, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from bank_common.timing import StageTimer
 from app.db.base import get_db
+from app.db.replicas import note_customer
 from app.db.models.user import Account, Transaction, AppData
-from app.schemas.transactions import TransactionCreateRequest
+from app.schemas.transactions import TransactionCreateRequest, BulkTransferRequest
 from app.services import feature_service
 from app.services.fraud_service import fraud_predictor
 from app.services.pin_verification_service import PinVerificationService
 from app.services.sms_service import SMSService
 from app.services.seedkey_attempt_service import SeedkeyAttemptService
 from app.schemas.transactions import PinVerificationRequest, PinVerificationResponse
-from app.services.restoration_limit_service import RestorationLimitService
+from app.services.restoration_limit_service import RestorationLimitService, RestorationLimitExceededError
+from app.services.balance_service import balance_engine, InsufficientFundsError
+from app.services.idempotency_service import idempotency_store, IdempotencyConflict
+from app.services.bulk_transfer_service import bulk_transfers
+from app.services.customer_context import get_customer_context, load_app_data
+from app.services.principal_cache import AuthenticatedCustomer, principal_cache
 
 # -----------------------------------------------------------------------------
 # Router & Logger
@@ -815,10 +824,10 @@ def validate_features(features: Dict[str, float]) -> FeatureValidationResult:
 # -----------------------------------------------------------------------------
 # Auth dependency
 # -----------------------------------------------------------------------------
-async def get_current_customer(
+def get_current_customer(
     authorization: Annotated[str, Header()],
     db: Session = Depends(get_db),
-) -> AppData:
+) -> AuthenticatedCustomer:
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Invalid authorization header")
 
@@ -833,11 +842,20 @@ async def get_current_customer(
     except jwt.PyJWTError as exc:
         raise HTTPException(status_code=401, detail="Could not validate credentials") from exc
 
-    customer = db.query(AppData).filter(AppData.customer_id == customer_id).first()
-    if customer is None:
-        raise HTTPException(status_code=404, detail="Customer not found")
+    note_customer(customer_id)
+    principal = principal_cache.get(customer_id)
+    if principal is None:
+        # Seeds the request's customer context: later AppData lookups reuse this row
+        customer = load_app_data(db, customer_id)
+        if customer is None:
+            raise HTTPException(status_code=404, detail="Customer not found")
+        principal = AuthenticatedCustomer(customer.customer_id, bool(customer.app_access_revoked))
+        principal_cache.put(principal)
 
-    return customer
+    if principal.app_access_revoked:
+        raise HTTPException(status_code=403, detail="App access has been revoked")
+
+    return principal
 
 # -----------------------------------------------------------------------------
 # Enhanced Transaction Endpoint 
@@ -847,10 +865,69 @@ def create_transaction(
     request: TransactionCreateRequest,
     background_tasks: BackgroundTasks,
     http_request: Request,
-    current_customer: AppData = Depends(get_current_customer),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    current_customer: AuthenticatedCustomer = Depends(get_current_customer),
     db: Session = Depends(get_db),
 ):
-    """Execute a transfer with enhanced PIN + FIDO2 authentication support and SMS notifications"""
+    """
+    Execute a transfer. With an Idempotency-Key header, retries of the same
+    request return the first outcome (marked Idempotent-Replayed) instead of
+    moving money again.
+    """
+    if not idempotency_key:
+        return _execute_transaction(request, background_tasks, http_request, current_customer, db)
+
+    customer_id = current_customer.customer_id
+    request_hash = idempotency_store.fingerprint(request.model_dump(exclude={"atm_pin"}))
+    try:
+        replay = idempotency_store.begin(customer_id, idempotency_key, request_hash)
+    except IdempotencyConflict as conflict:
+        raise HTTPException(status_code=conflict.status_code, detail=conflict.detail)
+
+    if replay is not None:
+        logger.info(f"Replaying idempotent transaction for customer {customer_id}, key {idempotency_key}")
+        return JSONResponse(
+            status_code=replay.status_code,
+            content=replay.response,
+            headers={"Idempotent-Replayed": "true"}
+        )
+
+    def record_outcome(session: Session, status_code: int, outcome: Dict[str, Any]) -> None:
+        idempotency_store.record(session, customer_id, idempotency_key, status_code, jsonable_encoder(outcome))
+
+    try:
+        response = _execute_transaction(request, background_tasks, http_request, current_customer, db,
+                                        record_outcome=record_outcome)
+    except HTTPException as exc:
+        # Client errors are final for this request; server errors may be retried.
+        # Errors only escape before the debit commits, and abandon() keeps a recorded key.
+        if exc.status_code < 500:
+            idempotency_store.complete(customer_id, idempotency_key, request_hash,
+                                       exc.status_code, {"detail": jsonable_encoder(exc.detail)})
+        else:
+            idempotency_store.abandon(customer_id, idempotency_key)
+        raise
+    except Exception:
+        idempotency_store.abandon(customer_id, idempotency_key)
+        raise
+
+    idempotency_store.complete(customer_id, idempotency_key, request_hash, 200, jsonable_encoder(response))
+    return response
+
+
+def _execute_transaction(
+    request: TransactionCreateRequest,
+    background_tasks: BackgroundTasks,
+    http_request: Request,
+    current_customer: AuthenticatedCustomer,
+    db: Session,
+    record_outcome: Optional[Callable[[Session, int, Dict[str, Any]], None]] = None,
+):
+    """
+    Execute a transfer with enhanced PIN + FIDO2 authentication support and SMS notifications.
+    `record_outcome(db, status_code, response)` is called in the debit's transaction, before it commits.
+    """
+    timer = StageTimer("transfer")
     device_info = get_device_info(http_request)
     sender_customer_id: str = current_customer.customer_id
 
@@ -859,15 +936,9 @@ def create_transaction(
     except Exception as exc:
         raise HTTPException(status_code=422, detail="Invalid amount format") from exc
 
+    customer_context = get_customer_context(db, sender_customer_id)
     if request.account_number:
-        sender_account: Optional[Account] = (
-            db.query(Account)
-            .filter(
-                Account.customer_id == sender_customer_id,
-                Account.account_number == request.account_number
-            )
-            .first()
-        )
+        sender_account: Optional[Account] = customer_context.account(db, request.account_number)
         
         if sender_account is None:
             raise HTTPException(
@@ -876,9 +947,7 @@ def create_transaction(
             )
             
     else:
-        sender_account: Optional[Account] = (
-            db.query(Account).filter(Account.customer_id == sender_customer_id).first()
-        )
+        sender_account: Optional[Account] = customer_context.primary_account(db)
         
         if sender_account is None:
             raise HTTPException(status_code=404, detail="No accounts found for customer")
@@ -895,6 +964,7 @@ def create_transaction(
     
     if sender_account.balance < transaction_amount:
         raise HTTPException(status_code=400, detail="Insufficient funds")
+    timer.mark("account_lookup")
 
     # Get recipient name for SMS notification (default to account number if not available)
     recipient_name = getattr(request, 'recipient_name', None) or f"A/C ***{request.recipient_account_number[-4:]}"
@@ -959,6 +1029,7 @@ def create_transaction(
         }
     
     logger.info(f"Restoration limits check passed: {validation_message}")
+    timer.mark("restoration_check")
 
     # --- CHECK FOR RE-AUTHENTICATION FLAGS -------------------------------------
     is_reauth = getattr(request, 'is_reauth_transaction', False) or False
@@ -1024,6 +1095,7 @@ def create_transaction(
             current_features: Dict[str, float] = feature_service.get_current_features_for_customer_and_terminal(
                 db, sender_customer_id, request.terminal_id
             )
+            timer.mark("feature_fetch")
 
             # Add transaction-time features
             now = datetime.now(timezone.utc)
@@ -1131,6 +1203,7 @@ def create_transaction(
         )
         fraud_probability = 0.0
         is_fraud_prediction = False
+    timer.mark("ml_scoring")
 
     # --- Early Return for Blocked Transactions ---------------------------------
     if is_fraud_prediction and fraud_details:
@@ -1192,6 +1265,7 @@ def create_transaction(
         }
 
     # --- Atomic Transaction Logic (Only for non-fraudulent transactions) -------
+    committed = False
     try:
         logger.info(
             "Executing transfer: from=%s to=%s amount=%s fraud_prob=%.6f is_reauth=%s pin_verified=%s bypassed=%s recipient_name=%s",
@@ -1205,8 +1279,16 @@ def create_transaction(
             recipient_name
         )
 
-        sender_account.balance -= transaction_amount
-        recipient_account.balance += transaction_amount
+        # Lock the account rows in account-number order and re-check funds under the lock
+        sender_account = balance_engine.transfer(
+            db, sender_account.account_number, recipient_account.account_number, transaction_amount
+        )
+
+        # Re-check the restoration limit and count the spend in the same transaction as the debit
+        sender_app_data = load_app_data(db, sender_customer_id)
+        if sender_app_data is not None and sender_app_data.is_restoration_limited:
+            if not RestorationLimitService.reserve_restoration_spend(db, sender_customer_id, transaction_amount):
+                raise RestorationLimitExceededError("Transaction exceeds post-restoration limit")
 
         # When creating transaction records, include auth method and recipient name
         auth_suffix = ""
@@ -1246,9 +1328,26 @@ def create_transaction(
         )
         db.add(credit_transaction)
 
+        # Outcome as of the commit: stored with the debit, and returned if a post-commit step fails
+        db.flush()
+        committed_response = {
+            "status": "Transaction successful",
+            "new_balance": float(sender_account.balance),
+            "transaction_id": str(debit_transaction.id),
+            "fraud_prediction": False,
+            "fraud_probability": float(fraud_probability) if fraud_probability != -1.0 else None,
+            "blocked": False,
+            "auth_method": auth_method,
+            "message": f"Transaction completed successfully. ₹{transaction_amount} transferred to {recipient_name}"
+        }
+        if record_outcome is not None:
+            record_outcome(db, 200, committed_response)
+
         # Commit the transaction FIRST
         db.commit()
+        committed = True
         db.refresh(debit_transaction)
+        timer.mark("commit")
         
         logger.info(f"Transaction committed successfully: tx_id={debit_transaction.id}")
         
@@ -1280,8 +1379,9 @@ def create_transaction(
             logger.error(f"Exception during transaction SMS for customer {sender_customer_id}: {str(sms_error)}")
             sms_error_details = str(sms_error)
             sms_sent = False
+        timer.mark("sms")
 
-        # Add transaction info to other_details for tracking
+        # Record the transaction as a device event for tracking
         try:
             SeedkeyAttemptService.add_device_info_to_other_details(
                 db=db,
@@ -1302,6 +1402,7 @@ def create_transaction(
             )
         except Exception as tracking_error:
             logger.error(f"Failed to add transaction tracking: {str(tracking_error)}")
+        timer.mark("device_tracking")
 
         # Post-commit background updates for rolling features
         background_tasks.add_task(feature_service.update_customer_features, db, sender_customer_id)
@@ -1311,6 +1412,7 @@ def create_transaction(
 
         # Get restoration info for response
         restoration_info = RestorationLimitService.get_restoration_info(db, sender_customer_id)
+        timer.mark("restoration_info")
         
         # Build enhanced success response
         response = {
@@ -1348,7 +1450,22 @@ def create_transaction(
             
         return response
 
+    except InsufficientFundsError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Insufficient funds")
+    except RestorationLimitExceededError as exc:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(exc))
     except Exception as exc:
+        if committed:
+            # The money moved: never report a committed transfer as failed (a retry would debit again)
+            logger.exception(
+                "Post-commit step failed for transaction %s (customer=%s): %s",
+                committed_response["transaction_id"],
+                sender_customer_id,
+                exc,
+            )
+            return committed_response
         db.rollback()
         logger.exception(
             "Transaction failed and rolled back (customer=%s): %s",
@@ -1370,11 +1487,95 @@ def create_transaction(
             logger.error(f"Failed to send transaction error SMS: {str(sms_error)}")
         
         raise HTTPException(status_code=500, detail="An error occurred during the transaction")
-    
+
+# -----------------------------------------------------------------------------
+# Bulk Transfer Endpoint (batch payouts)
+# -----------------------------------------------------------------------------
+@router.post("/transactions/bulk")
+def create_bulk_transfer(
+    request: BulkTransferRequest,
+    background_tasks: BackgroundTasks,
+    http_request: Request,
+    current_customer: AuthenticatedCustomer = Depends(get_current_customer),
+    db: Session = Depends(get_db),
+):
+    """
+    Execute up to BULK_TRANSFER_MAX_ITEMS transfers from one account (e.g. a
+    salary batch). Items are scored together and applied in chunked commits;
+    the response reports a result per item and the batch throughput.
+    """
+    if len(request.transfers) > settings.BULK_TRANSFER_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A bulk transfer can contain at most {settings.BULK_TRANSFER_MAX_ITEMS} transfers"
+        )
+
+    device_info = get_device_info(http_request)
+    sender_customer_id: str = current_customer.customer_id
+
+    customer_context = get_customer_context(db, sender_customer_id)
+    if request.account_number:
+        sender_account: Optional[Account] = customer_context.account(db, request.account_number)
+    else:
+        sender_account = customer_context.primary_account(db)
+    if sender_account is None:
+        raise HTTPException(status_code=404, detail="Sender account not found or not owned by you")
+
+    batch = bulk_transfers.execute(
+        db,
+        customer_id=sender_customer_id,
+        sender_account=sender_account,
+        terminal_id=request.terminal_id,
+        items=request.transfers,
+        fraud_threshold=FRAUD_THRESHOLD_ADJUSTED
+    )
+    counts = batch["counts"]
+
+    if counts["completed"]:
+        try:
+            SMSService.send_bulk_transfer_notification(
+                db=db,
+                customer_id=sender_customer_id,
+                transfer_count=counts["completed"],
+                total_amount=Decimal(str(batch["total_amount"])),
+                new_balance=Decimal(str(batch["new_balance"])),
+                device_info=device_info["device_info"],
+                location=device_info["location"]
+            )
+        except Exception as sms_error:
+            logger.error(f"Failed to send bulk transfer SMS: {str(sms_error)}")
+
+        try:
+            SeedkeyAttemptService.add_device_info_to_other_details(
+                db=db,
+                customer_id=sender_customer_id,
+                action_type="transaction",
+                device_info=device_info["device_info"],
+                location=device_info["location"],
+                ip_address=device_info["ip_address"],
+                additional_info={
+                    "bulk": True,
+                    "transfer_count": counts["completed"],
+                    "amount": batch["total_amount"],
+                    "auth_method": "standard"
+                }
+            )
+        except Exception as tracking_error:
+            logger.error(f"Failed to add bulk transfer tracking: {str(tracking_error)}")
+
+        # Rolling features are refreshed once per batch, not once per transfer
+        background_tasks.add_task(feature_service.update_customer_features, db, sender_customer_id)
+        background_tasks.add_task(feature_service.update_terminal_features, db, request.terminal_id)
+
+    return {
+        "status": "Bulk transfer processed",
+        **batch
+    }
+
 @router.post("/transactions/test-fraud")
 def test_fraud_detection(
     request: TransactionCreateRequest,
-    current_customer: AppData = Depends(get_current_customer),
+    current_customer: AuthenticatedCustomer = Depends(get_current_customer),
     db: Session = Depends(get_db),
 ):
     """Test fraud detection without executing transaction"""
@@ -1428,7 +1629,7 @@ def test_fraud_detection(
 def verify_atm_pin(
     request: PinVerificationRequest,
     http_request: Request,
-    current_customer: AppData = Depends(get_current_customer),
+    current_customer: AuthenticatedCustomer = Depends(get_current_customer),
     db: Session = Depends(get_db),
 ):
     """Verify ATM PIN for re-authentication flow with SMS notifications"""
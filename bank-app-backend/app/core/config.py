@@ -1,6 +1,6 @@
 from pydantic import AnyHttpUrl, PostgresDsn
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 
 class Settings(BaseSettings):
     # Core Project Settings
@@ -8,6 +8,27 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     BACKEND_CORS_ORIGINS: str
     DATABASE_URL: PostgresDsn
+    # Async engine for the async read endpoints; derived from DATABASE_URL (asyncpg) when unset
+    ASYNC_DATABASE_URL: Optional[str] = None
+    # Read replicas for read-only endpoints: comma-separated sync URLs (async ones are derived)
+    DATABASE_READ_REPLICA_URLS: str = ""
+    # Reads of a customer who just wrote stay on the primary for this long
+    READ_AFTER_WRITE_STICKY_SECONDS: float = 5.0
+    # Replicas further behind than this (or not checked recently) are skipped
+    REPLICA_MAX_LAG_SECONDS: float = 2.0
+    REPLICA_LAG_CHECK_INTERVAL_SECONDS: float = 1.0
+
+    # Connection pool, per engine and per worker process: at most
+    # DB_POOL_SIZE + DB_MAX_OVERFLOW connections, waiting up to DB_POOL_TIMEOUT
+    # seconds for one. Pre-ping tests each connection on checkout; recycle
+    # replaces connections older than DB_POOL_RECYCLE seconds (-1 disables).
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 10.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Reuse the most recently returned connection, so surplus idle ones age out via recycle
+    DB_POOL_USE_LIFO: bool = False
     RP_ID: str
     RP_NAME: str
     ORIGIN: AnyHttpUrl
@@ -15,9 +36,80 @@ class Settings(BaseSettings):
     TWILIO_AUTH_TOKEN: str
     TWILIO_VERIFY_SERVICE_SID: str
     TWILIO_PHONE_NUMBER: str
+    # Send Twilio API calls here instead of *.twilio.com (a local fake for load tests)
+    TWILIO_API_BASE_URL: Optional[str] = None
+    # IP geolocation lookup; {ip} is replaced with the address
+    IP_GEOLOCATION_URL: str = "http://ip-api.com/json/{ip}"
     PRIVATE_KEY: str
     JWT_SECRET: str = "your_jwt_secret_here"
 
+    # Worker startup: create missing tables and added columns (off where the schema is managed
+    # separately), and warm the fraud model / Twilio client in the background
+    # (off: they load on first use; /health/ready then does not wait for them)
+    DB_CREATE_ALL_ON_STARTUP: bool = True
+    STARTUP_WARMUP: bool = True
+
+    # Fraud model weights and scalers are memory-mapped from MODEL_SHARED_DIR
+    # (published there from app/ml_models on first load), so all workers share
+    # one copy. CPU only; off, or on a GPU, each worker loads its own.
+    SHARED_MODEL_WEIGHTS: bool = True
+    MODEL_SHARED_DIR: str = "app/ml_models/shared"
+
+    # Data retention for append-only log tables
+    RETENTION_ENABLED: bool = True
+    RETENTION_INTERVAL_MINUTES: int = 60
+    RETENTION_BATCH_SIZE: int = 1000
+    RETENTION_LOCK_TIMEOUT_MS: int = 2000
+    LOCATION_RETENTION_HOURS: int = 720
+    LOGIN_ATTEMPT_RETENTION_DAYS: int = 90
+    SEEDKEY_ATTEMPT_RETENTION_DAYS: int = 90
+
+    # Transaction history paging
+    TRANSACTION_PAGE_SIZE: int = 50
+    TRANSACTION_MAX_PAGE_SIZE: int = 500
+    TRANSACTION_STREAM_CHUNK_SIZE: int = 1000
+    ACCOUNT_SUMMARY_RECENT_TRANSACTIONS: int = 10
+
+    # Balance engine: comma-separated accounts whose credits go through the ledger
+    HOT_ACCOUNT_NUMBERS: str = ""
+    LEDGER_FOLD_INTERVAL_SECONDS: float = 2.0
+    LEDGER_FOLD_BATCH_SIZE: int = 5000
+
+    # Authenticated-principal cache (also the bound for revocation to reach every worker)
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS: float = 30.0
+    AUTH_PRINCIPAL_CACHE_SIZE: int = 50000
+
+    # Access log: sampled JSON lines (5xx and slow requests are always logged)
+    ACCESS_LOG_SAMPLE_RATE: float = 0.1
+    ACCESS_LOG_SLOW_MS: float = 1000.0
+    ACCESS_LOG_HEADERS: str = "user-agent,x-forwarded-for,x-request-id"
+    ACCESS_LOG_QUEUE_SIZE: int = 10000
+
+    # Return per-stage durations (transfer/login/restore) in a Server-Timing header
+    SERVER_TIMING_ENABLED: bool = False
+
+    # Bulk (batch payout) transfers
+    BULK_TRANSFER_MAX_ITEMS: int = 5000
+    BULK_TRANSFER_CHUNK_SIZE: int = 500
+
+    # Idempotency-Key handling for money-moving endpoints
+    IDEMPOTENCY_TTL_HOURS: int = 24
+    IDEMPOTENCY_WAIT_SECONDS: float = 15.0
+    IDEMPOTENCY_CACHE_SIZE: int = 10000
+
+    # Background statement exports
+    STATEMENT_EXPORT_DIR: str = "exports"
+    STATEMENT_EXPORT_WORKERS: int = 2
+    STATEMENT_EXPORT_CHUNK_ROWS: int = 5000
+    STATEMENT_EXPORT_MAX_RANGE_DAYS: int = 366
+    STATEMENT_EXPORT_RETENTION_HOURS: int = 72
+
+    # Monthly partitions of `transactions`; older months move to the compressed archive
+    TRANSACTION_PARTITIONS_AHEAD_MONTHS: int = 3
+    TRANSACTION_HOT_MONTHS: int = 13
+    TRANSACTION_ARCHIVE_ENABLED: bool = True
+    TRANSACTION_MIGRATION_BATCH_SIZE: int = 50000
+
     class Config:
         env_file = ".env"
         env_file_encoding = 'utf-8'
@@ -0,0 +1,19 @@
+# --- File: app/core/pagination.py ---
+# Opaque keyset cursors for (timestamp, id) ordered listings
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+
+def encode_cursor(ts: datetime, row_id: int) -> str:
+    raw = json.dumps([ts.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        ts, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(ts), int(row_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
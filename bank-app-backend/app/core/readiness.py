@@ -0,0 +1,96 @@
+# --- File: app/core/readiness.py ---
+"""
+Readiness of a worker's slow-to-start subsystems.
+
+Heavy dependencies are imported on first use instead of at import time
+(torch/pandas when the fraud models load, cv2/PIL when a signature route is
+hit, twilio on the first SMS), so a worker starts serving within a second or
+so. Subsystems registered with a `warm` callable are warmed one after another
+in a background thread once the app has started:
+
+    readiness.register("fraud_model", warm=fraud_predictor.warm_up,
+                       is_warm=lambda: fraud_predictor.models_loaded)
+
+Subsystems registered without `warm` stay lazy and only report whether they
+have been loaded yet. `report()` (GET /health/ready) lists every subsystem as
+cold / warming / warm / failed, with warm-up seconds or the error. A worker is
+ready once every `required` subsystem is warm.
+"""
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Subsystem:
+    __slots__ = ("name", "warm", "is_warm", "required", "state", "seconds", "error")
+
+    def __init__(self, name: str, warm: Optional[Callable[[], None]], is_warm: Callable[[], bool], required: bool):
+        self.name = name
+        self.warm = warm
+        self.is_warm = is_warm
+        self.required = required
+        self.state = "cold"
+        self.seconds = None
+        self.error = None
+
+
+class Readiness:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subsystems: Dict[str, Subsystem] = {}
+        self._started_at = time.monotonic()
+        self._thread = None
+
+    def register(self, name: str, warm: Optional[Callable[[], None]] = None,
+                 is_warm: Optional[Callable[[], bool]] = None, required: bool = True) -> None:
+        """`warm` raises on failure; `is_warm` reports lazy loading that happened outside the warm-up."""
+        with self._lock:
+            self._subsystems[name] = Subsystem(name, warm, is_warm or (lambda: False), required)
+
+    def _warm_all(self) -> None:
+        for subsystem in list(self._subsystems.values()):
+            if subsystem.warm is None:
+                continue
+            subsystem.state = "warming"
+            started = time.perf_counter()
+            try:
+                subsystem.warm()
+                subsystem.state = "warm"
+            except Exception as e:
+                subsystem.state = "failed"
+                subsystem.error = str(e)
+                logger.error(f"Warm-up of {subsystem.name} failed: {e}")
+            subsystem.seconds = round(time.perf_counter() - started, 3)
+            logger.info(f"Warm-up of {subsystem.name}: {subsystem.state} in {subsystem.seconds}s")
+
+    def warm_in_background(self) -> None:
+        self._thread = threading.Thread(target=self._warm_all, name="readiness-warmup", daemon=True)
+        self._thread.start()
+
+    def _state(self, subsystem: Subsystem) -> str:
+        if subsystem.state in ("cold", "warming") and subsystem.is_warm():
+            return "warm"
+        return subsystem.state
+
+    def report(self) -> Dict[str, any]:
+        subsystems = {}
+        for subsystem in list(self._subsystems.values()):
+            entry = {"state": self._state(subsystem), "required": subsystem.required,
+                     "lazy": subsystem.warm is None}
+            if subsystem.seconds is not None:
+                entry["warmup_seconds"] = subsystem.seconds
+            if subsystem.error:
+                entry["error"] = subsystem.error
+            subsystems[subsystem.name] = entry
+        return {
+            "ready": all(s["state"] == "warm" for s in subsystems.values() if s["required"]),
+            "uptime_seconds": round(time.monotonic() - self._started_at, 3),
+            "subsystems": subsystems,
+        }
+
+
+# Create global instance
+readiness = Readiness()
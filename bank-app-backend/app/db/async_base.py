@@ -0,0 +1,106 @@
+# --- File: app/db/async_base.py ---
+"""
+Async engine and session dependency for I/O-bound read endpoints.
+
+Runs alongside the sync engine in app/db/base.py against the same database
+(and the same models): asyncpg for Postgres, aiosqlite for SQLite. Engines
+are created on first use, so the sync-only parts of the app (scripts,
+background jobs, benchmarks) never need the async driver. get_async_read_db
+routes through read_router like get_read_db (see app/db/replicas.py).
+"""
+from typing import AsyncIterator, Dict
+
+from fastapi import Request
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.db.base import read_router
+from bank_common.pool import pool_metrics, pool_options
+from app.db.replicas import Replica, install_write_tracking
+
+# Sync driver -> async driver for the same database
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+_async_engines: Dict[str, AsyncEngine] = {}
+_async_sessionmakers: Dict[str, async_sessionmaker] = {}
+
+
+def to_async_url(url: str) -> str:
+    """`url` with its driver swapped for the async one."""
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+def async_database_url(url: str) -> str:
+    """ASYNC_DATABASE_URL if set, otherwise DATABASE_URL with its driver swapped for the async one."""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    return to_async_url(url)
+
+
+def _create_engine(name: str, url: str) -> AsyncEngine:
+    from app.db import query_counter
+
+    engine = create_async_engine(url, **pool_options(settings, async_engine=True))
+    pool_metrics.register(name, engine)
+    query_counter.install(engine.sync_engine)
+    return engine
+
+
+def get_async_engine() -> AsyncEngine:
+    if "async_primary" not in _async_engines:
+        engine = _create_engine("async_primary", async_database_url(str(settings.DATABASE_URL)))
+        install_write_tracking(engine)
+        _async_engines["async_primary"] = engine
+    return _async_engines["async_primary"]
+
+
+def get_async_replica_engine(replica: Replica) -> AsyncEngine:
+    name = f"async_{replica.name}"
+    if name not in _async_engines:
+        _async_engines[name] = _create_engine(name, to_async_url(replica.url))
+    return _async_engines[name]
+
+
+def _sessionmaker(key: str, engine: AsyncEngine) -> async_sessionmaker:
+    if key not in _async_sessionmakers:
+        # Objects stay readable after commit without an implicit (sync) refresh
+        _async_sessionmakers[key] = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+    return _async_sessionmakers[key]
+
+
+def get_async_sessionmaker() -> async_sessionmaker:
+    return _sessionmaker("primary", get_async_engine())
+
+
+def get_async_replica_sessionmaker(replica: Replica) -> async_sessionmaker:
+    return _sessionmaker(replica.name, get_async_replica_engine(replica))
+
+
+async def dispose_async_engine() -> None:
+    for engine in _async_engines.values():
+        await engine.dispose()
+    _async_engines.clear()
+    _async_sessionmakers.clear()
+
+
+# Dependency to get an async DB session in `async def` endpoints
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+# Dependency that marks an `async def` route read-only (see get_read_db)
+async def get_async_read_db(request: Request) -> AsyncIterator[AsyncSession]:
+    replica = read_router.route(request)
+    factory = get_async_replica_sessionmaker(replica) if replica else get_async_sessionmaker()
+    async with factory() as db:
+        yield db
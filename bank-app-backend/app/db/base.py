@@ -1,13 +1,33 @@
 # --- File: app/db/base.py ---
+from fastapi import Request
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from app.core.config import settings
+from bank_common.pool import pool_metrics, pool_options
+from app.db.replicas import ReadRouter, Replica, install_write_tracking
 
-engine = create_engine(str(settings.DATABASE_URL), pool_pre_ping=True)
+engine = create_engine(str(settings.DATABASE_URL), **pool_options(settings))
+pool_metrics.register("primary", engine)
+install_write_tracking(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Read replicas for read-only endpoints (see app/db/replicas.py)
+replicas = []
+for i, url in enumerate(u.strip() for u in settings.DATABASE_READ_REPLICA_URLS.split(",") if u.strip()):
+    replica_engine = create_engine(url, **pool_options(settings))
+    pool_metrics.register(f"replica{i + 1}", replica_engine)
+    replicas.append(Replica(f"replica{i + 1}", url, replica_engine))
+ReplicaSessions = {r.name: sessionmaker(autocommit=False, autoflush=False, bind=r.engine) for r in replicas}
+
+read_router = ReadRouter(
+    replicas,
+    sticky_seconds=settings.READ_AFTER_WRITE_STICKY_SECONDS,
+    max_lag_seconds=settings.REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.REPLICA_LAG_CHECK_INTERVAL_SECONDS
+)
+
 # Dependency to get a DB session in API endpoints
 def get_db():
     db = SessionLocal()
@@ -15,3 +35,12 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Dependency that marks a route read-only: a replica session unless read_router sends it to the primary
+def get_read_db(request: Request):
+    replica = read_router.route(request)
+    db = ReplicaSessions[replica.name]() if replica else SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
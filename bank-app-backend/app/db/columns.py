@@ -0,0 +1,41 @@
+# --- File: app/db/columns.py ---
+"""
+Columns added to tables that already existed, and adding them to an existing
+database.
+
+create_all() creates missing tables but never alters existing ones, so a
+column added to a model later is missing from databases created before it.
+add_missing_columns() adds each ADDED_COLUMNS entry that a table lacks
+(ALTER TABLE ... ADD COLUMN IF NOT EXISTS on Postgres, so concurrent workers
+starting at once are fine). With a constant default the ALTER only touches
+the catalog on Postgres 11+, not the rows.
+"""
+import logging
+from typing import List, Tuple
+
+from sqlalchemy import inspect, text
+
+logger = logging.getLogger(__name__)
+
+# (table, column, definition), oldest first
+ADDED_COLUMNS: List[Tuple[str, str, str]] = [
+    ("app_data", "restoration_spent", "NUMERIC(12,2) NOT NULL DEFAULT 0"),
+    ("statement_exports", "worker_id", "VARCHAR"),
+    ("statement_exports", "heartbeat_at", "TIMESTAMP WITH TIME ZONE"),
+]
+
+
+def add_missing_columns(engine) -> List[str]:
+    """Add the ADDED_COLUMNS an existing table lacks; returns "table.column" for each one added."""
+    added = []
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        tables = set(inspector.get_table_names())
+        for table, column, definition in ADDED_COLUMNS:
+            if table not in tables or column in {c["name"] for c in inspector.get_columns(table)}:
+                continue
+            if_not_exists = "IF NOT EXISTS " if engine.dialect.name == "postgresql" else ""
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {if_not_exists}{column} {definition}"))
+            logger.info(f"Added column {table}.{column}")
+            added.append(f"{table}.{column}")
+    return added
@@ -0,0 +1,156 @@
+# --- File: app/db/indexes.py ---
+"""
+Indexes behind the hot queries, and adding them to an existing database.
+
+create_all() only creates a model's indexes together with a new table, so
+create_missing() adds the ones an existing database lacks:
+
+  plain tables         CREATE INDEX CONCURRENTLY (writes keep flowing)
+  partitioned tables   the index is created ON ONLY the parent, built
+                       concurrently on each partition and attached; the
+                       parent index turns valid once every partition has one
+
+Indexes superseded by a new composite (REDUNDANT_INDEXES) are dropped once
+their replacement is valid. `accounts` (the core-banking KYC table queried
+with raw SQL) is not created by the app; its index is added when it exists.
+"""
+import logging
+import time
+from typing import Dict, List
+
+from sqlalchemy import Boolean, Column, Index, MetaData, String, Table, text
+
+logger = logging.getLogger(__name__)
+
+# Raw-SQL table owned by core banking; only the columns the app queries
+core_accounts = Table(
+    "accounts", MetaData(),
+    Column("customer_unique_id", String),
+    Column("phone_number", String),
+    Column("is_registeredinapp", Boolean),
+    Index("ix_accounts_phone_number", "phone_number"),
+)
+
+# Dropped after the index that supersedes them is in place
+REDUNDANT_INDEXES = {
+    "ix_transactions_terminal_id": "ix_transactions_terminal_date",
+}
+
+HOT_QUERY_INDEX_NAMES = (
+    "ix_transactions_account_date_id",
+    "ix_transactions_terminal_date",
+    "ix_transactions_debit_account_date",
+    "ix_account_customer_id",
+    "ix_app_data_phone_number",
+    "ix_challenges_challenge_string",
+    "ix_accounts_phone_number",
+)
+
+
+def hot_query_indexes() -> List[Index]:
+    from app.db.models.challenge import Challenge
+    from app.db.models.user import Account, AppData, Transaction
+
+    tables = [Transaction.__table__, Account.__table__, AppData.__table__, Challenge.__table__, core_accounts]
+    by_name = {index.name: index for table in tables for index in table.indexes}
+    return [by_name[name] for name in HOT_QUERY_INDEX_NAMES]
+
+
+def index_sql(index: Index, table: str = None, name: str = None, concurrently: bool = False,
+              only: bool = False) -> str:
+    """CREATE INDEX for `index`, optionally on another table (a partition or shadow table) under another name."""
+    options = index.dialect_options["postgresql"]
+    columns = ", ".join(c.name for c in index.columns)
+    sql = (
+        f"CREATE {'UNIQUE ' if index.unique else ''}INDEX {'CONCURRENTLY ' if concurrently else ''}"
+        f"IF NOT EXISTS {name or index.name} ON {'ONLY ' if only else ''}{table or index.table.name} ({columns})"
+    )
+    if options.get("include"):
+        sql += f" INCLUDE ({', '.join(options['include'])})"
+    if options.get("where") is not None:
+        sql += f" WHERE {options['where']}"
+    return sql
+
+
+def _relkind(conn, name: str):
+    return conn.execute(text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:n)"), {"n": name}).scalar()
+
+
+def _is_valid(conn, name: str) -> bool:
+    return bool(conn.execute(
+        text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:n)"), {"n": name}
+    ).scalar())
+
+
+def _partitions(conn, table: str) -> List[str]:
+    return conn.execute(
+        text("SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid"
+             " WHERE i.inhparent = to_regclass(:t) ORDER BY c.relname"),
+        {"t": table}
+    ).scalars().all()
+
+
+def missing_indexes(engine) -> List[str]:
+    """Hot-query indexes that are absent or not yet valid."""
+    if engine.dialect.name != "postgresql":
+        return []
+    with engine.connect() as conn:
+        return [
+            index.name for index in hot_query_indexes()
+            if _relkind(conn, index.table.name) is not None and not _is_valid(conn, index.name)
+        ]
+
+
+def create_missing(engine, drop_redundant: bool = True) -> List[Dict]:
+    """Create every missing hot-query index without blocking writes; returns one report per index."""
+    reports = []
+    if engine.dialect.name != "postgresql":
+        with engine.begin() as conn:
+            for index in hot_query_indexes():
+                if index.table is not core_accounts:
+                    index.create(conn, checkfirst=True)
+        return reports
+
+    # CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for index in hot_query_indexes():
+            table = index.table.name
+            kind = _relkind(conn, table)
+            if kind is None:
+                reports.append({"index": index.name, "status": "skipped", "reason": f"no table {table}"})
+                continue
+            if _is_valid(conn, index.name):
+                reports.append({"index": index.name, "status": "exists"})
+                continue
+
+            started = time.monotonic()
+            if kind == "p":
+                conn.execute(text(index_sql(index, only=True)))
+                for partition in _partitions(conn, table):
+                    partition_index = index.name.replace(f"ix_{table}", f"ix_{partition}", 1)
+                    if _relkind(conn, partition_index) is not None and not _is_valid(conn, partition_index):
+                        conn.execute(text(f"DROP INDEX CONCURRENTLY {partition_index}"))
+                    conn.execute(text(index_sql(index, partition, partition_index, concurrently=True)))
+                    conn.execute(text(f"ALTER INDEX {index.name} ATTACH PARTITION {partition_index}"))
+            else:
+                if _relkind(conn, index.name) is not None:
+                    # Left invalid by an interrupted CONCURRENTLY build
+                    conn.execute(text(f"DROP INDEX CONCURRENTLY {index.name}"))
+                conn.execute(text(index_sql(index, concurrently=True)))
+
+            report = {"index": index.name, "status": "created", "seconds": round(time.monotonic() - started, 2)}
+            logger.info(f"Created index {index.name} on {table} in {report['seconds']}s")
+            reports.append(report)
+
+        if drop_redundant:
+            for redundant, replacement in REDUNDANT_INDEXES.items():
+                if _relkind(conn, redundant) is None or not _is_valid(conn, replacement):
+                    continue
+                is_partitioned = conn.execute(
+                    text("SELECT c.relkind = 'I' FROM pg_class c WHERE c.oid = to_regclass(:n)"), {"n": redundant}
+                ).scalar()
+                # Partitioned indexes cannot be dropped concurrently
+                conn.execute(text(f"DROP INDEX {'' if is_partitioned else 'CONCURRENTLY '}{redundant}"))
+                reports.append({"index": redundant, "status": "dropped", "replaced_by": replacement})
+                logger.info(f"Dropped index {redundant} (superseded by {replacement})")
+    return reports
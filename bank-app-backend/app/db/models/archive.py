@@ -0,0 +1,31 @@
+# --- File: app/db/models/archive.py ---
+from sqlalchemy import Column, Integer, BigInteger, String, Date, DateTime, LargeBinary, Index
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+class TransactionArchiveMonth(Base):
+    """A month of transactions moved out of its `transactions` partition into the cold tier."""
+    __tablename__ = "transaction_archive_months"
+    month = Column(Date, primary_key=True)  # first day of the month (UTC)
+    row_count = Column(BigInteger, nullable=False)
+    account_count = Column(Integer, nullable=False)
+    raw_bytes = Column(BigInteger, nullable=False)
+    compressed_bytes = Column(BigInteger, nullable=False)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class TransactionArchiveChunk(Base):
+    """One account's transactions of one archived month, as zlib-compressed JSON rows."""
+    __tablename__ = "transaction_archive_chunks"
+    id = Column(Integer, primary_key=True)
+    month = Column(Date, nullable=False)
+    account_number = Column(String, nullable=False)
+    first_date = Column(DateTime(timezone=True), nullable=False)
+    last_date = Column(DateTime(timezone=True), nullable=False)
+    row_count = Column(Integer, nullable=False)
+    payload = Column(LargeBinary, nullable=False)
+
+    __table_args__ = (
+        # Statements read an account's months in order
+        Index("ix_transaction_archive_chunks_account_month", "account_number", "month", unique=True),
+        Index("ix_transaction_archive_chunks_month", "month"),
+    )
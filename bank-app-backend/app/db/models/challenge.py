@@ -15,7 +15,7 @@ class Challenge(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     customer_id = Column(String, index=True, nullable=False)
-    challenge_string = Column(String, nullable=False)
+    challenge_string = Column(String, nullable=False, index=True)
     challenge_type = Column(Enum(ChallengeType), nullable=False)
     expires_at = Column(DateTime, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
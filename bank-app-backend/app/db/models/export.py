@@ -0,0 +1,25 @@
+# --- File: app/db/models/export.py ---
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+class StatementExport(Base):
+    """A queued/running/finished statement export job and the file it produced."""
+    __tablename__ = "statement_exports"
+    id = Column(Integer, primary_key=True)
+    job_id = Column(String, unique=True, nullable=False)  # uuid4 hex, used in URLs
+    customer_id = Column(String, nullable=False, index=True)
+    account_number = Column(String, nullable=False)
+    start_date = Column(DateTime(timezone=True), nullable=False)
+    end_date = Column(DateTime(timezone=True), nullable=False)
+    format = Column(String, nullable=False)  # 'csv' or 'json'
+    status = Column(String, nullable=False, default="queued")  # queued, running, completed, failed
+    row_count = Column(Integer, nullable=False, default=0)
+    bytes_written = Column(BigInteger, nullable=False, default=0)
+    file_path = Column(String, nullable=True)
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    worker_id = Column(String, nullable=True)  # claim of the worker running the job
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)  # last progress of a running job
@@ -0,0 +1,22 @@
+# --- File: app/db/models/idempotency.py ---
+from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+class IdempotencyRecord(Base):
+    """Outcome of a request sent with an Idempotency-Key, replayed to retries of the same key."""
+    __tablename__ = "idempotency_keys"
+    id = Column(Integer, primary_key=True)
+    customer_id = Column(String, nullable=False)
+    idempotency_key = Column(String, nullable=False)
+    request_hash = Column(String, nullable=False)
+    status = Column(String, nullable=False, default="in_progress")  # in_progress, completed
+    status_code = Column(Integer, nullable=True)
+    response = Column(JSONB, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("customer_id", "idempotency_key", name="uq_idempotency_customer_key"),
+    )
@@ -0,0 +1,15 @@
+# --- File: app/db/models/stats.py ---
+from sqlalchemy import Column, String, BigInteger, DateTime
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+class TableStats(Base):
+    """
+    Exact row counters for large append-only tables, maintained incrementally
+    on insert/delete so health and dashboard probes never need COUNT(*).
+    """
+    __tablename__ = "table_stats"
+    table_name = Column(String, primary_key=True)
+    row_count = Column(BigInteger, nullable=False, default=0)
+    flagged_count = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,6 +1,6 @@
 # --- File: app/db/models/user.py ---
 # Enhanced database models with device tracking and seedkey attempts
-from sqlalchemy import Column, Integer, String, LargeBinary, DateTime, Boolean, Numeric, Date, ForeignKey
+from sqlalchemy import Column, Integer, String, LargeBinary, DateTime, Boolean, Numeric, Date, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from sqlalchemy.dialects.postgresql import JSONB
@@ -9,7 +9,7 @@ from app.db.base import Base
 class Account(Base):
     __tablename__ = "account"
     account_number = Column(String, primary_key=True, index=True)
-    customer_id = Column(String, nullable=False)
+    customer_id = Column(String, nullable=False, index=True)
     account_type = Column(String, nullable=False, default="Savings")
     balance = Column(Numeric(10, 2), nullable=False, default=0.00)     
     atm_pin_hash = Column(String, nullable=True)
@@ -20,10 +20,12 @@ class Account(Base):
     transactions = relationship("Transaction", back_populates="account", cascade="all, delete-orphan")
 
 class Transaction(Base):
+    # On Postgres this is range-partitioned by month on `date`, with primary key
+    # (id, date); see app/services/transaction_partition_service.py
     __tablename__ = "transactions"
     id = Column(Integer, primary_key=True, index=True)
     account_number = Column(String, ForeignKey("account.account_number"), nullable=False)
-    terminal_id = Column(String, index=True, nullable=False)
+    terminal_id = Column(String, nullable=False)
     date = Column(DateTime(timezone=True), server_default=func.now())
     description = Column(String, nullable=False)
     amount = Column(Numeric(10, 2), nullable=False)
@@ -35,6 +37,18 @@ class Transaction(Base):
 
     account = relationship("Account", back_populates="transactions")
 
+    __table_args__ = (
+        # Newest-first history per account (overview, pagination, streaming)
+        Index("ix_transactions_account_date_id", "account_number", "date", "id"),
+        # Terminal feature windows (also serves plain terminal_id lookups)
+        Index("ix_transactions_terminal_date", "terminal_id", "date"),
+        # Customer feature windows aggregate debits only; index-only with amount included
+        Index(
+            "ix_transactions_debit_account_date", "account_number", "date",
+            postgresql_where=text("type = 'debit'"), postgresql_include=["amount"]
+        ),
+    )
+
 class Passkey(Base):
     __tablename__ = "passkeys"
     id = Column(Integer, primary_key=True, index=True)
@@ -58,7 +72,7 @@ class AppData(Base):
     id = Column(Integer, primary_key=True, index=True)
     customer_id = Column(String, unique=True, nullable=False, index=True)
     name = Column(String, nullable=False)
-    phone_number = Column(String, nullable=True)
+    phone_number = Column(String, nullable=True, index=True)
     email = Column(String, nullable=False)
     aadhaar_number = Column(String, nullable=False)
     date_of_birth = Column(Date, nullable=True)
@@ -72,6 +86,7 @@ class AppData(Base):
     is_restoration_limited = Column(Boolean, default=False, nullable=False)
     restoration_daily_limit = Column(Numeric(10, 2), default=5000.00, nullable=False)
     restoration_limit_expires_at = Column(DateTime(timezone=True), nullable=True)
+    restoration_spent = Column(Numeric(12, 2), default=0, server_default="0", nullable=False)  # running debit total since restoration
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     failed_login_attempts = Column(Integer, default=0, nullable=False)
@@ -106,4 +121,49 @@ class SeedkeyAttempt(Base):
     user_agent = Column(String, nullable=True)
     device_info = Column(String, nullable=True)
     location = Column(String, nullable=True)
-    failure_reason = Column(String, nullable=True)
\ No newline at end of file
+    failure_reason = Column(String, nullable=True)
+
+class DeviceEvent(Base):
+    """Append-only device/security activity log (replaces the AppData.other_details array)"""
+    __tablename__ = "device_events"
+    id = Column(Integer, primary_key=True)
+    customer_id = Column(String, nullable=False)
+    action_type = Column(String, nullable=False)  # 'registration', 'restoration', 'login_success', 'transaction', ...
+    ts = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    device_info = Column(String, nullable=True)
+    location = Column(String, nullable=True)
+    ip_address = Column(String, nullable=True)
+    device_id = Column(String, nullable=True)
+    details = Column(JSONB, nullable=True)  # Action-specific fields (user_agent, transaction_id, ...)
+
+    __table_args__ = (
+        Index("ix_device_events_customer_action_ts", "customer_id", "action_type", "ts"),
+        Index("ix_device_events_customer_ts_id", "customer_id", "ts", "id"),
+    )
+
+class SignatureTemplate(Base):
+    """Registered signature features used for restoration (previously stored in other_details)"""
+    __tablename__ = "signature_templates"
+    customer_id = Column(String, primary_key=True)
+    features = Column(JSONB, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class CustomerSecuritySummary(Base):
+    """Per-customer rollup of device_events, maintained on insert so dashboards need one PK read"""
+    __tablename__ = "customer_security_summaries"
+    customer_id = Column(String, primary_key=True)
+    action_counts = Column(JSONB, nullable=False, default=dict)  # {action_type: count}
+    latest_events = Column(JSONB, nullable=False, default=dict)  # {action_type: newest entry}
+    registered_devices = Column(JSONB, nullable=False, default=list)  # Distinct devices, newest first
+    restored_devices = Column(JSONB, nullable=False, default=list)
+    recent_events = Column(JSONB, nullable=False, default=list)  # Newest device history entries
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class BalanceLedgerEntry(Base):
+    """Pending credit to a hot account, folded into account.balance in periodic batches"""
+    __tablename__ = "balance_ledger"
+    id = Column(Integer, primary_key=True)
+    account_number = Column(String, ForeignKey("account.account_number"), nullable=False, index=True)
+    amount = Column(Numeric(10, 2), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,41 @@
+# --- File: app/db/query_counter.py ---
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+
+
+class QueryCounter:
+    """Number of SQL statements executed while this counter is current."""
+
+    def __init__(self):
+        self.count = 0
+
+
+_current: ContextVar[Optional[QueryCounter]] = ContextVar("db_query_counter", default=None)
+
+
+def _on_execute(conn, cursor, statement, parameters, context, executemany):
+    counter = _current.get()
+    if counter is not None:
+        counter.count += 1
+
+
+def install(engine) -> None:
+    """Count statements on `engine` into whichever QueryCounter is current."""
+    if not event.contains(engine, "before_cursor_execute", _on_execute):
+        event.listen(engine, "before_cursor_execute", _on_execute)
+
+
+def start() -> QueryCounter:
+    """
+    Make a fresh counter current for this context. Worker threads started via
+    run_in_threadpool copy the context, so sync endpoints count into it too.
+    """
+    counter = QueryCounter()
+    _current.set(counter)
+    return counter
+
+
+def current() -> Optional[QueryCounter]:
+    return _current.get()
@@ -0,0 +1,251 @@
+# --- File: app/db/replicas.py ---
+"""
+Read-replica routing for read-only endpoints.
+
+A route marks itself read-only by depending on get_read_db /
+get_async_read_db instead of get_db. For each such request ReadRouter picks
+a replica, or falls back to the primary when:
+
+  sticky       the customer (path parameter `customer_id`) wrote through this
+               worker within READ_AFTER_WRITE_STICKY_SECONDS, or the client
+               carries the primary-until cookie set on any writing response
+               (covers other workers and routes keyed by account number)
+  lagging      no replica reported replication lag <= REPLICA_MAX_LAG_SECONDS
+               on its last check (or the check is stale or failed)
+  no_replica   no replica URLs are configured
+
+Writes are detected per request: the HTTP middleware calls begin_request(),
+and every non-SELECT statement on the primary engines flags the request.
+Replica lag is polled by a background thread (start()/stop()).
+"""
+import itertools
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from sqlalchemy import event, text
+
+logger = logging.getLogger(__name__)
+
+# Cookie carrying the epoch time until which this client's reads go to the primary
+PRIMARY_UNTIL_COOKIE = "db_primary_until"
+
+_READ_PREFIXES = ("SELECT", "SHOW", "WITH")
+
+# Seconds of replay lag; 0 when the replica has replayed everything it received
+_LAG_SQL = text(
+    "SELECT CASE"
+    " WHEN NOT pg_is_in_recovery() THEN 0"
+    " WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+    " END"
+)
+
+
+class RequestWrites:
+    """Whether the current request wrote to the primary, and for which customer."""
+    __slots__ = ("wrote", "customer_id")
+
+    def __init__(self):
+        self.wrote = False
+        self.customer_id: Optional[str] = None
+
+
+_current: ContextVar[Optional[RequestWrites]] = ContextVar("db_request_writes", default=None)
+
+
+def begin_request() -> RequestWrites:
+    """Called by the HTTP middleware; worker threads copy the context, so sync endpoints report too."""
+    writes = RequestWrites()
+    _current.set(writes)
+    return writes
+
+
+def note_customer(customer_id: str) -> None:
+    """Attribute the current request's writes to `customer_id` (called by the auth dependency)."""
+    writes = _current.get()
+    if writes is not None:
+        writes.customer_id = customer_id
+
+
+def _on_execute(conn, cursor, statement, parameters, context, executemany):
+    writes = _current.get()
+    if writes is None or writes.wrote:
+        return
+    if not statement.lstrip()[:6].upper().startswith(_READ_PREFIXES):
+        writes.wrote = True
+
+
+def install_write_tracking(engine) -> None:
+    """Flag requests that execute a write on `engine` (sync or async engine)."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if not event.contains(sync_engine, "before_cursor_execute", _on_execute):
+        event.listen(sync_engine, "before_cursor_execute", _on_execute)
+
+
+class Replica:
+    def __init__(self, name: str, url: str, engine):
+        self.name = name
+        self.url = url
+        self.engine = engine
+        self.lag_seconds: Optional[float] = None
+        self.checked_at = 0.0
+        self.error: Optional[str] = None
+
+
+class ReadRouter:
+    def __init__(
+        self,
+        replicas: List[Replica],
+        sticky_seconds: float,
+        max_lag_seconds: float,
+        check_interval: float,
+        max_tracked_customers: int = 100000
+    ):
+        self.replicas = replicas
+        self.sticky_seconds = sticky_seconds
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self.max_tracked_customers = max_tracked_customers
+        self._recent_writes: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._round_robin = itertools.count()
+        self._routed: Dict[str, int] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # -- read-your-writes -----------------------------------------------------
+
+    def mark_write(self, customer_id: Optional[str]) -> None:
+        if not customer_id or not self.replicas:
+            return
+        with self._lock:
+            self._recent_writes[customer_id] = time.monotonic() + self.sticky_seconds
+            self._recent_writes.move_to_end(customer_id)
+            while len(self._recent_writes) > self.max_tracked_customers:
+                self._recent_writes.popitem(last=False)
+
+    def finish_request(self, request, response, writes: RequestWrites) -> None:
+        """After a request that wrote: keep its customer, and its client, on the primary for a while."""
+        if not writes.wrote or not self.replicas:
+            return
+        self.mark_write(writes.customer_id or request.path_params.get("customer_id"))
+        response.set_cookie(
+            PRIMARY_UNTIL_COOKIE,
+            f"{time.time() + self.sticky_seconds:.3f}",
+            max_age=math.ceil(self.sticky_seconds),
+            httponly=True,
+            samesite="lax"
+        )
+
+    def _is_sticky(self, customer_id: Optional[str], primary_until: Optional[str]) -> bool:
+        if primary_until:
+            try:
+                if float(primary_until) > time.time():
+                    return True
+            except ValueError:
+                pass
+        if customer_id:
+            with self._lock:
+                until = self._recent_writes.get(customer_id)
+                if until is not None:
+                    if until > time.monotonic():
+                        return True
+                    del self._recent_writes[customer_id]
+        return False
+
+    # -- routing --------------------------------------------------------------
+
+    def _count(self, target: str) -> None:
+        with self._lock:
+            self._routed[target] = self._routed.get(target, 0) + 1
+
+    def _eligible(self) -> List[Replica]:
+        fresh_after = time.monotonic() - max(3 * self.check_interval, 1.0)
+        return [
+            r for r in self.replicas
+            if r.lag_seconds is not None and r.lag_seconds <= self.max_lag_seconds and r.checked_at >= fresh_after
+        ]
+
+    def choose(self, customer_id: Optional[str] = None, primary_until: Optional[str] = None) -> Optional[Replica]:
+        """The replica to read from, or None for the primary."""
+        if not self.replicas:
+            self._count("primary:no_replica")
+            return None
+        if self._is_sticky(customer_id, primary_until):
+            self._count("primary:sticky")
+            return None
+        eligible = self._eligible()
+        if not eligible:
+            self._count("primary:lagging")
+            return None
+        replica = eligible[next(self._round_robin) % len(eligible)]
+        self._count(f"replica:{replica.name}")
+        return replica
+
+    def route(self, request) -> Optional[Replica]:
+        return self.choose(request.path_params.get("customer_id"), request.cookies.get(PRIMARY_UNTIL_COOKIE))
+
+    # -- lag monitor ----------------------------------------------------------
+
+    def check_lag(self) -> None:
+        for replica in self.replicas:
+            try:
+                with replica.engine.connect() as conn:
+                    if replica.engine.dialect.name == "postgresql":
+                        lag = float(conn.execute(_LAG_SQL).scalar() or 0)
+                    else:
+                        conn.execute(text("SELECT 1"))
+                        lag = 0.0
+                replica.lag_seconds = lag
+                replica.error = None
+                if lag > self.max_lag_seconds:
+                    logger.warning(f"Replica {replica.name} is {lag:.1f}s behind; reads fall back to the primary")
+            except Exception as e:
+                replica.lag_seconds = None
+                replica.error = str(e)
+                logger.error(f"Replica {replica.name} lag check failed: {e}")
+            replica.checked_at = time.monotonic()
+
+    def start(self) -> None:
+        if not self.replicas or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self.check_lag()
+        self._thread = threading.Thread(target=self._loop, name="replica-lag-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.check_interval):
+            self.check_lag()
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            routed = dict(self._routed)
+            sticky_customers = sum(1 for until in self._recent_writes.values() if until > now)
+        return {
+            "replicas": [
+                {
+                    "name": r.name,
+                    "lag_seconds": r.lag_seconds,
+                    "checked_seconds_ago": round(now - r.checked_at, 3) if r.checked_at else None,
+                    "eligible": r in self._eligible(),
+                    "error": r.error
+                }
+                for r in self.replicas
+            ],
+            "max_lag_seconds": self.max_lag_seconds,
+            "sticky_seconds": self.sticky_seconds,
+            "sticky_customers": sticky_customers,
+            "routed": routed
+        }
@@ -67,7 +67,7 @@
 # --- File: app/schemas/transaction.py ---
 
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 class TransactionCreateRequest(BaseModel):
@@ -82,6 +82,18 @@ class TransactionCreateRequest(BaseModel):
     atm_pin: Optional[str] = Field(None, description="ATM PIN for re-authentication (required for blocked transactions)")
     pin_verified: Optional[bool] = Field(False, description="Whether PIN verification was completed")
 
+class BulkTransferItem(BaseModel):
+    recipient_account_number: str = Field(..., description="The account number of the recipient.")
+    amount: float = Field(..., gt=0, description="The amount to transfer.")
+    recipient_name: Optional[str] = Field(None, description="Name of the recipient.")
+    reference: Optional[str] = Field(None, description="Caller's reference for this item, echoed in the result.")
+
+class BulkTransferRequest(BaseModel):
+    transfers: List[BulkTransferItem] = Field(..., min_length=1, description="Transfers to execute, in order.")
+    terminal_id: str = Field(..., description="A unique identifier for the client device/terminal.")
+    account_number: Optional[str] = Field(None, description="The sender's account number.")
+    biometric_hash: str = Field(..., description="A hash representing the client's biometric state.")
+
 # NEW: PIN verification request schema
 class PinVerificationRequest(BaseModel):
     atm_pin: str = Field(..., min_length=4, max_length=6, description="ATM PIN (4-6 digits)")
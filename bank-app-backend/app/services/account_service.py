@@ -1,10 +1,24 @@
 # --- File: app/services/account_service.py ---
+from sqlalchemy import and_, func, insert, select, true, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.core.pagination import decode_cursor, encode_cursor
 from app.db.models.user import Account, Transaction
-from typing import List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 import random
 from datetime import datetime, timedelta
 
+# Columns returned by the history APIs (avoids loading full ORM objects)
+TRANSACTION_COLUMNS = (
+    Transaction.id,
+    Transaction.account_number,
+    Transaction.description,
+    Transaction.amount,
+    Transaction.type,
+    Transaction.date,
+    Transaction.terminal_id,
+)
+
 def create_account_for_customer(db: Session, customer_id: str, account_type: str = "Savings") -> Account:
     """Creates a new account for a customer."""
     account_number = f"ACC{random.randint(100000000, 999999999)}"
@@ -38,6 +52,194 @@ def get_transactions_by_account_number(db: Session, account_number: str) -> List
     """Retrieves all transactions for a given account, most recent first."""
     return db.query(Transaction).filter(Transaction.account_number == account_number).order_by(Transaction.date.desc()).all()
 
+def transaction_to_dict(t) -> Dict[str, Any]:
+    """Serialize a transaction (ORM object or TRANSACTION_COLUMNS row) for API responses."""
+    return {
+        "id": t.id,
+        "account_number": t.account_number,
+        "description": t.description,
+        "amount": float(t.amount),
+        "type": t.type,
+        "date": t.date.isoformat() if t.date else None,
+        "terminal_id": t.terminal_id
+    }
+
+def _filtered_transactions(
+    db: Session,
+    account_number: str,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    txn_type: Optional[str] = None,
+    newest_first: bool = True
+):
+    query = db.query(*TRANSACTION_COLUMNS).filter(Transaction.account_number == account_number)
+    if start_date:
+        query = query.filter(Transaction.date >= start_date)
+    if end_date:
+        query = query.filter(Transaction.date < end_date)
+    if txn_type:
+        query = query.filter(Transaction.type == txn_type)
+    if newest_first:
+        return query.order_by(Transaction.date.desc(), Transaction.id.desc())
+    return query.order_by(Transaction.date, Transaction.id)
+
+def _accounts_overview_query(dialect_name: str, customer_id: str, recent_limit: int):
+    """
+    All accounts of a customer with their latest `recent_limit` transactions, in one query.
+
+    Postgres uses a LATERAL subquery per account (an index range scan that stops
+    after recent_limit + 1 rows); other databases rank rows with ROW_NUMBER().
+    One extra row per account is fetched to know whether a next page exists.
+    """
+    fetch = recent_limit + 1
+    txn_columns = [c.label(f"txn_{c.key}") for c in TRANSACTION_COLUMNS if c.key != "account_number"]
+
+    if dialect_name == 'postgresql':
+        recent = select(*txn_columns).where(
+            Transaction.account_number == Account.account_number
+        ).order_by(Transaction.date.desc(), Transaction.id.desc()).limit(fetch).lateral("recent")
+        join_condition = true()
+        order_by = (Account.created_at, Account.account_number, recent.c.txn_date.desc(), recent.c.txn_id.desc())
+    else:
+        recent = select(
+            Transaction.account_number,
+            *txn_columns,
+            func.row_number().over(
+                partition_by=Transaction.account_number,
+                order_by=(Transaction.date.desc(), Transaction.id.desc())
+            ).label("rn")
+        ).join(
+            Account, Account.account_number == Transaction.account_number
+        ).where(Account.customer_id == customer_id).subquery("recent")
+        join_condition = and_(recent.c.account_number == Account.account_number, recent.c.rn <= fetch)
+        order_by = (Account.created_at, Account.account_number, recent.c.rn)
+
+    query = select(
+        Account.account_number,
+        Account.account_type,
+        Account.balance,
+        Account.customer_id,
+        recent.c.txn_id,
+        recent.c.txn_description,
+        recent.c.txn_amount,
+        recent.c.txn_type,
+        recent.c.txn_date,
+        recent.c.txn_terminal_id
+    ).select_from(Account).outerjoin(recent, join_condition).where(
+        Account.customer_id == customer_id
+    ).order_by(*order_by)
+    return query
+
+def _build_accounts_overview(rows, recent_limit: int) -> List[Dict[str, Any]]:
+    """Fold the overview query's rows into per-account payloads, serialized straight from the tuples."""
+    overview: List[Dict[str, Any]] = []
+    current = None
+    for (account_number, account_type, balance, acc_customer_id,
+         txn_id, description, amount, txn_type, date, terminal_id) in rows:
+        if current is None or current["account_number"] != account_number:
+            current = {
+                "account_number": account_number,
+                "account_type": account_type,
+                "balance": float(balance),
+                "customer_id": acc_customer_id,
+                "transactions": [],
+                "transactions_next_cursor": None
+            }
+            overview.append(current)
+        if txn_id is None:
+            continue
+        if len(current["transactions"]) < recent_limit:
+            current["transactions"].append({
+                "id": txn_id,
+                "account_number": account_number,
+                "description": description,
+                "amount": float(amount),
+                "type": txn_type,
+                "date": date.isoformat() if date else None,
+                "terminal_id": terminal_id
+            })
+        elif current["transactions"]:
+            last = current["transactions"][-1]
+            current["transactions_next_cursor"] = encode_cursor(datetime.fromisoformat(last["date"]), last["id"])
+
+    return overview
+
+def get_accounts_overview(db: Session, customer_id: str, recent_limit: int) -> List[Dict[str, Any]]:
+    """All accounts of a customer with their latest `recent_limit` transactions, in one query."""
+    query = _accounts_overview_query(db.get_bind().dialect.name, customer_id, recent_limit)
+    return _build_accounts_overview(db.execute(query), recent_limit)
+
+async def get_accounts_overview_async(db: AsyncSession, customer_id: str, recent_limit: int) -> List[Dict[str, Any]]:
+    """get_accounts_overview on an async session."""
+    query = _accounts_overview_query(db.get_bind().dialect.name, customer_id, recent_limit)
+    return _build_accounts_overview(await db.execute(query), recent_limit)
+
+def get_transactions_page(
+    db: Session,
+    account_number: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    txn_type: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    One page of an account's transactions, newest first, keyset-paginated on (date, id).
+    Returns (transactions, next_cursor); next_cursor is None on the last page.
+    """
+    query = _filtered_transactions(db, account_number, start_date, end_date, txn_type)
+    if cursor:
+        cursor_date, cursor_id = decode_cursor(cursor)
+        query = query.filter(tuple_(Transaction.date, Transaction.id) < tuple_(cursor_date, cursor_id))
+
+    rows = query.limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].date, rows[-1].id)
+
+    return [transaction_to_dict(row) for row in rows], next_cursor
+
+def iter_transactions(
+    db: Session,
+    account_number: str,
+    chunk_size: int,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    txn_type: Optional[str] = None,
+    newest_first: bool = True
+) -> Iterator[Dict[str, Any]]:
+    """Stream every matching transaction from a server-side cursor, chunk_size rows at a time."""
+    query = _filtered_transactions(db, account_number, start_date, end_date, txn_type, newest_first)
+    for row in query.execution_options(stream_results=True).yield_per(chunk_size):
+        yield transaction_to_dict(row)
+
+def iter_statement_transactions(
+    db: Session,
+    account_number: str,
+    chunk_size: int,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    txn_type: Optional[str] = None,
+    newest_first: bool = True
+) -> Iterator[Dict[str, Any]]:
+    """
+    iter_transactions over both storage tiers: the hot partitions and the
+    archived months. Archived months are always older than every hot row, so
+    the two streams are simply concatenated in the requested order.
+    """
+    from app.services.transaction_partition_service import iter_archived_transactions
+
+    hot = iter_transactions(db, account_number, chunk_size, start_date, end_date, txn_type, newest_first)
+    cold = iter_archived_transactions(db, account_number, start_date, end_date, txn_type, newest_first)
+    if newest_first:
+        yield from hot
+        yield from cold
+    else:
+        yield from cold
+        yield from hot
+
 def seed_dummy_transactions(db: Session, account_number: str, count: int = 10):
     """Creates random dummy transactions for an account."""
     dummy_descriptions = [
@@ -49,21 +251,23 @@ def seed_dummy_transactions(db: Session, account_number: str, count: int = 10):
         ("Insurance Premium", "debit"), ("Refund Credit", "credit")
     ]
     
+    rows = []
     for i in range(count):
         desc, type = random.choice(dummy_descriptions)
         amount = random.uniform(50.0, 2500.0) if type == 'debit' else random.uniform(1000.0, 50000.0)
         date = datetime.utcnow() - timedelta(days=random.randint(1, 30))
+        rows.append({
+            "account_number": account_number,
+            "description": desc,
+            "amount": round(amount, 2),
+            "type": type,
+            "date": date,
+            "terminal_id": f"terminal_{random.randint(1000, 9999)}",
+        })
 
-        db_transaction = Transaction(
-            account_number=account_number,
-            description=desc,
-            amount=amount,
-            type=type,
-            date=date,
-            terminal_id=f"terminal_{random.randint(1000, 9999)}"
-        )
-        db.add(db_transaction)
-    
+    # One multi-row INSERT instead of a flush per ORM object
+    if rows:
+        db.execute(insert(Transaction), rows)
     db.commit()
 
 def create_multiple_accounts_for_customer(db: Session, customer_id: str) -> List[Account]:
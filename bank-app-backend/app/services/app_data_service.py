@@ -1,15 +1,18 @@
 # --- File: app/services/app_data_service.py ---
 # Enhanced app data service with better device tracking and dashboard support
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from app.db.models.user import AppData
 from app.services.sms_service import SMSService
 from app.services.seedkey_attempt_service import SeedkeyAttemptService
+from app.services.device_event_service import DEVICE_HISTORY_ACTIONS, device_event_buffer, list_events, list_events_async
+from app.services.security_summary_service import security_summary
+from app.services.principal_cache import principal_cache
 import uuid
 import logging
-import json
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -44,10 +47,11 @@ def revoke_app_access(
         
         db.commit()
         db.refresh(app_data_entry)
+        principal_cache.invalidate(str(customer_unique_id))
         
         logger.info(f"App access revoked successfully for customer: {customer_unique_id}")
         
-        # Add device info to other_details for tracking
+        # Record the revocation as a device event for tracking
         try:
             SeedkeyAttemptService.add_device_info_to_other_details(
                 db=db,
@@ -91,129 +95,92 @@ def revoke_app_access(
             detail=f"Failed to revoke app access: {str(e)}"
         )
 
+def get_customer_device_history_page(
+    db: Session,
+    customer_id: str,
+    limit: int = 10,
+    cursor: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Keyset-paginated device history (newest first). Returns (entries, next_cursor)."""
+    return list_events(db, customer_id, action_types=DEVICE_HISTORY_ACTIONS, limit=limit, cursor=cursor)
+
+async def get_customer_device_history_page_async(
+    db: AsyncSession,
+    customer_id: str,
+    limit: int = 10,
+    cursor: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """get_customer_device_history_page on an async session."""
+    return await list_events_async(db, customer_id, action_types=DEVICE_HISTORY_ACTIONS, limit=limit, cursor=cursor)
+
 def get_customer_device_history(db: Session, customer_id: str, limit: int = 10) -> List[Dict[str, Any]]:
-    """Get device history from other_details for a customer"""
+    """Get the most recent device history entries for a customer"""
     try:
-        app_data = db.query(AppData).filter(AppData.customer_id == customer_id).first()
-        
-        if not app_data:
-            return []
-        
-        # Handle other_details properly
-        other_details = []
-        if app_data.other_details is None:
-            other_details = []
-        elif isinstance(app_data.other_details, list):
-            other_details = app_data.other_details
-        elif isinstance(app_data.other_details, str):
-            try:
-                other_details = json.loads(app_data.other_details)
-                if not isinstance(other_details, list):
-                    other_details = []
-            except (json.JSONDecodeError, TypeError):
-                other_details = []
-        
-        # Filter and sort device history entries
-        device_history = []
-        for entry in other_details:
-            if isinstance(entry, dict) and entry.get("action_type") in [
-                "registration", "restoration", "login_success", "revocation", "transaction"
-            ]:
-                device_history.append(entry)
-        
-        # Sort by timestamp (most recent first) and limit results
-        device_history.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
-        
-        return device_history[:limit]
+        entries, _ = get_customer_device_history_page(db, customer_id, limit=limit)
+        return entries
         
     except Exception as e:
         logger.error(f"Error getting device history for customer {customer_id}: {str(e)}")
         return []
 
+def _registered_device(entry: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "device_info": entry.get("device_info") or "Unknown Device",
+        "timestamp": entry.get("timestamp"),
+        "location": entry.get("location") or "Unknown Location",
+        "ip_address": entry.get("ip_address") or "Unknown IP",
+        "device_id": entry.get("device_id"),
+        "user_agent": entry.get("user_agent"),
+        "registration_type": entry.get("registration_type", "standard")
+    }
+
+def _restored_device(entry: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "device_info": entry.get("device_info") or "Unknown Device",
+        "timestamp": entry.get("timestamp"),
+        "location": entry.get("location") or "Unknown Location",
+        "ip_address": entry.get("ip_address") or "Unknown IP",
+        "device_id": entry.get("device_id"),
+        "user_agent": entry.get("user_agent"),
+        "restoration_type": entry.get("restoration_type", "standard"),
+        "restoration_limits_activated": entry.get("restoration_limits_activated", False)
+    }
+
+def _empty_device_info() -> Dict[str, Any]:
+    return {
+        "registered_devices": [], 
+        "restored_devices": [], 
+        "total_registrations": 0, 
+        "total_restorations": 0,
+        "latest_registration": None,
+        "latest_restoration": None
+    }
+
+def _device_info_from_summary(summary: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if not summary:
+        return _empty_device_info()
+
+    registered_devices = [_registered_device(entry) for entry in summary["registered_devices"]]
+    restored_devices = [_restored_device(entry) for entry in summary["restored_devices"]]
+    latest_events = summary["latest_events"]
+
+    return {
+        "registered_devices": registered_devices,
+        "restored_devices": restored_devices,
+        "total_registrations": summary["action_counts"].get("registration", 0),
+        "total_restorations": summary["action_counts"].get("restoration", 0),
+        "latest_registration": _registered_device(latest_events["registration"]) if "registration" in latest_events else None,
+        "latest_restoration": _restored_device(latest_events["restoration"]) if "restoration" in latest_events else None
+    }
+
 def get_registered_and_restored_devices(db: Session, customer_id: str) -> Dict[str, Any]:
     """Get only registered and restored devices for dashboard display"""
     try:
-        app_data = db.query(AppData).filter(AppData.customer_id == customer_id).first()
-        
-        if not app_data:
-            return {
-                "registered_devices": [], 
-                "restored_devices": [], 
-                "total_registrations": 0, 
-                "total_restorations": 0,
-                "latest_registration": None,
-                "latest_restoration": None
-            }
-        
-        # Handle other_details properly
-        other_details = []
-        if app_data.other_details is None:
-            other_details = []
-        elif isinstance(app_data.other_details, list):
-            other_details = app_data.other_details
-        elif isinstance(app_data.other_details, str):
-            try:
-                other_details = json.loads(app_data.other_details)
-                if not isinstance(other_details, list):
-                    other_details = []
-            except (json.JSONDecodeError, TypeError):
-                other_details = []
-        
-        # Filter and categorize devices
-        registered_devices = []
-        restored_devices = []
-        
-        for entry in other_details:
-            if isinstance(entry, dict):
-                if entry.get("action_type") == "registration":
-                    registered_devices.append({
-                        "device_info": entry.get("device_info", "Unknown Device"),
-                        "timestamp": entry.get("timestamp"),
-                        "location": entry.get("location", "Unknown Location"),
-                        "ip_address": entry.get("ip_address", "Unknown IP"),
-                        "device_id": entry.get("device_id"),
-                        "user_agent": entry.get("user_agent"),
-                        "registration_type": entry.get("registration_type", "standard")
-                    })
-                elif entry.get("action_type") == "restoration":
-                    restored_devices.append({
-                        "device_info": entry.get("device_info", "Unknown Device"),
-                        "timestamp": entry.get("timestamp"),
-                        "location": entry.get("location", "Unknown Location"),
-                        "ip_address": entry.get("ip_address", "Unknown IP"),
-                        "device_id": entry.get("device_id"),
-                        "user_agent": entry.get("user_agent"),
-                        "restoration_type": entry.get("restoration_type", "standard"),
-                        "restoration_limits_activated": entry.get("restoration_limits_activated", False)
-                    })
-        
-        # Sort by timestamp (most recent first)
-        registered_devices.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
-        restored_devices.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
-        
-        # Get latest entries
-        latest_registration = registered_devices[0] if registered_devices else None
-        latest_restoration = restored_devices[0] if restored_devices else None
-        
-        return {
-            "registered_devices": registered_devices,
-            "restored_devices": restored_devices,
-            "total_registrations": len(registered_devices),
-            "total_restorations": len(restored_devices),
-            "latest_registration": latest_registration,
-            "latest_restoration": latest_restoration
-        }
+        return _device_info_from_summary(security_summary.get(db, customer_id))
         
     except Exception as e:
         logger.error(f"Error getting registered/restored devices for customer {customer_id}: {str(e)}")
-        return {
-            "registered_devices": [], 
-            "restored_devices": [], 
-            "total_registrations": 0, 
-            "total_restorations": 0,
-            "latest_registration": None,
-            "latest_restoration": None
-        }
+        return _empty_device_info()
 
 def get_customer_security_summary(db: Session, customer_id: str) -> Dict[str, Any]:
     """Get comprehensive security summary including device history and account status"""
@@ -226,18 +193,21 @@ def get_customer_security_summary(db: Session, customer_id: str) -> Dict[str, An
                 "error": "Customer not found"
             }
         
-        # Get device information
-        device_info = get_registered_and_restored_devices(db, customer_id)
-        device_history = get_customer_device_history(db, customer_id, limit=10)
+        # Everything device-related comes from the materialized summary row
+        device_event_buffer.flush_customer(customer_id)
+        summary = security_summary.get(db, customer_id)
+        device_info = _device_info_from_summary(summary)
+        device_history = summary["recent_events"] if summary else []
+        action_counts = summary["action_counts"] if summary else {}
         
         # Count different types of activities
         registration_count = device_info["total_registrations"]
         restoration_count = device_info["total_restorations"]
-        login_count = sum(1 for entry in device_history if entry.get("action_type") == "login_success")
-        transaction_count = sum(1 for entry in device_history if entry.get("action_type") == "transaction")
+        login_count = action_counts.get("login_success", 0)
+        transaction_count = action_counts.get("transaction", 0)
         
         # Get latest activities
-        latest_login = next((entry for entry in device_history if entry.get("action_type") == "login_success"), None)
+        latest_login = summary["latest_events"].get("login_success") if summary else None
         
         return {
             "customer_found": True,
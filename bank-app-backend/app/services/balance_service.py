@@ -0,0 +1,227 @@
+# --- File: app/services/balance_service.py ---
+import logging
+import threading
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.base import SessionLocal
+from app.db.models.user import Account, BalanceLedgerEntry
+
+logger = logging.getLogger(__name__)
+
+
+class AccountNotFoundError(Exception):
+    pass
+
+
+class InsufficientFundsError(Exception):
+    pass
+
+
+def parse_account_list(raw: str) -> Set[str]:
+    return {number.strip() for number in raw.split(",") if number.strip()}
+
+
+class BalanceEngine:
+    """
+    Applies balance changes under row locks taken in a fixed order.
+
+    Every transfer locks the account rows it changes with SELECT ... FOR UPDATE,
+    sorted by account number, so two transfers in opposite directions queue
+    behind each other instead of deadlocking, and no update is lost.
+
+    Credits to configured hot accounts (merchant / collection accounts) do not
+    lock the account row at all: they are appended to balance_ledger and folded
+    into account.balance in batches by fold_pending(). Reads that need the
+    up-to-date figure use available_balance().
+    """
+
+    def __init__(self, hot_accounts: Optional[Iterable[str]] = None):
+        self.hot_accounts: Set[str] = set(hot_accounts or ())
+
+    def is_hot(self, account_number: str) -> bool:
+        return account_number in self.hot_accounts
+
+    def lock_accounts(self, db: Session, account_numbers: Iterable[str]) -> Dict[str, Account]:
+        """Lock the given accounts in ascending account-number order and return them by number."""
+        ordered = sorted(set(account_numbers))
+        if not ordered:
+            return {}
+        accounts = (
+            db.query(Account)
+            .filter(Account.account_number.in_(ordered))
+            .order_by(Account.account_number)
+            .with_for_update()
+            .populate_existing()
+            .all()
+        )
+        return {account.account_number: account for account in accounts}
+
+    def transfer(self, db: Session, sender_number: str, recipient_number: str, amount: Decimal) -> Account:
+        """
+        Move `amount` from sender to recipient inside the caller's transaction
+        (the caller commits). Returns the locked sender account.
+        """
+        if amount <= 0:
+            raise ValueError("Transfer amount must be positive")
+
+        recipient_is_hot = self.is_hot(recipient_number)
+        to_lock = [sender_number] if recipient_is_hot else [sender_number, recipient_number]
+        accounts = self.lock_accounts(db, to_lock)
+
+        sender = accounts.get(sender_number)
+        if sender is None:
+            raise AccountNotFoundError(f"Account {sender_number} not found")
+        if sender.balance < amount:
+            raise InsufficientFundsError(f"Insufficient funds in {sender_number}")
+
+        sender.balance -= amount
+        if recipient_is_hot:
+            db.add(BalanceLedgerEntry(account_number=recipient_number, amount=amount))
+        else:
+            recipient = accounts.get(recipient_number)
+            if recipient is None:
+                raise AccountNotFoundError(f"Account {recipient_number} not found")
+            recipient.balance += amount
+
+        db.flush()
+        return sender
+
+    def transfer_many(
+        self, db: Session, sender_number: str, transfers: List[Tuple[str, Decimal]]
+    ) -> Tuple[Account, List[Optional[str]]]:
+        """
+        Pay several recipients from one sender inside the caller's transaction.
+        All involved rows are locked with a single ordered FOR UPDATE. Returns
+        the sender and, per transfer, None if applied or the reason it was not.
+        """
+        to_lock = {sender_number}
+        to_lock.update(number for number, _ in transfers if not self.is_hot(number))
+        accounts = self.lock_accounts(db, to_lock)
+
+        sender = accounts.get(sender_number)
+        if sender is None:
+            raise AccountNotFoundError(f"Account {sender_number} not found")
+
+        errors: List[Optional[str]] = []
+        for recipient_number, amount in transfers:
+            if amount <= 0:
+                errors.append("Transfer amount must be positive")
+                continue
+            if sender.balance < amount:
+                errors.append("Insufficient funds")
+                continue
+            if self.is_hot(recipient_number):
+                db.add(BalanceLedgerEntry(account_number=recipient_number, amount=amount))
+            else:
+                recipient = accounts.get(recipient_number)
+                if recipient is None:
+                    errors.append("Recipient account not found")
+                    continue
+                recipient.balance += amount
+            sender.balance -= amount
+            errors.append(None)
+
+        db.flush()
+        return sender, errors
+
+    def available_balance(self, db: Session, account_number: str) -> Optional[Decimal]:
+        """Materialized balance plus credits still waiting in the ledger."""
+        balance = db.query(Account.balance).filter(Account.account_number == account_number).scalar()
+        if balance is None:
+            return None
+        if not self.is_hot(account_number):
+            return balance
+        pending = db.query(func.coalesce(func.sum(BalanceLedgerEntry.amount), 0)).filter(
+            BalanceLedgerEntry.account_number == account_number
+        ).scalar()
+        return balance + Decimal(pending)
+
+    def fold_pending(self, db: Session, account_number: Optional[str] = None,
+                     batch_size: int = settings.LEDGER_FOLD_BATCH_SIZE) -> Dict[str, int]:
+        """
+        Fold pending ledger credits into account balances, one bounded batch per
+        transaction: take the batch (SKIP LOCKED), lock the account, add the sum,
+        delete the folded entries and commit.
+        """
+        is_postgres = db.get_bind().dialect.name == 'postgresql'
+        if account_number:
+            account_numbers: List[str] = [account_number]
+        else:
+            account_numbers = [
+                row[0] for row in db.query(BalanceLedgerEntry.account_number).distinct().all()
+            ]
+            db.rollback()
+
+        folded: Dict[str, int] = {}
+        for number in sorted(account_numbers):
+            while True:
+                batch_query = select(BalanceLedgerEntry.id, BalanceLedgerEntry.amount).where(
+                    BalanceLedgerEntry.account_number == number
+                ).order_by(BalanceLedgerEntry.id).limit(batch_size)
+                if is_postgres:
+                    batch_query = batch_query.with_for_update(skip_locked=True)
+
+                rows = db.execute(batch_query).all()
+                if not rows:
+                    db.rollback()
+                    break
+
+                account = self.lock_accounts(db, [number]).get(number)
+                if account is None:
+                    db.rollback()
+                    logger.error(f"Ledger entries reference missing account {number}")
+                    break
+
+                account.balance += sum((row.amount for row in rows), Decimal("0"))
+                db.execute(delete(BalanceLedgerEntry).where(BalanceLedgerEntry.id.in_([row.id for row in rows])))
+                db.commit()
+                folded[number] = folded.get(number, 0) + len(rows)
+
+                if len(rows) < batch_size:
+                    break
+
+        if folded:
+            logger.info(f"Folded ledger entries into balances: {folded}")
+        return folded
+
+
+class LedgerFolder:
+    """Folds hot-account ledger entries periodically on a daemon thread."""
+
+    def __init__(self, engine: BalanceEngine, interval_seconds: float):
+        self.engine = engine
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="ledger-folder", daemon=True)
+        self._thread.start()
+        logger.info(f"Ledger folder started (every {self.interval_seconds}s)")
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            db = SessionLocal()
+            try:
+                self.engine.fold_pending(db)
+            except Exception as e:
+                logger.error(f"Ledger fold failed: {str(e)}")
+                db.rollback()
+            finally:
+                db.close()
+
+
+# Create global instances
+balance_engine = BalanceEngine(parse_account_list(settings.HOT_ACCOUNT_NUMBERS))
+ledger_folder = LedgerFolder(balance_engine, settings.LEDGER_FOLD_INTERVAL_SECONDS)
@@ -0,0 +1,258 @@
+# --- File: app/services/bulk_transfer_service.py ---
+import logging
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, List
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models.user import Account, Transaction
+from app.services import feature_service
+from app.services.balance_service import balance_engine
+from app.services.restoration_limit_service import RestorationLimitService, RestorationLimitExceededError
+
+logger = logging.getLogger(__name__)
+
+# Same manual override as the single-transfer path: amount far above the 30-day average
+AMOUNT_RATIO_OVERRIDE = 15
+OVERRIDE_PROBABILITY = 0.95
+FRAUD_BLOCK_ERROR = "Suspicious transfer blocked by fraud detection"
+
+
+class BulkTransferService:
+    """
+    Executes a batch of transfers from one sender account.
+
+    Per batch instead of per transfer: one query for all recipient accounts,
+    one feature fetch, one restoration-limit lookup and a single batched
+    fraud-model call. Balance changes and Transaction rows are then applied in
+    chunks of `chunk_size` items, each chunk under one ordered row lock and one
+    commit. Every item gets its own result (completed, blocked or failed).
+
+    Under a post-restoration limit the remaining allowance is read once and
+    the items that passed fraud scoring take it in request order; an item that
+    no longer fits is blocked on its own. Each chunk then reserves what it
+    actually applied, in its own transaction.
+    """
+
+    def __init__(self, chunk_size: int):
+        self.chunk_size = chunk_size
+
+    def execute(
+        self,
+        db: Session,
+        customer_id: str,
+        sender_account: Account,
+        terminal_id: str,
+        items: List[Any],
+        fraud_threshold: float
+    ) -> Dict[str, Any]:
+        started = time.perf_counter()
+        sender_number = sender_account.account_number
+        results: List[Dict[str, Any]] = []
+        pending: List[int] = []
+
+        recipient_numbers = {item.recipient_account_number for item in items}
+        existing = {
+            row[0] for row in
+            db.query(Account.account_number).filter(Account.account_number.in_(recipient_numbers)).all()
+        }
+
+        is_limited, limit_amount, _ = RestorationLimitService.check_restoration_status(db, customer_id)
+        if is_limited:
+            allowance = RestorationLimitService.remaining_restoration_limit(db, customer_id, limit_amount)
+
+        for index, item in enumerate(items):
+            amount = Decimal(str(item.amount))
+            result = {
+                "index": index,
+                "reference": item.reference,
+                "recipient_account_number": item.recipient_account_number,
+                "amount": float(amount),
+                "status": "pending",
+                "transaction_id": None,
+                "fraud_probability": None,
+                "error": None
+            }
+            results.append(result)
+            if item.recipient_account_number == sender_number:
+                result.update(status="failed", error="Cannot transfer to the same account")
+            elif item.recipient_account_number not in existing:
+                result.update(status="failed", error="Recipient account not found")
+            else:
+                pending.append(index)
+
+        self._score(db, customer_id, terminal_id, items, results, pending, fraud_threshold)
+
+        if is_limited:
+            for i in pending:
+                if results[i]["status"] != "pending":
+                    continue
+                amount = Decimal(str(items[i].amount))
+                if amount > allowance:
+                    results[i].update(
+                        status="blocked",
+                        error=f"Exceeds remaining post-restoration limit of ₹{allowance} (₹{limit_amount} in total)"
+                    )
+                else:
+                    allowance -= amount
+
+        blocked_rows: List[int] = [i for i, r in enumerate(results) if r["status"] == "blocked"]
+        to_apply = [i for i in pending if results[i]["status"] == "pending"]
+
+        total_amount = Decimal("0")
+        new_balance = sender_account.balance
+        for offset in range(0, max(len(to_apply), len(blocked_rows)), self.chunk_size):
+            chunk = to_apply[offset:offset + self.chunk_size]
+            blocked_chunk = blocked_rows[offset:offset + self.chunk_size]
+            try:
+                sender, applied = self._apply_chunk(db, sender_number, terminal_id, items, results, chunk, blocked_chunk)
+                # Fits by construction unless another transfer spent from the limit since it was read
+                if is_limited and applied:
+                    if not RestorationLimitService.reserve_restoration_spend(db, customer_id, applied):
+                        raise RestorationLimitExceededError(
+                            "The post-restoration limit was used by another transfer during this batch"
+                        )
+                chunk_balance = sender.balance
+                db.commit()
+                new_balance = chunk_balance
+                total_amount += applied
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Bulk transfer chunk at offset {offset} rolled back: {str(e)}")
+                error = str(e) if isinstance(e, RestorationLimitExceededError) else "Transfer could not be applied"
+                for i in chunk:
+                    results[i].update(status="failed", transaction_id=None, error=error)
+                # The rollback also discarded this chunk's blocked rows; record them on their own
+                self._record_blocked_alone(db, sender_number, terminal_id, items, results, blocked_chunk)
+
+        elapsed = time.perf_counter() - started
+        counts = {"completed": 0, "blocked": 0, "failed": 0}
+        for result in results:
+            counts[result["status"]] += 1
+        transfers_per_second = counts["completed"] / elapsed if elapsed > 0 else 0.0
+        logger.info(
+            f"Bulk transfer from {sender_number}: {counts} in {elapsed:.3f}s "
+            f"({transfers_per_second:.1f} transfers/s)"
+        )
+
+        return {
+            "sender_account_number": sender_number,
+            "new_balance": float(new_balance),
+            "total_amount": float(total_amount),
+            "counts": counts,
+            "elapsed_seconds": round(elapsed, 4),
+            "transfers_per_second": round(transfers_per_second, 1),
+            "results": results
+        }
+
+    def _score(self, db, customer_id, terminal_id, items, results, pending, fraud_threshold) -> None:
+        """Score every pending item with one feature fetch and one batched model call."""
+        if not pending:
+            return
+        try:
+            from app.services.fraud_service import fraud_predictor
+
+            base_features = feature_service.get_current_features_for_customer_and_terminal(db, customer_id, terminal_id)
+            now = datetime.now(timezone.utc)
+            base_features["TX_DURING_WEEKEND"] = 1 if now.weekday() >= 5 else 0
+            base_features["TX_DURING_NIGHT"] = 1 if not 6 <= now.hour <= 22 else 0
+            rows = [dict(base_features, TX_AMOUNT=float(items[i].amount)) for i in pending]
+
+            probabilities = fraud_predictor.predict_batch(rows)
+        except Exception as e:
+            # Never block payments due to ML issues (same policy as single transfers)
+            logger.exception(f"Batch fraud scoring failed; continuing without block: {e}")
+            for i in pending:
+                results[i]["fraud_probability"] = 0.0
+            return
+
+        avg_amount = base_features.get("CUSTOMER_ID_AVG_AMOUNT_30DAY_WINDOW", 0)
+        for i, row, probability in zip(pending, rows, probabilities):
+            if avg_amount > 0 and row["TX_AMOUNT"] / avg_amount > AMOUNT_RATIO_OVERRIDE:
+                probability = max(probability, OVERRIDE_PROBABILITY)
+            results[i]["fraud_probability"] = float(probability)
+            if probability > fraud_threshold:
+                results[i].update(status="blocked", error=FRAUD_BLOCK_ERROR)
+
+    def _apply_chunk(self, db, sender_number, terminal_id, items, results, chunk, blocked_chunk):
+        sender, errors = balance_engine.transfer_many(
+            db, sender_number,
+            [(items[i].recipient_account_number, Decimal(str(items[i].amount))) for i in chunk]
+        )
+
+        debit_rows = []
+        applied = Decimal("0")
+        for i, error in zip(chunk, errors):
+            item = items[i]
+            if error:
+                results[i].update(status="failed", error=error)
+                continue
+            amount = Decimal(str(item.amount))
+            recipient_name = item.recipient_name or f"A/C ***{item.recipient_account_number[-4:]}"
+            debit = Transaction(
+                account_number=sender_number,
+                terminal_id=terminal_id,
+                description=f"Bulk transfer to {item.recipient_account_number}",
+                amount=-amount,
+                type="debit",
+                is_fraud=False,
+                auth_method="standard",
+                recipient_name=recipient_name
+            )
+            credit = Transaction(
+                account_number=item.recipient_account_number,
+                terminal_id=terminal_id,
+                description=f"Bulk transfer from {sender_number}",
+                amount=amount,
+                type="credit",
+                is_fraud=False,
+                auth_method="standard"
+            )
+            db.add_all([debit, credit])
+            debit_rows.append((i, debit))
+            applied += amount
+
+        self._add_blocked(db, sender_number, terminal_id, items, results, blocked_chunk)
+
+        # Read ids before commit: committed objects are expired and would reload one by one
+        db.flush()
+        for i, debit in debit_rows:
+            results[i].update(status="completed", transaction_id=str(debit.id))
+        return sender, applied
+
+    def _add_blocked(self, db, sender_number, terminal_id, items, results, blocked_chunk) -> None:
+        """Stage the audit rows of blocked items (type "blocked", no balance change)."""
+        for i in blocked_chunk:
+            item = items[i]
+            db.add(Transaction(
+                account_number=sender_number,
+                terminal_id=terminal_id,
+                description=f"BLOCKED Bulk transfer to {item.recipient_account_number} - {results[i]['error']}",
+                amount=-Decimal(str(item.amount)),
+                type="blocked",
+                is_fraud=results[i]["error"] == FRAUD_BLOCK_ERROR,
+                recipient_name=item.recipient_name
+            ))
+
+    def _record_blocked_alone(self, db, sender_number, terminal_id, items, results, blocked_chunk) -> None:
+        """
+        Commit blocked rows after their chunk rolled back. They stay "blocked"
+        either way; if even this commit fails, the result says the block was not recorded.
+        """
+        if not blocked_chunk:
+            return
+        try:
+            self._add_blocked(db, sender_number, terminal_id, items, results, blocked_chunk)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Could not record {len(blocked_chunk)} blocked bulk transfers: {str(e)}")
+            for i in blocked_chunk:
+                results[i]["error"] = f"{results[i]['error']} (block not recorded)"
+
+
+# Create global instance
+bulk_transfers = BulkTransferService(settings.BULK_TRANSFER_CHUNK_SIZE)
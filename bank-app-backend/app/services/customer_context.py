@@ -0,0 +1,68 @@
+# --- File: app/services/customer_context.py ---
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.db.models.user import Account, AppData
+
+_UNLOADED = object()
+_SESSION_KEY = "customer_contexts"
+
+
+class CustomerContext:
+    """
+    AppData and Account rows of one customer, loaded at most once per session.
+
+    The session is request-scoped (get_db), so this acts as a per-request
+    identity map keyed by customer_id: the auth dependency registers the
+    AppData it already loaded, and services that used to re-query by
+    customer_id read it from here. The rows are ordinary session objects, so
+    changes made through them are flushed and committed as before, and a
+    commit expires them like any other instance.
+    """
+
+    def __init__(self, customer_id: str):
+        self.customer_id = customer_id
+        self._app_data = _UNLOADED
+        self._accounts: Optional[List[Account]] = None
+
+    def app_data(self, db: Session) -> Optional[AppData]:
+        if self._app_data is _UNLOADED:
+            self._app_data = db.query(AppData).filter(AppData.customer_id == self.customer_id).first()
+        return self._app_data
+
+    def accounts(self, db: Session) -> List[Account]:
+        if self._accounts is None:
+            self._accounts = db.query(Account).filter(Account.customer_id == self.customer_id).all()
+        return self._accounts
+
+    def primary_account(self, db: Session) -> Optional[Account]:
+        accounts = self.accounts(db)
+        return accounts[0] if accounts else None
+
+    def account(self, db: Session, account_number: str) -> Optional[Account]:
+        for account in self.accounts(db):
+            if account.account_number == account_number:
+                return account
+        return None
+
+
+def get_customer_context(db: Session, customer_id: str) -> CustomerContext:
+    contexts: Dict[str, CustomerContext] = db.info.setdefault(_SESSION_KEY, {})
+    context = contexts.get(customer_id)
+    if context is None:
+        context = contexts[customer_id] = CustomerContext(customer_id)
+    return context
+
+
+def register_app_data(db: Session, app_data: AppData) -> None:
+    """Seed the context with an AppData row the caller already loaded."""
+    get_customer_context(db, app_data.customer_id)._app_data = app_data
+
+
+def load_app_data(db: Session, customer_id: str) -> Optional[AppData]:
+    return get_customer_context(db, customer_id).app_data(db)
+
+
+def load_primary_account(db: Session, customer_id: str) -> Optional[Account]:
+    return get_customer_context(db, customer_id).primary_account(db)
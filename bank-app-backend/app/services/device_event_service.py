@@ -0,0 +1,342 @@
+# --- File: app/services/device_event_service.py ---
+import asyncio
+import json
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.db.base import SessionLocal, read_router
+from app.db.models.user import AppData, DeviceEvent, SignatureTemplate
+from app.services.security_summary_service import security_summary
+
+logger = logging.getLogger(__name__)
+
+# Action types shown in the device history views
+DEVICE_HISTORY_ACTIONS = ["registration", "restoration", "login_success", "revocation", "transaction"]
+
+# Rare, security-relevant actions are written synchronously; everything else is buffered
+DURABLE_ACTIONS = {"registration", "restoration", "revocation"}
+
+# Keys of a legacy other_details entry that map onto DeviceEvent columns
+EVENT_COLUMNS = ("action_type", "timestamp", "device_info", "location", "ip_address", "device_id")
+
+
+def _build_event_row(
+    customer_id: str,
+    action_type: str,
+    device_info: Optional[str],
+    location: Optional[str],
+    ip_address: Optional[str],
+    additional_info: Optional[Dict] = None,
+    ts: Optional[datetime] = None
+) -> Dict[str, Any]:
+    ts = ts or datetime.now(timezone.utc)
+    return {
+        "customer_id": customer_id,
+        "action_type": action_type,
+        "ts": ts,
+        "device_info": device_info,
+        "location": location,
+        "ip_address": ip_address,
+        "device_id": f"{device_info}_{ip_address}_{ts.strftime('%Y%m%d_%H%M%S')}",
+        "details": additional_info or None
+    }
+
+
+def row_to_entry(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Render an event row in the same shape the other_details entries had."""
+    entry = {
+        "action_type": row["action_type"],
+        "timestamp": row["ts"].isoformat() if row.get("ts") else None,
+        "device_info": row.get("device_info"),
+        "location": row.get("location"),
+        "ip_address": row.get("ip_address"),
+        "device_id": row.get("device_id"),
+    }
+    if row.get("details"):
+        entry.update(row["details"])
+    return entry
+
+
+def event_to_entry(event) -> Dict[str, Any]:
+    return row_to_entry({
+        "action_type": event.action_type,
+        "ts": event.ts,
+        "device_info": event.device_info,
+        "location": event.location,
+        "ip_address": event.ip_address,
+        "device_id": event.device_id,
+        "details": event.details,
+    })
+
+
+class DeviceEventBuffer:
+    """
+    Collects device events in memory and writes them with one multi-row INSERT
+    per batch, so login/transaction requests do not pay for their own insert.
+    """
+
+    def __init__(self, max_batch: int = 500, flush_interval: float = 0.5, max_pending: int = 10000):
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: deque = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, row: Dict[str, Any]) -> None:
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                dropped = self._pending.popleft()
+                logger.error(f"Device event buffer full, dropping oldest event for customer {dropped['customer_id']}")
+            self._pending.append(row)
+            full = len(self._pending) >= self.max_batch
+        # Until flushed, the event exists only in this worker: keep the customer's reads on the primary
+        read_router.mark_write(row["customer_id"])
+        if full:
+            self._wakeup.set()
+
+    def has_pending(self, customer_id: str) -> bool:
+        with self._lock:
+            return any(row["customer_id"] == customer_id for row in self._pending)
+
+    def flush(self) -> int:
+        """Write everything queued so far. Returns the number of events written."""
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = [self._pending.popleft() for _ in range(min(self.max_batch, len(self._pending)))]
+                if not batch:
+                    return written
+                db = SessionLocal()
+                try:
+                    record_events(db, batch)
+                    db.commit()
+                    written += len(batch)
+                except Exception as e:
+                    db.rollback()
+                    logger.error(f"Failed to write {len(batch)} device events: {str(e)}")
+                    with self._lock:
+                        self._pending.extendleft(reversed(batch))
+                    return written
+                finally:
+                    db.close()
+
+    def flush_customer(self, customer_id: str) -> None:
+        """Read-your-writes: make this worker's queued events for a customer visible before a read."""
+        if self.has_pending(customer_id):
+            self.flush()
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="device-event-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self.flush()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+
+# Create global instance
+device_event_buffer = DeviceEventBuffer()
+
+
+def record_event(
+    db: Session,
+    customer_id: str,
+    action_type: str,
+    device_info: Optional[str],
+    location: Optional[str],
+    ip_address: Optional[str],
+    additional_info: Optional[Dict] = None,
+    buffered: Optional[bool] = None
+) -> None:
+    """Append one device event. Durable actions are inserted and committed immediately."""
+    row = _build_event_row(customer_id, action_type, device_info, location, ip_address, additional_info)
+    if buffered is None:
+        buffered = action_type not in DURABLE_ACTIONS
+
+    if buffered:
+        device_event_buffer.add(row)
+    else:
+        record_events(db, [row])
+        db.commit()
+    logger.info(f"Recorded {action_type} device event for customer {customer_id}")
+
+
+def record_events(db: Session, rows: List[Dict[str, Any]]) -> int:
+    """Bulk insert already-built event rows and fold them into the security summaries, in the caller's transaction."""
+    if rows:
+        db.execute(insert(DeviceEvent.__table__), rows)
+        security_summary.apply_rows(db, rows)
+    return len(rows)
+
+
+def _events_page_query(
+    customer_id: str,
+    action_types: Optional[List[str]],
+    limit: int,
+    cursor: Optional[str]
+):
+    query = select(DeviceEvent).where(DeviceEvent.customer_id == customer_id)
+    if action_types:
+        query = query.where(DeviceEvent.action_type.in_(action_types))
+    if cursor:
+        cursor_ts, cursor_id = decode_cursor(cursor)
+        query = query.where(tuple_(DeviceEvent.ts, DeviceEvent.id) < tuple_(cursor_ts, cursor_id))
+    return query.order_by(DeviceEvent.ts.desc(), DeviceEvent.id.desc()).limit(limit + 1)
+
+
+def _events_page(events: List[DeviceEvent], limit: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    next_cursor = None
+    if len(events) > limit:
+        events = events[:limit]
+        next_cursor = encode_cursor(events[-1].ts, events[-1].id)
+
+    return [event_to_entry(e) for e in events], next_cursor
+
+
+def list_events(
+    db: Session,
+    customer_id: str,
+    action_types: Optional[List[str]] = None,
+    limit: int = 10,
+    cursor: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Newest-first keyset page of a customer's events.
+    Returns (entries, next_cursor); next_cursor is None on the last page.
+    """
+    device_event_buffer.flush_customer(customer_id)
+
+    events = db.execute(_events_page_query(customer_id, action_types, limit, cursor)).scalars().all()
+    return _events_page(list(events), limit)
+
+
+async def list_events_async(
+    db: AsyncSession,
+    customer_id: str,
+    action_types: Optional[List[str]] = None,
+    limit: int = 10,
+    cursor: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """list_events on an async session. The buffer flush (sync) runs off the event loop."""
+    if device_event_buffer.has_pending(customer_id):
+        await asyncio.to_thread(device_event_buffer.flush)
+
+    result = await db.execute(_events_page_query(customer_id, action_types, limit, cursor))
+    return _events_page(list(result.scalars().all()), limit)
+
+
+def _parse_entry_timestamp(value: Any, fallback: Optional[datetime]) -> datetime:
+    if isinstance(value, str):
+        try:
+            parsed = datetime.fromisoformat(value)
+            return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+        except ValueError:
+            pass
+    return fallback or datetime.now(timezone.utc)
+
+
+def _load_other_details(raw: Any) -> List[Any]:
+    if isinstance(raw, list):
+        return raw
+    if isinstance(raw, str):
+        try:
+            parsed = json.loads(raw)
+            return parsed if isinstance(parsed, list) else []
+        except (json.JSONDecodeError, TypeError):
+            return []
+    return []
+
+
+def migrate_other_details(db: Session, batch_size: int = 200, max_batches: Optional[int] = None) -> Dict[str, int]:
+    """
+    One-off migration: move AppData.other_details arrays into device_events and
+    signature_templates. Each batch of customers is moved and its arrays emptied
+    in one transaction, so the migration is resumable and safe to re-run.
+    """
+    last_id = 0
+    batches = 0
+    customers = 0
+    events_moved = 0
+    signatures_moved = 0
+
+    while max_batches is None or batches < max_batches:
+        app_rows = db.query(
+            AppData.id,
+            AppData.customer_id,
+            AppData.other_details,
+            AppData.updated_at
+        ).filter(
+            AppData.id > last_id,
+            AppData.other_details.isnot(None)
+        ).order_by(AppData.id).limit(batch_size).all()
+        if not app_rows:
+            break
+
+        event_rows = []
+        migrated_ids = []
+        for app_id, customer_id, other_details, updated_at in app_rows:
+            last_id = app_id
+            entries = _load_other_details(other_details)
+            if not entries:
+                continue
+            customers += 1
+            migrated_ids.append(app_id)
+
+            for entry in entries:
+                if not isinstance(entry, dict):
+                    continue
+                if "signature" in entry:
+                    db.merge(SignatureTemplate(customer_id=customer_id, features=entry["signature"]))
+                    signatures_moved += 1
+                elif entry.get("action_type"):
+                    details = {k: v for k, v in entry.items() if k not in EVENT_COLUMNS}
+                    event_rows.append({
+                        "customer_id": customer_id,
+                        "action_type": entry["action_type"],
+                        "ts": _parse_entry_timestamp(entry.get("timestamp"), updated_at),
+                        "device_info": entry.get("device_info"),
+                        "location": entry.get("location"),
+                        "ip_address": entry.get("ip_address"),
+                        "device_id": entry.get("device_id"),
+                        "details": details or None
+                    })
+
+        if migrated_ids:
+            db.execute(update(AppData.__table__).where(AppData.id.in_(migrated_ids)).values(other_details=[]))
+        events_moved += record_events(db, event_rows)
+        db.commit()
+        batches += 1
+        logger.info(f"Device event migration batch {batches}: up to app_data.id={last_id}, {len(event_rows)} events")
+
+    return {
+        "batches": batches,
+        "customers_migrated": customers,
+        "events_moved": events_moved,
+        "signatures_moved": signatures_moved,
+        "last_app_data_id": last_id
+    }
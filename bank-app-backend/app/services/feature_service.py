@@ -77,7 +77,8 @@ def update_customer_features(db: Session, customer_id: str):
             func.avg(case((Transaction.date >= day_30_ago, func.abs(Transaction.amount)))).label("avg_amount_30day")
         ).join(Account, Transaction.account_number == Account.account_number).filter(
             Account.customer_id == customer_id,
-            Transaction.type == 'debit' # Ensure we only look at debits
+            Transaction.type == 'debit', # Ensure we only look at debits
+            Transaction.date >= day_30_ago # Only the last one or two monthly partitions are scanned
         ).one()
 
         # ORM-based upsert logic
@@ -120,7 +121,10 @@ def update_terminal_features(db: Session, terminal_id: str):
             func.sum(case((Transaction.is_fraud == True, 1), else_=0)).filter(Transaction.date >= day_7_ago).label("risk_7day"),
             func.count(case((Transaction.date >= day_30_ago, Transaction.id))).label("nb_tx_30day"),
             func.sum(case((Transaction.is_fraud == True, 1), else_=0)).filter(Transaction.date >= day_30_ago).label("risk_30day")
-        ).filter(Transaction.terminal_id == terminal_id).one()
+        ).filter(
+            Transaction.terminal_id == terminal_id,
+            Transaction.date >= day_30_ago # Only the last one or two monthly partitions are scanned
+        ).one()
         
         # ORM-based upsert logic
         terminal_record = db.query(TerminalFraudFeatures).filter(TerminalFraudFeatures.terminal_id == terminal_id).first()
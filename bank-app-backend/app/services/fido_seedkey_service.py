@@ -93,7 +93,7 @@ def start_fido_registration(db: Session, customer_id: str):
         "attestation": registration_options.attestation,
     }
 
-async def register_fido_seedkey(db: Session, phone_number: str, customer_id: str, fido_data: dict, seed_data: dict):
+def register_fido_seedkey(db: Session, phone_number: str, customer_id: str, fido_data: dict, seed_data: dict):
     query = text("SELECT id FROM app_data WHERE customer_id = :customer_id AND phone_number = :phone_number")
     result = db.execute(query, {"customer_id": customer_id, "phone_number": phone_number}).fetchone()
     if not result:
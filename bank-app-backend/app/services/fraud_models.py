@@ -0,0 +1,29 @@
+# --- File: app/services/fraud_models.py ---
+# PyTorch definitions of the fraud models. Imported by FraudPredictor when it
+# loads the weights, so torch is not imported until the models are needed.
+import torch
+
+DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+
+class SimpleAutoencoder(torch.nn.Module):
+    def __init__(self, input_size, intermediate_size, code_size):
+        super().__init__()
+        self.encoder = torch.nn.Sequential(
+            torch.nn.Linear(input_size, intermediate_size), torch.nn.ReLU(),
+            torch.nn.Linear(intermediate_size, code_size), torch.nn.ReLU()
+        )
+        self.decoder = torch.nn.Sequential(
+            torch.nn.Linear(code_size, intermediate_size), torch.nn.ReLU(),
+            torch.nn.Linear(intermediate_size, input_size)
+        )
+    def forward(self, x): return self.decoder(self.encoder(x))
+
+class SimpleFraudMLP(torch.nn.Module):
+    def __init__(self, input_size, hidden_size, dropout_rate):
+        super().__init__()
+        self.network = torch.nn.Sequential(
+            torch.nn.Linear(input_size, hidden_size), torch.nn.ReLU(),
+            torch.nn.Dropout(dropout_rate),
+            torch.nn.Linear(hidden_size, 1), torch.nn.Sigmoid()
+        )
+    def forward(self, x): return self.network(x)
@@ -1,14 +1,18 @@
 # --- File: app/services/fraud_service.py ---
-import pandas as pd
+# torch, pandas and sklearn (via the pickled scalers) are imported when the
+# models load: in the startup warm-up, or on the first scoring request.
+# Weights and scalers come from the shared model store (app/services/model_store.py)
+# so every worker maps the same copy.
 import numpy as np
-import torch
 import os
 import pickle
 import json
-from sklearn.preprocessing import StandardScaler
+import threading
 from typing import List, Dict
 import logging
 
+from app.core.config import settings
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
@@ -22,33 +26,8 @@ INPUT_FEATURES = [
     'TERMINAL_ID_RISK_7DAY_WINDOW', 'TERMINAL_ID_NB_TX_30DAY_WINDOW',
     'TERMINAL_ID_RISK_30DAY_WINDOW'
 ]
-DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
 MODEL_DIR = "app/ml_models/" # Directory to store model files
 
-# --- PyTorch Model Definitions ---
-class SimpleAutoencoder(torch.nn.Module):
-    def __init__(self, input_size, intermediate_size, code_size):
-        super().__init__()
-        self.encoder = torch.nn.Sequential(
-            torch.nn.Linear(input_size, intermediate_size), torch.nn.ReLU(),
-            torch.nn.Linear(intermediate_size, code_size), torch.nn.ReLU()
-        )
-        self.decoder = torch.nn.Sequential(
-            torch.nn.Linear(code_size, intermediate_size), torch.nn.ReLU(),
-            torch.nn.Linear(intermediate_size, input_size)
-        )
-    def forward(self, x): return self.decoder(self.encoder(x))
-
-class SimpleFraudMLP(torch.nn.Module):
-    def __init__(self, input_size, hidden_size, dropout_rate):
-        super().__init__()
-        self.network = torch.nn.Sequential(
-            torch.nn.Linear(input_size, hidden_size), torch.nn.ReLU(),
-            torch.nn.Dropout(dropout_rate),
-            torch.nn.Linear(hidden_size, 1), torch.nn.Sigmoid()
-        )
-    def forward(self, x): return self.network(x)
-
 # --- Enhanced Fraud Predictor Service ---
 
 class FraudPredictor:
@@ -59,10 +38,35 @@ class FraudPredictor:
         self.scaler_features = None
         self.scaler_error = None
         self.models_loaded = False
-        self._load_models()
+        self.shared_weights = False
+        self.load_error = None
+        self._load_attempted = False
+        self._load_lock = threading.Lock()
+
+    def ensure_loaded(self) -> bool:
+        """Load the models once (startup warm-up or first scoring request); True when they are usable."""
+        if self._load_attempted:
+            return self.models_loaded
+        with self._load_lock:
+            if not self._load_attempted:
+                try:
+                    self._load_models()
+                except Exception as e:
+                    # Scoring falls back to the manual checks; readiness reports the failure
+                    self.load_error = str(e)
+                finally:
+                    self._load_attempted = True
+        return self.models_loaded
+
+    def warm_up(self) -> None:
+        """Readiness warm-up: load the models, raising if they cannot be loaded."""
+        if not self.ensure_loaded():
+            raise RuntimeError(self.load_error or "fraud models not loaded")
 
     def _load_models(self):
         try:
+            from app.services.fraud_models import DEVICE, SimpleAutoencoder, SimpleFraudMLP
+
             # Check if files exist first
             scaler_features_path = os.path.join(self.model_dir, 'scaler_features.pkl')
             scaler_error_path = os.path.join(self.model_dir, 'scaler_error.pkl')
@@ -75,32 +79,31 @@ class FraudPredictor:
                     raise FileNotFoundError(f"Model file not found: {path}")
                 logger.info(f"✅ Found model file: {path} (size: {os.path.getsize(path)} bytes)")
 
+            # Shared weights are plain CPU tensors over the mapped arrays
+            self.shared_weights = settings.SHARED_MODEL_WEIGHTS and DEVICE == "cpu"
+
             # Load scalers with verification
-            with open(scaler_features_path, 'rb') as f:
-                self.scaler_features = pickle.load(f)
+            self.scaler_features = self._load_scaler("fraud_scaler_features", scaler_features_path)
             logger.info(f"✅ Loaded feature scaler: {type(self.scaler_features)}")
             
-            with open(scaler_error_path, 'rb') as f:
-                self.scaler_error = pickle.load(f)
+            self.scaler_error = self._load_scaler("fraud_scaler_error", scaler_error_path)
             logger.info(f"✅ Loaded error scaler: {type(self.scaler_error)}")
 
             # Load Autoencoder with verification
             self.autoencoder = SimpleAutoencoder(len(INPUT_FEATURES), 10, 5).to(DEVICE)
-            autoencoder_state = torch.load(autoencoder_path, map_location=DEVICE)
-            self.autoencoder.load_state_dict(autoencoder_state)
+            self._load_weights(self.autoencoder, "fraud_autoencoder", autoencoder_path)
             self.autoencoder.eval()
             logger.info(f"✅ Loaded autoencoder: {len(INPUT_FEATURES)} input features")
 
             # Load Classifier with verification
             classifier_input_size = len(INPUT_FEATURES) + 1  # Features + reconstruction_error
             self.classifier = SimpleFraudMLP(classifier_input_size, 100, 0.2).to(DEVICE)
-            classifier_state = torch.load(classifier_path, map_location=DEVICE)
-            self.classifier.load_state_dict(classifier_state)
+            self._load_weights(self.classifier, "fraud_classifier", classifier_path)
             self.classifier.eval()
             logger.info(f"✅ Loaded classifier: {classifier_input_size} input features")
 
             self.models_loaded = True
-            logger.info("✅ All fraud detection models loaded successfully.")
+            logger.info(f"✅ All fraud detection models loaded successfully (shared weights: {self.shared_weights}).")
 
         except FileNotFoundError as e:
             logger.error(f"❌ Error loading model files: {e}. Ensure models are in '{self.model_dir}'.")
@@ -111,6 +114,43 @@ class FraudPredictor:
             self.models_loaded = False
             raise e
 
+    def _load_scaler(self, name: str, path: str):
+        """A pickled sklearn scaler; from the model store (arrays mapped read-only) when weights are shared."""
+        def unpickle():
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+
+        if not self.shared_weights:
+            return unpickle()
+        from app.services.model_store import model_store
+        return model_store.load(name, [path], unpickle)
+
+    def _load_weights(self, module, name: str, path: str) -> None:
+        """
+        Load a state dict into `module`. Shared: the parameters become tensors
+        over the store's mapped arrays (assign=True, no copy into the module).
+        """
+        import torch
+        from app.services.fraud_models import DEVICE
+
+        if not self.shared_weights:
+            module.load_state_dict(torch.load(path, map_location=DEVICE))
+            return
+
+        import warnings
+        from app.services.model_store import model_store
+
+        arrays = model_store.load(
+            name, [path],
+            lambda: {key: tensor.cpu().numpy() for key, tensor in torch.load(path, map_location="cpu").items()}
+        )
+        with warnings.catch_warnings():
+            # from_numpy warns that the mapped arrays are read-only; inference never writes them
+            warnings.simplefilter("ignore", UserWarning)
+            state = {key: torch.from_numpy(array) for key, array in arrays.items()}
+        module.requires_grad_(False)
+        module.load_state_dict(state, assign=True)
+
     def manual_anomaly_check(self, transaction_features: Dict[str, float]) -> tuple[bool, float, str]:
         """Manual anomaly detection as backup to ML model"""
         
@@ -156,10 +196,14 @@ class FraudPredictor:
         
         logger.info(f"🔍 DEBUG: Input features: {transaction_features}")
         
-        if not self.models_loaded:
+        if not self.ensure_loaded():
             logger.error("❌ Models not loaded, cannot perform debug prediction")
             return {"error": "Models not loaded"}
         
+        import pandas as pd
+        import torch
+        from app.services.fraud_models import DEVICE
+
         try:
             # Create DataFrame and scale features
             df = pd.DataFrame([transaction_features])
@@ -208,6 +252,63 @@ class FraudPredictor:
             logger.error(f"❌ Debug prediction failed: {e}")
             return {"error": str(e)}
 
+    def _ml_probabilities(self, ordered_df) -> np.ndarray:
+        """Run the autoencoder + classifier pipeline on every row of ordered_df (a DataFrame) in one pass."""
+        import pandas as pd
+        import torch
+        from app.services.fraud_models import DEVICE
+
+        # 1. Scale the input features using the DataFrame (preserves feature names)
+        scaled_features = self.scaler_features.transform(ordered_df)
+        features_tensor = torch.FloatTensor(scaled_features).to(DEVICE)
+
+        # 2. Get reconstruction error from the autoencoder
+        with torch.no_grad():
+            reconstructed = self.autoencoder(features_tensor)
+            mse_loss = torch.mean((features_tensor - reconstructed)**2, dim=1).cpu().numpy().reshape(-1, 1)
+
+        # 3. Scale the reconstruction error using a DataFrame to maintain consistency
+        error_df = pd.DataFrame(mse_loss, columns=['reconstruction_error'])
+        scaled_error = self.scaler_error.transform(error_df)
+
+        # 4. Combine features and error, and predict with the classifier
+        combined_features = np.hstack([scaled_features, scaled_error])
+        combined_tensor = torch.FloatTensor(combined_features).to(DEVICE)
+
+        with torch.no_grad():
+            return self.classifier(combined_tensor).cpu().numpy()[:, 0]
+
+    def predict_batch(self, rows: List[Dict]) -> List[float]:
+        """
+        Score many transactions with a single scaler/model invocation.
+        Same result per row as predict(), without per-row DataFrame and tensor setup.
+        """
+        if not rows:
+            return []
+        for features in rows:
+            if not all(k in features for k in INPUT_FEATURES):
+                missing_keys = [k for k in INPUT_FEATURES if k not in features]
+                raise ValueError(f"Missing required features for prediction: {missing_keys}")
+
+        manual_probs = []
+        for features in rows:
+            manual_anomaly, manual_prob, _ = self.manual_anomaly_check(features)
+            manual_probs.append(manual_prob if manual_anomaly else 0.0)
+
+        if not self.ensure_loaded():
+            logger.warning("⚠️ ML models not loaded, using manual detection only")
+            return manual_probs
+
+        import pandas as pd
+        try:
+            ml_probs = self._ml_probabilities(pd.DataFrame(rows)[INPUT_FEATURES])
+        except Exception as e:
+            logger.error(f"❌ Batch ML prediction failed, falling back to manual detection: {e}")
+            return manual_probs
+
+        logger.info(f"🔍 Batch ML prediction: {len(rows)} rows, max prob {float(ml_probs.max()):.6f}")
+        return [max(float(ml), manual) for ml, manual in zip(ml_probs, manual_probs)]
+
     def predict(self, transaction_features: Dict) -> float:
         # First check if we have all required features
         if not all(k in transaction_features for k in INPUT_FEATURES):
@@ -220,35 +321,15 @@ class FraudPredictor:
         logger.info(f"🔍 Manual anomaly check: anomaly={manual_anomaly}, prob={manual_prob:.3f}, reason='{manual_reason}'")
 
         # If models are not loaded, fall back to manual detection
-        if not self.models_loaded:
+        if not self.ensure_loaded():
             logger.warning("⚠️ ML models not loaded, using manual detection only")
             return manual_prob if manual_anomaly else 0.0
 
+        import pandas as pd
         try:
             # Create a DataFrame from the input dictionary
             df = pd.DataFrame([transaction_features])
-            ordered_df = df[INPUT_FEATURES]
-            
-            # 1. Scale the input features using the DataFrame (preserves feature names)
-            scaled_features = self.scaler_features.transform(ordered_df)
-            features_tensor = torch.FloatTensor(scaled_features).to(DEVICE)
-
-            # 2. Get reconstruction error from the autoencoder
-            with torch.no_grad():
-                reconstructed = self.autoencoder(features_tensor)
-                mse_loss = torch.mean((features_tensor - reconstructed)**2, dim=1).cpu().numpy().reshape(-1, 1)
-
-            # 3. Scale the reconstruction error using a DataFrame to maintain consistency
-            error_df = pd.DataFrame(mse_loss, columns=['reconstruction_error'])
-            scaled_error = self.scaler_error.transform(error_df)
-
-            # 4. Combine features and error, and predict with the classifier
-            combined_features = np.hstack([scaled_features, scaled_error])
-            combined_tensor = torch.FloatTensor(combined_features).to(DEVICE)
-
-            with torch.no_grad():
-                ml_prediction = self.classifier(combined_tensor)
-                ml_prob = ml_prediction.cpu().numpy()[0][0]
+            ml_prob = self._ml_probabilities(df[INPUT_FEATURES])[0]
 
             logger.info(f"🔍 ML prediction: {ml_prob:.6f}")
             
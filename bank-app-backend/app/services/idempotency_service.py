@@ -0,0 +1,290 @@
+# --- File: app/services/idempotency_service.py ---
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.base import SessionLocal
+from app.db.models.idempotency import IdempotencyRecord
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyConflict(Exception):
+    """The key cannot be used for this request right now (maps to an HTTP error)."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class IdempotentReplay:
+    """Stored outcome of the first request with a key."""
+    __slots__ = ("status_code", "response")
+
+    def __init__(self, status_code: int, response: Any):
+        self.status_code = status_code
+        self.response = response
+
+
+class IdempotencyStore:
+    """
+    Dedupe store for requests carrying an Idempotency-Key.
+
+    The first request for (customer, key) inserts an in_progress row (unique
+    constraint), executes, and stores its response. Work that moves money marks
+    the row completed with record(), inside its own transaction, so the outcome
+    commits or rolls back together with the debit. Retries get the stored
+    response without re-executing. Duplicates that arrive while the first one is
+    still running wait for it: on an in-process Event when the owner is in this
+    worker, otherwise by polling the row. Completed outcomes are also kept in a
+    small in-memory LRU so hot retries do not hit the database.
+
+    An in_progress row is never taken over, however old: its owner may still
+    commit. If the owner died, the key answers 409 until retention removes it.
+    """
+
+    POLL_INTERVAL_SECONDS = 0.1
+
+    def __init__(self, ttl_seconds: float, wait_seconds: float, cache_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.wait_seconds = wait_seconds
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[str, str], Tuple[float, str, int, Any]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str], threading.Event] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(payload: Dict[str, Any]) -> str:
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    # ---- cache --------------------------------------------------------------
+
+    def _cache_get(self, cache_key) -> Optional[Tuple[float, str, int, Any]]:
+        with self._lock:
+            entry = self._cache.get(cache_key)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                del self._cache[cache_key]
+                return None
+            self._cache.move_to_end(cache_key)
+            return entry
+
+    def _cache_put(self, cache_key, expires_at: float, request_hash: str, status_code: int, response: Any) -> None:
+        with self._lock:
+            self._cache[cache_key] = (expires_at, request_hash, status_code, response)
+            self._cache.move_to_end(cache_key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    @staticmethod
+    def _replay(request_hash: str, stored_hash: str, status_code: int, response: Any) -> IdempotentReplay:
+        if stored_hash != request_hash:
+            raise IdempotencyConflict(422, "Idempotency-Key was already used with a different request")
+        return IdempotentReplay(status_code, response)
+
+    # ---- database -----------------------------------------------------------
+
+    def _claim(self, customer_id: str, key: str, request_hash: str) -> Optional[Dict[str, Any]]:
+        """Insert the in_progress row. Returns None if claimed, else a snapshot of the existing row."""
+        db = SessionLocal()
+        try:
+            existing = db.query(IdempotencyRecord).filter(
+                IdempotencyRecord.customer_id == customer_id,
+                IdempotencyRecord.idempotency_key == key
+            ).first()
+
+            if existing is not None:
+                age = (datetime.now(timezone.utc) - _as_utc(existing.created_at)).total_seconds()
+                if not (existing.status == "completed" and age > self.ttl_seconds):
+                    return _snapshot(existing)
+                db.delete(existing)
+                db.flush()
+
+            db.add(IdempotencyRecord(
+                customer_id=customer_id,
+                idempotency_key=key,
+                request_hash=request_hash,
+                status="in_progress",
+                created_at=datetime.now(timezone.utc)
+            ))
+            db.commit()
+            return None
+
+        except IntegrityError:
+            db.rollback()
+            existing = db.query(IdempotencyRecord).filter(
+                IdempotencyRecord.customer_id == customer_id,
+                IdempotencyRecord.idempotency_key == key
+            ).first()
+            # Lost the race to a row that has since been removed again: let the caller retry
+            return _snapshot(existing) if existing is not None else {"status": "retry"}
+        finally:
+            db.close()
+
+    # ---- public API ---------------------------------------------------------
+
+    def begin(self, customer_id: str, key: str, request_hash: str) -> Optional[IdempotentReplay]:
+        """
+        Returns None when the caller now owns the key and must call complete()
+        or abandon(); returns an IdempotentReplay when the request already ran.
+        Raises IdempotencyConflict on key misuse or when waiting times out.
+        """
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise IdempotencyConflict(400, f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters")
+
+        cache_key = (customer_id, key)
+        deadline = time.monotonic() + self.wait_seconds
+
+        while True:
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return self._replay(request_hash, cached[1], cached[2], cached[3])
+
+            with self._lock:
+                event = self._inflight.get(cache_key)
+                owner = event is None
+                if owner:
+                    event = self._inflight[cache_key] = threading.Event()
+
+            remaining = deadline - time.monotonic()
+            if not owner:
+                if remaining <= 0 or not event.wait(timeout=remaining):
+                    raise IdempotencyConflict(409, "A request with this Idempotency-Key is still being processed")
+                continue
+
+            try:
+                existing = self._claim(customer_id, key, request_hash)
+            except Exception:
+                self._release(cache_key)
+                raise
+            if existing is None:
+                return None
+
+            # Someone else (another worker process, or an earlier attempt) has the key
+            self._release(cache_key)
+            if existing["status"] == "completed":
+                self._cache_put(cache_key, existing["expires_at"], existing["request_hash"],
+                                existing["status_code"], existing["response"])
+                return self._replay(request_hash, existing["request_hash"],
+                                    existing["status_code"], existing["response"])
+            if existing["status"] == "in_progress" and existing["request_hash"] != request_hash:
+                raise IdempotencyConflict(422, "Idempotency-Key was already used with a different request")
+            if remaining <= 0:
+                raise IdempotencyConflict(409, "A request with this Idempotency-Key is still being processed")
+            time.sleep(self.POLL_INTERVAL_SECONDS)
+
+    @staticmethod
+    def record(db: Session, customer_id: str, key: str, status_code: int, response: Any) -> None:
+        """
+        Mark the key completed inside the caller's transaction (the caller
+        commits), so the outcome is stored exactly when the work is.
+        Raises IdempotencyConflict if this request no longer holds the key.
+        """
+        updated = db.query(IdempotencyRecord).filter(
+            IdempotencyRecord.customer_id == customer_id,
+            IdempotencyRecord.idempotency_key == key,
+            IdempotencyRecord.status == "in_progress"
+        ).update({
+            "status": "completed",
+            "status_code": status_code,
+            "response": response,
+            "completed_at": datetime.now(timezone.utc)
+        }, synchronize_session=False)
+        if updated != 1:
+            raise IdempotencyConflict(409, "Idempotency-Key is no longer held by this request")
+
+    def complete(self, customer_id: str, key: str, request_hash: str, status_code: int, response: Any) -> None:
+        """
+        Store the final outcome for replay and wake up waiting duplicates. For
+        work already stored with record(), this only replaces the response.
+        """
+        cache_key = (customer_id, key)
+        db = SessionLocal()
+        try:
+            db.query(IdempotencyRecord).filter(
+                IdempotencyRecord.customer_id == customer_id,
+                IdempotencyRecord.idempotency_key == key
+            ).update({
+                "status": "completed",
+                "status_code": status_code,
+                "response": response,
+                "completed_at": datetime.now(timezone.utc)
+            }, synchronize_session=False)
+            db.commit()
+            self._cache_put(cache_key, time.time() + self.ttl_seconds, request_hash, status_code, response)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to store idempotent response for key {key}: {str(e)}")
+            # Unrecorded and nothing committed with it: free the key rather than leave it in_progress
+            self._delete_in_progress(db, customer_id, key)
+        finally:
+            db.close()
+            self._release(cache_key)
+
+    def abandon(self, customer_id: str, key: str) -> None:
+        """
+        Forget an attempt that failed without a storable outcome so the client
+        can retry. A key completed by record() is kept: its work committed.
+        """
+        db = SessionLocal()
+        try:
+            self._delete_in_progress(db, customer_id, key)
+        finally:
+            db.close()
+            self._release((customer_id, key))
+
+    @staticmethod
+    def _delete_in_progress(db: Session, customer_id: str, key: str) -> None:
+        try:
+            db.query(IdempotencyRecord).filter(
+                IdempotencyRecord.customer_id == customer_id,
+                IdempotencyRecord.idempotency_key == key,
+                IdempotencyRecord.status == "in_progress"
+            ).delete(synchronize_session=False)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to release idempotency key {key}: {str(e)}")
+
+    def _release(self, cache_key) -> None:
+        with self._lock:
+            event = self._inflight.pop(cache_key, None)
+        if event is not None:
+            event.set()
+
+
+def _as_utc(value: Optional[datetime]) -> datetime:
+    if value is None:
+        return datetime.now(timezone.utc)
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _snapshot(record: IdempotencyRecord) -> Dict[str, Any]:
+    return {
+        "status": record.status,
+        "request_hash": record.request_hash,
+        "status_code": record.status_code,
+        "response": record.response,
+        "expires_at": (_as_utc(record.created_at) + timedelta(hours=settings.IDEMPOTENCY_TTL_HOURS)).timestamp()
+    }
+
+
+# Create global instance
+idempotency_store = IdempotencyStore(
+    ttl_seconds=settings.IDEMPOTENCY_TTL_HOURS * 3600,
+    wait_seconds=settings.IDEMPOTENCY_WAIT_SECONDS,
+    cache_size=settings.IDEMPOTENCY_CACHE_SIZE
+)
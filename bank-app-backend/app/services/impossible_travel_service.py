@@ -0,0 +1,316 @@
+# --- File: app/services/impossible_travel_service.py ---
+import heapq
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0
+
+# Column layout of a customer's track array
+COL_LAT, COL_LON, COL_TS, COL_IS_IP = 0, 1, 2, 3
+TRACK_COLUMNS = 4
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Vectorized Haversine distance in km. Arguments broadcast like NumPy arrays."""
+    lat1 = np.radians(lat1)
+    lon1 = np.radians(lon1)
+    lat2 = np.radians(lat2)
+    lon2 = np.radians(lon2)
+
+    a = (np.sin((lat2 - lat1) / 2) ** 2 +
+         np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def to_epoch_seconds(value: Optional[datetime]) -> float:
+    """Convert a DB timestamp to epoch seconds. Naive values are treated as UTC."""
+    if value is None:
+        return datetime.now(timezone.utc).timestamp()
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def has_coordinates(latitude: Optional[float], longitude: Optional[float]) -> bool:
+    """Local/unknown lookups come back as 0,0 and must not be treated as a real position."""
+    return latitude is not None and longitude is not None and not (latitude == 0 and longitude == 0)
+
+
+class _CustomerTrack:
+    """Fixed-size ring buffer of the most recent points for one customer."""
+    __slots__ = ("points", "size", "head", "last_id")
+
+    def __init__(self, capacity: int):
+        self.points = np.zeros((capacity, TRACK_COLUMNS), dtype=np.float64)
+        self.size = 0
+        self.head = 0
+        self.last_id = 0  # Highest user_locations.id loaded into the track
+
+    def append(self, latitude: float, longitude: float, ts: float, is_ip: bool) -> None:
+        self.points[self.head] = (latitude, longitude, ts, 1.0 if is_ip else 0.0)
+        self.head = (self.head + 1) % len(self.points)
+        self.size = min(self.size + 1, len(self.points))
+
+    def view(self) -> np.ndarray:
+        """Return the filled part of the buffer (order does not matter for the check)."""
+        return self.points[:self.size]
+
+
+class ImpossibleTravelDetector:
+    """
+    Flags physically impossible movement between a customer's recent locations,
+    independent of the session they were recorded in.
+
+    Each tracked customer keeps the last HISTORY_SIZE accepted (unflagged)
+    points in a small NumPy array, so a check is a single vectorized Haversine
+    over at most N rows. user_locations is the source of truth: every worker
+    writes its points there, and sync_from_db() pulls the rows added since the
+    track was last synced (usually none) before each check, so a point accepted
+    by another worker is seen on the next request.
+    """
+
+    HISTORY_SIZE = 16
+    MAX_SPEED_KMH = 1000.0  # Faster than a commercial flight is not plausible
+    GPS_TOLERANCE_KM = 1.0
+    IP_TOLERANCE_KM = 100.0  # IP geolocation is only accurate to the city/region level
+    MIN_ELAPSED_SECONDS = 60.0
+    MAX_TRACKED_CUSTOMERS = 100_000
+
+    def __init__(self, history_size: int = HISTORY_SIZE, max_speed_kmh: float = MAX_SPEED_KMH):
+        self.history_size = history_size
+        self.max_speed_kmh = max_speed_kmh
+        self._tracks: "OrderedDict[str, _CustomerTrack]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_track(self, customer_id: str) -> Optional[_CustomerTrack]:
+        track = self._tracks.get(customer_id)
+        if track is not None:
+            self._tracks.move_to_end(customer_id)
+        return track
+
+    def _new_track(self, customer_id: str) -> _CustomerTrack:
+        track = _CustomerTrack(self.history_size)
+        self._tracks[customer_id] = track
+        while len(self._tracks) > self.MAX_TRACKED_CUSTOMERS:
+            self._tracks.popitem(last=False)
+        return track
+
+    def sync_from_db(self, db: Session, customer_id) -> None:
+        """Load the customer's accepted points persisted since the last sync (the last N on first use)."""
+        from app.services.location_service import UserLocation
+
+        key = str(customer_id)
+        with self._lock:
+            track = self._tracks.get(key)
+            last_id = track.last_id if track is not None else 0
+
+        rows = db.query(
+            UserLocation.id,
+            UserLocation.latitude,
+            UserLocation.longitude,
+            UserLocation.created_at,
+            UserLocation.location_source
+        ).filter(
+            UserLocation.customer_unique_id == customer_id,
+            UserLocation.id > last_id,
+            UserLocation.is_flagged.isnot(True),
+            UserLocation.latitude.isnot(None),
+            UserLocation.longitude.isnot(None)
+        ).order_by(UserLocation.id.desc()).limit(self.history_size).all()
+
+        with self._lock:
+            track = self._get_track(key) or self._new_track(key)
+            # Insert oldest first so the ring buffer overwrites the oldest points;
+            # rows another request already loaded are skipped
+            for row_id, latitude, longitude, created_at, source in reversed(rows):
+                if row_id <= track.last_id:
+                    continue
+                track.last_id = row_id
+                if has_coordinates(latitude, longitude):
+                    track.append(latitude, longitude, to_epoch_seconds(created_at), source == 'ip')
+
+    def check(
+        self,
+        customer_id,
+        latitude: float,
+        longitude: float,
+        ts: float,
+        is_ip: bool = False
+    ) -> Dict[str, any]:
+        """Compare a new point with the customer's recent points and report the worst implied speed."""
+        result = {
+            'is_impossible': False,
+            'compared_points': 0,
+            'max_speed_kmh': 0.0,
+            'distance_km': None,
+            'elapsed_minutes': None,
+            'reason': None
+        }
+        if not has_coordinates(latitude, longitude):
+            return result
+
+        with self._lock:
+            track = self._get_track(str(customer_id))
+            history = track.view().copy() if track is not None else None
+
+        if history is None or len(history) == 0:
+            return result
+
+        distances = haversine_km(latitude, longitude, history[:, COL_LAT], history[:, COL_LON])
+
+        # Subtract the positioning error of both endpoints before computing speed
+        point_tolerance = self.IP_TOLERANCE_KM if is_ip else self.GPS_TOLERANCE_KM
+        history_tolerance = np.where(history[:, COL_IS_IP] > 0, self.IP_TOLERANCE_KM, self.GPS_TOLERANCE_KM)
+        effective_km = np.maximum(distances - point_tolerance - history_tolerance, 0.0)
+
+        elapsed_seconds = np.maximum(np.abs(ts - history[:, COL_TS]), self.MIN_ELAPSED_SECONDS)
+        speeds = effective_km / (elapsed_seconds / 3600.0)
+
+        worst = int(np.argmax(speeds))
+        result.update({
+            'compared_points': int(len(history)),
+            'max_speed_kmh': float(speeds[worst]),
+            'distance_km': float(distances[worst]),
+            'elapsed_minutes': float(np.abs(ts - history[worst, COL_TS]) / 60.0)
+        })
+
+        if speeds[worst] > self.max_speed_kmh:
+            result['is_impossible'] = True
+            result['reason'] = (
+                f"Impossible travel: {result['distance_km']:.0f}km in "
+                f"{result['elapsed_minutes']:.0f} min (~{result['max_speed_kmh']:.0f} km/h)"
+            )
+        return result
+
+    def forget(self, customer_id) -> None:
+        with self._lock:
+            self._tracks.pop(str(customer_id), None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'tracked_customers': len(self._tracks),
+                'history_size': self.history_size,
+                'max_speed_kmh': self.max_speed_kmh
+            }
+
+    def _scan_customer(self, customer_id: str, lats: List[float], lons: List[float],
+                       timestamps: List[float], is_ip: List[bool], ids: List[int]) -> List[Dict]:
+        """Vectorized consecutive-point check over one customer's full history."""
+        if len(lats) < 2:
+            return []
+
+        lat = np.asarray(lats, dtype=np.float64)
+        lon = np.asarray(lons, dtype=np.float64)
+        ts = np.asarray(timestamps, dtype=np.float64)
+        ip = np.asarray(is_ip, dtype=bool)
+
+        distances = haversine_km(lat[:-1], lon[:-1], lat[1:], lon[1:])
+        tolerance = (np.where(ip[:-1], self.IP_TOLERANCE_KM, self.GPS_TOLERANCE_KM) +
+                     np.where(ip[1:], self.IP_TOLERANCE_KM, self.GPS_TOLERANCE_KM))
+        effective_km = np.maximum(distances - tolerance, 0.0)
+        elapsed = np.diff(ts)
+        speeds = effective_km / (np.maximum(elapsed, self.MIN_ELAPSED_SECONDS) / 3600.0)
+
+        return [
+            {
+                'customer_unique_id': customer_id,
+                'from_location_id': ids[i],
+                'to_location_id': ids[i + 1],
+                'distance_km': round(float(distances[i]), 1),
+                'elapsed_minutes': round(float(elapsed[i]) / 60.0, 1),
+                'speed_kmh': round(float(speeds[i]), 1)
+            }
+            for i in np.flatnonzero(speeds > self.max_speed_kmh)
+        ]
+
+    def scan_location_history(
+        self,
+        db: Session,
+        since: Optional[datetime] = None,
+        batch_size: int = 5000,
+        max_violations: int = 1000
+    ) -> Dict[str, any]:
+        """
+        Audit mode: stream the whole user_locations table ordered by customer and
+        time, and report every consecutive pair of points with an impossible speed.
+        """
+        from app.services.location_service import UserLocation
+
+        query = db.query(
+            UserLocation.id,
+            UserLocation.customer_unique_id,
+            UserLocation.latitude,
+            UserLocation.longitude,
+            UserLocation.created_at,
+            UserLocation.location_source
+        ).filter(
+            UserLocation.latitude.isnot(None),
+            UserLocation.longitude.isnot(None)
+        )
+        if since is not None:
+            query = query.filter(UserLocation.created_at >= since)
+
+        query = query.order_by(
+            UserLocation.customer_unique_id,
+            UserLocation.created_at,
+            UserLocation.id
+        ).yield_per(batch_size)
+
+        # Only the fastest max_violations are kept; the rest are just counted
+        violations: List[Dict] = []
+        violation_count = 0
+        scanned_rows = 0
+        scanned_customers = 0
+        current_customer = None
+        lats, lons, timestamps, is_ip, ids = [], [], [], [], []
+
+        def flush():
+            nonlocal violations, violation_count
+            if current_customer is not None:
+                found = self._scan_customer(current_customer, lats, lons, timestamps, is_ip, ids)
+                if found:
+                    violation_count += len(found)
+                    violations = heapq.nlargest(max_violations, violations + found, key=lambda v: v['speed_kmh'])
+
+        for row_id, customer_id, latitude, longitude, created_at, source in query:
+            scanned_rows += 1
+            customer_key = str(customer_id)
+            if customer_key != current_customer:
+                flush()
+                current_customer = customer_key
+                scanned_customers += 1
+                lats, lons, timestamps, is_ip, ids = [], [], [], [], []
+            if not has_coordinates(latitude, longitude):
+                continue
+            lats.append(latitude)
+            lons.append(longitude)
+            timestamps.append(to_epoch_seconds(created_at))
+            is_ip.append(source == 'ip')
+            ids.append(row_id)
+        flush()
+
+        logger.info(
+            f"Impossible travel audit scanned {scanned_rows} rows for {scanned_customers} customers, "
+            f"found {violation_count} violations"
+        )
+
+        return {
+            'scanned_rows': scanned_rows,
+            'scanned_customers': scanned_customers,
+            'violation_count': violation_count,
+            'violations': violations,
+            'max_speed_kmh': self.max_speed_kmh
+        }
+
+
+# Create global instance
+impossible_travel_detector = ImpossibleTravelDetector()
@@ -1,14 +1,17 @@
 # --- File: bank-app-backend/app/services/location_service.py ---
 import requests
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, select
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 from typing import Dict, Optional, Tuple, List
 import math
 
+from app.core.config import settings
 from app.db.base import Base
+from app.services.impossible_travel_service import impossible_travel_detector
 
 class UserLocation(Base):
     """Model to store user location data and session tracking."""
@@ -31,6 +34,30 @@ class UserLocation(Base):
     def __repr__(self):
         return f"<UserLocation session_id={self.session_id} ip={self.ip_address}>"
 
+def location_to_dict(loc: UserLocation) -> Dict:
+    return {
+        'session_id': loc.session_id,
+        'ip_address': loc.ip_address,
+        'latitude': loc.latitude,
+        'longitude': loc.longitude,
+        'city': loc.city,
+        'country': loc.country,
+        'source': loc.location_source,
+        'is_flagged': loc.is_flagged,
+        'flag_reason': loc.flag_reason,
+        'created_at': loc.created_at.isoformat()
+    }
+
+async def get_user_location_history_async(db: AsyncSession, customer_id: uuid.UUID, limit: int = 10) -> List[Dict]:
+    """LocationService.get_user_location_history on an async session."""
+    result = await db.execute(
+        select(UserLocation)
+        .where(UserLocation.customer_unique_id == customer_id)
+        .order_by(UserLocation.created_at.desc())
+        .limit(limit)
+    )
+    return [location_to_dict(loc) for loc in result.scalars().all()]
+
 class LocationService:
     def __init__(self, db: Session):
         self.db = db
@@ -39,7 +66,7 @@ class LocationService:
     MAX_DISTANCE_KM = 50  # Maximum allowed distance change during session
     MAX_SESSION_DURATION_HOURS = 24  # Auto-expire sessions after 24 hours
     
-    async def get_location_from_ip(self, ip_address: str) -> Optional[Dict]:
+    def get_location_from_ip(self, ip_address: str) -> Optional[Dict]:
         """Get location data from IP address using ip-api.com service."""
         if not ip_address or ip_address in ['127.0.0.1', 'localhost']:
             return {
@@ -52,10 +79,7 @@ class LocationService:
         
         try:
             # Using ip-api.com (free tier: 1000 requests/month)
-            response = requests.get(
-                f"http://ip-api.com/json/{ip_address}",
-                timeout=5
-            )
+            response = requests.get(settings.IP_GEOLOCATION_URL.format(ip=ip_address), timeout=5)
             response.raise_for_status()
             data = response.json()
             
@@ -93,7 +117,7 @@ class LocationService:
         
         return R * c
     
-    async def validate_location(
+    def validate_location(
         self, 
         customer_id: uuid.UUID, 
         session_id: str,
@@ -122,7 +146,7 @@ class LocationService:
             location_source = 'gps'
             print(f"   Using GPS coordinates: {gps_coords}")
         else:
-            current_location = await self.get_location_from_ip(ip_address)
+            current_location = self.get_location_from_ip(ip_address)
             location_source = 'ip'
             print(f"   Using IP-based location: {current_location}")
         
@@ -135,6 +159,19 @@ class LocationService:
                 'location': None
             }
         
+        # Cross-session check: compare against the customer's last N accepted points
+        now_ts = datetime.now(timezone.utc).timestamp()
+        impossible_travel_detector.sync_from_db(self.db, customer_id)
+        travel_check = impossible_travel_detector.check(
+            customer_id,
+            current_location['latitude'],
+            current_location['longitude'],
+            now_ts,
+            is_ip=location_source == 'ip'
+        )
+        if travel_check['is_impossible']:
+            print(f"🚨 [Location Service] {travel_check['reason']}")
+        
         # Check for existing session data
         existing_session = self.db.query(UserLocation).filter(
             UserLocation.customer_unique_id == customer_id,
@@ -155,17 +192,31 @@ class LocationService:
                 city=current_location['city'],
                 country=current_location['country'],
                 is_initial_login=True,
-                is_flagged=False
+                is_flagged=travel_check['is_impossible'],
+                flag_reason=travel_check['reason']
             )
             
+            # Unflagged rows become reference points for later checks (sync_from_db)
             self.db.add(location_record)
             self.db.commit()
             
+            if travel_check['is_impossible']:
+                return {
+                    'success': True,
+                    'is_suspicious': True,
+                    'message': travel_check['reason'],
+                    'location': current_location,
+                    'distance_km': travel_check['distance_km'],
+                    'impossible_travel': True,
+                    'action': 'blocked'
+                }
+            
             return {
                 'success': True,
                 'is_suspicious': False,
                 'message': 'Location baseline established',
                 'location': current_location,
+                'impossible_travel': False,
                 'action': 'baseline_set'
             }
         
@@ -197,7 +248,11 @@ class LocationService:
         flag_reason = None
         action = 'verified'
         
-        if ip_changed and distance_km > self.MAX_DISTANCE_KM:
+        if travel_check['is_impossible']:
+            is_suspicious = True
+            flag_reason = travel_check['reason']
+            action = 'blocked'
+        elif ip_changed and distance_km > self.MAX_DISTANCE_KM:
             is_suspicious = True
             flag_reason = f"IP and location changed significantly (IP: {initial_ip} → {ip_address}, Distance: {distance_km:.1f}km)"
             action = 'blocked'
@@ -241,6 +296,7 @@ class LocationService:
             'location': current_location,
             'distance_km': distance_km,
             'ip_changed': ip_changed,
+            'impossible_travel': travel_check['is_impossible'],
             'action': action
         }
     
@@ -250,31 +306,17 @@ class LocationService:
             UserLocation.customer_unique_id == customer_id
         ).order_by(UserLocation.created_at.desc()).limit(limit).all()
         
-        return [
-            {
-                'session_id': loc.session_id,
-                'ip_address': loc.ip_address,
-                'latitude': loc.latitude,
-                'longitude': loc.longitude,
-                'city': loc.city,
-                'country': loc.country,
-                'source': loc.location_source,
-                'is_flagged': loc.is_flagged,
-                'flag_reason': loc.flag_reason,
-                'created_at': loc.created_at.isoformat()
-            }
-            for loc in locations
-        ]
+        return [location_to_dict(loc) for loc in locations]
     
     def cleanup_old_sessions(self, hours: int = 24):
-        """Clean up location data older than specified hours."""
-        cutoff_time = datetime.utcnow() - timedelta(hours=hours)
+        """Clean up location data older than specified hours in bounded batches."""
+        from app.services.retention_service import retention_service
         
-        deleted_count = self.db.query(UserLocation).filter(
-            UserLocation.created_at < cutoff_time
-        ).delete()
+        cutoff_time = datetime.utcnow() - timedelta(hours=hours)
+        policy = retention_service.get_policy('user_locations')
+        report = retention_service.purge(self.db, policy, cutoff=cutoff_time)
+        deleted_count = report['rows_deleted']
         
-        self.db.commit()
         print(f"🧹 [Location Service] Cleaned up {deleted_count} old location records")
         
         return deleted_count
\ No newline at end of file
@@ -0,0 +1,210 @@
+# --- File: app/services/location_stats_service.py ---
+import hashlib
+import logging
+import math
+import random
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import event, func, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.db.base import SessionLocal
+from app.db.models.stats import TableStats
+from app.services.location_service import UserLocation
+
+logger = logging.getLogger(__name__)
+
+LOCATION_TABLE = 'user_locations'
+COUNTER_SHARDS = 16
+
+
+def shard_key(shard: int) -> str:
+    """table_stats key of one counter shard, e.g. 'user_locations:3'."""
+    return f"{LOCATION_TABLE}:{shard}"
+
+
+class HyperLogLog:
+    """Fixed-memory distinct counter (4 KB at the default precision, ~1.6% standard error)."""
+
+    def __init__(self, precision: int = 12):
+        self.precision = precision
+        self.num_registers = 1 << precision
+        self.registers = bytearray(self.num_registers)
+        self.alpha = 0.7213 / (1 + 1.079 / self.num_registers)
+        self._cached_estimate: Optional[int] = 0
+
+    def add(self, value) -> None:
+        digest = hashlib.blake2b(str(value).encode(), digest_size=8).digest()
+        hashed = int.from_bytes(digest, 'big')
+        index = hashed >> (64 - self.precision)
+        remaining_bits = 64 - self.precision
+        rank = remaining_bits - (hashed & ((1 << remaining_bits) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+            self._cached_estimate = None
+
+    def update(self, values: Iterable) -> None:
+        for value in values:
+            self.add(value)
+
+    def count(self) -> int:
+        if self._cached_estimate is not None:
+            return self._cached_estimate
+
+        estimate = self.alpha * self.num_registers ** 2 / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * self.num_registers and zeros:
+            # Small-range correction (linear counting)
+            estimate = self.num_registers * math.log(self.num_registers / zeros)
+
+        self._cached_estimate = int(round(estimate))
+        return self._cached_estimate
+
+
+class LocationStatsService:
+    """
+    Keeps user_locations statistics readable in O(1).
+
+    Exact row and flagged counts are spread over COUNTER_SHARDS table_stats
+    rows ('user_locations:0' ...). Every insert/delete adds its delta to one
+    random shard in the same transaction, so concurrent writers rarely wait on
+    the same row lock; reads sum the shards. Distinct customers are estimated
+    with an in-process HyperLogLog that is seeded once from the table in the
+    background and then fed by this worker's inserts, so each worker's
+    estimate lags the inserts made by the other workers until it is reseeded.
+    """
+
+    def __init__(self):
+        self.distinct_users = HyperLogLog()
+        self.distinct_ready = False
+        self.distinct_seeded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    # ---- incremental maintenance -------------------------------------------
+
+    def _apply_delta(self, connection, rows: int, flagged: int) -> None:
+        stats = TableStats.__table__
+        connection.execute(
+            update(stats)
+            .where(stats.c.table_name == shard_key(random.randrange(COUNTER_SHARDS)))
+            .values(
+                row_count=stats.c.row_count + rows,
+                flagged_count=stats.c.flagged_count + flagged
+            )
+        )
+
+    def on_insert(self, connection, target: UserLocation) -> None:
+        self._apply_delta(connection, 1, 1 if target.is_flagged else 0)
+        with self._lock:
+            self.distinct_users.add(target.customer_unique_id)
+
+    def on_delete(self, connection, target: UserLocation) -> None:
+        self._apply_delta(connection, -1, -1 if target.is_flagged else 0)
+
+    def record_purged(self, db: Session, rows) -> None:
+        """Retention hook: rows are (id, is_flagged) tuples deleted in the current transaction."""
+        flagged = sum(1 for row in rows if row[1])
+        self._apply_delta(db.connection(), -len(rows), -flagged)
+
+    # ---- (re)building ---------------------------------------------------------
+
+    def rebuild_counters(self, db: Session) -> Dict[str, int]:
+        """Recompute the exact counters with a full scan (bootstrap / repair only)."""
+        total, flagged = db.query(
+            func.count(UserLocation.id),
+            func.count(UserLocation.id).filter(UserLocation.is_flagged == True)
+        ).one()
+
+        values = {"row_count": total or 0, "flagged_count": flagged or 0}
+        # The totals go to shard 0 and every other shard restarts at zero
+        shards = [
+            {"table_name": shard_key(shard), **(values if shard == 0 else {"row_count": 0, "flagged_count": 0})}
+            for shard in range(COUNTER_SHARDS)
+        ]
+        if db.get_bind().dialect.name == 'postgresql':
+            stmt = postgresql.insert(TableStats).values(shards)
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=[TableStats.table_name],
+                set_={"row_count": stmt.excluded.row_count, "flagged_count": stmt.excluded.flagged_count}
+            ))
+        else:
+            for shard in shards:
+                db.merge(TableStats(**shard))
+        # Single-row counter used before the counters were sharded
+        db.query(TableStats).filter(TableStats.table_name == LOCATION_TABLE).delete(synchronize_session=False)
+        db.commit()
+
+        logger.info(f"Rebuilt {LOCATION_TABLE} counters: total={values['row_count']} flagged={values['flagged_count']}")
+        return {"total_records": values["row_count"], "flagged_records": values["flagged_count"]}
+
+    def seed_distinct_users(self, db: Session, batch_size: int = 10000) -> int:
+        """Stream customer ids once into a fresh sketch and swap it in."""
+        sketch = HyperLogLog(self.distinct_users.precision)
+        query = db.query(UserLocation.customer_unique_id).yield_per(batch_size)
+        for (customer_id,) in query:
+            sketch.add(customer_id)
+
+        with self._lock:
+            self.distinct_users = sketch
+            self.distinct_ready = True
+            self.distinct_seeded_at = time.time()
+        return sketch.count()
+
+    def warm(self) -> None:
+        """Create the counter row if missing and seed the sketch (run off the request path)."""
+        db = SessionLocal()
+        try:
+            if db.get(TableStats, shard_key(COUNTER_SHARDS - 1)) is None:
+                self.rebuild_counters(db)
+            self.seed_distinct_users(db)
+            logger.info("Location stats warmed")
+        except Exception as e:
+            logger.error(f"Failed to warm location stats: {str(e)}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def warm_in_background(self) -> None:
+        threading.Thread(target=self.warm, name="location-stats-warmup", daemon=True).start()
+
+    # ---- reads --------------------------------------------------------------
+
+    def snapshot(self, db: Session) -> Dict[str, any]:
+        """Sum of the counter shards (a primary-key range read) plus this worker's distinct estimate."""
+        total, flagged, shards, updated_at = db.query(
+            func.sum(TableStats.row_count),
+            func.sum(TableStats.flagged_count),
+            func.count(TableStats.table_name),
+            func.max(TableStats.updated_at)
+        ).filter(TableStats.table_name.in_([shard_key(shard) for shard in range(COUNTER_SHARDS)])).one()
+        ready = shards == COUNTER_SHARDS
+        with self._lock:
+            unique_users = self.distinct_users.count() if self.distinct_ready else None
+            seeded_at = self.distinct_seeded_at
+
+        return {
+            "counters_ready": ready,
+            "total_records": int(total) if ready else None,
+            "flagged_records": int(flagged) if ready else None,
+            "unique_users_estimate": unique_users,
+            "unique_users_ready": unique_users is not None,
+            "distinct_seeded_at": seeded_at,
+            "updated_at": updated_at.isoformat() if ready and updated_at else None
+        }
+
+
+# Create global instance
+location_stats = LocationStatsService()
+
+
+@event.listens_for(UserLocation, 'after_insert')
+def _location_inserted(mapper, connection, target):
+    location_stats.on_insert(connection, target)
+
+
+@event.listens_for(UserLocation, 'after_delete')
+def _location_deleted(mapper, connection, target):
+    location_stats.on_delete(connection, target)
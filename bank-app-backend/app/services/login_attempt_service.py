@@ -1,5 +1,7 @@
 # Create new file: app/services/login_attempt_service.py
 
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import text
 from app.db.models.user import AppData, LoginAttempt
@@ -163,20 +165,44 @@ class LoginAttemptService:
             if not app_data:
                 return {"is_locked": False}
             
-            now = datetime.now()
-            is_locked = app_data.login_blocked_until and app_data.login_blocked_until > now
+            return LoginAttemptService._lockout_payload(app_data.failed_login_attempts, app_data.login_blocked_until)
+            
+        except Exception as e:
+            logger.error(f"Error getting lockout info: {str(e)}")
+            return {"is_locked": False}
+
+    @staticmethod
+    async def get_lockout_info_async(db: AsyncSession, customer_id: str) -> dict:
+        """
+        get_lockout_info on an async session (reads only the two lockout columns)
+        """
+        try:
+            result = await db.execute(
+                select(AppData.failed_login_attempts, AppData.login_blocked_until)
+                .where(AppData.customer_id == customer_id)
+            )
+            row = result.first()
+            if not row:
+                return {"is_locked": False}
             
-            return {
-                "is_locked": is_locked,
-                "failed_attempts": app_data.failed_login_attempts,
-                "attempts_remaining": max(0, LoginAttemptService.MAX_FAILED_ATTEMPTS - app_data.failed_login_attempts),
-                "locked_until": app_data.login_blocked_until.isoformat() if app_data.login_blocked_until else None,
-                "time_remaining_hours": (
-                    (app_data.login_blocked_until - now).total_seconds() / 3600
-                    if is_locked else 0
-                )
-            }
+            return LoginAttemptService._lockout_payload(row.failed_login_attempts, row.login_blocked_until)
             
         except Exception as e:
             logger.error(f"Error getting lockout info: {str(e)}")
-            return {"is_locked": False}
\ No newline at end of file
+            return {"is_locked": False}
+
+    @staticmethod
+    def _lockout_payload(failed_login_attempts: int, login_blocked_until: Optional[datetime]) -> dict:
+        now = datetime.now()
+        is_locked = login_blocked_until and login_blocked_until > now
+        
+        return {
+            "is_locked": is_locked,
+            "failed_attempts": failed_login_attempts,
+            "attempts_remaining": max(0, LoginAttemptService.MAX_FAILED_ATTEMPTS - failed_login_attempts),
+            "locked_until": login_blocked_until.isoformat() if login_blocked_until else None,
+            "time_remaining_hours": (
+                (login_blocked_until - now).total_seconds() / 3600
+                if is_locked else 0
+            )
+        }
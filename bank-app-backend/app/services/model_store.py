@@ -0,0 +1,94 @@
+# --- File: app/services/model_store.py ---
+"""
+Read-only model artifacts shared by all worker processes through the page cache.
+
+uvicorn --workers starts every worker as a fresh (spawned) interpreter, so
+nothing a parent process loads is inherited. Instead each artifact (torch
+weights converted to numpy arrays, pickled scalers) is published once as an
+uncompressed joblib file, and every worker memory-maps its arrays read-only
+(joblib.load(mmap_mode="r")). The pages of a mapped file are shared by every
+process mapping it, so N workers hold one copy of the weights.
+
+    arrays = model_store.load("fraud_autoencoder", [autoencoder_path], convert)
+
+load() attaches the published artifact, or first publishes `convert()` when
+it is missing or older than its source files (size and mtime are recorded at
+publish time). Publishing writes a temporary file and renames it over the
+old one, so a worker still mapping the previous version keeps reading it;
+scripts/publish_models.py publishes ahead of starting the workers.
+"""
+import logging
+import os
+import tempfile
+import threading
+from typing import Any, Callable, Dict, List
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _fingerprint(sources: List[str]) -> List[list]:
+    fingerprint = []
+    for path in sources:
+        stat = os.stat(path)
+        fingerprint.append([os.path.abspath(path), stat.st_size, stat.st_mtime_ns])
+    return fingerprint
+
+
+class ModelStore:
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+        self._attached: Dict[str, str] = {}
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.root, f"{name}.joblib")
+
+    def publish(self, name: str, artifact: Any, sources: List[str]) -> str:
+        """Write `artifact` (numpy arrays are stored uncompressed, so they can be mapped) and swap it in."""
+        import joblib
+
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=f".{name}.", suffix=".tmp")
+        os.close(fd)
+        try:
+            joblib.dump({"sources": _fingerprint(sources), "artifact": artifact}, tmp_path)
+            os.chmod(tmp_path, 0o644)  # mkstemp creates it owner-only
+            os.replace(tmp_path, self.path(name))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        logger.info(f"Published shared model artifact {name} ({os.path.getsize(self.path(name))} bytes)")
+        return self.path(name)
+
+    def attach(self, name: str, sources: List[str]) -> Any:
+        """The published artifact with its arrays mapped read-only; None when missing or stale."""
+        import joblib
+
+        path = self.path(name)
+        if not os.path.exists(path):
+            return None
+        stored = joblib.load(path, mmap_mode="r")
+        if stored.get("sources") != _fingerprint(sources):
+            return None
+        with self._lock:
+            self._attached[name] = path
+        return stored["artifact"]
+
+    def load(self, name: str, sources: List[str], convert: Callable[[], Any]) -> Any:
+        artifact = self.attach(name, sources)
+        if artifact is None:
+            self.publish(name, convert(), sources)
+            artifact = self.attach(name, sources)
+        return artifact
+
+    def attached(self) -> Dict[str, str]:
+        """Artifacts this worker has mapped: name -> file."""
+        with self._lock:
+            return dict(self._attached)
+
+
+# Create global instance
+model_store = ModelStore(settings.MODEL_SHARED_DIR)
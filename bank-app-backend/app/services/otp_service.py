@@ -6,7 +6,7 @@ from cryptography.hazmat.primitives.asymmetric import ed25519
 from cryptography.hazmat.primitives.asymmetric import padding
 from cryptography.hazmat.backends import default_backend
 import base64
-from twilio.rest import Client
+from app.services.twilio_client import get_twilio_client
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import text
 from app.core.config import settings
@@ -83,7 +83,7 @@ def send_otp(phone_number: str, customer_status: str) -> None:
         )
     
     try:
-        client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
+        client = get_twilio_client()
         verification = client.verify.v2.services(settings.TWILIO_VERIFY_SERVICE_SID) \
             .verifications.create(to=phone_number, channel="sms")
         
@@ -97,7 +97,7 @@ def send_otp(phone_number: str, customer_status: str) -> None:
 
 def verify_otp(phone_number: str, otp_code: str) -> bool:
     try:
-        client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
+        client = get_twilio_client()
         verification_check = client.verify.v2.services(settings.TWILIO_VERIFY_SERVICE_SID) \
             .verification_checks.create(to=phone_number, code=otp_code)
         
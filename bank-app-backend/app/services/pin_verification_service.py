@@ -6,6 +6,7 @@ from typing import Optional
 
 from sqlalchemy.orm import Session
 from app.db.models.user import Account
+from app.services.customer_context import load_primary_account
 from app.schemas.transactions import PinVerificationResponse
 
 logger = logging.getLogger(__name__)
@@ -28,7 +29,7 @@ class PinVerificationService:
         """Verify ATM PIN with attempt tracking and lockout protection"""
         try:
             # Get customer account
-            account = db.query(Account).filter(Account.customer_id == customer_id).first()
+            account = load_primary_account(db, customer_id)
             if not account:
                 logger.warning(f"PIN verification failed - account not found: {customer_id}")
                 return PinVerificationResponse(
@@ -125,7 +126,7 @@ class PinVerificationService:
                 return False
             
             # Get account
-            account = db.query(Account).filter(Account.customer_id == customer_id).first()
+            account = load_primary_account(db, customer_id)
             if not account:
                 logger.warning(f"Account not found for PIN setup: {customer_id}")
                 return False
@@ -148,7 +149,7 @@ class PinVerificationService:
     def reset_pin_attempts(cls, db: Session, customer_id: str) -> bool:
         """Reset PIN attempts (admin function)"""
         try:
-            account = db.query(Account).filter(Account.customer_id == customer_id).first()
+            account = load_primary_account(db, customer_id)
             if not account:
                 return False
             
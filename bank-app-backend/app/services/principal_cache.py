@@ -0,0 +1,68 @@
+# --- File: app/services/principal_cache.py ---
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from app.core.config import settings
+
+
+class AuthenticatedCustomer:
+    """What get_current_customer hands to endpoints: the customer behind a valid token."""
+    __slots__ = ("customer_id", "app_access_revoked")
+
+    def __init__(self, customer_id: str, app_access_revoked: bool = False):
+        self.customer_id = customer_id
+        self.app_access_revoked = app_access_revoked
+
+
+class PrincipalCache:
+    """
+    Short-lived cache of authenticated principals keyed by token subject.
+
+    Lets get_current_customer skip the AppData lookup on every call. Entries
+    are dropped immediately in this process on revocation, logout and
+    restoration; other worker processes pick the change up when their entry
+    expires, so ttl_seconds is the upper bound for a revocation to take
+    effect everywhere. A ttl of 0 disables the cache.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, AuthenticatedCustomer]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, customer_id: str) -> Optional[AuthenticatedCustomer]:
+        if self.ttl_seconds <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(customer_id)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[customer_id]
+                return None
+            self._entries.move_to_end(customer_id)
+            return entry[1]
+
+    def put(self, principal: AuthenticatedCustomer) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[principal.customer_id] = (time.monotonic() + self.ttl_seconds, principal)
+            self._entries.move_to_end(principal.customer_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, customer_id: str) -> None:
+        with self._lock:
+            self._entries.pop(str(customer_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Create global instance
+principal_cache = PrincipalCache(settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS, settings.AUTH_PRINCIPAL_CACHE_SIZE)
@@ -5,13 +5,25 @@ from decimal import Decimal
 from typing import Optional, Tuple
 
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, or_, update
 from app.db.models.user import Account, Transaction, AppData
+from app.services.customer_context import load_app_data, load_primary_account
 
 logger = logging.getLogger(__name__)
 
+class RestorationLimitExceededError(Exception):
+    pass
+
 class RestorationLimitService:
-    """Service for managing post-restoration transaction limits"""
+    """
+    Service for managing post-restoration transaction limits
+
+    For RESTORATION_LIMIT_HOURS after a restore, the debits of the account may
+    add up to at most `restoration_daily_limit` over the whole period (a
+    cumulative limit, not a per-transaction one). AppData.restoration_spent is
+    the running total; reserve_restoration_spend checks and adds to it in the
+    debit's transaction.
+    """
     
     # Constants
     RESTORATION_LIMIT_HOURS = 35
@@ -31,7 +43,7 @@ class RestorationLimitService:
             bool: True if limits were activated successfully
         """
         try:
-            app_data = db.query(AppData).filter(AppData.customer_id == customer_id).first()
+            app_data = load_app_data(db, customer_id)
             if not app_data:
                 logger.warning(f"AppData not found for restoration limits: {customer_id}")
                 return False
@@ -43,6 +55,7 @@ class RestorationLimitService:
             app_data.is_restoration_limited = True
             app_data.restoration_daily_limit = limit_amount or cls.DEFAULT_RESTORATION_LIMIT
             app_data.restoration_limit_expires_at = expires_at
+            app_data.restoration_spent = Decimal('0.00')
             app_data.updated_at = now
             
             db.commit()
@@ -66,7 +79,7 @@ class RestorationLimitService:
             Tuple[is_limited, limit_amount, expires_at]
         """
         try:
-            app_data = db.query(AppData).filter(AppData.customer_id == customer_id).first()
+            app_data = load_app_data(db, customer_id)
             if not app_data:
                 return False, None, None
             
@@ -93,8 +106,8 @@ class RestorationLimitService:
         Validate if transaction is allowed under restoration limits
         
         Restoration limits work as:
-        - Individual transaction limit ONLY: No single transaction > ₹5000
-        - NO cumulative limit: Users can make unlimited transactions under ₹5000 each
+        - Cumulative limit: debits since the restore may total at most the limit (₹5000 by default)
+        - Checked up front here; reserve_restoration_spend enforces it again under the debit
         
         Args:
             db: Database session
@@ -110,17 +123,16 @@ class RestorationLimitService:
             if not is_limited:
                 return True, "No restoration limits active"
             
-            # Only check individual transaction limit
-            if transaction_amount > limit_amount:
-                hours_remaining = cls._calculate_hours_remaining(expires_at)
+            remaining = cls.remaining_restoration_limit(db, customer_id, limit_amount)
+            hours_remaining = cls._calculate_hours_remaining(expires_at)
+            if transaction_amount > remaining:
                 return False, (
-                    f"Transaction amount ₹{transaction_amount} exceeds post-restoration limit of "
-                    f"₹{limit_amount} per transaction. This limit expires in {hours_remaining:.1f} hours."
+                    f"Transaction amount ₹{transaction_amount} exceeds the remaining post-restoration limit of "
+                    f"₹{remaining} (₹{limit_amount} in total). This limit expires in {hours_remaining:.1f} hours."
                 )
             
-            # Transaction is within individual limit - allow it
-            hours_remaining = cls._calculate_hours_remaining(expires_at)
-            return True, f"Transaction allowed (₹{transaction_amount} ≤ ₹{limit_amount} individual limit, {hours_remaining:.1f} hours remaining)"
+            # Transaction fits in what is left of the limit - allow it
+            return True, f"Transaction allowed (₹{transaction_amount} ≤ ₹{remaining} remaining of ₹{limit_amount}, {hours_remaining:.1f} hours remaining)"
             
         except Exception as e:
             logger.exception(f"Error validating restoration limits for {customer_id}: {e}")
@@ -132,6 +144,7 @@ class RestorationLimitService:
         try:
             app_data.is_restoration_limited = False
             app_data.restoration_limit_expires_at = None
+            app_data.restoration_spent = Decimal('0.00')
             app_data.updated_at = datetime.now(timezone.utc)
             db.commit()
             logger.info(f"Restoration limits expired and removed: customer={app_data.customer_id}")
@@ -139,40 +152,46 @@ class RestorationLimitService:
             logger.exception(f"Error removing restoration limits: {e}")
             db.rollback()
     
+    @classmethod
+    def reserve_restoration_spend(cls, db: Session, customer_id: str, amount: Decimal) -> bool:
+        """
+        Add `amount` to the running restoration spend if the total stays within
+        the limit, in one conditional UPDATE inside the caller's transaction (the
+        caller commits it together with the debit). Returns False if the limit is
+        active and would be exceeded; nothing is reserved then.
+        """
+        now = datetime.now(timezone.utc)
+        result = db.execute(
+            update(AppData)
+            .where(
+                AppData.customer_id == customer_id,
+                or_(
+                    AppData.is_restoration_limited == False,
+                    AppData.restoration_limit_expires_at <= now,
+                    AppData.restoration_spent + amount <= AppData.restoration_daily_limit
+                )
+            )
+            .values(restoration_spent=AppData.restoration_spent + amount)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount == 1
+    
+    @classmethod
+    def remaining_restoration_limit(cls, db: Session, customer_id: str, limit_amount: Decimal) -> Decimal:
+        """What is left of `limit_amount` after the spend since the restore (never negative)"""
+        return max(limit_amount - cls._get_restoration_period_transaction_total(db, customer_id), Decimal('0.00'))
+    
     @classmethod
     def _get_restoration_period_transaction_total(cls, db: Session, customer_id: str) -> Decimal:
-        """Get total SUCCESSFUL transaction amount since restoration was activated"""
+        """Get total SUCCESSFUL debit amount since restoration was activated (running counter, no history scan)"""
         try:
-            # Get account number from Account table using customer_id
-            account = db.query(Account).filter(Account.customer_id == customer_id).first()
-            if not account:
-                logger.warning(f"Account not found for customer: {customer_id}")
+            app_data = load_app_data(db, customer_id)
+            if not app_data or not app_data.is_restoration_limited:
                 return Decimal('0.00')
-            
-            # Get restoration data from AppData table
-            app_data = db.query(AppData).filter(AppData.customer_id == customer_id).first()
-            if not app_data or not app_data.last_restored_at:
-                logger.debug(f"No restoration data found for customer: {customer_id}")
-                return Decimal('0.00')
-            
-            # Only count SUCCESSFUL debit transactions since restoration was activated
-            # Exclude: blocked transactions, fraud transactions, and non-debit types
-            total = db.query(Transaction).filter(
-                Transaction.account_number == account.account_number,
-                Transaction.type == 'debit',  # Only debit transactions (money going out)
-                Transaction.amount < 0,  # Debit transactions are negative
-                Transaction.date >= app_data.last_restored_at,  # Only since restoration
-                Transaction.is_fraud == False,  # Exclude fraud transactions
-                # Note: type == 'debit' already excludes 'blocked' type transactions
-            ).with_entities(
-                func.sum(func.abs(Transaction.amount))
-            ).scalar() or Decimal('0.00')
-            
-            logger.info(f"Restoration period successful transactions total for {customer_id}: ₹{total} (since {app_data.last_restored_at})")
-            return Decimal(str(total))
+            return Decimal(str(app_data.restoration_spent or 0))
             
         except Exception as e:
-            logger.exception(f"Error calculating restoration period transaction total for {customer_id}: {e}")
+            logger.exception(f"Error reading restoration period spend for {customer_id}: {e}")
             return Decimal('0.00')
     
     @classmethod
@@ -207,15 +226,17 @@ class RestorationLimitService:
                 }
             
             hours_remaining = cls._calculate_hours_remaining(expires_at)
+            used = cls._get_restoration_period_transaction_total(db, customer_id)
+            remaining = cls.remaining_restoration_limit(db, customer_id, limit_amount)
             
             return {
                 "is_limited": True,
                 "limit_amount": float(limit_amount),
-                "daily_used": None,  # No cumulative tracking
-                "remaining_limit": float(limit_amount),  # Always the full limit per transaction
+                "daily_used": float(used),  # Spent since the restore
+                "remaining_limit": float(remaining),
                 "hours_remaining": hours_remaining,
                 "expires_at": expires_at.isoformat() if expires_at else None,
-                "message": f"Post-restoration limits active: ₹{limit_amount} per transaction limit, expires in {hours_remaining:.1f} hours"
+                "message": f"Post-restoration limits active: ₹{remaining} of ₹{limit_amount} left to spend, expires in {hours_remaining:.1f} hours"
             }
             
         except Exception as e:
@@ -230,8 +251,8 @@ class RestorationLimitService:
         """Debug method to inspect restoration status and recent transactions"""
         try:
             # Get account and restoration data
-            account = db.query(Account).filter(Account.customer_id == customer_id).first()
-            app_data = db.query(AppData).filter(AppData.customer_id == customer_id).first()
+            account = load_primary_account(db, customer_id)
+            app_data = load_app_data(db, customer_id)
             
             if not account or not app_data:
                 return {"error": "Account or app data not found"}
@@ -248,7 +269,8 @@ class RestorationLimitService:
                 "account_number": account.account_number,
                 "restoration_status": {
                     "is_limited": app_data.is_restoration_limited,
-                    "individual_transaction_limit": float(app_data.restoration_daily_limit),
+                    "restoration_period_limit": float(app_data.restoration_daily_limit),
+                    "restoration_spent": float(app_data.restoration_spent or 0),
                     "last_restored_at": app_data.last_restored_at.isoformat() if app_data.last_restored_at else None,
                     "expires_at": app_data.restoration_limit_expires_at.isoformat() if app_data.restoration_limit_expires_at else None,
                     "hours_remaining": hours_remaining
@@ -264,7 +286,7 @@ class RestorationLimitService:
                     }
                     for t in recent_transactions
                 ],
-                "note": "Restoration limits only apply to individual transactions (max ₹5000 each), not cumulative amounts"
+                "note": "Restoration limits cap the total debited since the restore (₹5000 by default), not single transactions"
             }
             
         except Exception as e:
@@ -0,0 +1,310 @@
+# --- File: app/services/retention_service.py ---
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, delete, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.base import SessionLocal, engine
+from app.db.models.user import LoginAttempt, SeedkeyAttempt
+
+logger = logging.getLogger(__name__)
+
+# Postgres SQLSTATE raised when lock_timeout expires
+LOCK_NOT_AVAILABLE = '55P03'
+# Arbitrary key so only one worker process runs a retention cycle at a time
+RETENTION_ADVISORY_LOCK_KEY = 727001
+
+
+class RetentionPolicy:
+    """How long rows of one table are kept and how they are purged."""
+
+    def __init__(self, name: str, model, timestamp_column: str, max_age: timedelta, batch_size: int,
+                 tracked_columns: Tuple[str, ...] = (), on_purged: Optional[Callable] = None):
+        self.name = name
+        self.model = model
+        self.timestamp_column = timestamp_column
+        self.max_age = max_age
+        self.batch_size = batch_size
+        # Extra columns fetched with each batch and passed to on_purged(db, rows)
+        # before the batch commits, e.g. to keep incremental counters exact.
+        self.tracked_columns = tracked_columns
+        self.on_purged = on_purged
+
+    @property
+    def table(self):
+        return self.model.__table__
+
+    def cutoff(self) -> datetime:
+        """Cutoff in the same flavour (naive UTC or aware) as the timestamp column."""
+        column = self.table.c[self.timestamp_column]
+        if getattr(column.type, 'timezone', False):
+            return datetime.now(timezone.utc) - self.max_age
+        return datetime.utcnow() - self.max_age
+
+
+def default_policies() -> List[RetentionPolicy]:
+    from app.services.location_service import UserLocation
+    from app.services.location_stats_service import location_stats
+    from app.services.statement_export_service import StatementExport, statement_exports
+    from app.db.models.idempotency import IdempotencyRecord
+
+    return [
+        RetentionPolicy(
+            'user_locations', UserLocation, 'created_at',
+            timedelta(hours=settings.LOCATION_RETENTION_HOURS), settings.RETENTION_BATCH_SIZE,
+            tracked_columns=('is_flagged',), on_purged=location_stats.record_purged
+        ),
+        RetentionPolicy(
+            'login_attempts', LoginAttempt, 'attempt_time',
+            timedelta(days=settings.LOGIN_ATTEMPT_RETENTION_DAYS), settings.RETENTION_BATCH_SIZE
+        ),
+        RetentionPolicy(
+            'seedkey_attempts', SeedkeyAttempt, 'attempt_time',
+            timedelta(days=settings.SEEDKEY_ATTEMPT_RETENTION_DAYS), settings.RETENTION_BATCH_SIZE
+        ),
+        RetentionPolicy(
+            'statement_exports', StatementExport, 'created_at',
+            timedelta(hours=settings.STATEMENT_EXPORT_RETENTION_HOURS), settings.RETENTION_BATCH_SIZE,
+            tracked_columns=('file_path',), on_purged=statement_exports.remove_files
+        ),
+        RetentionPolicy(
+            'idempotency_keys', IdempotencyRecord, 'created_at',
+            timedelta(hours=settings.IDEMPOTENCY_TTL_HOURS), settings.RETENTION_BATCH_SIZE
+        ),
+    ]
+
+
+class RetentionService:
+    """
+    Purges expired rows with chunked keyset deletes.
+
+    Each batch locks at most `batch_size` rows (FOR UPDATE SKIP LOCKED), deletes
+    them by primary key and commits, so no single transaction holds locks for
+    long or produces one huge burst of dead tuples. Rows are walked in id order,
+    which for these append-only tables matches insertion time.
+
+    A batch first finds its expired ids with a plain (non-locking) scan and then
+    locks exactly those ids by primary key, so the report can separate scan
+    time (scan_seconds) from the time spent taking locks (lock_wait_seconds,
+    including waits for the table lock up to lock_timeout). Rows another
+    transaction holds are skipped and counted in rows_skipped_locked; lock
+    waits that hit lock_timeout are counted in lock_timeouts.
+    """
+
+    MAX_LOCK_TIMEOUTS = 5
+    LOCK_TIMEOUT_BACKOFF_SECONDS = 0.5
+    PAUSE_BETWEEN_BATCHES_SECONDS = 0.0
+
+    def __init__(self, policies: Optional[List[RetentionPolicy]] = None,
+                 lock_timeout_ms: int = settings.RETENTION_LOCK_TIMEOUT_MS):
+        self._policies = policies
+        self.lock_timeout_ms = lock_timeout_ms
+        self.last_reports: Dict[str, Dict] = {}
+        self.last_run_at: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @property
+    def policies(self) -> List[RetentionPolicy]:
+        if self._policies is None:
+            self._policies = default_policies()
+        return self._policies
+
+    def get_policy(self, name: str) -> Optional[RetentionPolicy]:
+        return next((p for p in self.policies if p.name == name), None)
+
+    def purge(self, db: Session, policy: RetentionPolicy, cutoff: Optional[datetime] = None) -> Dict[str, any]:
+        """Delete every row of a policy's table older than the cutoff, one bounded batch at a time."""
+        table = policy.table
+        id_column = table.c.id
+        ts_column = table.c[policy.timestamp_column]
+        tracked = [table.c[name] for name in policy.tracked_columns]
+        cutoff = cutoff or policy.cutoff()
+        is_postgres = db.get_bind().dialect.name == 'postgresql'
+
+        last_id = 0
+        deleted = 0
+        batches = 0
+        scan_seconds = 0.0
+        lock_wait_seconds = 0.0
+        skipped_locked = 0
+        lock_timeouts = 0
+        started = time.monotonic()
+
+        while True:
+            try:
+                if is_postgres:
+                    db.execute(text(f"SET LOCAL lock_timeout = {int(self.lock_timeout_ms)}"))
+
+                scan_query = select(id_column).where(
+                    ts_column < cutoff,
+                    id_column > last_id
+                ).order_by(id_column).limit(policy.batch_size)
+                scan_started = time.monotonic()
+                candidate_ids = db.execute(scan_query).scalars().all()
+                scan_seconds += time.monotonic() - scan_started
+
+                if not candidate_ids:
+                    db.rollback()
+                    break
+
+                lock_query = select(id_column, *tracked).where(
+                    id_column.in_(candidate_ids),
+                    ts_column < cutoff
+                ).order_by(id_column)
+                if is_postgres:
+                    lock_query = lock_query.with_for_update(skip_locked=True)
+                lock_started = time.monotonic()
+                rows = db.execute(lock_query).all()
+                lock_wait_seconds += time.monotonic() - lock_started
+                skipped_locked += len(candidate_ids) - len(rows)
+
+                ids = [row[0] for row in rows]
+                if ids:
+                    db.execute(delete(table).where(id_column.in_(ids)))
+                    if policy.on_purged:
+                        policy.on_purged(db, rows)
+                db.commit()
+            except OperationalError as e:
+                db.rollback()
+                if getattr(e.orig, 'pgcode', None) != LOCK_NOT_AVAILABLE:
+                    raise
+                lock_timeouts += 1
+                logger.warning(f"Retention batch on {policy.name} hit lock_timeout ({lock_timeouts}/{self.MAX_LOCK_TIMEOUTS})")
+                if lock_timeouts >= self.MAX_LOCK_TIMEOUTS:
+                    break
+                time.sleep(self.LOCK_TIMEOUT_BACKOFF_SECONDS)
+                continue
+
+            deleted += len(ids)
+            batches += 1
+            last_id = candidate_ids[-1]
+
+            if len(candidate_ids) < policy.batch_size:
+                break
+            if self.PAUSE_BETWEEN_BATCHES_SECONDS:
+                time.sleep(self.PAUSE_BETWEEN_BATCHES_SECONDS)
+
+        duration = time.monotonic() - started
+        report = {
+            "table": policy.name,
+            "cutoff": cutoff.isoformat(),
+            "rows_deleted": deleted,
+            "batches": batches,
+            "batch_size": policy.batch_size,
+            "duration_seconds": round(duration, 3),
+            "rows_per_second": round(deleted / duration, 1) if duration > 0 else 0.0,
+            "scan_seconds": round(scan_seconds, 3),
+            "lock_wait_seconds": round(lock_wait_seconds, 3),
+            "rows_skipped_locked": skipped_locked,
+            "lock_timeouts": lock_timeouts,
+            "completed": lock_timeouts < self.MAX_LOCK_TIMEOUTS
+        }
+
+        with self._lock:
+            self.last_reports[policy.name] = report
+
+        logger.info(
+            f"Retention purge {policy.name}: deleted={deleted} batches={batches} "
+            f"rate={report['rows_per_second']}/s scan={report['scan_seconds']}s lock_wait={report['lock_wait_seconds']}s "
+            f"skipped_locked={skipped_locked} lock_timeouts={lock_timeouts}"
+        )
+        return report
+
+    def run_all(self, db: Session) -> Dict[str, Dict]:
+        """Apply every retention policy once."""
+        reports = {}
+        for policy in self.policies:
+            try:
+                reports[policy.name] = self.purge(db, policy)
+            except Exception as e:
+                logger.error(f"Retention purge failed for {policy.name}: {str(e)}")
+                db.rollback()
+                reports[policy.name] = {"table": policy.name, "error": str(e)}
+        if settings.TRANSACTION_ARCHIVE_ENABLED:
+            # Transactions are not purged: whole monthly partitions move to the archive tier
+            from app.services.transaction_partition_service import transaction_partitions
+            try:
+                reports["transactions"] = transaction_partitions.maintain(db)
+            except Exception as e:
+                logger.error(f"Transaction partition maintenance failed: {str(e)}")
+                db.rollback()
+                reports["transactions"] = {"table": "transactions", "error": str(e)}
+        self.last_run_at = datetime.now(timezone.utc).isoformat()
+        return reports
+
+    def status(self) -> Dict[str, any]:
+        with self._lock:
+            reports = dict(self.last_reports)
+        return {
+            "last_run_at": self.last_run_at,
+            "policies": [
+                {
+                    "table": p.name,
+                    "timestamp_column": p.timestamp_column,
+                    "max_age_hours": p.max_age.total_seconds() / 3600,
+                    "batch_size": p.batch_size,
+                    "last_report": reports.get(p.name)
+                }
+                for p in self.policies
+            ]
+        }
+
+
+class RetentionScheduler:
+    """Runs the retention policies periodically on a daemon thread."""
+
+    def __init__(self, service: RetentionService, interval_seconds: float):
+        self.service = service
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="retention-scheduler", daemon=True)
+        self._thread.start()
+        logger.info(f"Retention scheduler started (every {self.interval_seconds:.0f}s)")
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Retention cycle failed: {str(e)}")
+
+    def run_once(self) -> Optional[Dict[str, Dict]]:
+        """Run one cycle unless another worker process already holds the retention lock."""
+        is_postgres = engine.dialect.name == 'postgresql'
+        with engine.connect() as lock_conn:
+            if is_postgres:
+                acquired = lock_conn.execute(
+                    text("SELECT pg_try_advisory_lock(:key)"), {"key": RETENTION_ADVISORY_LOCK_KEY}
+                ).scalar()
+                if not acquired:
+                    logger.info("Retention cycle skipped: another worker is running it")
+                    return None
+            db = SessionLocal()
+            try:
+                return self.service.run_all(db)
+            finally:
+                db.close()
+                if is_postgres:
+                    lock_conn.execute(
+                        text("SELECT pg_advisory_unlock(:key)"), {"key": RETENTION_ADVISORY_LOCK_KEY}
+                    )
+
+
+# Create global instances
+retention_service = RetentionService()
+retention_scheduler = RetentionScheduler(retention_service, settings.RETENTION_INTERVAL_MINUTES * 60)
@@ -0,0 +1,173 @@
+# --- File: app/services/security_summary_service.py ---
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.db.models.user import CustomerSecuritySummary, DeviceEvent
+
+logger = logging.getLogger(__name__)
+
+MAX_DEVICES = 50
+RECENT_EVENTS = 10
+
+# Action types whose device entries appear in recent_events
+HISTORY_ACTIONS = {"registration", "restoration", "login_success", "revocation", "transaction"}
+
+
+def _device_key(entry: Dict[str, Any]) -> tuple:
+    return (entry.get("device_info"), entry.get("ip_address"), entry.get("location"))
+
+
+def _merge_newest(existing: List[Dict], new_entries: List[Dict], limit: int, distinct_devices: bool = False) -> List[Dict]:
+    """Merge entries newest-first by timestamp, optionally keeping only the newest entry per device."""
+    merged = sorted(existing + new_entries, key=lambda e: e.get("timestamp") or "", reverse=True)
+    if not distinct_devices:
+        return merged[:limit]
+
+    seen = set()
+    result = []
+    for entry in merged:
+        key = _device_key(entry)
+        if key in seen:
+            continue
+        seen.add(key)
+        result.append(entry)
+        if len(result) >= limit:
+            break
+    return result
+
+
+class SecuritySummaryService:
+    """
+    Maintains one customer_security_summaries row per customer: event counts and
+    latest entry per action type, distinct registered/restored devices and the
+    newest history entries. It is updated in the same transaction that inserts
+    the device events, so the dashboard endpoints only need a primary-key read.
+    """
+
+    def _lock_summary(self, db: Session, customer_id: str) -> CustomerSecuritySummary:
+        """Return the customer's summary row, created if missing and locked for update."""
+        if db.get_bind().dialect.name == 'postgresql':
+            db.execute(
+                postgresql.insert(CustomerSecuritySummary)
+                .values(customer_id=customer_id, action_counts={}, latest_events={},
+                        registered_devices=[], restored_devices=[], recent_events=[])
+                .on_conflict_do_nothing(index_elements=[CustomerSecuritySummary.customer_id])
+            )
+            return db.query(CustomerSecuritySummary).filter(
+                CustomerSecuritySummary.customer_id == customer_id
+            ).with_for_update().one()
+
+        summary = db.get(CustomerSecuritySummary, customer_id)
+        if summary is None:
+            summary = CustomerSecuritySummary(
+                customer_id=customer_id, action_counts={}, latest_events={},
+                registered_devices=[], restored_devices=[], recent_events=[]
+            )
+            db.add(summary)
+        return summary
+
+    def apply(self, db: Session, customer_id: str, entries: List[Dict[str, Any]]) -> None:
+        """Fold newly inserted events (in event_to_entry shape) into the customer's summary."""
+        if not entries:
+            return
+        summary = self._lock_summary(db, customer_id)
+
+        counts = dict(summary.action_counts or {})
+        latest = dict(summary.latest_events or {})
+        for entry in entries:
+            action_type = entry["action_type"]
+            counts[action_type] = counts.get(action_type, 0) + 1
+            current = latest.get(action_type)
+            if current is None or (entry.get("timestamp") or "") >= (current.get("timestamp") or ""):
+                latest[action_type] = entry
+
+        registered = [e for e in entries if e["action_type"] == "registration"]
+        restored = [e for e in entries if e["action_type"] == "restoration"]
+        history = [e for e in entries if e["action_type"] in HISTORY_ACTIONS]
+
+        # JSONB columns are replaced wholesale so SQLAlchemy sees the change
+        summary.action_counts = counts
+        summary.latest_events = latest
+        if registered:
+            summary.registered_devices = _merge_newest(list(summary.registered_devices or []), registered, MAX_DEVICES, True)
+        if restored:
+            summary.restored_devices = _merge_newest(list(summary.restored_devices or []), restored, MAX_DEVICES, True)
+        if history:
+            summary.recent_events = _merge_newest(list(summary.recent_events or []), history, RECENT_EVENTS)
+        db.flush()
+
+    def apply_rows(self, db: Session, rows: List[Dict[str, Any]]) -> None:
+        """Apply a batch of inserted device_events rows, one locked summary row per customer."""
+        from app.services.device_event_service import row_to_entry
+
+        by_customer: Dict[str, List[Dict]] = defaultdict(list)
+        for row in rows:
+            by_customer[row["customer_id"]].append(row_to_entry(row))
+        # Lock in a stable order so concurrent batches cannot deadlock
+        for customer_id in sorted(by_customer):
+            self.apply(db, customer_id, by_customer[customer_id])
+
+    def get(self, db: Session, customer_id: str) -> Optional[Dict[str, Any]]:
+        summary = db.get(CustomerSecuritySummary, customer_id)
+        if summary is None:
+            return None
+        return {
+            "action_counts": summary.action_counts or {},
+            "latest_events": summary.latest_events or {},
+            "registered_devices": summary.registered_devices or [],
+            "restored_devices": summary.restored_devices or [],
+            "recent_events": summary.recent_events or []
+        }
+
+    def rebuild_customer(self, db: Session, customer_id: str) -> None:
+        """Recompute one customer's summary from device_events (backfill / repair)."""
+        from app.services.device_event_service import event_to_entry
+
+        existing = db.get(CustomerSecuritySummary, customer_id)
+        if existing is not None:
+            db.delete(existing)
+            db.flush()
+
+        events = db.query(DeviceEvent).filter(
+            DeviceEvent.customer_id == customer_id
+        ).order_by(DeviceEvent.ts, DeviceEvent.id).yield_per(1000)
+        entries = [event_to_entry(e) for e in events]
+        if entries:
+            self.apply(db, customer_id, entries)
+
+    def rebuild(self, db: Session, customer_id: Optional[str] = None, batch_size: int = 500) -> Dict[str, int]:
+        """Rebuild one customer's summary, or every customer's in keyset batches (one commit per batch)."""
+        if customer_id:
+            self.rebuild_customer(db, customer_id)
+            db.commit()
+            return {"customers_rebuilt": 1}
+
+        last_customer = ""
+        rebuilt = 0
+        while True:
+            customer_ids = [
+                row[0] for row in db.query(DeviceEvent.customer_id)
+                .filter(DeviceEvent.customer_id > last_customer)
+                .distinct()
+                .order_by(DeviceEvent.customer_id)
+                .limit(batch_size)
+                .all()
+            ]
+            if not customer_ids:
+                break
+            for cid in customer_ids:
+                self.rebuild_customer(db, cid)
+            db.commit()
+            rebuilt += len(customer_ids)
+            last_customer = customer_ids[-1]
+            logger.info(f"Rebuilt security summaries for {rebuilt} customers")
+
+        return {"customers_rebuilt": rebuilt}
+
+
+# Create global instance
+security_summary = SecuritySummaryService()
@@ -1,10 +1,10 @@
 # Enhanced Seedkey attempt tracking service with FIXED datetime handling
 from sqlalchemy.orm import Session
-from app.db.models.user import AppData, SeedkeyAttempt
+from app.db.models.user import SeedkeyAttempt
+from app.services.customer_context import load_app_data
 from datetime import datetime, timedelta, timezone
 import logging
 from typing import Tuple, Optional, Dict, Any, List
-import json
 
 logger = logging.getLogger(__name__)
 
@@ -49,7 +49,7 @@ class SeedkeyAttemptService:
         Returns: (is_blocked, attempts_remaining)
         """
         try:
-            app_data = db.query(AppData).filter(AppData.customer_id == customer_id).first()
+            app_data = load_app_data(db, customer_id)
             if not app_data:
                 logger.error(f"No app data found for customer {customer_id}")
                 return False, SeedkeyAttemptService.MAX_FAILED_ATTEMPTS
@@ -106,7 +106,7 @@ class SeedkeyAttemptService:
         Returns: (is_locked, unlock_time)
         """
         try:
-            app_data = db.query(AppData).filter(AppData.customer_id == customer_id).first()
+            app_data = load_app_data(db, customer_id)
             if not app_data:
                 return False, None
             
@@ -131,7 +131,7 @@ class SeedkeyAttemptService:
     def get_seedkey_failed_attempt_count(db: Session, customer_id: str) -> int:
         """Get current failed seedkey attempt count for a user"""
         try:
-            app_data = db.query(AppData).filter(AppData.customer_id == customer_id).first()
+            app_data = load_app_data(db, customer_id)
             if not app_data:
                 return 0
             return app_data.seedkey_failed_attempts
@@ -143,7 +143,7 @@ class SeedkeyAttemptService:
     def reset_seedkey_failed_attempts(db: Session, customer_id: str) -> bool:
         """Reset seedkey failed attempts (admin function)"""
         try:
-            app_data = db.query(AppData).filter(AppData.customer_id == customer_id).first()
+            app_data = load_app_data(db, customer_id)
             if not app_data:
                 return False
             
@@ -164,7 +164,7 @@ class SeedkeyAttemptService:
     def get_seedkey_lockout_info(db: Session, customer_id: str) -> Dict[str, Any]:
         """Get detailed seedkey lockout information for frontend"""
         try:
-            app_data = db.query(AppData).filter(AppData.customer_id == customer_id).first()
+            app_data = load_app_data(db, customer_id)
             if not app_data:
                 return {
                     "is_locked": False,
@@ -220,65 +220,23 @@ class SeedkeyAttemptService:
         ip_address: str,
         additional_info: Optional[Dict] = None
     ) -> bool:
-        """Add device information to app_data.other_details with proper handling"""
+        """Record a device event for the customer (stored in device_events, no longer in other_details)"""
+        from app.services.device_event_service import record_event
+
         try:
-            app_data = db.query(AppData).filter(AppData.customer_id == customer_id).first()
-            if not app_data:
-                logger.error(f"No app data found for customer {customer_id}")
-                return False
-            
-            # Handle different types of other_details properly
-            current_details = []
-            
-            if app_data.other_details is None:
-                current_details = []
-            elif isinstance(app_data.other_details, list):
-                current_details = app_data.other_details
-            elif isinstance(app_data.other_details, str):
-                try:
-                    # Try to parse as JSON string
-                    current_details = json.loads(app_data.other_details)
-                    if not isinstance(current_details, list):
-                        current_details = []
-                except (json.JSONDecodeError, TypeError):
-                    logger.warning(f"Could not parse other_details as JSON, starting fresh for customer {customer_id}")
-                    current_details = []
-            else:
-                logger.warning(f"Unexpected other_details type {type(app_data.other_details)}, starting fresh for customer {customer_id}")
-                current_details = []
-            
-            # Create device info entry (only for registration/restoration)
-            if action_type in ["registration", "restoration"]:
-                device_entry = {
-                    "action_type": action_type,
-                    "timestamp": datetime.now(timezone.utc).isoformat(),
-                    "device_info": device_info,
-                    "location": location,
-                    "ip_address": ip_address,
-                    "device_id": f"{device_info}_{ip_address}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-                }
-                
-                if additional_info:
-                    device_entry.update(additional_info)
-                
-                # Add to the list (keep only last 50 entries to prevent bloat)
-                current_details.append(device_entry)
-                if len(current_details) > 50:
-                    current_details = current_details[-50:]
-                
-                app_data.other_details = current_details
-                app_data.updated_at = datetime.now(timezone.utc)
-                db.commit()
-                
-                logger.info(f"Added {action_type} device info for customer {customer_id}")
-                return True
-            else:
-                # For other action types, just log without storing
-                logger.info(f"Logged {action_type} activity for customer {customer_id} (not stored in other_details)")
-                return True
-                
+            record_event(
+                db=db,
+                customer_id=customer_id,
+                action_type=action_type,
+                device_info=device_info,
+                location=location,
+                ip_address=ip_address,
+                additional_info=additional_info
+            )
+            return True
+
         except Exception as e:
-            logger.error(f"Error adding device info to other_details: {str(e)}")
+            logger.error(f"Error recording {action_type} device event: {str(e)}")
             logger.exception("Full traceback:")
             db.rollback()
             return False
@@ -286,60 +244,12 @@ class SeedkeyAttemptService:
     @staticmethod
     def get_registered_and_restored_devices(db: Session, customer_id: str) -> Dict[str, Any]:
         """Get only registered and restored devices for dashboard"""
-        try:
-            app_data = db.query(AppData).filter(AppData.customer_id == customer_id).first()
-            if not app_data:
-                return {"registered_devices": [], "restored_devices": [], "total_registrations": 0, "total_restorations": 0}
-            
-            # Handle other_details properly
-            other_details = []
-            if app_data.other_details is None:
-                other_details = []
-            elif isinstance(app_data.other_details, list):
-                other_details = app_data.other_details
-            elif isinstance(app_data.other_details, str):
-                try:
-                    other_details = json.loads(app_data.other_details)
-                    if not isinstance(other_details, list):
-                        other_details = []
-                except (json.JSONDecodeError, TypeError):
-                    other_details = []
-            
-            # Filter and categorize devices
-            registered_devices = []
-            restored_devices = []
-            
-            for entry in other_details:
-                if isinstance(entry, dict):
-                    if entry.get("action_type") == "registration":
-                        registered_devices.append({
-                            "device_info": entry.get("device_info"),
-                            "timestamp": entry.get("timestamp"),
-                            "location": entry.get("location"),
-                            "ip_address": entry.get("ip_address"),
-                            "device_id": entry.get("device_id")
-                        })
-                    elif entry.get("action_type") == "restoration":
-                        restored_devices.append({
-                            "device_info": entry.get("device_info"),
-                            "timestamp": entry.get("timestamp"),
-                            "location": entry.get("location"),
-                            "ip_address": entry.get("ip_address"),
-                            "device_id": entry.get("device_id"),
-                            "restoration_limits_activated": entry.get("restoration_limits_activated", False)
-                        })
-            
-            # Sort by timestamp (most recent first)
-            registered_devices.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
-            restored_devices.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
-            
-            return {
-                "registered_devices": registered_devices,
-                "restored_devices": restored_devices,
-                "total_registrations": len(registered_devices),
-                "total_restorations": len(restored_devices)
-            }
-            
-        except Exception as e:
-            logger.error(f"Error getting registered/restored devices for customer {customer_id}: {str(e)}")
-            return {"registered_devices": [], "restored_devices": [], "total_registrations": 0, "total_restorations": 0}
\ No newline at end of file
+        from app.services.app_data_service import get_registered_and_restored_devices
+
+        devices = get_registered_and_restored_devices(db, customer_id)
+        return {
+            "registered_devices": devices["registered_devices"],
+            "restored_devices": devices["restored_devices"],
+            "total_registrations": devices["total_registrations"],
+            "total_restorations": devices["total_restorations"]
+        }
@@ -1,11 +1,13 @@
 # --- File: app/services/signature_service.py ---
-import cv2
+# cv2 and PIL are imported inside the functions that use them: only the
+# signature registration and restoration routes pay for loading OpenCV.
 import numpy as np
 import base64
 from io import BytesIO
-from PIL import Image
 import logging
 from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from app.db.models.user import SignatureTemplate
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +15,9 @@ def preprocess_signature(image_data: str):
     """
     Preprocess the signature image for feature extraction
     """
+    import cv2
+    from PIL import Image
+
     try:
         logger.info("Starting signature preprocessing...")
         
@@ -76,6 +81,8 @@ def extract_sift_features(img):
     """
     Extract SIFT features from the preprocessed image
     """
+    import cv2
+
     try:
         sift = cv2.SIFT_create(nfeatures=100)
         keypoints, descriptors = sift.detectAndCompute(img, None)
@@ -96,6 +103,8 @@ def extract_contour_features(img):
     """
     Extract contour-based features
     """
+    import cv2
+
     try:
         contours, _ = cv2.findContours(img, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
         
@@ -132,6 +141,8 @@ def extract_hu_moments(img):
     """
     Extract Hu moments
     """
+    import cv2
+
     try:
         moments = cv2.moments(img)
         hu_moments = cv2.HuMoments(moments)
@@ -174,6 +185,8 @@ def match_sift_features(des1, des2):
     if len(des1) < 2 or len(des2) < 2:
         return 0.0
     
+    import cv2
+
     try:
         FLANN_INDEX_KDTREE = 1
         index_params = dict(algorithm=FLANN_INDEX_KDTREE, trees=5)
@@ -251,4 +264,21 @@ def calculate_final_score(sift_score, contour_score, hu_score):
                    hu_weight * hu_score)
     
     logger.info(f"Final weighted score: {final_score:.3f}")
-    return float(final_score)
\ No newline at end of file
+    return float(final_score)
+
+def save_signature_template(db: Session, customer_id: str, features: dict) -> None:
+    """
+    Store (or replace) a customer's registered signature features
+    """
+    template = db.get(SignatureTemplate, customer_id)
+    if template:
+        template.features = features
+    else:
+        db.add(SignatureTemplate(customer_id=customer_id, features=features))
+
+def get_signature_template(db: Session, customer_id: str):
+    """
+    Return the registered signature features for a customer, or None
+    """
+    template = db.get(SignatureTemplate, customer_id)
+    return template.features if template else None
@@ -694,10 +694,10 @@
 
 
 # Enhanced SMS Service with fixed notifications - COMPLETE FILE
-from twilio.rest import Client
+from app.services.twilio_client import get_twilio_client
 from sqlalchemy.orm import Session
 from app.core.config import settings
-from app.db.models.user import AppData
+from app.services.customer_context import load_app_data
 import logging
 from datetime import datetime
 from typing import Optional, Dict, Any
@@ -720,7 +720,7 @@ class SMSService:
     ) -> bool:
         """Send SMS notification for login attempt (success or failure)"""
         try:
-            app_data = db.query(AppData).filter(AppData.customer_id == customer_id).first()
+            app_data = load_app_data(db, customer_id)
             if not app_data or not app_data.phone_number:
                 logger.error(f"No phone number found for customer {customer_id}")
                 return False
@@ -771,7 +771,7 @@ class SMSService:
     def send_account_locked_notification(db: Session, customer_id: str, device_info: str) -> bool:
         """Send SMS when account gets locked after failed attempts"""
         try:
-            app_data = db.query(AppData).filter(AppData.customer_id == customer_id).first()
+            app_data = load_app_data(db, customer_id)
             if not app_data or not app_data.phone_number:
                 return False
 
@@ -811,7 +811,7 @@ class SMSService:
         try:
             logger.info(f"Starting transaction SMS for customer: {customer_id}")
             
-            app_data = db.query(AppData).filter(AppData.customer_id == customer_id).first()
+            app_data = load_app_data(db, customer_id)
             if not app_data:
                 logger.error(f"Customer not found in database: {customer_id}")
                 return False
@@ -862,6 +862,43 @@ class SMSService:
             logger.exception(f"Transaction SMS notification failed: {str(e)}")
             return False
 
+    @staticmethod
+    def send_bulk_transfer_notification(
+        db: Session,
+        customer_id: str,
+        transfer_count: int,
+        total_amount: Decimal,
+        new_balance: Decimal,
+        device_info: Optional[str] = None,
+        location: Optional[str] = None
+    ) -> bool:
+        """Send one summary SMS for a completed bulk transfer instead of one per transfer"""
+        try:
+            app_data = load_app_data(db, customer_id)
+            if not app_data or not app_data.phone_number:
+                logger.error(f"No phone number found for customer {customer_id}")
+                return False
+
+            timestamp = datetime.now().strftime("%d-%m-%Y %I:%M %p IST")
+            message = (
+                f"BULK TRANSFER COMPLETED\n"
+                f"Transfers: {transfer_count}\n"
+                f"Total: ₹{total_amount}\n"
+                f"Time: {timestamp}\n"
+                f"Balance: ₹{new_balance}\n"
+            )
+            if device_info:
+                message += f"Device: {device_info}\n"
+            if location:
+                message += f"Location: {location}\n"
+            message += f"\nIf unauthorized, contact support immediately."
+
+            return SMSService._send_sms_with_retry(app_data.phone_number, message)
+
+        except Exception as e:
+            logger.exception(f"Bulk transfer SMS notification failed: {str(e)}")
+            return False
+
     @staticmethod
     def send_registration_notification(
         db: Session,
@@ -872,7 +909,7 @@ class SMSService:
     ) -> bool:
         """Send SMS notification for successful app registration"""
         try:
-            app_data = db.query(AppData).filter(AppData.customer_id == customer_id).first()
+            app_data = load_app_data(db, customer_id)
             if not app_data or not app_data.phone_number:
                 logger.error(f"No phone number found for customer {customer_id}")
                 return False
@@ -907,7 +944,7 @@ class SMSService:
     ) -> bool:
         """Send SMS notification for successful app restoration"""
         try:
-            app_data = db.query(AppData).filter(AppData.customer_id == customer_id).first()
+            app_data = load_app_data(db, customer_id)
             if not app_data or not app_data.phone_number:
                 logger.error(f"No phone number found for customer {customer_id}")
                 return False
@@ -927,7 +964,7 @@ class SMSService:
             if restoration_limits_info and restoration_limits_info.get("activated"):
                 message += (
                     f"\nSECURITY NOTICE: Post-restoration limits active\n"
-                    f"Transaction Limit: ₹{restoration_limits_info.get('limit_amount', 5000)} per transaction\n"
+                    f"Transfer Limit: ₹{restoration_limits_info.get('limit_amount', 5000)} in total\n"
                     f"Duration: {restoration_limits_info.get('duration_hours', 35)} hours\n"
                 )
             
@@ -951,7 +988,7 @@ class SMSService:
         try:
             logger.info(f"Starting seedkey attempt SMS for customer: {customer_id}")
             
-            app_data = db.query(AppData).filter(AppData.customer_id == customer_id).first()
+            app_data = load_app_data(db, customer_id)
             if not app_data or not app_data.phone_number:
                 logger.error(f"No phone number found for customer {customer_id}")
                 return False
@@ -1002,7 +1039,7 @@ class SMSService:
     ) -> bool:
         """Send SMS notification for app access revocation"""
         try:
-            app_data = db.query(AppData).filter(AppData.customer_id == customer_id).first()
+            app_data = load_app_data(db, customer_id)
             if not app_data or not app_data.phone_number:
                 logger.error(f"No phone number found for customer {customer_id}")
                 return False
@@ -1038,7 +1075,7 @@ class SMSService:
     ) -> bool:
         """Send SMS notification for anomaly detection"""
         try:
-            app_data = db.query(AppData).filter(AppData.customer_id == customer_id).first()
+            app_data = load_app_data(db, customer_id)
             if not app_data or not app_data.phone_number:
                 logger.error(f"No phone number found for customer {customer_id}")
                 return False
@@ -1085,7 +1122,7 @@ class SMSService:
                 
                 logger.debug(f"Twilio config - SID: {settings.TWILIO_ACCOUNT_SID[:10]}..., From: {settings.TWILIO_PHONE_NUMBER}")
                 
-                client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
+                client = get_twilio_client()
                 
                 # Ensure proper phone number format
                 formatted_number = phone_number
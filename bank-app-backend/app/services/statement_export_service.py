@@ -0,0 +1,362 @@
+# --- File: app/services/statement_export_service.py ---
+import csv
+import io
+import json
+import logging
+import os
+import queue
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import List, Optional
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.base import SessionLocal
+from app.db.models.export import StatementExport
+from app.db.models.user import Account
+from app.services import account_service
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {"csv": "text/csv", "json": "application/json"}
+CSV_FIELDS = ["id", "date", "description", "type", "amount", "terminal_id"]
+
+
+class ExportReassigned(Exception):
+    """The job was requeued and claimed by another worker while this one was running it."""
+
+
+class _ChunkedWriter:
+    """Buffers rows in memory and appends them to the file every `chunk_rows` rows."""
+
+    def __init__(self, fh, chunk_rows: int, on_flush=None):
+        self.fh = fh
+        self.chunk_rows = chunk_rows
+        self.on_flush = on_flush
+        self.buffer = io.StringIO()
+        self.pending = 0
+
+    def write(self, text: str, is_row: bool = False) -> None:
+        self.buffer.write(text)
+        if is_row:
+            self.pending += 1
+            if self.pending >= self.chunk_rows:
+                self.flush()
+
+    def flush(self) -> None:
+        if self.buffer.tell():
+            self.fh.write(self.buffer.getvalue())
+            self.buffer.seek(0)
+            self.buffer.truncate()
+        self.pending = 0
+        if self.on_flush:
+            self.on_flush()
+
+
+class StatementExportService:
+    """
+    Runs statement exports on a small pool of daemon threads.
+
+    Jobs are rows in statement_exports; the in-process queue only carries job ids.
+    A job is claimed with a conditional UPDATE (queued -> running), so it runs at
+    most once even if several worker processes see it. Rows are streamed from a
+    server-side cursor and written in fixed-size chunks to a .part file that is
+    renamed into place when complete.
+
+    The claim records a worker_id, and the running job refreshes heartbeat_at
+    while it writes chunks. A running job is only treated as abandoned (and
+    requeued at startup) once its heartbeat is STALE_HEARTBEAT_SECONDS old. If
+    a slow worker's job was requeued and claimed again anyway, its next
+    heartbeat or its completion sees the new worker_id and it gives up; each
+    claim writes its own .part file, so the two never share a file.
+    """
+
+    HEARTBEAT_SECONDS = 30
+    STALE_HEARTBEAT_SECONDS = 300
+
+    def __init__(self, export_dir: str, workers: int, chunk_rows: int):
+        self.export_dir = Path(export_dir)
+        self.workers = workers
+        self.chunk_rows = chunk_rows
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self.worker_name = f"{socket.gethostname()}:{os.getpid()}"
+
+    # ---- API side -----------------------------------------------------------
+
+    def enqueue(
+        self,
+        db: Session,
+        customer_id: str,
+        account_number: str,
+        start_date: datetime,
+        end_date: datetime,
+        export_format: str
+    ) -> StatementExport:
+        job = StatementExport(
+            job_id=uuid.uuid4().hex,
+            customer_id=customer_id,
+            account_number=account_number,
+            start_date=start_date,
+            end_date=end_date,
+            format=export_format,
+            status="queued",
+            row_count=0,
+            bytes_written=0
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        self._queue.put(job.job_id)
+        logger.info(f"Queued statement export {job.job_id} for account {account_number}")
+        return job
+
+    def get_job(self, db: Session, job_id: str) -> Optional[StatementExport]:
+        return db.query(StatementExport).filter(StatementExport.job_id == job_id).first()
+
+    @staticmethod
+    def job_to_dict(job: StatementExport) -> dict:
+        return {
+            "job_id": job.job_id,
+            "account_number": job.account_number,
+            "start_date": job.start_date.isoformat() if job.start_date else None,
+            "end_date": job.end_date.isoformat() if job.end_date else None,
+            "format": job.format,
+            "status": job.status,
+            "row_count": job.row_count,
+            "bytes_written": job.bytes_written,
+            "error": job.error,
+            "created_at": job.created_at.isoformat() if job.created_at else None,
+            "started_at": job.started_at.isoformat() if job.started_at else None,
+            "completed_at": job.completed_at.isoformat() if job.completed_at else None
+        }
+
+    def remove_files(self, db: Session, rows) -> None:
+        """Retention hook: rows are (id, file_path) of purged jobs."""
+        for _, file_path in rows:
+            if file_path:
+                try:
+                    os.remove(file_path)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    logger.warning(f"Could not remove export file {file_path}: {str(e)}")
+
+    # ---- worker side --------------------------------------------------------
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        self.export_dir.mkdir(parents=True, exist_ok=True)
+        self._stop.clear()
+        self._recover()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"statement-export-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Statement export workers started ({self.workers})")
+
+    def stop(self) -> None:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+
+    def _recover(self) -> None:
+        """Requeue jobs left behind by a restart (queued, or running without a recent heartbeat)."""
+        db = SessionLocal()
+        try:
+            stale_before = datetime.now(timezone.utc) - timedelta(seconds=self.STALE_HEARTBEAT_SECONDS)
+            db.execute(
+                update(StatementExport)
+                .where(
+                    StatementExport.status == "running",
+                    func.coalesce(StatementExport.heartbeat_at, StatementExport.started_at) < stale_before
+                )
+                .values(status="queued", worker_id=None)
+            )
+            db.commit()
+            job_ids = [row[0] for row in db.query(StatementExport.job_id).filter(StatementExport.status == "queued")]
+            for job_id in job_ids:
+                self._queue.put(job_id)
+            if job_ids:
+                logger.info(f"Requeued {len(job_ids)} statement exports")
+        except Exception as e:
+            logger.error(f"Failed to recover statement exports: {str(e)}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def _work(self) -> None:
+        while not self._stop.is_set():
+            try:
+                job_id = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            try:
+                self.run_job(job_id)
+            except Exception as e:
+                logger.error(f"Statement export {job_id} crashed: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def _heartbeat(self, job_id: str, worker_id: str) -> None:
+        """Refresh the job's heartbeat; raises ExportReassigned if another worker owns it now."""
+        db = SessionLocal()
+        try:
+            owned = db.execute(
+                update(StatementExport)
+                .where(
+                    StatementExport.job_id == job_id,
+                    StatementExport.status == "running",
+                    StatementExport.worker_id == worker_id
+                )
+                .values(heartbeat_at=datetime.now(timezone.utc))
+            ).rowcount
+            db.commit()
+        finally:
+            db.close()
+        if not owned:
+            raise ExportReassigned(f"Statement export {job_id} was reassigned to another worker")
+
+    def run_job(self, job_id: str) -> None:
+        db = SessionLocal()
+        part_path = None
+        claim = uuid.uuid4().hex[:12]
+        worker_id = f"{self.worker_name}/{claim}"
+        owned = (
+            StatementExport.job_id == job_id,
+            StatementExport.status == "running",
+            StatementExport.worker_id == worker_id
+        )
+        try:
+            now = datetime.now(timezone.utc)
+            claimed = db.execute(
+                update(StatementExport)
+                .where(StatementExport.job_id == job_id, StatementExport.status == "queued")
+                .values(status="running", started_at=now, heartbeat_at=now, worker_id=worker_id, error=None)
+            ).rowcount
+            db.commit()
+            if not claimed:
+                return
+
+            job = self.get_job(db, job_id)
+            final_path = self.export_dir / f"{job.job_id}.{job.format}"
+            part_path = final_path.with_name(f"{final_path.name}.{claim}.part")
+
+            last_beat = time.monotonic()
+
+            def heartbeat():
+                nonlocal last_beat
+                if time.monotonic() - last_beat >= self.HEARTBEAT_SECONDS:
+                    self._heartbeat(job_id, worker_id)
+                    last_beat = time.monotonic()
+
+            with open(part_path, "w", newline="", encoding="utf-8") as fh:
+                row_count = self._write_statement(db, job, fh, heartbeat)
+
+            # Mark the job completed only if this claim still owns it; the row
+            # lock taken by the UPDATE is held until the file is in place
+            bytes_written = part_path.stat().st_size
+            completed = db.execute(
+                update(StatementExport)
+                .where(*owned)
+                .values(
+                    status="completed",
+                    row_count=row_count,
+                    bytes_written=bytes_written,
+                    file_path=str(final_path),
+                    completed_at=datetime.now(timezone.utc)
+                )
+            ).rowcount
+            if not completed:
+                raise ExportReassigned(f"Statement export {job_id} was reassigned to another worker")
+            os.replace(part_path, final_path)
+            part_path = None
+            db.commit()
+            logger.info(f"Statement export {job_id} completed: {row_count} rows, {bytes_written} bytes")
+
+        except ExportReassigned as e:
+            db.rollback()
+            logger.warning(str(e))
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Statement export {job_id} failed: {str(e)}")
+            db.execute(
+                update(StatementExport)
+                .where(*owned)
+                .values(status="failed", error=str(e)[:500], completed_at=datetime.now(timezone.utc))
+            )
+            db.commit()
+        finally:
+            if part_path is not None and part_path.exists():
+                part_path.unlink()
+            db.close()
+
+    def _write_statement(self, db: Session, job: StatementExport, fh, on_flush=None) -> int:
+        rows = account_service.iter_statement_transactions(
+            db, job.account_number, self.chunk_rows,
+            start_date=job.start_date, end_date=job.end_date, newest_first=False
+        )
+        out = _ChunkedWriter(fh, self.chunk_rows, on_flush)
+        row_count = 0
+
+        if job.format == "csv":
+            line = io.StringIO()
+            writer = csv.DictWriter(line, fieldnames=CSV_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            out.write(line.getvalue())
+            for row in rows:
+                line.seek(0)
+                line.truncate()
+                writer.writerow(row)
+                out.write(line.getvalue(), is_row=True)
+                row_count += 1
+            out.flush()
+            return row_count
+
+        # PDF-ready JSON: statement header, transactions in date order, totals
+        account = db.get(Account, job.account_number)
+        header = {
+            "account_number": job.account_number,
+            "account_type": account.account_type if account else None,
+            "customer_id": job.customer_id,
+            "period_start": job.start_date.isoformat(),
+            "period_end": job.end_date.isoformat(),
+            "generated_at": datetime.now(timezone.utc).isoformat()
+        }
+        total_credits = Decimal("0")
+        total_debits = Decimal("0")
+        out.write('{"statement": ' + json.dumps(header) + ', "transactions": [')
+        for row in rows:
+            if row["type"] == "credit":
+                total_credits += Decimal(str(row["amount"]))
+            else:
+                total_debits += Decimal(str(row["amount"]))
+            out.write(("," if row_count else "") + "\n" + json.dumps(row), is_row=True)
+            row_count += 1
+        summary = {
+            "transaction_count": row_count,
+            "total_credits": float(total_credits),
+            "total_debits": float(total_debits),
+            "net_change": float(total_credits - total_debits)
+        }
+        out.write('\n], "summary": ' + json.dumps(summary) + "}\n")
+        out.flush()
+        return row_count
+
+
+# Create global instance
+statement_exports = StatementExportService(
+    settings.STATEMENT_EXPORT_DIR,
+    settings.STATEMENT_EXPORT_WORKERS,
+    settings.STATEMENT_EXPORT_CHUNK_ROWS
+)
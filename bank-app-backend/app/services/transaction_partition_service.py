@@ -0,0 +1,600 @@
+# --- File: app/services/transaction_partition_service.py ---
+"""
+Monthly range partitioning of `transactions` on `date`, and its cold archive tier.
+
+Layout on Postgres:
+
+  transactions                partitioned parent, PARTITION BY RANGE (date),
+                              primary key (id, date); ids still come from one sequence
+  transactions_pYYYY_MM       one partition per calendar month (UTC)
+  transactions_default        rows outside every monthly partition
+  transaction_archive_chunks  cold tier: one zlib-compressed blob of rows per
+                              (month, account), listed in transaction_archive_months
+
+maintain() keeps TRANSACTION_PARTITIONS_AHEAD_MONTHS partitions ready ahead of
+now and moves partitions older than TRANSACTION_HOT_MONTHS to the cold tier.
+A month's partition is locked against writes (SHARE mode) before its rows are
+read, its rows are written as archive chunks, and the partition is detached and
+dropped in the same transaction once its row count matches what was archived,
+so every row is visible exactly once, hot or cold. iter_archived_transactions() reads the cold tier back for statements
+(account_service.iter_statement_transactions unions both tiers).
+
+An existing heap `transactions` table is converted by migrate(): a batched
+copy into a partitioned shadow table while the app keeps writing, then a short
+swap under a write lock (see scripts/partition_transactions.py).
+"""
+import json
+import logging
+import re
+import threading
+import time
+import zlib
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from itertools import groupby
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.base import SessionLocal, engine
+from app.db.indexes import index_sql
+from app.db.models.archive import TransactionArchiveChunk, TransactionArchiveMonth
+from app.db.models.user import Transaction
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "transactions"
+DEFAULT_PARTITION = "transactions_default"
+SHADOW_TABLE = "transactions_partitioned"
+LEGACY_TABLE = "transactions_legacy"
+PARTITION_NAME = re.compile(r"^transactions_p(\d{4})_(\d{2})$")
+
+# Columns of an archived row, in payload order (account_number is stored on the chunk)
+ARCHIVE_FIELDS = ("id", "date", "description", "amount", "type", "terminal_id",
+                  "is_fraud", "is_reauth_transaction", "auth_method", "recipient_name")
+# Archive chunks inserted per statement while archiving a month
+CHUNK_INSERT_BATCH = 500
+# Archive chunks (one per month of an account) fetched per round trip when reading the cold tier
+CHUNK_FETCH_BATCH = 12
+# Ids below the last copied id that are re-checked at swap time, for inserts
+# that were still uncommitted while their part of the table was copied
+STRAGGLER_WINDOW = 100000
+MIGRATION_LOCK_TIMEOUT_MS = 10000
+# Arbitrary key so only one worker process partitions the table at startup
+PARTITION_ADVISORY_LOCK_KEY = 727002
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Cannot archive value of type {type(value).__name__}")
+
+
+_encode = json.JSONEncoder(separators=(",", ":"), default=_json_default).encode
+
+
+def month_start(value) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_p{month.year:04d}_{month.month:02d}"
+
+
+def _bound(month: date) -> str:
+    return f"'{month.isoformat()} 00:00:00+00'"
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Naive datetimes are taken as UTC, as the database session does."""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _is_postgres(conn) -> bool:
+    return conn.get_bind().dialect.name == "postgresql" if isinstance(conn, Session) \
+        else conn.dialect.name == "postgresql"
+
+
+def _exists(conn, table: str) -> bool:
+    return conn.execute(text("SELECT to_regclass(:t) IS NOT NULL"), {"t": table}).scalar()
+
+
+def is_partitioned(conn, table: str = PARENT_TABLE) -> bool:
+    return conn.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:t)"), {"t": table}
+    ).scalar() == "p"
+
+
+def list_partitions(conn, parent: str = PARENT_TABLE) -> Dict[date, str]:
+    """Monthly partitions of `parent` by month (the default partition is not included)."""
+    names = conn.execute(
+        text("SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid"
+             " WHERE i.inhparent = to_regclass(:t)"),
+        {"t": parent}
+    ).scalars()
+    partitions = {}
+    for name in names:
+        match = PARTITION_NAME.match(name)
+        if match:
+            partitions[date(int(match.group(1)), int(match.group(2)), 1)] = name
+    return partitions
+
+
+def create_partition(conn, month: date, parent: str = PARENT_TABLE) -> str:
+    """
+    Create the partition for `month`. Rows of that month already in the
+    default partition are moved into it first, since Postgres refuses to add a
+    partition whose range the default partition still holds rows for.
+    """
+    name = partition_name(month)
+    lo, hi = _bound(month), _bound(add_months(month, 1))
+    in_default = _exists(conn, DEFAULT_PARTITION) and conn.execute(text(
+        f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE date >= {lo} AND date < {hi})"
+    )).scalar()
+    if in_default:
+        conn.execute(text(f"CREATE TABLE {name} (LIKE {parent} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+        conn.execute(text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE date >= {lo} AND date < {hi} RETURNING *)"
+            f" INSERT INTO {name} SELECT * FROM moved"
+        ))
+        conn.execute(text(f"ALTER TABLE {parent} ATTACH PARTITION {name} FOR VALUES FROM ({lo}) TO ({hi})"))
+    else:
+        conn.execute(text(f"CREATE TABLE {name} PARTITION OF {parent} FOR VALUES FROM ({lo}) TO ({hi})"))
+    return name
+
+
+def _decode_chunk(payload: bytes) -> List[list]:
+    return json.loads(zlib.decompress(payload))
+
+
+def iter_archived_transactions(
+    db: Session,
+    account_number: str,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    txn_type: Optional[str] = None,
+    newest_first: bool = True
+) -> Iterator[Dict[str, Any]]:
+    """
+    An account's archived transactions, shaped like account_service.transaction_to_dict.
+    Only the chunks of months overlapping the range are read, streamed from a
+    server-side cursor CHUNK_FETCH_BATCH at a time and decompressed one month
+    at a time.
+    """
+    start_date, end_date = _as_utc(start_date), _as_utc(end_date)
+    query = select(TransactionArchiveChunk.payload).where(TransactionArchiveChunk.account_number == account_number)
+    if start_date:
+        query = query.where(TransactionArchiveChunk.last_date >= start_date)
+    if end_date:
+        query = query.where(TransactionArchiveChunk.first_date < end_date)
+    query = query.order_by(
+        TransactionArchiveChunk.month.desc() if newest_first else TransactionArchiveChunk.month
+    ).execution_options(stream_results=True, yield_per=CHUNK_FETCH_BATCH)
+
+    for (payload,) in db.execute(query):
+        rows = _decode_chunk(payload)
+        if newest_first:
+            rows.reverse()
+        for row in rows:
+            record = dict(zip(ARCHIVE_FIELDS, row))
+            txn_date = datetime.fromisoformat(record["date"])
+            if (start_date and txn_date < start_date) or (end_date and txn_date >= end_date):
+                continue
+            if txn_type and record["type"] != txn_type:
+                continue
+            yield {
+                "id": record["id"],
+                "account_number": account_number,
+                "description": record["description"],
+                "amount": float(record["amount"]),
+                "type": record["type"],
+                "date": record["date"],
+                "terminal_id": record["terminal_id"]
+            }
+
+
+class TransactionPartitionService:
+    """Creates, archives and restores the monthly partitions of `transactions`."""
+
+    def __init__(self, ahead_months: int, hot_months: int, migration_batch_size: int):
+        self.ahead_months = ahead_months
+        self.hot_months = hot_months
+        self.migration_batch_size = migration_batch_size
+        self.last_report: Optional[Dict[str, Any]] = None
+        self.last_migration: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+
+    # ---- hot tier -----------------------------------------------------------
+
+    def ensure_partitions(self, db: Session, now: Optional[datetime] = None, parent: str = PARENT_TABLE) -> List[str]:
+        """Create the default partition and this month's and the next `ahead_months` partitions."""
+        current = month_start(now or datetime.now(timezone.utc))
+        existing = list_partitions(db, parent)
+        archived = set(db.execute(select(TransactionArchiveMonth.month)).scalars())
+        created = []
+        if not _exists(db, DEFAULT_PARTITION):
+            db.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {parent} DEFAULT"))
+            created.append(DEFAULT_PARTITION)
+        for i in range(self.ahead_months + 1):
+            month = add_months(current, i)
+            if month not in existing and month not in archived:
+                created.append(create_partition(db, month, parent))
+        return created
+
+    def archive_cutoff(self, now: Optional[datetime] = None) -> date:
+        """Partitions of months before this one belong in the cold tier."""
+        return add_months(month_start(now or datetime.now(timezone.utc)), -self.hot_months)
+
+    # ---- cold tier ----------------------------------------------------------
+
+    def archive_partition(self, db: Session, month: date) -> Dict[str, Any]:
+        """Move one month from its partition into compressed archive chunks."""
+        month = month_start(month)
+        # Feature windows look back 30 days: the current and previous month stay hot
+        if month >= add_months(month_start(datetime.now(timezone.utc)), -1):
+            raise ValueError(f"{month:%Y-%m} is too recent to archive")
+        name = list_partitions(db).get(month)
+        if not name:
+            raise ValueError(f"No partition for {month:%Y-%m}")
+
+        started = time.monotonic()
+        db.execute(text(f"SET LOCAL lock_timeout = {int(settings.RETENTION_LOCK_TIMEOUT_MS)}"))
+        # Reads go on; back-dated inserts and late writes into this month wait until the partition is gone
+        db.execute(text(f"LOCK TABLE {name} IN SHARE MODE"))
+        result = db.execute(
+            text(f"SELECT account_number, {', '.join(ARCHIVE_FIELDS)} FROM {name} ORDER BY account_number, date, id")
+            .execution_options(stream_results=True)
+        )
+
+        chunk_table = TransactionArchiveChunk.__table__
+        pending = []
+        row_count = account_count = raw_bytes = compressed_bytes = 0
+        for account_number, rows in groupby(result, key=lambda row: row[0]):
+            rows = [list(row[1:]) for row in rows]
+            raw = _encode(rows).encode()
+            payload = zlib.compress(raw, 6)
+            pending.append({
+                "month": month,
+                "account_number": account_number,
+                "first_date": rows[0][1],
+                "last_date": rows[-1][1],
+                "row_count": len(rows),
+                "payload": payload
+            })
+            row_count += len(rows)
+            account_count += 1
+            raw_bytes += len(raw)
+            compressed_bytes += len(payload)
+            if len(pending) >= CHUNK_INSERT_BATCH:
+                db.execute(insert(chunk_table), pending)
+                pending = []
+        if pending:
+            db.execute(insert(chunk_table), pending)
+
+        db.add(TransactionArchiveMonth(
+            month=month, row_count=row_count, account_count=account_count,
+            raw_bytes=raw_bytes, compressed_bytes=compressed_bytes
+        ))
+        db.flush()
+        db.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+        table_rows = db.execute(text(f"SELECT count(*) FROM {name}")).scalar()
+        if table_rows != row_count:
+            raise RuntimeError(f"{name} holds {table_rows} rows but {row_count} were archived")
+        db.execute(text(f"DROP TABLE {name}"))
+        db.commit()
+
+        report = {
+            "month": month.isoformat(),
+            "partition": name,
+            "rows": row_count,
+            "accounts": account_count,
+            "raw_bytes": raw_bytes,
+            "compressed_bytes": compressed_bytes,
+            "compression_ratio": round(raw_bytes / compressed_bytes, 2) if compressed_bytes else None,
+            "duration_seconds": round(time.monotonic() - started, 3)
+        }
+        logger.info(
+            f"Archived {name}: {row_count} rows of {account_count} accounts, "
+            f"{raw_bytes} -> {compressed_bytes} bytes in {report['duration_seconds']}s"
+        )
+        return report
+
+    def restore_partition(self, db: Session, month: date) -> Dict[str, Any]:
+        """Bring an archived month back into a hot partition (e.g. for a bulk correction or audit)."""
+        month = month_start(month)
+        if db.get(TransactionArchiveMonth, month) is None:
+            raise ValueError(f"{month:%Y-%m} is not archived")
+        if month in list_partitions(db):
+            raise ValueError(f"{month:%Y-%m} already has a partition")
+
+        started = time.monotonic()
+        db.execute(text(f"SET LOCAL lock_timeout = {int(settings.RETENTION_LOCK_TIMEOUT_MS)}"))
+        name = create_partition(db, month)
+        chunks = db.execute(
+            select(TransactionArchiveChunk.account_number, TransactionArchiveChunk.payload)
+            .where(TransactionArchiveChunk.month == month)
+            .execution_options(stream_results=True)
+        )
+        row_count = 0
+        for account_number, payload in chunks:
+            rows = []
+            for row in _decode_chunk(payload):
+                record = dict(zip(ARCHIVE_FIELDS, row))
+                record["account_number"] = account_number
+                record["date"] = datetime.fromisoformat(record["date"])
+                record["amount"] = Decimal(record["amount"])
+                rows.append(record)
+            db.execute(text(
+                f"INSERT INTO {name} (account_number, {', '.join(ARCHIVE_FIELDS)}) "
+                f"VALUES (:account_number, {', '.join(':' + f for f in ARCHIVE_FIELDS)})"
+            ), rows)
+            row_count += len(rows)
+        db.execute(delete(TransactionArchiveChunk).where(TransactionArchiveChunk.month == month))
+        db.execute(delete(TransactionArchiveMonth).where(TransactionArchiveMonth.month == month))
+        db.commit()
+
+        logger.info(f"Restored {row_count} archived transactions into {name}")
+        return {
+            "month": month.isoformat(),
+            "partition": name,
+            "rows": row_count,
+            "duration_seconds": round(time.monotonic() - started, 3)
+        }
+
+    # ---- scheduling ---------------------------------------------------------
+
+    def maintain(self, db: Session, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Create upcoming partitions and archive the ones past TRANSACTION_HOT_MONTHS."""
+        if not _is_postgres(db) or not is_partitioned(db):
+            return {"partitioned": False}
+
+        created = self.ensure_partitions(db, now)
+        db.commit()
+
+        cutoff = self.archive_cutoff(now)
+        archived = []
+        for month in sorted(m for m in list_partitions(db) if m < cutoff):
+            try:
+                archived.append(self.archive_partition(db, month))
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Archiving transactions of {month:%Y-%m} failed: {str(e)}")
+                archived.append({"month": month.isoformat(), "error": str(e)})
+                break
+
+        report = {
+            "partitioned": True,
+            "partitions_created": created,
+            "archive_cutoff": cutoff.isoformat(),
+            "archived": archived,
+            "ran_at": datetime.now(timezone.utc).isoformat()
+        }
+        with self._lock:
+            self.last_report = report
+        return report
+
+    def startup(self) -> None:
+        """
+        On Postgres: partition a still-empty `transactions` table in place (new
+        installs), then make sure the upcoming partitions exist. A populated
+        heap table is left alone; it needs the online migration. Only the worker
+        holding the partition advisory lock does this; the others skip it.
+        """
+        if engine.dialect.name != "postgresql":
+            return
+        with engine.connect() as lock_conn:
+            acquired = lock_conn.execute(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": PARTITION_ADVISORY_LOCK_KEY}
+            ).scalar()
+            if not acquired:
+                logger.info("Transaction partition startup skipped: another worker is running it")
+                return
+            try:
+                self._startup()
+            finally:
+                lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": PARTITION_ADVISORY_LOCK_KEY})
+
+    def _startup(self) -> None:
+        db = SessionLocal()
+        try:
+            if not is_partitioned(db):
+                if db.execute(text(f"SELECT EXISTS (SELECT 1 FROM {PARENT_TABLE})")).scalar():
+                    logger.warning(
+                        "transactions is not partitioned; run scripts/partition_transactions.py to migrate it"
+                    )
+                    return
+                db.close()
+                self.migrate()
+                db = SessionLocal()
+            created = self.ensure_partitions(db)
+            db.commit()
+            if created:
+                logger.info(f"Created transaction partitions: {', '.join(created)}")
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Transaction partition maintenance failed at startup: {str(e)}")
+        finally:
+            db.close()
+
+    def status(self, db: Session) -> Dict[str, Any]:
+        archived = [
+            {
+                "month": m.month.isoformat(),
+                "rows": m.row_count,
+                "accounts": m.account_count,
+                "raw_bytes": m.raw_bytes,
+                "compressed_bytes": m.compressed_bytes,
+                "archived_at": m.archived_at.isoformat() if m.archived_at else None
+            }
+            for m in db.query(TransactionArchiveMonth).order_by(TransactionArchiveMonth.month)
+        ]
+        partitions = []
+        partitioned = _is_postgres(db) and is_partitioned(db)
+        if partitioned:
+            partitions = [
+                {"name": name, "rows_estimate": max(int(rows), 0), "total_bytes": size}
+                for name, rows, size in db.execute(text(
+                    "SELECT c.relname, c.reltuples, pg_total_relation_size(c.oid)"
+                    " FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid"
+                    " WHERE i.inhparent = to_regclass(:t) ORDER BY c.relname"
+                ), {"t": PARENT_TABLE})
+            ]
+        with self._lock:
+            last_report = self.last_report
+        return {
+            "partitioned": partitioned,
+            "hot_months": self.hot_months,
+            "ahead_months": self.ahead_months,
+            "archive_cutoff": self.archive_cutoff().isoformat(),
+            "partitions": partitions,
+            "archived_months": archived,
+            "last_report": last_report,
+            "last_migration": self.last_migration
+        }
+
+    # ---- migration of an existing heap table --------------------------------
+
+    def migrate(self, batch_size: Optional[int] = None, drop_legacy: bool = False) -> Dict[str, Any]:
+        """
+        Convert a heap `transactions` table into the partitioned layout.
+
+        1. Create the partitioned shadow table (same columns and defaults, so it
+           shares the id sequence), its indexes and one partition per month from
+           the oldest row to TRANSACTION_PARTITIONS_AHEAD_MONTHS ahead.
+        2. Copy rows in id order, `batch_size` per committed transaction. The app
+           keeps writing to `transactions` meanwhile; an interrupted run resumes
+           from the highest id already copied.
+        3. Under an EXCLUSIVE lock (reads continue, writes wait): copy the tail
+           and any stragglers, check that both tables hold the same number of
+           rows, and swap the names. The old table stays as transactions_legacy
+           unless `drop_legacy`.
+
+        Rows with a NULL date are stored with the oldest date in the table.
+        """
+        batch_size = batch_size or self.migration_batch_size
+        started = time.monotonic()
+        columns = [c.name for c in Transaction.__table__.columns]
+        column_list = ", ".join(columns)
+
+        with engine.begin() as conn:
+            if is_partitioned(conn):
+                return {"status": "already_partitioned"}
+            oldest = conn.execute(text(f"SELECT min(date) FROM {PARENT_TABLE}")).scalar()
+            floor = oldest or datetime.now(timezone.utc)
+            created = []
+            if not _exists(conn, SHADOW_TABLE):
+                conn.execute(text(
+                    f"CREATE TABLE {SHADOW_TABLE} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS) PARTITION BY RANGE (date)"
+                ))
+                conn.execute(text(f"ALTER TABLE {SHADOW_TABLE} ADD CONSTRAINT {SHADOW_TABLE}_pkey PRIMARY KEY (id, date)"))
+                conn.execute(text(
+                    f"ALTER TABLE {SHADOW_TABLE} ADD CONSTRAINT {SHADOW_TABLE}_account_number_fkey"
+                    f" FOREIGN KEY (account_number) REFERENCES account (account_number)"
+                ))
+                for index in Transaction.__table__.indexes:
+                    conn.execute(text(index_sql(index, SHADOW_TABLE, f"{index.name}_new")))
+                conn.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {SHADOW_TABLE} DEFAULT"))
+                month = month_start(floor)
+                last = add_months(month_start(datetime.now(timezone.utc)), self.ahead_months)
+                while month <= last:
+                    created.append(create_partition(conn, month, SHADOW_TABLE))
+                    month = add_months(month, 1)
+                logger.info(f"Created {SHADOW_TABLE} with {len(created)} monthly partitions")
+
+        select_list = ", ".join("COALESCE(date, :floor)" if c == "date" else c for c in columns)
+        copy_sql = text(
+            f"INSERT INTO {SHADOW_TABLE} ({column_list}) SELECT {select_list} FROM {PARENT_TABLE}"
+            f" WHERE id > :after AND id <= :upto"
+        )
+        with engine.connect() as conn:
+            copied_upto = conn.execute(text(f"SELECT COALESCE(max(id), 0) FROM {SHADOW_TABLE}")).scalar()
+        rows_copied = 0
+        batches = 0
+        while True:
+            with engine.begin() as conn:
+                upto = conn.execute(text(
+                    f"SELECT max(id) FROM (SELECT id FROM {PARENT_TABLE} WHERE id > :after ORDER BY id LIMIT :n) b"
+                ), {"after": copied_upto, "n": batch_size}).scalar()
+                if upto is None:
+                    break
+                rows_copied += conn.execute(copy_sql, {"after": copied_upto, "upto": upto, "floor": floor}).rowcount
+            copied_upto = upto
+            batches += 1
+            if batches % 20 == 0:
+                logger.info(f"Partition migration: {rows_copied} rows copied (up to id {copied_upto})")
+
+        swap_started = time.monotonic()
+        with engine.begin() as conn:
+            conn.execute(text(f"SET LOCAL lock_timeout = {MIGRATION_LOCK_TIMEOUT_MS}"))
+            conn.execute(text(f"LOCK TABLE {PARENT_TABLE} IN EXCLUSIVE MODE"))
+            rows_copied += conn.execute(copy_sql, {"after": copied_upto, "upto": 2 ** 62, "floor": floor}).rowcount
+
+            missing_sql = text(
+                f"INSERT INTO {SHADOW_TABLE} ({column_list}) SELECT {select_list} FROM {PARENT_TABLE} t"
+                f" WHERE t.id > :after AND NOT EXISTS (SELECT 1 FROM {SHADOW_TABLE} s WHERE s.id = t.id)"
+            )
+            rows_copied += conn.execute(
+                missing_sql, {"after": copied_upto - STRAGGLER_WINDOW, "floor": floor}
+            ).rowcount
+            count_sql = f"SELECT (SELECT count(*) FROM {PARENT_TABLE}), (SELECT count(*) FROM {SHADOW_TABLE})"
+            legacy_rows, new_rows = conn.execute(text(count_sql)).one()
+            if legacy_rows != new_rows:
+                rows_copied += conn.execute(missing_sql, {"after": 0, "floor": floor}).rowcount
+                legacy_rows, new_rows = conn.execute(text(count_sql)).one()
+                if legacy_rows != new_rows:
+                    raise RuntimeError(f"Row counts differ after copy: {legacy_rows} vs {new_rows}")
+
+            conn.execute(text(f"ALTER TABLE {PARENT_TABLE} RENAME TO {LEGACY_TABLE}"))
+            legacy_indexes = conn.execute(text(
+                "SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = :t"
+            ), {"t": LEGACY_TABLE}).scalars().all()
+            for index_name in legacy_indexes:
+                conn.execute(text(f"ALTER INDEX {index_name} RENAME TO {index_name}_legacy"))
+            conn.execute(text(f"ALTER TABLE {SHADOW_TABLE} RENAME TO {PARENT_TABLE}"))
+            conn.execute(text(f"ALTER INDEX {SHADOW_TABLE}_pkey RENAME TO {PARENT_TABLE}_pkey"))
+            for index in Transaction.__table__.indexes:
+                conn.execute(text(f"ALTER INDEX {index.name}_new RENAME TO {index.name}"))
+            conn.execute(text(
+                f"ALTER TABLE {PARENT_TABLE} RENAME CONSTRAINT {SHADOW_TABLE}_account_number_fkey"
+                f" TO {PARENT_TABLE}_account_number_fkey"
+            ))
+            sequence = conn.execute(text("SELECT pg_get_serial_sequence(:t, 'id')"), {"t": LEGACY_TABLE}).scalar()
+            if sequence:
+                conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {PARENT_TABLE}.id"))
+            if drop_legacy:
+                conn.execute(text(f"DROP TABLE {LEGACY_TABLE}"))
+
+        report = {
+            "status": "migrated",
+            "rows_copied": rows_copied,
+            "rows": new_rows,
+            "batches": batches,
+            "partitions_created": len(created),
+            "swap_lock_seconds": round(time.monotonic() - swap_started, 3),
+            "duration_seconds": round(time.monotonic() - started, 3),
+            "legacy_table": None if drop_legacy else LEGACY_TABLE
+        }
+        self.last_migration = report
+        logger.info(
+            f"Partition migration complete: {new_rows} rows, write lock held {report['swap_lock_seconds']}s"
+        )
+        return report
+
+
+# Create global instance
+transaction_partitions = TransactionPartitionService(
+    settings.TRANSACTION_PARTITIONS_AHEAD_MONTHS,
+    settings.TRANSACTION_HOT_MONTHS,
+    settings.TRANSACTION_MIGRATION_BATCH_SIZE
+)
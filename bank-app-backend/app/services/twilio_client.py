@@ -0,0 +1,42 @@
+# --- File: app/services/twilio_client.py ---
+# twilio.rest is imported on the first client build (startup warm-up or the
+# first SMS), not when the services that send SMS are imported.
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+from app.core.config import settings
+
+
+@lru_cache(maxsize=1)
+def _redirecting_http_client_class():
+    from twilio.http.http_client import TwilioHttpClient
+
+    class RedirectingHttpClient(TwilioHttpClient):
+        """Sends every Twilio API call to `base_url`, keeping the path (e.g. a local fake under load tests)."""
+
+        def __init__(self, base_url: str):
+            super().__init__()
+            self.base_url = base_url.rstrip("/")
+
+        def request(self, method, url, *args, **kwargs):
+            return super().request(method, self.base_url + urlsplit(url).path, *args, **kwargs)
+
+    return RedirectingHttpClient
+
+
+def get_twilio_client():
+    """Twilio REST client, pointed at TWILIO_API_BASE_URL when that is set."""
+    from twilio.rest import Client
+
+    if settings.TWILIO_API_BASE_URL:
+        return Client(
+            settings.TWILIO_ACCOUNT_SID,
+            settings.TWILIO_AUTH_TOKEN,
+            http_client=_redirecting_http_client_class()(settings.TWILIO_API_BASE_URL)
+        )
+    return Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
+
+
+def warm_up() -> None:
+    """Import the Twilio client modules ahead of the first SMS."""
+    import twilio.rest  # noqa: F401
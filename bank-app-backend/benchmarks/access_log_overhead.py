@@ -0,0 +1,96 @@
+# --- File: benchmarks/access_log_overhead.py ---
+"""
+Per-request overhead of the access log / route metrics middleware logic.
+
+    python -m benchmarks.access_log_overhead --requests 200000 --budget-us 20
+
+Times AccessLog.record() (route histogram update, sampling decision and, for
+sampled requests, building and enqueueing the record) against a realistic
+request scope, at several sample rates. "request" is the time spent in the
+request thread; "total" also waits for the writer thread to serialize and
+write every queued record (to /dev/null), so it is the full CPU cost per
+request. Exits non-zero if the total at any of the --budget-rates exceeds
+the budget.
+
+Only needs the bank_common package; no app settings or database.
+"""
+import argparse
+import os
+import sys
+import time
+
+from starlette.requests import Request
+from starlette.routing import Route
+
+from bank_common.access_log import AccessLog
+
+HEADERS = [
+    (b"host", b"bank.example"),
+    (b"user-agent", b"Mozilla/5.0 (Linux; Android 14) BankApp/3.2"),
+    (b"authorization", b"Bearer eyJhbGciOiJIUzI1NiJ9.payload.signature"),
+    (b"content-type", b"application/json"),
+    (b"x-request-id", b"0d9f6c1e-1f1b-4a57-9d0a-7f6a0c1b2e3d"),
+    (b"accept", b"*/*"),
+]
+
+
+def make_request() -> Request:
+    route = Route("/api/v1/transactions/{customer_id}", endpoint=lambda request: None)
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/api/v1/transactions/CUST000123",
+        "headers": HEADERS,
+        "client": ("10.0.0.7", 52344),
+        "route": route,
+    }
+    return Request(scope)
+
+
+def bench(sample_rate: float, requests: int):
+    access_log = AccessLog(
+        sample_rate=sample_rate,
+        slow_ms=float("inf"),
+        header_allowlist=["user-agent", "x-forwarded-for", "x-request-id", "authorization"],
+        queue_size=requests + 1,
+        logger_name=f"access.bench.{sample_rate}"
+    )
+    with open(os.devnull, "w") as devnull:
+        access_log.start(stream=devnull)
+        request = make_request()
+        record = access_log.record
+        started = time.perf_counter()
+        for i in range(requests):
+            record(request, 200, 12.5, db_queries=3)
+        request_elapsed = time.perf_counter() - started
+        access_log.stop(timeout=None)
+        total_elapsed = time.perf_counter() - started
+    assert "authorization" not in access_log.header_allowlist
+    assert access_log.dropped == 0
+    return request_elapsed / requests * 1e6, total_elapsed / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200000)
+    parser.add_argument("--sample-rates", type=float, nargs="+", default=[0.0, 0.01, 0.1, 1.0])
+    parser.add_argument("--budget-us", type=float, default=20.0)
+    parser.add_argument("--budget-rates", type=float, nargs="+", default=[0.0, 0.01, 0.1],
+                        help="sample rates the budget applies to (default: up to the 0.1 default)")
+    args = parser.parse_args()
+
+    print(f"{'sample rate':>12} {'request us':>12} {'total us':>12}")
+    over_budget = []
+    for sample_rate in args.sample_rates:
+        request_us, total_us = bench(sample_rate, args.requests)
+        if sample_rate in args.budget_rates and total_us > args.budget_us:
+            over_budget.append(sample_rate)
+        print(f"{sample_rate:>12.2f} {request_us:>12.2f} {total_us:>12.2f}")
+    if over_budget:
+        print(f"FAIL: total overhead above {args.budget_us}us/request at sample rates {over_budget}")
+        sys.exit(1)
+    print(f"OK: total overhead within {args.budget_us}us/request at sample rates {args.budget_rates}")
+
+
+if __name__ == "__main__":
+    main()
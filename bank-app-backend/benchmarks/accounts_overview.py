@@ -0,0 +1,135 @@
+# --- File: benchmarks/accounts_overview.py ---
+"""
+Compare the accounts overview loader with the previous per-account implementation
+of GET /accounts/{customer_id}.
+
+    python -m benchmarks.accounts_overview --database-url sqlite:///bench.db
+    python -m benchmarks.accounts_overview --database-url postgresql+psycopg2://... --sizes 10 100 10000
+
+Run from the backend directory with the usual .env present (the app settings are
+loaded on import). Tables are created if missing and the benchmark customers'
+rows are replaced on every run.
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, delete, event, insert
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.db.models.user import Account, Transaction
+from app.services import account_service
+
+ACCOUNTS_PER_CUSTOMER = 3
+
+
+def legacy_accounts_payload(db: Session, customer_id: str):
+    """The pre-overview endpoint body: one query per account, full history, ORM objects."""
+    accounts = db.query(Account).filter(Account.customer_id == customer_id).all()
+    response_data = []
+    for acc in accounts:
+        transactions = account_service.get_transactions_by_account_number(db, acc.account_number)
+        response_data.append({
+            "account_number": acc.account_number,
+            "account_type": acc.account_type,
+            "balance": float(acc.balance),
+            "customer_id": acc.customer_id,
+            "transactions": [
+                {
+                    "id": t.id,
+                    "account_number": t.account_number,
+                    "description": t.description,
+                    "amount": float(t.amount),
+                    "type": t.type,
+                    "date": t.date.isoformat() if t.date else None,
+                    "terminal_id": t.terminal_id
+                } for t in transactions
+            ]
+        })
+    return response_data
+
+
+def seed_customer(engine, customer_id: str, transactions_per_account: int) -> None:
+    account_numbers = [f"BENCH{transactions_per_account}_{i}" for i in range(ACCOUNTS_PER_CUSTOMER)]
+    start = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(delete(Transaction.__table__).where(Transaction.account_number.in_(account_numbers)))
+        conn.execute(delete(Account.__table__).where(Account.customer_id == customer_id))
+        conn.execute(insert(Account.__table__), [
+            {"account_number": n, "customer_id": customer_id, "account_type": "Savings",
+             "balance": 1000, "pin_attempts": 0}
+            for n in account_numbers
+        ])
+        for account_number in account_numbers:
+            rows = [
+                {
+                    "account_number": account_number,
+                    "terminal_id": f"terminal_{random.randint(1000, 9999)}",
+                    "date": start + timedelta(minutes=i),
+                    "description": "Benchmark transaction",
+                    "amount": round(random.uniform(1, 5000), 2),
+                    "type": random.choice(("credit", "debit")),
+                    "is_fraud": False,
+                    "is_reauth_transaction": False
+                }
+                for i in range(transactions_per_account)
+            ]
+            for offset in range(0, len(rows), 5000):
+                conn.execute(insert(Transaction.__table__), rows[offset:offset + 5000])
+
+
+def measure(engine, fn, repeat: int):
+    statements = []
+
+    def count_statement(*args):
+        statements.append(1)
+
+    timings = []
+    for _ in range(repeat):
+        statements.clear()
+        event.listen(engine, "before_cursor_execute", count_statement)
+        try:
+            with Session(engine) as db:
+                started = time.perf_counter()
+                payload = fn(db)
+                timings.append(time.perf_counter() - started)
+        finally:
+            event.remove(engine, "before_cursor_execute", count_statement)
+
+    rows = sum(len(acc["transactions"]) for acc in payload)
+    return statistics.median(timings) * 1000, len(statements), rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///accounts_overview_bench.db")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 10000],
+                        help="transactions per account")
+    parser.add_argument("--recent", type=int, default=10, help="transactions embedded per account")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(engine, tables=[Account.__table__, Transaction.__table__])
+
+    print(f"{'txns/account':>12} | {'legacy ms':>10} {'queries':>7} {'rows':>7} | "
+          f"{'overview ms':>11} {'queries':>7} {'rows':>5} | {'speedup':>7}")
+    for size in args.sizes:
+        customer_id = f"bench-customer-{size}"
+        seed_customer(engine, customer_id, size)
+
+        legacy_ms, legacy_queries, legacy_rows = measure(
+            engine, lambda db: legacy_accounts_payload(db, customer_id), args.repeat)
+        overview_ms, overview_queries, overview_rows = measure(
+            engine, lambda db: account_service.get_accounts_overview(db, customer_id, args.recent), args.repeat)
+
+        print(f"{size:>12} | {legacy_ms:>10.2f} {legacy_queries:>7} {legacy_rows:>7} | "
+              f"{overview_ms:>11.2f} {overview_queries:>7} {overview_rows:>5} | "
+              f"{legacy_ms / overview_ms:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,574 @@
+# --- File: benchmarks/api_suite.py ---
+"""
+Load test for the critical API flows: throughput and p50/p95/p99 latency per
+flow, JSON results, and a regression gate against a baseline run.
+
+    python -m benchmarks.api_suite --database-url postgresql+psycopg2://.../bank_bench \
+        --concurrency 16 --duration 20
+    python -m benchmarks.api_suite ... --save-baseline benchmarks/baselines/api_suite.json
+    python -m benchmarks.api_suite ... --baseline benchmarks/baselines/api_suite.json --max-regression 0.15
+
+Flows:
+
+  accounts_overview   GET  /accounts/{customer_id}
+  transaction_create  POST /transactions/create (Bearer token of a benchmark customer)
+  bulk_transfer       POST /transactions/bulk with BULK_ITEMS transfers to other identities
+                      (an error unless every item comes back with a result)
+                      Before the timed flows, one bulk request from the last identity
+                      runs under a post-restoration limit of RESTORATION_CHECK_LIMIT with
+                      two items of which only the first fits; the run fails unless the
+                      first completes and the second is blocked.
+  fido_login_finish   POST /login/fido-finish with a freshly signed assertion
+                      (the /login/fido-start that issues its challenge is not timed)
+  behavior_log        POST /analytics/behavior            (behaviour-analysis app)
+  behavior_verify     POST /ml-analytics/verify-behavior  (behaviour-analysis app)
+
+The backend and the behaviour-analysis app both define a top-level `app`
+package, so each runs as its own uvicorn process (--workers) and is driven
+over local HTTP; the backend is measured once /health/ready reports its
+models warm. Twilio and ip-api are replaced by benchmarks.fake_services,
+answering after --fake-latency-ms. The behaviour app runs in a scratch
+directory, so the per-user models it trains stay out of the repo.
+
+Data: --database-url must be a scratch Postgres database. The first run seeds
+it, and --behavior-database-url, with benchmarks.synthetic_bank (--customers,
+--seed). The first --identities customers also get a P-256 passkey (private
+key derived from the seed), a seed key and 60 behaviour sessions. Later runs
+with the same seed reuse the data and only reset those customers' balances
+and lockouts.
+
+Each flow first sends one untimed request per identity (which also trains the
+behaviour models), then runs --concurrency closed-loop clients for --duration
+seconds. Results (req/s, p50/p95/p99/max ms, errors per flow, plus run
+metadata) are written to --output. A flow fails when more than
+--max-error-rate of its requests fail or, with --baseline, when its p95 rises
+or its throughput drops by more than --max-regression; the exit status is 1
+if any flow fails.
+
+Run from the backend directory with the usual .env present.
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import platform
+import random
+import secrets
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+import httpx
+import jwt
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from sqlalchemy import create_engine, update
+from sqlalchemy.engine import make_url
+
+from benchmarks.fake_services import FakeServices
+from benchmarks.synthetic_bank import BulkLoader, SyntheticBank, user_behavior
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+BEHAVIOR_DIR = BACKEND_DIR.parent / "bank-app-frontend" / "behaviour_analysis"
+API_PREFIX = "/api/v1"
+RP_ID = "localhost"
+ORIGIN = "http://localhost:8080"
+# P-256 group order: passkey private keys are derived from the seed modulo it
+P256_ORDER = 0xFFFFFFFF00000000FFFFFFFFFFFFFFFFBCE6FAADA7179E84F3B9CAC2FC632551
+IDENTITY_BALANCE = 5000000
+IDENTITY_SESSIONS = 60
+BULK_ITEMS = 20
+RESTORATION_CHECK_LIMIT = 100
+# Settings both apps require; harmless placeholders unless already set
+REQUIRED_SETTINGS = {
+    "PROJECT_NAME": "bank-bench", "BACKEND_CORS_ORIGINS": "*", "RP_NAME": "bank-bench",
+    "TWILIO_ACCOUNT_SID": "ACbench", "TWILIO_AUTH_TOKEN": "bench", "TWILIO_VERIFY_SERVICE_SID": "VAbench",
+    "TWILIO_PHONE_NUMBER": "+15005550006", "PRIVATE_KEY": "bench",
+}
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class Identity:
+    """A seeded customer the suite can log in as: accounts, passkey private key, JWT."""
+
+    def __init__(self, seed: int, index: int, customer_id: str, account_numbers: List[str]):
+        digest = hashlib.sha256(f"bench-passkey:{seed}:{index}".encode()).digest()
+        self.index = index
+        self.customer_id = customer_id
+        self.account_numbers = account_numbers
+        self.private_key = ec.derive_private_key(int.from_bytes(digest, "big") % (P256_ORDER - 1) + 1, ec.SECP256R1())
+        self.credential_id = hashlib.sha256(f"bench-credential:{seed}:{index}".encode()).digest()
+        self.token = None
+
+    @property
+    def public_key_der(self) -> bytes:
+        return self.private_key.public_key().public_bytes(
+            serialization.Encoding.DER, serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+
+    def assertion(self, challenge: str) -> dict:
+        """A WebAuthn assertion over `challenge`, as a platform authenticator would return it."""
+        client_data = json.dumps({"type": "webauthn.get", "challenge": challenge, "origin": ORIGIN,
+                                  "crossOrigin": False}, separators=(",", ":")).encode()
+        # rpIdHash | flags (user present + verified) | signCount 0 (no counter)
+        authenticator_data = hashlib.sha256(RP_ID.encode()).digest() + bytes([0x05]) + bytes(4)
+        signature = self.private_key.sign(authenticator_data + hashlib.sha256(client_data).digest(),
+                                          ec.ECDSA(hashes.SHA256()))
+        credential_id = _b64url(self.credential_id)
+        return {
+            "id": credential_id,
+            "rawId": credential_id,
+            "type": "public-key",
+            "response": {
+                "clientDataJSON": _b64url(client_data),
+                "authenticatorData": _b64url(authenticator_data),
+                "signature": _b64url(signature),
+            },
+        }
+
+
+def seed(args, backend_engine, behavior_engine) -> List[Identity]:
+    """Seed both databases on the first run; always returns the benchmark identities."""
+    from app.db.models.user import Account, AppData, Passkey, Seedkey, Transaction
+
+    bank = SyntheticBank(args.seed, args.customers, 0, args.days, args.transactions_per_account,
+                         args.terminals, 0.002, 8.0)
+    app_data = bank.app_data()
+    accounts = bank.accounts()
+    owned: Dict[str, List[str]] = {}
+    for account_number, customer_id in zip(accounts["account_number"].tolist(), accounts["customer_id"].tolist()):
+        owned.setdefault(customer_id, []).append(account_number)
+    identities = [Identity(args.seed, i, customer_id, owned[customer_id])
+                  for i, customer_id in enumerate(app_data["customer_id"][:args.identities].tolist())]
+
+    with backend_engine.connect() as conn:
+        seeded = conn.execute(
+            AppData.__table__.select().where(AppData.customer_id == identities[0].customer_id)
+        ).first() is not None
+
+    if not seeded:
+        started = time.perf_counter()
+        loader = BulkLoader(backend_engine)
+        loader.load(AppData.__table__, app_data)
+        loader.load(Account.__table__, accounts)
+        rows = 0
+        for first in range(0, len(bank.account_numbers), 20000):
+            rows += loader.load(Transaction.__table__, bank.transactions(slice(first, first + 20000)))
+        with backend_engine.begin() as conn:
+            conn.execute(Passkey.__table__.insert(), [
+                {"customer_id": identity.customer_id, "credential_id": identity.credential_id,
+                 "public_key": identity.public_key_der, "symmetric_key": f"bench-symmetric-{i}", "sign_count": 0}
+                for i, identity in enumerate(identities)
+            ])
+            conn.execute(Seedkey.__table__.insert(), [
+                {"customer_id": identity.customer_id, "public_key": f"0xbench{args.seed}x{i}",
+                 "user_id": f"bench-{args.seed}-{i}"}
+                for i, identity in enumerate(identities)
+            ])
+        behavior_loader = BulkLoader(behavior_engine)
+        behavior_loader.load(user_behavior, bank.behavior_sessions())
+        behavior_loader.load(user_behavior, bank.behavior_sessions(slice(0, args.identities), IDENTITY_SESSIONS))
+        print(f"Seeded {args.customers:,} customers and {rows:,} transactions "
+              f"in {time.perf_counter() - started:.1f}s")
+
+    with backend_engine.begin() as conn:
+        account_numbers = [n for identity in identities for n in identity.account_numbers]
+        customer_ids = [identity.customer_id for identity in identities]
+        conn.execute(update(Account.__table__).where(Account.account_number.in_(account_numbers))
+                     .values(balance=IDENTITY_BALANCE, pin_attempts=0, pin_locked_until=None))
+        conn.execute(update(AppData.__table__).where(AppData.customer_id.in_(customer_ids)).values(
+            app_access_revoked=False, is_restoration_limited=False, failed_login_attempts=0,
+            login_blocked_until=None))
+    return identities
+
+
+class AppServer:
+    """One app (directory containing main.py) under uvicorn on a free local port."""
+
+    def __init__(self, name: str, app_dir: Path, cwd: Path, env: Dict[str, str], workers: int, log_path: Path,
+                 ready_path: str = "/"):
+        self.name = name
+        self.app_dir = app_dir
+        self.cwd = cwd
+        self.env = env
+        self.workers = workers
+        self.log_path = log_path
+        self.ready_path = ready_path
+        self.url = f"http://127.0.0.1:{_free_port()}"
+        self.process = None
+
+    def start(self) -> None:
+        port = self.url.rsplit(":", 1)[1]
+        self.log = open(self.log_path, "w")
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", str(self.app_dir), "--host", "127.0.0.1",
+             "--port", port, "--workers", str(self.workers), "--log-level", "warning", "--no-access-log"],
+            cwd=self.cwd, env=self.env, stdout=self.log, stderr=subprocess.STDOUT,
+        )
+
+    def wait_ready(self, timeout: float) -> None:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"{self.name} exited with {self.process.returncode}; see {self.log_path}")
+            try:
+                response = httpx.get(f"{self.url}{self.ready_path}", timeout=1.0)
+                if response.status_code == 200:
+                    return
+                if response.status_code == 503:
+                    failed = {name: sub.get("error") for name, sub in response.json()["subsystems"].items()
+                              if sub["required"] and sub["state"] == "failed"}
+                    if failed:
+                        raise RuntimeError(f"{self.name} warm-up failed: {failed}; see {self.log_path}")
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.25)
+        raise RuntimeError(f"{self.name} not ready after {timeout:.0f}s; see {self.log_path}")
+
+    def stop(self) -> None:
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        if self.process:
+            self.log.close()
+
+
+# A flow builds one timed request for an identity: (method, url, json body, headers).
+# Anything it awaits itself (e.g. fetching a challenge) is not timed.
+Flow = Callable[[httpx.AsyncClient, Identity, random.Random], Awaitable[Tuple]]
+
+
+def build_flows(backend_url: str, behavior_url: str, identities: List[Identity]) -> Dict[str, Flow]:
+    backend = backend_url + API_PREFIX
+    behavior = behavior_url + API_PREFIX
+
+    async def accounts_overview(client, identity, rng):
+        return "GET", f"{backend}/accounts/{identity.customer_id}", None, {}
+
+    async def transaction_create(client, identity, rng):
+        recipient = identities[(identity.index + 1) % len(identities)]
+        body = {
+            "recipient_account_number": recipient.account_numbers[0],
+            "amount": round(rng.uniform(1, 500), 2),
+            "terminal_id": f"terminal_{rng.randrange(200)}",
+            "account_number": identity.account_numbers[0],
+            "biometric_hash": "bench",
+        }
+        return "POST", f"{backend}/transactions/create", body, {"Authorization": f"Bearer {identity.token}"}
+
+    async def bulk_transfer(client, identity, rng):
+        others = [other for other in identities if other is not identity]
+        body = {
+            "transfers": [
+                {"recipient_account_number": others[(identity.index + k) % len(others)].account_numbers[0],
+                 "amount": round(rng.uniform(1, 50), 2), "reference": f"bench-{k}"}
+                for k in range(BULK_ITEMS)
+            ],
+            "terminal_id": f"terminal_{rng.randrange(200)}",
+            "account_number": identity.account_numbers[0],
+            "biometric_hash": "bench",
+        }
+
+        def every_item_answered(response) -> bool:
+            return len(response.json().get("results", [])) == BULK_ITEMS
+
+        return ("POST", f"{backend}/transactions/bulk", body, {"Authorization": f"Bearer {identity.token}"},
+                every_item_answered)
+
+    async def fido_login_finish(client, identity, rng):
+        start = await client.post(f"{backend}/login/fido-start", json={"customer_id": identity.customer_id})
+        start.raise_for_status()
+        body = {"customer_id": identity.customer_id, "credential": identity.assertion(start.json()["challenge"])}
+        return "POST", f"{backend}/login/fido-finish", body, {"Origin": ORIGIN}
+
+    def behavior_metrics(identity, rng):
+        return {
+            "customer_unique_id": identity.customer_id,
+            "flight_avg": abs(rng.gauss(120, 15)),
+            "traj_avg": abs(rng.gauss(300, 40)) + 1,
+            "typing_speed": abs(rng.gauss(4.5, 0.5)),
+            "correction_rate": abs(rng.gauss(0.06, 0.02)),
+            "clicks_per_minute": abs(rng.gauss(25, 4)),
+        }
+
+    async def behavior_log(client, identity, rng):
+        return "POST", f"{behavior}/analytics/behavior", behavior_metrics(identity, rng), {}
+
+    async def behavior_verify(client, identity, rng):
+        return "POST", f"{behavior}/ml-analytics/verify-behavior", behavior_metrics(identity, rng), {}
+
+    return {
+        "accounts_overview": accounts_overview,
+        "transaction_create": transaction_create,
+        "bulk_transfer": bulk_transfer,
+        "fido_login_finish": fido_login_finish,
+        "behavior_log": behavior_log,
+        "behavior_verify": behavior_verify,
+    }
+
+
+async def run_flow(flow: Flow, identities: List[Identity], concurrency: int, duration: float, seed: int) -> dict:
+    latencies: List[float] = []
+    requests = 0
+    errors = 0
+    error_samples: Dict[str, int] = {}
+    stop = asyncio.Event()
+    limits = httpx.Limits(max_connections=concurrency * 2, max_keepalive_connections=concurrency * 2)
+
+    async with httpx.AsyncClient(limits=limits, timeout=60.0) as client:
+
+        async def send(identity: Identity, rng: random.Random, timed: bool) -> None:
+            nonlocal requests, errors
+            try:
+                # (method, url, body, headers[, check]): check(response) False counts a 2xx as an error
+                method, url, body, headers, *check = await flow(client, identity, rng)
+                started = time.perf_counter()
+                response = await client.request(method, url, json=body, headers=headers)
+                elapsed = (time.perf_counter() - started) * 1000
+                status = str(response.status_code)
+                if check and status.startswith("2") and not check[0](response):
+                    status = "check_failed"
+            except httpx.HTTPError as exc:
+                elapsed, status = None, type(exc).__name__
+            if not timed:
+                return
+            requests += 1
+            if elapsed is not None:
+                latencies.append(elapsed)
+            if not status.startswith("2"):
+                errors += 1
+                error_samples[status] = error_samples.get(status, 0) + 1
+
+        # Warm-up: one untimed request per identity (connections, caches, model training)
+        warmup_rng = random.Random(seed)
+        for identity in identities:
+            await send(identity, warmup_rng, timed=False)
+
+        async def worker(index: int) -> None:
+            rng = random.Random(seed * 1000 + index)
+            turn = index
+            while not stop.is_set():
+                # Workers take identities round-robin, so no two share one at a time unless concurrency > identities
+                await send(identities[turn % len(identities)], rng, timed=True)
+                turn += concurrency
+
+        workers = [asyncio.create_task(worker(i)) for i in range(concurrency)]
+        started = time.perf_counter()
+        await asyncio.sleep(duration)
+        stop.set()
+        await asyncio.gather(*workers)
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+
+    def pct(q: float) -> float:
+        return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))], 2) if latencies else 0.0
+
+    return {
+        "requests": requests,
+        "errors": errors,
+        "error_rate": round(errors / requests, 4) if requests else 1.0,
+        "errors_by_status": error_samples,
+        "rps": round(requests / elapsed, 1),
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+    }
+
+
+def check_bulk_restoration_limit(backend_url: str, backend_engine, identity: Identity,
+                                 recipient: Identity) -> List[str]:
+    """POST /transactions/bulk with two items under a restoration limit that only the first fits."""
+    from app.db.models.user import AppData
+
+    amounts = [RESTORATION_CHECK_LIMIT * 0.8, RESTORATION_CHECK_LIMIT * 0.5]
+    limited = AppData.__table__.update().where(AppData.customer_id == identity.customer_id)
+    with backend_engine.begin() as conn:
+        conn.execute(limited.values(
+            is_restoration_limited=True, restoration_daily_limit=RESTORATION_CHECK_LIMIT, restoration_spent=0,
+            restoration_limit_expires_at=datetime.now(timezone.utc) + timedelta(hours=1)))
+    try:
+        body = {
+            "transfers": [{"recipient_account_number": recipient.account_numbers[0], "amount": amount,
+                           "reference": f"restoration-check-{k}"} for k, amount in enumerate(amounts)],
+            "terminal_id": "terminal_0",
+            "account_number": identity.account_numbers[0],
+            "biometric_hash": "bench",
+        }
+        response = httpx.post(f"{backend_url}{API_PREFIX}/transactions/bulk", json=body, timeout=60.0,
+                              headers={"Authorization": f"Bearer {identity.token}"})
+    finally:
+        with backend_engine.begin() as conn:
+            conn.execute(limited.values(is_restoration_limited=False, restoration_spent=0,
+                                        restoration_limit_expires_at=None))
+
+    if response.status_code != 200:
+        return [f"bulk restoration limit check: HTTP {response.status_code}"]
+    statuses = [result["status"] for result in response.json()["results"]]
+    if statuses != ["completed", "blocked"]:
+        return [f"bulk restoration limit check: {statuses}, expected ['completed', 'blocked']"]
+    return []
+
+
+def compare(results: dict, baseline: dict, max_regression: float, max_error_rate: float) -> List[str]:
+    """Regressions of `results` against `baseline` (and error-rate violations), one message each."""
+    failures = []
+    for name, flow in results["flows"].items():
+        if flow["error_rate"] > max_error_rate:
+            failures.append(f"{name}: error rate {flow['error_rate']:.1%} > {max_error_rate:.1%} "
+                            f"({flow['errors_by_status']})")
+        base = (baseline or {}).get("flows", {}).get(name)
+        if not base:
+            continue
+        if base["p95_ms"] and flow["p95_ms"] > base["p95_ms"] * (1 + max_regression):
+            failures.append(f"{name}: p95 {flow['p95_ms']:.1f} ms vs baseline {base['p95_ms']:.1f} ms")
+        if base["rps"] and flow["rps"] < base["rps"] * (1 - max_regression):
+            failures.append(f"{name}: {flow['rps']:.0f} req/s vs baseline {base['rps']:.0f} req/s")
+    return failures
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or "unknown"
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True, help="scratch Postgres database for the backend")
+    parser.add_argument("--behavior-database-url", default=None,
+                        help="behaviour-analysis database (default: a SQLite file next to --output)")
+    parser.add_argument("--flows", default="all", help="comma-separated flow names, or 'all'")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per flow")
+    parser.add_argument("--workers", type=int, default=2, help="uvicorn workers per app")
+    parser.add_argument("--customers", type=int, default=20000)
+    parser.add_argument("--transactions-per-account", type=float, default=40.0)
+    parser.add_argument("--days", type=int, default=120)
+    parser.add_argument("--terminals", type=int, default=5000)
+    parser.add_argument("--identities", type=int, default=64, help="customers the suite logs in as")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--fake-latency-ms", type=float, default=50.0, help="Twilio / ip-api response delay")
+    parser.add_argument("--output", default=None, help="results JSON (default: benchmarks/results/<time>.json)")
+    parser.add_argument("--baseline", default=None, help="results JSON to compare against")
+    parser.add_argument("--save-baseline", default=None, help="also write the results here")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="allowed p95 increase / throughput drop vs the baseline (fraction)")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--startup-timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    started_at = datetime.now(timezone.utc)
+    output = Path(args.output or BACKEND_DIR / "benchmarks" / "results" /
+                  f"api_suite-{started_at:%Y%m%dT%H%M%S}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    behavior_url = args.behavior_database_url or f"sqlite:///{output.parent.resolve() / 'api_suite_behavior.db'}"
+    baseline = json.loads(Path(args.baseline).read_text()) if args.baseline else None
+
+    jwt_secret = secrets.token_hex(32)
+    scratch = Path(tempfile.mkdtemp(prefix="api_suite_"))
+    with FakeServices(latency_ms=args.fake_latency_ms) as fakes:
+        env = {**REQUIRED_SETTINGS, **os.environ}
+        env.update({
+            "JWT_SECRET": jwt_secret, "RP_ID": RP_ID, "ORIGIN": ORIGIN,
+            "TWILIO_API_BASE_URL": fakes.url, "IP_GEOLOCATION_URL": f"{fakes.url}/json/{{ip}}",
+            "PYTHONDONTWRITEBYTECODE": "1",
+        })
+        servers = [
+            AppServer("backend", BACKEND_DIR, BACKEND_DIR, {**env, "DATABASE_URL": args.database_url},
+                      args.workers, scratch / "backend.log", ready_path="/health/ready"),
+            AppServer("behaviour", BEHAVIOR_DIR, scratch, {**env, "DATABASE_URL": behavior_url},
+                      args.workers, scratch / "behaviour.log"),
+        ]
+        try:
+            # The apps create (and partition) their tables on startup, so start them before seeding
+            for server in servers:
+                server.start()
+            for server in servers:
+                server.wait_ready(args.startup_timeout)
+
+            backend_engine = create_engine(args.database_url)
+            behavior_engine = create_engine(behavior_url)
+            identities = seed(args, backend_engine, behavior_engine)
+            behavior_engine.dispose()
+            expires = datetime.now(timezone.utc) + timedelta(hours=6)
+            for identity in identities:
+                identity.token = jwt.encode({"sub": identity.customer_id, "exp": expires}, jwt_secret,
+                                            algorithm="HS256")
+            check_failures = check_bulk_restoration_limit(servers[0].url, backend_engine, identities[-1],
+                                                          identities[0])
+            backend_engine.dispose()
+
+            flows = build_flows(servers[0].url, servers[1].url, identities)
+            selected = list(flows) if args.flows == "all" else [name.strip() for name in args.flows.split(",")]
+            unknown = set(selected) - set(flows)
+            if unknown:
+                parser.error(f"unknown flows: {', '.join(sorted(unknown))} (known: {', '.join(flows)})")
+
+            results = {
+                "meta": {
+                    "started_at": started_at.isoformat(),
+                    "git_commit": _git_commit(),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "cpu_count": os.cpu_count(),
+                    "settings": {key: getattr(args, key) for key in (
+                        "concurrency", "duration", "workers", "customers", "transactions_per_account",
+                        "identities", "seed", "fake_latency_ms")},
+                    "database": make_url(args.database_url).get_backend_name(),
+                },
+                "flows": {},
+            }
+            print(f"{'flow':>20} | {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} | "
+                  f"{'errors':>6}")
+            for name in selected:
+                flow = asyncio.run(run_flow(flows[name], identities, args.concurrency, args.duration, args.seed))
+                results["flows"][name] = flow
+                print(f"{name:>20} | {flow['rps']:>8.1f} {flow['p50_ms']:>8.1f} {flow['p95_ms']:>8.1f} "
+                      f"{flow['p99_ms']:>8.1f} {flow['max_ms']:>8.1f} | {flow['errors']:>6}")
+            results["meta"]["fake_service_calls"] = fakes.counts
+        finally:
+            for server in servers:
+                server.stop()
+
+    failures = check_failures + compare(results, baseline, args.max_regression, args.max_error_rate)
+    results["failures"] = failures
+    output.write_text(json.dumps(results, indent=2))
+    print(f"\nResults written to {output} (server logs in {scratch})")
+    if args.save_baseline:
+        Path(args.save_baseline).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.save_baseline).write_text(json.dumps(results, indent=2))
+        print(f"Baseline written to {args.save_baseline}")
+
+    if failures:
+        print("\nFAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nAll flows within limits" + (" of the baseline" if baseline else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+# --- File: benchmarks/async_read_paths.py ---
+"""
+Load test for the read endpoints moved to the async session: accounts
+overview, device history, login status and location history.
+
+    python -m benchmarks.async_read_paths --database-url postgresql+psycopg2://... \
+        --concurrency 64 --duration 10
+
+Each endpoint is served twice from one in-process app and driven with
+`--concurrency` concurrent clients for `--duration` seconds:
+
+  sync   the previous handlers: sync Session from the threadpool (`def`), or
+         on the event loop itself for location history (`async def` calling
+         the sync session)
+  async  the new handlers: AsyncSession (asyncpg / aiosqlite)
+
+For each it reports requests per second, p50/p99 latency and event-loop lag
+(how late a 5 ms `asyncio.sleep` wakes up while the load runs). The async
+URL is derived from --database-url like the app does (psycopg2 -> asyncpg).
+Location history needs Postgres (UUID column) and is skipped elsewhere.
+
+Run from the backend directory with the usual .env present (the app settings
+are loaded on import). The benchmark customer's rows are replaced on every run.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine, delete, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.async_base import ASYNC_DRIVERS
+from app.db.base import Base
+from app.db.models.user import Account, AppData, DeviceEvent, Transaction
+from app.services import account_service, app_data_service
+from app.services.location_service import LocationService, UserLocation, get_user_location_history_async
+from app.services.login_attempt_service import LoginAttemptService
+
+CUSTOMER_ID = "bench-async-customer"
+LOCATION_CUSTOMER = uuid.UUID("00000000-0000-4000-8000-00000000be0c")
+ACCOUNTS = 3
+TRANSACTIONS_PER_ACCOUNT = 500
+EVENTS = 500
+LOCATIONS = 200
+LAG_INTERVAL = 0.005
+
+
+def seed(engine) -> None:
+    account_numbers = [f"BENCHASYNC_{i}" for i in range(ACCOUNTS)]
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    with engine.begin() as conn:
+        conn.execute(delete(Transaction.__table__).where(Transaction.account_number.in_(account_numbers)))
+        conn.execute(delete(Account.__table__).where(Account.customer_id == CUSTOMER_ID))
+        conn.execute(delete(DeviceEvent.__table__).where(DeviceEvent.customer_id == CUSTOMER_ID))
+        conn.execute(delete(AppData.__table__).where(AppData.customer_id == CUSTOMER_ID))
+        conn.execute(insert(AppData.__table__), [{
+            "customer_id": CUSTOMER_ID, "name": "Benchmark", "phone_number": "0000000000",
+            "email": "bench@example.com", "aadhaar_number": "000000000000",
+            "date_of_birth": date(1990, 1, 1), "failed_login_attempts": 1
+        }])
+        conn.execute(insert(Account.__table__), [
+            {"account_number": n, "customer_id": CUSTOMER_ID, "account_type": "Savings",
+             "balance": 1000, "pin_attempts": 0}
+            for n in account_numbers
+        ])
+        conn.execute(insert(Transaction.__table__), [
+            {"account_number": n, "terminal_id": "terminal_1000", "date": start + timedelta(minutes=i),
+             "description": "Benchmark transaction", "amount": 10, "type": "debit",
+             "is_fraud": False, "is_reauth_transaction": False}
+            for n in account_numbers for i in range(TRANSACTIONS_PER_ACCOUNT)
+        ])
+        conn.execute(insert(DeviceEvent.__table__), [
+            {"customer_id": CUSTOMER_ID, "action_type": "login_success", "ts": start + timedelta(minutes=i),
+             "device_info": "bench", "location": "bench", "ip_address": "10.0.0.1",
+             "device_id": f"bench_{i}", "details": {}}
+            for i in range(EVENTS)
+        ])
+        if engine.dialect.name == "postgresql":
+            conn.execute(delete(UserLocation.__table__).where(UserLocation.customer_unique_id == LOCATION_CUSTOMER))
+            conn.execute(insert(UserLocation.__table__), [
+                {"customer_unique_id": LOCATION_CUSTOMER, "session_id": f"s{i}", "ip_address": "10.0.0.1",
+                 "latitude": 12.9, "longitude": 77.6, "location_source": "ip",
+                 "created_at": start + timedelta(minutes=i)}
+                for i in range(LOCATIONS)
+            ])
+
+
+def build_app(SyncSession, AsyncSession) -> FastAPI:
+    app = FastAPI()
+
+    # -- previous handlers ------------------------------------------------------
+    @app.get("/sync/accounts")
+    def sync_accounts():
+        with SyncSession() as db:
+            return account_service.get_accounts_overview(db, CUSTOMER_ID, 10)
+
+    @app.get("/sync/device-history")
+    def sync_device_history():
+        with SyncSession() as db:
+            return app_data_service.get_customer_device_history_page(db, CUSTOMER_ID, limit=10)[0]
+
+    @app.get("/sync/login-status")
+    def sync_login_status():
+        with SyncSession() as db:
+            return LoginAttemptService.get_lockout_info(db, CUSTOMER_ID)
+
+    @app.get("/sync/location-history")
+    async def sync_location_history():
+        with SyncSession() as db:
+            return LocationService(db).get_user_location_history(LOCATION_CUSTOMER, 10)
+
+    # -- async session handlers -------------------------------------------------
+    @app.get("/async/accounts")
+    async def async_accounts():
+        async with AsyncSession() as db:
+            return await account_service.get_accounts_overview_async(db, CUSTOMER_ID, 10)
+
+    @app.get("/async/device-history")
+    async def async_device_history():
+        async with AsyncSession() as db:
+            return (await app_data_service.get_customer_device_history_page_async(db, CUSTOMER_ID, limit=10))[0]
+
+    @app.get("/async/login-status")
+    async def async_login_status():
+        async with AsyncSession() as db:
+            return await LoginAttemptService.get_lockout_info_async(db, CUSTOMER_ID)
+
+    @app.get("/async/location-history")
+    async def async_location_history():
+        async with AsyncSession() as db:
+            return await get_user_location_history_async(db, LOCATION_CUSTOMER, 10)
+
+    return app
+
+
+async def measure_lag(stop: asyncio.Event, lags: list) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        started = loop.time()
+        await asyncio.sleep(LAG_INTERVAL)
+        lags.append((loop.time() - started - LAG_INTERVAL) * 1000)
+
+
+async def run_load(app: FastAPI, path: str, concurrency: int, duration: float):
+    latencies = []
+    errors = 0
+    lags: list = []
+    stop = asyncio.Event()
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get(path)  # warm up connections
+
+        async def worker():
+            nonlocal errors
+            while not stop.is_set():
+                started = time.perf_counter()
+                response = await client.get(path)
+                latencies.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    errors += 1
+
+        lag_task = asyncio.create_task(measure_lag(stop, lags))
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        started = time.perf_counter()
+        await asyncio.sleep(duration)
+        stop.set()
+        await asyncio.gather(*workers, lag_task)
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    lags.sort()
+
+    def pct(values, q):
+        return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) if latencies else 0.0,
+        "p99_ms": pct(latencies, 0.99),
+        "lag_p99_ms": pct(lags, 0.99),
+        "lag_max_ms": lags[-1] if lags else 0.0,
+        "errors": errors
+    }
+
+
+async def main_async(args) -> None:
+    engine = create_engine(args.database_url, pool_size=args.concurrency, max_overflow=0)
+    Base.metadata.create_all(engine, tables=[AppData.__table__, Account.__table__, Transaction.__table__,
+                                             DeviceEvent.__table__, UserLocation.__table__])
+    seed(engine)
+
+    parsed = engine.url
+    async_url = parsed.set(drivername=ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername))
+    async_engine = create_async_engine(async_url, pool_size=args.concurrency, max_overflow=0)
+
+    app = build_app(
+        sessionmaker(bind=engine, autoflush=False),
+        async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    )
+
+    endpoints = ["accounts", "device-history", "login-status"]
+    if engine.dialect.name == "postgresql":
+        endpoints.append("location-history")
+
+    print(f"{'endpoint':>16} {'mode':>5} | {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} | "
+          f"{'lag p99':>8} {'lag max':>8} | {'errors':>6}")
+    for endpoint in endpoints:
+        for mode in ("sync", "async"):
+            r = await run_load(app, f"/{mode}/{endpoint}", args.concurrency, args.duration)
+            print(f"{endpoint:>16} {mode:>5} | {r['rps']:>8.0f} {r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f} | "
+                  f"{r['lag_p99_ms']:>8.2f} {r['lag_max_ms']:>8.2f} | {r['errors']:>6}")
+
+    await async_engine.dispose()
+    engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///async_read_paths_bench.db")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per endpoint and mode")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# --- File: benchmarks/balance_contention.py ---
+"""
+Concurrent transfer benchmark for the balance engine.
+
+    python -m benchmarks.balance_contention --database-url postgresql+psycopg2://... \
+        --threads 16 --transfers 500 --accounts 8
+
+Modes:
+  naive   read balances through the ORM, modify, commit (the previous behaviour)
+  locked  BalanceEngine.transfer: FOR UPDATE row locks in account-number order
+  ledger  every transfer pays one hot account whose credits go through the ledger
+
+For each mode it reports committed transfers per second, failed transfers
+(deadlocks, lock errors) and the lost-update rate: the fraction of committed
+transfers whose effect is missing from the final balances. Row locks need
+Postgres: SQLite ignores FOR UPDATE, so every mode can lose updates there.
+"""
+import argparse
+import random
+import threading
+import time
+from collections import defaultdict
+from decimal import Decimal
+
+from sqlalchemy import create_engine, delete, insert
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.base import Base
+from app.db.models.user import Account, BalanceLedgerEntry
+from app.services.balance_service import BalanceEngine
+
+AMOUNT = Decimal("1.00")
+START_BALANCE = Decimal("1000000.00")
+HOT_ACCOUNT = "BENCHHOT"
+
+
+def naive_transfer(db: Session, engine: BalanceEngine, sender: str, recipient: str) -> None:
+    sender_account = db.query(Account).filter(Account.account_number == sender).first()
+    recipient_account = db.query(Account).filter(Account.account_number == recipient).first()
+    sender_account.balance -= AMOUNT
+    recipient_account.balance += AMOUNT
+
+
+def locked_transfer(db: Session, engine: BalanceEngine, sender: str, recipient: str) -> None:
+    engine.transfer(db, sender, recipient, AMOUNT)
+
+
+def reset_accounts(engine, account_numbers):
+    with engine.begin() as conn:
+        conn.execute(delete(BalanceLedgerEntry.__table__))
+        conn.execute(delete(Account.__table__).where(Account.account_number.in_(account_numbers)))
+        conn.execute(insert(Account.__table__), [
+            {"account_number": n, "customer_id": "bench", "account_type": "Savings",
+             "balance": START_BALANCE, "pin_attempts": 0}
+            for n in account_numbers
+        ])
+
+
+def run_mode(engine, mode: str, threads: int, transfers: int, account_numbers):
+    balance_engine = BalanceEngine([HOT_ACCOUNT] if mode == "ledger" else [])
+    transfer_fn = naive_transfer if mode == "naive" else locked_transfer
+    SessionFactory = sessionmaker(bind=engine)
+    payers = [n for n in account_numbers if n != HOT_ACCOUNT]
+
+    expected_delta = defaultdict(Decimal)
+    counters = {"committed": 0, "failed": 0}
+    lock = threading.Lock()
+
+    def worker(seed: int):
+        rng = random.Random(seed)
+        db = SessionFactory()
+        try:
+            for _ in range(transfers):
+                if mode == "ledger":
+                    sender, recipient = rng.choice(payers), HOT_ACCOUNT
+                else:
+                    sender, recipient = rng.sample(payers, 2)
+                try:
+                    transfer_fn(db, balance_engine, sender, recipient)
+                    db.commit()
+                except Exception:
+                    db.rollback()
+                    with lock:
+                        counters["failed"] += 1
+                    continue
+                with lock:
+                    counters["committed"] += 1
+                    expected_delta[sender] -= AMOUNT
+                    expected_delta[recipient] += AMOUNT
+        finally:
+            db.close()
+
+    reset_accounts(engine, account_numbers)
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    with SessionFactory() as db:
+        fold_started = time.perf_counter()
+        balance_engine.fold_pending(db)
+        fold_seconds = time.perf_counter() - fold_started
+        balances = dict(db.query(Account.account_number, Account.balance).filter(
+            Account.account_number.in_(account_numbers)).all())
+
+    lost_amount = sum(
+        abs(START_BALANCE + expected_delta[n] - balances[n]) for n in account_numbers
+    )
+    # Each lost transfer leaves one side (or both) wrong by AMOUNT
+    lost_transfers = lost_amount / AMOUNT / 2
+    committed = counters["committed"]
+    return {
+        "mode": mode,
+        "committed": committed,
+        "failed": counters["failed"],
+        "tps": committed / elapsed if elapsed else 0.0,
+        "lost_rate": float(lost_transfers / committed) if committed else 0.0,
+        "fold_seconds": fold_seconds
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite:///balance_contention_bench.db")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--transfers", type=int, default=200, help="transfers per thread")
+    parser.add_argument("--accounts", type=int, default=4, help="accounts shared by all threads")
+    parser.add_argument("--modes", nargs="+", default=["naive", "locked", "ledger"])
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url, pool_size=args.threads + 2, max_overflow=0) \
+        if not args.database_url.startswith("sqlite") else create_engine(args.database_url)
+    Base.metadata.create_all(engine, tables=[Account.__table__, BalanceLedgerEntry.__table__])
+    if engine.dialect.name != "postgresql":
+        print(f"WARNING: {engine.dialect.name} does not enforce SELECT ... FOR UPDATE; "
+              "lost-update figures are only meaningful on Postgres.")
+    account_numbers = [f"BENCHACC{i}" for i in range(args.accounts)] + [HOT_ACCOUNT]
+
+    print(f"{'mode':>7} | {'committed':>9} {'failed':>6} | {'tx/s':>8} | {'lost-update rate':>16} | {'fold s':>6}")
+    for mode in args.modes:
+        r = run_mode(engine, mode, args.threads, args.transfers, account_numbers)
+        print(f"{r['mode']:>7} | {r['committed']:>9} {r['failed']:>6} | {r['tps']:>8.1f} | "
+              f"{r['lost_rate']:>16.2%} | {r['fold_seconds']:>6.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# --- File: benchmarks/fake_services.py ---
+"""
+Local stand-ins for the third-party APIs the backend calls, for load tests.
+
+  Twilio   POST .../Messages.json, Verify Verifications / VerificationCheck
+           (point the app at it with TWILIO_API_BASE_URL=<url>)
+  ip-api   GET /json/<ip>
+           (IP_GEOLOCATION_URL=<url>/json/{ip})
+
+Every response waits `latency_ms` first, to stand in for the provider's
+round trip. Request counts per API are kept in `counts`.
+
+    with FakeServices(latency_ms=50) as fakes:
+        env["TWILIO_API_BASE_URL"] = fakes.url
+"""
+import json
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status: int, body: dict) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _count(self, kind: str) -> None:
+        with self.server.lock:
+            self.server.counts[kind] += 1
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        path = self.path.split("?", 1)[0]
+        if path.endswith("/Messages.json"):
+            self._count("twilio_sms")
+            self._reply(201, {"sid": f"SM{uuid.uuid4().hex}", "status": "queued",
+                              "error_code": None, "error_message": None})
+        elif path.endswith("/Verifications"):
+            self._count("twilio_verify")
+            self._reply(201, {"sid": f"VE{uuid.uuid4().hex}", "status": "pending"})
+        elif path.endswith("/VerificationCheck"):
+            self._count("twilio_verify_check")
+            self._reply(200, {"sid": f"VE{uuid.uuid4().hex}", "status": "approved"})
+        else:
+            self._count("unknown")
+            self._reply(404, {"message": f"no fake for POST {path}"})
+
+    def do_GET(self):
+        if self.path.startswith("/json/"):
+            self._count("ip_api")
+            self._reply(200, {"status": "success", "lat": 12.9716, "lon": 77.5946,
+                              "city": "Bengaluru", "country": "India"})
+        else:
+            self._count("unknown")
+            self._reply(404, {"message": f"no fake for GET {self.path}"})
+
+
+class FakeServices:
+    """Threaded HTTP server on a free local port, serving the fakes until stopped."""
+
+    def __init__(self, latency_ms: float = 0.0, host: str = "127.0.0.1"):
+        self.server = ThreadingHTTPServer((host, 0), _Handler)
+        self.server.daemon_threads = True
+        self.server.latency = latency_ms / 1000.0
+        self.server.counts = Counter()
+        self.server.lock = threading.Lock()
+        self.url = f"http://{host}:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, name="fake-services", daemon=True)
+
+    @property
+    def counts(self) -> dict:
+        with self.server.lock:
+            return dict(self.server.counts)
+
+    def start(self) -> "FakeServices":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,267 @@
+# --- File: benchmarks/query_plans.py ---
+"""
+Query-plan regression check for the hot queries (Postgres only).
+
+    python -m benchmarks.query_plans --database-url postgresql+psycopg2://... \
+        --customers 50000 --transactions 2000000
+
+Seeds a scratch schema (plan_check) with a realistic volume of accounts,
+transactions, app data, challenges and core-banking `accounts` rows, adds the
+hot-query indexes (app/db/indexes.py), then calls the real service code for
+each hot query:
+
+  customer_features     feature_service.update_customer_features
+  terminal_features     feature_service.update_terminal_features
+  transactions_page     account_service.get_transactions_page
+  accounts_overview     account_service.get_accounts_overview
+  accounts_by_customer  account_service.get_accounts_by_customer_id
+  challenge_lookup      challenge_service.get_and_delete_challenge
+  accounts_by_phone     otp_service.check_phone_number (raw SQL on accounts)
+  app_data_by_phone     otp_service.check_phone_number (raw SQL on app_data)
+
+The SQL each call emits is captured and re-run under EXPLAIN (ANALYZE,
+BUFFERS) for `--runs` random keys. A query fails when its plan reads one of
+the large tables with a sequential scan, or when its median execution time is
+over its budget (BUDGETS_MS x --budget-scale). The exit status is 1 if any
+query fails, so this can gate a deploy or a CI job with a database.
+
+--without-hot-indexes drops the indexes after seeding, to see the failures
+the suite is there to catch. --keep reuses the seeded schema on later runs.
+"""
+import argparse
+import random
+import statistics
+import sys
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+
+SCHEMA = "plan_check"
+TERMINALS = 5000
+MONTHS = 13
+
+# Median EXPLAIN ANALYZE execution time allowed per query, in ms
+BUDGETS_MS = {
+    "customer_features": 20.0,
+    "terminal_features": 20.0,
+    "transactions_page": 5.0,
+    "accounts_overview": 10.0,
+    "accounts_by_customer": 2.0,
+    "challenge_lookup": 2.0,
+    "accounts_by_phone": 2.0,
+    "app_data_by_phone": 2.0,
+}
+
+# Tables too large for a sequential scan on a hot path (partitions included)
+LARGE_TABLES = ("transactions", "account", "app_data", "challenges", "accounts")
+
+
+def seed(engine, customers: int, transactions: int, challenges: int) -> None:
+    from app.db.base import Base
+    from app.db.indexes import core_accounts
+    from app.db.models import challenge, features, user  # noqa: F401 (register the tables)
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    Base.metadata.create_all(engine, tables=[
+        user.Account.__table__, user.Transaction.__table__, user.AppData.__table__,
+        features.CustomerFraudFeatures.__table__, features.TerminalFraudFeatures.__table__
+    ])
+    challenge.Base.metadata.create_all(engine)
+    core_accounts.metadata.create_all(engine)
+
+    accounts = customers * 2
+    print(f"Seeding {customers:,} customers, {accounts:,} accounts, {transactions:,} transactions, "
+          f"{challenges:,} challenges")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO account (account_number, customer_id, account_type, balance, pin_attempts)"
+            " SELECT 'PC' || g, 'cust_' || (g / 2), 'Savings', 1000, 0 FROM generate_series(0, :n - 1) g"
+        ), {"n": accounts})
+        conn.execute(text(
+            "INSERT INTO app_data (customer_id, name, phone_number, email, aadhaar_number, app_access_revoked,"
+            " no_of_logged_in_devices, is_restoration_limited, restoration_daily_limit, restoration_spent,"
+            " failed_login_attempts, seedkey_failed_attempts)"
+            " SELECT 'cust_' || g, 'Customer ' || g, '9' || lpad(g::text, 9, '0'), 'c' || g || '@example.com',"
+            " lpad(g::text, 12, '0'), false, 1, false, 5000, 0, 0, 0 FROM generate_series(0, :n - 1) g"
+        ), {"n": customers})
+        conn.execute(text(
+            "INSERT INTO accounts (customer_unique_id, phone_number, is_registeredinapp)"
+            " SELECT 'cust_' || g, '9' || lpad(g::text, 9, '0'), true FROM generate_series(0, :n - 1) g"
+        ), {"n": customers})
+        conn.execute(text(
+            "INSERT INTO challenges (customer_id, challenge_string, challenge_type, expires_at, created_at)"
+            " SELECT 'cust_' || (g % :customers), md5(g::text), 'FIDO2', now() - interval '1 hour',"
+            " now() - interval '2 hours' FROM generate_series(0, :n - 1) g"
+        ), {"n": challenges, "customers": customers})
+    for offset in range(0, transactions, 1000000):
+        with engine.begin() as conn:
+            conn.execute(text(
+                "INSERT INTO transactions (account_number, terminal_id, date, description, amount, type,"
+                " is_fraud, is_reauth_transaction)"
+                " SELECT 'PC' || (random() * (:accounts - 1))::int, 'terminal_' || (g % :terminals),"
+                " now() - random() * make_interval(days => :days), 'Plan check', round((random() * 2500)::numeric, 2),"
+                " CASE WHEN g % 4 = 0 THEN 'credit' ELSE 'debit' END, random() < 0.001, false"
+                " FROM generate_series(:lo, :hi) g"
+            ), {"accounts": accounts, "terminals": TERMINALS, "days": MONTHS * 30,
+                "lo": offset, "hi": min(offset + 1000000, transactions) - 1})
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE"))
+
+
+class StatementCapture:
+    """Remembers the first SELECT containing `marker` run on the engine."""
+
+    def __init__(self, engine):
+        self.marker = None
+        self.captured = None
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def expect(self, marker: str) -> None:
+        self.marker = marker
+        self.captured = None
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if self.captured is None and self.marker and self.marker in statement \
+                and statement.lstrip()[:6].upper() in ("SELECT", "WITH"):
+            self.captured = (statement, parameters)
+
+
+def hot_queries(customers: int):
+    """(name, marker in the emitted SQL, function(db, rng) calling the service code)."""
+    from app.services import account_service, challenge_service, feature_service
+    from app.services.otp_service import check_phone_number
+
+    def customer(rng):
+        return f"cust_{rng.randrange(customers)}"
+
+    def phone(rng):
+        return f"9{rng.randrange(customers):09d}"
+
+    return [
+        ("customer_features", "FROM transactions JOIN account",
+         lambda db, rng: feature_service.update_customer_features(db, customer(rng))),
+        ("terminal_features", "FROM transactions",
+         lambda db, rng: feature_service.update_terminal_features(db, f"terminal_{rng.randrange(TERMINALS)}")),
+        ("transactions_page", "FROM transactions",
+         lambda db, rng: account_service.get_transactions_page(db, f"PC{rng.randrange(customers * 2)}", 50)),
+        ("accounts_overview", "FROM account",
+         lambda db, rng: account_service.get_accounts_overview(db, customer(rng), 10)),
+        ("accounts_by_customer", "FROM account",
+         lambda db, rng: account_service.get_accounts_by_customer_id(db, customer(rng))),
+        ("challenge_lookup", "FROM challenges",
+         lambda db, rng: challenge_service.get_and_delete_challenge(db, f"{rng.randrange(10 ** 9):032x}")),
+        ("accounts_by_phone", "FROM accounts",
+         lambda db, rng: check_phone_number(db, phone(rng))),
+        ("app_data_by_phone", "FROM app_data",
+         lambda db, rng: check_phone_number(db, phone(rng))),
+    ]
+
+
+def walk(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from walk(child)
+
+
+def is_large(relation: str) -> bool:
+    return any(relation == t or relation.startswith(f"{t}_p") or relation == f"{t}_default" for t in LARGE_TABLES)
+
+
+def explain(engine, statement: str, parameters) -> dict:
+    with engine.connect() as conn:
+        plan = conn.exec_driver_sql("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + statement, parameters).scalar()
+        conn.rollback()
+    root = plan[0]
+    nodes = list(walk(root["Plan"]))
+    return {
+        "ms": root["Execution Time"],
+        "seq_scans": sorted({n["Relation Name"] for n in nodes
+                             if n["Node Type"] == "Seq Scan" and is_large(n["Relation Name"])}),
+        "indexes": sorted({n["Index Name"] for n in nodes if "Index Name" in n}),
+        "shared_hit": root["Plan"].get("Shared Hit Blocks", 0),
+        "shared_read": root["Plan"].get("Shared Read Blocks", 0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--customers", type=int, default=50000)
+    parser.add_argument("--transactions", type=int, default=2000000)
+    parser.add_argument("--challenges", type=int, default=200000)
+    parser.add_argument("--runs", type=int, default=20, help="EXPLAIN ANALYZE runs per query (random keys)")
+    parser.add_argument("--budget-scale", type=float, default=1.0, help="multiply every latency budget")
+    parser.add_argument("--without-hot-indexes", action="store_true",
+                        help="drop the hot-query indexes first (shows what the check catches)")
+    parser.add_argument("--keep", action="store_true", help="reuse the seeded schema if present, keep it afterwards")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url, connect_args={"options": f"-csearch_path={SCHEMA}"})
+    if engine.dialect.name != "postgresql":
+        parser.error("EXPLAIN (ANALYZE, BUFFERS) needs Postgres")
+
+    from app.db.indexes import create_missing, hot_query_indexes
+
+    with engine.connect() as conn:
+        seeded = conn.execute(text(f"SELECT to_regclass('{SCHEMA}.transactions') IS NOT NULL")).scalar()
+    if not (args.keep and seeded):
+        seed(engine, args.customers, args.transactions, args.challenges)
+    create_missing(engine)
+    if args.without_hot_indexes:
+        with engine.begin() as conn:
+            for index in hot_query_indexes():
+                conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+            conn.execute(text("ANALYZE"))
+
+    capture = StatementCapture(engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    rng = random.Random(args.seed)
+    failures = []
+
+    print(f"\n{'query':>22} | {'p50 ms':>8} {'max ms':>8} {'budget':>7} | {'hit':>7} {'read':>7} | {'status':<6} detail")
+    for name, marker, call in hot_queries(args.customers):
+        results = []
+        for _ in range(args.runs):
+            capture.expect(marker)
+            with Session() as db:
+                call(db, rng)
+            if capture.captured is None:
+                continue
+            results.append(explain(engine, *capture.captured))
+        if not results:
+            failures.append(name)
+            print(f"{name:>22} | {'-':>8} {'-':>8} {'-':>7} | {'-':>7} {'-':>7} | FAIL   no statement captured")
+            continue
+
+        budget = BUDGETS_MS[name] * args.budget_scale
+        p50 = statistics.median(r["ms"] for r in results)
+        seq_scans = sorted({t for r in results for t in r["seq_scans"]})
+        problems = []
+        if seq_scans:
+            problems.append(f"seq scan on {', '.join(seq_scans)}")
+        if p50 > budget:
+            problems.append("p50 over budget")
+        if problems:
+            failures.append(name)
+        indexes = sorted({i for r in results for i in r["indexes"]})
+        print(f"{name:>22} | {p50:>8.2f} {max(r['ms'] for r in results):>8.2f} {budget:>7.1f} | "
+              f"{statistics.median(r['shared_hit'] for r in results):>7.0f} "
+              f"{statistics.median(r['shared_read'] for r in results):>7.0f} | "
+              f"{'FAIL' if problems else 'ok':<6} {'; '.join(problems) or ', '.join(indexes)}")
+
+    if not args.keep:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+    engine.dispose()
+
+    if failures:
+        print(f"\nFAILED: {', '.join(failures)}")
+        sys.exit(1)
+    print("\nOK: every hot query uses an index and stays within its budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,375 @@
+# --- File: benchmarks/synthetic_bank.py ---
+"""
+Synthetic bank generator for load and plan testing.
+
+    python -m benchmarks.synthetic_bank --database-url postgresql+psycopg2://... \
+        --customers 100000 --transactions-per-account 60 --seed 1
+    python -m benchmarks.synthetic_bank ... \
+        --behavior-database-url sqlite:///../bank-app-frontend/behaviour_analysis/behavioral_analysis.db
+
+Generates, with vectorized NumPy sampling:
+
+  app_data      one row per customer (UUID customer ids, unique phone/aadhaar)
+  account       1-3 accounts per customer, log-normal balances
+  transactions  over-dispersed counts per account; dates follow weekday and
+                hour-of-day weights over the last --days days; 85% of an
+                account's payments go to its three "home" terminals, the rest
+                to terminals drawn by Zipf-like popularity; fraud labels at
+                --fraud-rate, concentrated on large, night-time and
+                non-home-terminal debits
+  passkeys      0-2 per customer (random key material, not usable for login)
+  accounts      the core-banking KYC rows (--core-accounts, table must exist)
+  user_behavior behaviour-analysis sessions around a per-customer baseline,
+                with a share of outlier sessions (--behavior-database-url)
+
+Postgres tables are bulk-loaded with COPY, other databases with executemany.
+The same --seed and --end always produce the same data. To add to an existing
+dataset, use another --seed and an --offset past the customers already
+generated (phone, aadhaar and account numbers are derived from it).
+Transactions are generated and loaded --chunk-accounts accounts at a time, so
+memory stays flat at any size. Target throughput: 1M rows per minute or more.
+"""
+import argparse
+import io
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List
+
+import numpy as np
+from sqlalchemy import Column, DateTime, Float, Integer, MetaData, String, Table, create_engine, insert, inspect
+
+from app.db.base import Base
+from app.db.indexes import core_accounts
+from app.db.models.user import Account, AppData, Passkey, Transaction
+
+FIRST_NAMES = np.array(["Aarav", "Vivaan", "Aditya", "Ananya", "Diya", "Ishaan", "Kavya", "Rohan", "Saanvi",
+                        "Arjun", "Meera", "Kabir", "Priya", "Rahul", "Neha", "Vikram", "Pooja", "Karan"])
+LAST_NAMES = np.array(["Sharma", "Verma", "Iyer", "Reddy", "Nair", "Gupta", "Patel", "Singh", "Rao",
+                       "Menon", "Das", "Joshi", "Kulkarni", "Chopra", "Bose", "Mehta"])
+DEBIT_DESCRIPTIONS = np.array(["UPI to Zomato", "ATM Withdrawal", "Netflix Subscription", "Rent Payment",
+                               "Electricity Bill", "Mobile Recharge", "Online Shopping", "Insurance Premium",
+                               "Grocery Store", "Fuel Station", "UPI Transfer"])
+CREDIT_DESCRIPTIONS = np.array(["Salary Credit", "Interest Credit", "Dividend Credit", "Refund Credit",
+                                "UPI Received"])
+
+# Relative transaction volume per hour of day and per weekday (Monday first)
+HOURLY_WEIGHTS = np.array([0.3, 0.15, 0.1, 0.1, 0.15, 0.3, 0.8, 1.5, 2.2, 2.6, 3.0, 3.2,
+                           3.3, 3.0, 2.7, 2.6, 2.7, 3.0, 3.4, 3.6, 3.2, 2.4, 1.5, 0.7])
+WEEKDAY_WEIGHTS = np.array([1.0, 1.0, 1.0, 1.05, 1.2, 0.9, 0.75])
+
+# The behaviour-analysis app's table (it lives in that app's own database)
+user_behavior = Table(
+    "user_behavior", MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("customer_unique_id", String(36), nullable=False),
+    Column("session_id", String(36), unique=True),
+    Column("flight_avg", Float, nullable=False),
+    Column("traj_avg", Float, nullable=False),
+    Column("typing_speed", Float, nullable=False),
+    Column("correction_rate", Float, nullable=False),
+    Column("clicks_per_minute", Float, nullable=False),
+    Column("created_at", DateTime),
+)
+
+
+def _uuids(rng: np.random.Generator, n: int) -> np.ndarray:
+    raw = rng.bytes(16 * n)
+    return np.array([str(uuid.UUID(bytes=raw[i:i + 16], version=4)) for i in range(0, 16 * n, 16)])
+
+
+def _hex_bytes(rng: np.random.Generator, n: int, size: int) -> List[bytes]:
+    raw = rng.bytes(n * size)
+    return [raw[i:i + size] for i in range(0, n * size, size)]
+
+
+def _timestamps(rng: np.random.Generator, n: int, start: np.datetime64, days: int) -> np.ndarray:
+    """`n` timestamps in [start, start + days), weighted by weekday and hour of day."""
+    weekday_of_start = (start.astype("datetime64[D]").view("int64") - 4) % 7  # 1970-01-01 was a Thursday
+    day_weights = WEEKDAY_WEIGHTS[(weekday_of_start + np.arange(days)) % 7]
+    day = rng.choice(days, n, p=day_weights / day_weights.sum())
+    hour = rng.choice(24, n, p=HOURLY_WEIGHTS / HOURLY_WEIGHTS.sum())
+    seconds = day * 86400 + hour * 3600 + rng.integers(0, 3600, n)
+    return start + seconds.astype("timedelta64[s]")
+
+
+class SyntheticBank:
+    """Samples every table from one seeded generator; each method returns column arrays."""
+
+    def __init__(self, seed: int, customers: int, offset: int, days: int, transactions_per_account: float,
+                 terminals: int, fraud_rate: float, sessions_per_customer: float, end: datetime = None):
+        self.rng = np.random.default_rng(seed)
+        self.customers = customers
+        self.offset = offset
+        self.days = days
+        self.transactions_per_account = transactions_per_account
+        self.terminals = terminals
+        self.fraud_rate = fraud_rate
+        self.sessions_per_customer = sessions_per_customer
+        end = end or datetime.now(timezone.utc)
+        self.end = np.datetime64(end.astimezone(timezone.utc).replace(tzinfo=None), "s")
+        self.start = self.end - np.timedelta64(days, "D")
+        ranks = np.arange(1, terminals + 1)
+        self.terminal_popularity = ranks ** -1.1 / (ranks ** -1.1).sum()
+
+    def app_data(self) -> Dict[str, np.ndarray]:
+        rng, n = self.rng, self.customers
+        index = self.offset + np.arange(n)
+        first = rng.choice(FIRST_NAMES, n)
+        last = rng.choice(LAST_NAMES, n)
+        self.customer_ids = _uuids(rng, n)
+        self.customer_phones = np.char.add("9", np.char.zfill(index.astype(str), 9))
+        self.customer_names = np.char.add(np.char.add(first, " "), last)
+        self.customer_emails = np.char.add(np.char.add(np.char.lower(first), np.char.add(".", index.astype(str))),
+                                           "@example.com")
+        self.customer_aadhaar = (100000000000 + index).astype(str)
+        self.customer_dob = np.datetime64("1950-01-01") + rng.integers(0, 55 * 365, n).astype("timedelta64[D]")
+        return {
+            "customer_id": self.customer_ids,
+            "name": self.customer_names,
+            "phone_number": self.customer_phones,
+            "email": self.customer_emails,
+            "aadhaar_number": self.customer_aadhaar,
+            "date_of_birth": self.customer_dob,
+            "app_access_revoked": np.zeros(n, dtype=bool),
+            "no_of_logged_in_devices": rng.integers(1, 3, n),
+            "is_restoration_limited": np.zeros(n, dtype=bool),
+            "restoration_daily_limit": np.full(n, 5000.0),
+            "restoration_spent": np.zeros(n),
+            "failed_login_attempts": np.zeros(n, dtype=np.int64),
+            "seedkey_failed_attempts": np.zeros(n, dtype=np.int64),
+        }
+
+    def core_accounts(self) -> Dict[str, np.ndarray]:
+        return {
+            "customer_unique_id": self.customer_ids,
+            "phone_number": self.customer_phones,
+            "is_registeredinapp": self.rng.random(self.customers) < 0.9,
+        }
+
+    def accounts(self) -> Dict[str, np.ndarray]:
+        rng = self.rng
+        per_customer = rng.choice([1, 2, 3], self.customers, p=[0.55, 0.35, 0.10])
+        n = int(per_customer.sum())
+        owner = np.repeat(np.arange(self.customers), per_customer)
+        first_index = self.offset * 3
+        self.account_numbers = np.char.add("ACC", (9000000000 + first_index + np.arange(n)).astype(str))
+        return {
+            "account_number": self.account_numbers,
+            "customer_id": self.customer_ids[owner],
+            "account_type": rng.choice(["Savings", "Current"], n, p=[0.8, 0.2]),
+            "balance": np.round(np.minimum(rng.lognormal(np.log(40000), 1.2, n), 9999999), 2),
+            "pin_attempts": np.zeros(n, dtype=np.int64),
+        }
+
+    def transactions(self, accounts: slice) -> Dict[str, np.ndarray]:
+        """Transactions of one block of accounts."""
+        rng = self.rng
+        account_numbers = self.account_numbers[accounts]
+        n_accounts = len(account_numbers)
+        # Gamma-Poisson mixture: most accounts are quiet, a few are very busy
+        counts = rng.poisson(rng.gamma(2.0, self.transactions_per_account / 2.0, n_accounts))
+        owner = np.repeat(np.arange(n_accounts), counts)
+        n = len(owner)
+
+        home = rng.choice(self.terminals, (n_accounts, 3), p=self.terminal_popularity)
+        at_home = rng.random(n) < 0.85
+        terminal = np.where(at_home, home[owner, rng.integers(0, 3, n)],
+                            rng.choice(self.terminals, n, p=self.terminal_popularity))
+
+        dates = _timestamps(rng, n, self.start, self.days)
+        is_debit = rng.random(n) < 0.75
+        amount = np.where(is_debit, rng.lognormal(np.log(600), 1.0, n), rng.lognormal(np.log(8000), 0.9, n))
+        amount = np.round(np.clip(amount, 10, 2000000), 2)
+
+        # Fraud: debits only, more likely when large, at night or away from home terminals
+        hour = (dates.astype("datetime64[h]").view("int64")) % 24
+        risk = is_debit * (1.0 + 3.0 * (amount > 10000) + 2.0 * (hour < 5) + 2.0 * ~at_home)
+        fraud_p = np.clip(self.fraud_rate * risk / max(risk.mean(), 1e-9), 0, 1)
+
+        return {
+            "account_number": account_numbers[owner],
+            "terminal_id": np.char.add("terminal_", terminal.astype(str)),
+            "date": dates,
+            "description": np.where(is_debit, rng.choice(DEBIT_DESCRIPTIONS, n), rng.choice(CREDIT_DESCRIPTIONS, n)),
+            "amount": amount,
+            "type": np.where(is_debit, "debit", "credit"),
+            "is_fraud": rng.random(n) < fraud_p,
+            "is_reauth_transaction": np.zeros(n, dtype=bool),
+        }
+
+    def passkeys(self) -> Dict[str, np.ndarray]:
+        rng = self.rng
+        per_customer = rng.choice([0, 1, 2], self.customers, p=[0.3, 0.5, 0.2])
+        n = int(per_customer.sum())
+        credential_ids = np.empty(n, dtype=object)
+        credential_ids[:] = _hex_bytes(rng, n, 32)
+        public_keys = np.empty(n, dtype=object)
+        public_keys[:] = _hex_bytes(rng, n, 77)
+        return {
+            "customer_id": self.customer_ids[np.repeat(np.arange(self.customers), per_customer)],
+            "credential_id": credential_ids,
+            "public_key": public_keys,
+            "sign_count": rng.integers(0, 500, n),
+        }
+
+    def behavior_sessions(self, customers: slice = slice(None), per_customer: float = None) -> Dict[str, np.ndarray]:
+        """Sessions of `customers` (all by default), `per_customer` on average (default --sessions-per-customer)."""
+        rng = self.rng
+        customer_ids = self.customer_ids[customers]
+        c = len(customer_ids)
+        per_customer = rng.poisson(per_customer or self.sessions_per_customer, c)
+        owner = np.repeat(np.arange(c), per_customer)
+        n = len(owner)
+        # Per-customer baseline, per-session noise, and ~2% sessions from someone else
+        baseline = np.column_stack([
+            rng.normal(120, 25, c), rng.normal(300, 80, c), rng.normal(4.5, 1.2, c),
+            rng.beta(2, 30, c), rng.normal(25, 7, c),
+        ])
+        metrics = baseline[owner] * rng.normal(1.0, 0.1, (n, 5))
+        outlier = rng.random(n) < 0.02
+        metrics[outlier] = baseline[rng.integers(0, c, int(outlier.sum()))] * rng.normal(1.4, 0.3, (int(outlier.sum()), 5))
+        metrics = np.abs(metrics)
+        return {
+            "customer_unique_id": customer_ids[owner],
+            "session_id": _uuids(rng, n),
+            "flight_avg": np.round(metrics[:, 0], 3),
+            "traj_avg": np.round(metrics[:, 1], 3),
+            "typing_speed": np.round(metrics[:, 2], 3),
+            "correction_rate": np.round(metrics[:, 3], 4),
+            "clicks_per_minute": np.round(metrics[:, 4], 3),
+            "created_at": _timestamps(rng, n, self.start, self.days),
+        }
+
+
+class BulkLoader:
+    """COPY into Postgres; executemany in batches elsewhere."""
+
+    EXECUTEMANY_BATCH = 10000
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.is_postgres = engine.dialect.name == "postgresql"
+
+    @staticmethod
+    def _copy_text(values: np.ndarray) -> List[str]:
+        if values.dtype == bool:
+            return np.where(values, "t", "f").tolist()
+        if np.issubdtype(values.dtype, np.datetime64):
+            if values.dtype == np.dtype("datetime64[D]"):
+                return np.datetime_as_string(values).tolist()
+            return np.char.add(np.datetime_as_string(values, unit="s"), "+00").tolist()
+        if values.dtype == object:
+            # bytea in COPY text format: \x followed by hex, backslash escaped
+            return ["\\N" if v is None else "\\\\x" + v.hex() if isinstance(v, bytes) else str(v) for v in values]
+        return values.astype(str).tolist()
+
+    @staticmethod
+    def _python(values: np.ndarray) -> list:
+        if values.dtype == np.dtype("datetime64[D]"):
+            return values.astype(object).tolist()
+        if np.issubdtype(values.dtype, np.datetime64):
+            return values.astype("datetime64[us]").astype(object).tolist()
+        return values.tolist()
+
+    def load(self, table, data: Dict[str, np.ndarray]) -> int:
+        columns = list(data)
+        n = len(data[columns[0]])
+        if not n:
+            return 0
+        if self.is_postgres:
+            buffer = io.StringIO()
+            text_columns = [self._copy_text(data[c]) for c in columns]
+            buffer.write("\n".join("\t".join(row) for row in zip(*text_columns)))
+            buffer.write("\n")
+            buffer.seek(0)
+            raw = self.engine.raw_connection()
+            try:
+                with raw.cursor() as cursor:
+                    cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN", buffer)
+                raw.commit()
+            finally:
+                raw.close()
+            return n
+
+        py_columns = [self._python(data[c]) for c in columns]
+        rows = [dict(zip(columns, values)) for values in zip(*py_columns)]
+        with self.engine.begin() as conn:
+            for i in range(0, n, self.EXECUTEMANY_BATCH):
+                conn.execute(insert(table), rows[i:i + self.EXECUTEMANY_BATCH])
+        return n
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--behavior-database-url", default=None,
+                        help="behaviour-analysis database for user_behavior sessions (skipped if not given)")
+    parser.add_argument("--customers", type=int, default=10000)
+    parser.add_argument("--offset", type=int, default=0, help="index of the first customer (for unique numbers)")
+    parser.add_argument("--transactions-per-account", type=float, default=60.0)
+    parser.add_argument("--days", type=int, default=395)
+    parser.add_argument("--end", type=datetime.fromisoformat, default=None,
+                        help="end of the generated period, ISO date (default: now; fix it for identical reruns)")
+    parser.add_argument("--terminals", type=int, default=20000)
+    parser.add_argument("--fraud-rate", type=float, default=0.002)
+    parser.add_argument("--sessions-per-customer", type=float, default=8.0)
+    parser.add_argument("--chunk-accounts", type=int, default=20000, help="accounts per transactions chunk")
+    parser.add_argument("--core-accounts", action="store_true",
+                        help="also fill the core-banking `accounts` table (must already exist)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(engine, tables=[AppData.__table__, Account.__table__, Transaction.__table__,
+                                             Passkey.__table__])
+    loader = BulkLoader(engine)
+    bank = SyntheticBank(args.seed, args.customers, args.offset, args.days, args.transactions_per_account,
+                         args.terminals, args.fraud_rate, args.sessions_per_customer,
+                         args.end.replace(tzinfo=args.end.tzinfo or timezone.utc) if args.end else None)
+
+    totals = {}
+    started = time.perf_counter()
+
+    def timed(name, table, generate):
+        t0 = time.perf_counter()
+        rows = loader.load(table, generate())
+        totals[name] = totals.get(name, 0) + rows
+        return rows, time.perf_counter() - t0
+
+    for name, table, generate in (("app_data", AppData.__table__, bank.app_data),
+                                  ("account", Account.__table__, bank.accounts),
+                                  ("passkeys", Passkey.__table__, bank.passkeys)):
+        rows, seconds = timed(name, table, generate)
+        print(f"{name:>14} {rows:>11,} rows in {seconds:6.1f}s")
+
+    if args.core_accounts and inspect(engine).has_table("accounts"):
+        rows, seconds = timed("accounts", core_accounts, bank.core_accounts)
+        print(f"{'accounts':>14} {rows:>11,} rows in {seconds:6.1f}s")
+
+    account_count = len(bank.account_numbers)
+    t0 = time.perf_counter()
+    for first in range(0, account_count, args.chunk_accounts):
+        block = slice(first, min(first + args.chunk_accounts, account_count))
+        timed("transactions", Transaction.__table__, lambda: bank.transactions(block))
+        elapsed = time.perf_counter() - t0
+        print(f"{'transactions':>14} {totals['transactions']:>11,} rows in {elapsed:6.1f}s "
+              f"({totals['transactions'] / elapsed:,.0f} rows/s)", end="\r")
+    print()
+
+    if args.behavior_database_url:
+        behavior_engine = create_engine(args.behavior_database_url)
+        user_behavior.metadata.create_all(behavior_engine)
+        rows = BulkLoader(behavior_engine).load(user_behavior, bank.behavior_sessions())
+        totals["user_behavior"] = rows
+        print(f"{'user_behavior':>14} {rows:>11,} rows")
+        behavior_engine.dispose()
+
+    elapsed = time.perf_counter() - started
+    total = sum(totals.values())
+    print(f"\n{total:,} rows in {elapsed:.1f}s: {total / elapsed * 60:,.0f} rows per minute (seed {args.seed})")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
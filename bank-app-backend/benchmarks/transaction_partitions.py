@@ -0,0 +1,225 @@
+# --- File: benchmarks/transaction_partitions.py ---
+"""
+Feature-query and insert latency on a heap vs a monthly-partitioned
+transactions table at 10M+ rows (Postgres only).
+
+    python -m benchmarks.transaction_partitions --database-url postgresql+psycopg2://... \
+        --rows 10000000 --months 36
+
+Builds two tables with the columns and indexes of `transactions` in the
+bench_partitions schema, loaded with the same rows spread evenly over the
+last `--months` months:
+
+  heap         one table, like `transactions` before partitioning
+  partitioned  PARTITION BY RANGE (date), one partition per month
+
+and measures, over random accounts and terminals:
+
+  customer/terminal features   the 1/7/30-day aggregates of feature_service,
+                               both in the previous shape (no date bound in the
+                               WHERE clause, every month is read) and with the
+                               30-day bound (partition pruning: 1-2 partitions)
+  insert                       single-row committed inserts at the current date,
+                               and 1000-row batches
+
+and the number of partitions the bounded query plans touch. Loading 10M rows
+takes a few minutes; --keep leaves the schema in place and later runs with the
+same --rows/--months reuse it.
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, text
+
+from app.services.transaction_partition_service import add_months, month_start
+
+SCHEMA = "bench_partitions"
+LOAD_CHUNK = 1000000
+
+COLUMNS = """
+    id bigint NOT NULL DEFAULT nextval('{schema}.txn_id_seq'),
+    account_number varchar NOT NULL,
+    terminal_id varchar NOT NULL,
+    date timestamptz NOT NULL,
+    description varchar NOT NULL,
+    amount numeric(10, 2) NOT NULL,
+    type varchar NOT NULL,
+    is_fraud boolean NOT NULL,
+    is_reauth_transaction boolean NOT NULL
+"""
+
+CUSTOMER_FEATURES = """
+SELECT count(CASE WHEN date >= :d1 THEN id END), avg(CASE WHEN date >= :d1 THEN abs(amount) END),
+       count(CASE WHEN date >= :d7 THEN id END), avg(CASE WHEN date >= :d7 THEN abs(amount) END),
+       count(CASE WHEN date >= :d30 THEN id END), avg(CASE WHEN date >= :d30 THEN abs(amount) END)
+FROM {table} WHERE account_number = :key AND type = 'debit' {bound}
+"""
+
+TERMINAL_FEATURES = """
+SELECT count(CASE WHEN date >= :d1 THEN id END), sum(CASE WHEN is_fraud THEN 1 ELSE 0 END) FILTER (WHERE date >= :d1),
+       count(CASE WHEN date >= :d7 THEN id END), sum(CASE WHEN is_fraud THEN 1 ELSE 0 END) FILTER (WHERE date >= :d7),
+       count(CASE WHEN date >= :d30 THEN id END), sum(CASE WHEN is_fraud THEN 1 ELSE 0 END) FILTER (WHERE date >= :d30)
+FROM {table} WHERE terminal_id = :key {bound}
+"""
+
+INSERT = """
+INSERT INTO {table} (account_number, terminal_id, date, description, amount, type, is_fraud, is_reauth_transaction)
+VALUES (:account, :terminal, now(), 'Benchmark', :amount, 'debit', false, false)
+"""
+
+
+def build(engine, rows: int, months: int, accounts: int, terminals: int) -> None:
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        conn.execute(text(f"CREATE SEQUENCE {SCHEMA}.txn_id_seq"))
+        columns = COLUMNS.format(schema=SCHEMA)
+        conn.execute(text(f"CREATE TABLE {SCHEMA}.heap ({columns}, PRIMARY KEY (id))"))
+        conn.execute(text(
+            f"CREATE TABLE {SCHEMA}.partitioned ({columns}, PRIMARY KEY (id, date)) PARTITION BY RANGE (date)"
+        ))
+        first = add_months(month_start(datetime.now(timezone.utc)), -months)
+        for i in range(months + 2):
+            month = add_months(first, i)
+            conn.execute(text(
+                f"CREATE TABLE {SCHEMA}.p{month:%Y_%m} PARTITION OF {SCHEMA}.partitioned"
+                f" FOR VALUES FROM ('{month} 00:00:00+00') TO ('{add_months(month, 1)} 00:00:00+00')"
+            ))
+        conn.execute(text(f"CREATE TABLE {SCHEMA}.p_default PARTITION OF {SCHEMA}.partitioned DEFAULT"))
+
+    started = time.perf_counter()
+    for offset in range(0, rows, LOAD_CHUNK):
+        with engine.begin() as conn:
+            conn.execute(text(
+                f"INSERT INTO {SCHEMA}.heap (account_number, terminal_id, date, description, amount, type,"
+                f" is_fraud, is_reauth_transaction)"
+                f" SELECT 'BENCHACC' || (g % :accounts), 'terminal_' || (g % :terminals),"
+                f" now() - random() * make_interval(days => :days), 'Benchmark transaction',"
+                f" round((random() * 2500)::numeric, 2), CASE WHEN g % 4 = 0 THEN 'credit' ELSE 'debit' END,"
+                f" random() < 0.001, false"
+                f" FROM generate_series(:lo, :hi) g"
+            ), {"accounts": accounts, "terminals": terminals, "days": months * 30,
+                "lo": offset + 1, "hi": min(offset + LOAD_CHUNK, rows)})
+        print(f"  loaded {min(offset + LOAD_CHUNK, rows):>11,} rows ({time.perf_counter() - started:.0f}s)")
+
+    with engine.begin() as conn:
+        conn.execute(text(f"INSERT INTO {SCHEMA}.partitioned SELECT * FROM {SCHEMA}.heap"))
+        for table in ("heap", "partitioned"):
+            conn.execute(text(f"CREATE INDEX ON {SCHEMA}.{table} (terminal_id)"))
+            conn.execute(text(f"CREATE INDEX ON {SCHEMA}.{table} (account_number, date, id)"))
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text(f"VACUUM ANALYZE {SCHEMA}.heap"))
+        conn.execute(text(f"VACUUM ANALYZE {SCHEMA}.partitioned"))
+    print(f"  built both tables in {time.perf_counter() - started:.0f}s")
+
+
+def existing_rows(engine) -> int:
+    with engine.connect() as conn:
+        if not conn.execute(text(f"SELECT to_regclass('{SCHEMA}.heap') IS NOT NULL")).scalar():
+            return -1
+        # Rows added by the insert timings of earlier runs are not counted
+        return conn.execute(text(
+            f"SELECT count(*) FROM {SCHEMA}.heap WHERE description = 'Benchmark transaction'"
+        )).scalar()
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return statistics.median(samples), samples[min(len(samples) - 1, int(0.99 * len(samples)))]
+
+
+def time_queries(engine, sql: str, keys, windows) -> tuple:
+    latencies = []
+    with engine.connect() as conn:
+        for key in keys:
+            started = time.perf_counter()
+            conn.execute(text(sql), {"key": key, **windows}).one()
+            latencies.append((time.perf_counter() - started) * 1000)
+    return percentiles(latencies)
+
+
+def partitions_scanned(engine, sql: str, key: str, windows) -> int:
+    with engine.connect() as conn:
+        plan = conn.execute(text("EXPLAIN (FORMAT JSON) " + sql), {"key": key, **windows}).scalar()
+
+    def count(node) -> int:
+        own = 1 if node.get("Relation Name", "").startswith("p") and "Scan" in node.get("Node Type", "") else 0
+        return own + sum(count(child) for child in node.get("Plans", []))
+
+    return count(plan[0]["Plan"])
+
+
+def time_inserts(engine, table: str, count: int, accounts: int, terminals: int) -> tuple:
+    latencies = []
+    sql = text(INSERT.format(table=f"{SCHEMA}.{table}"))
+    with engine.connect() as conn:
+        for _ in range(count):
+            params = {"account": f"BENCHACC{random.randrange(accounts)}",
+                      "terminal": f"terminal_{random.randrange(terminals)}", "amount": 10}
+            started = time.perf_counter()
+            conn.execute(sql, params)
+            conn.commit()
+            latencies.append((time.perf_counter() - started) * 1000)
+
+        batch = [{"account": f"BENCHACC{random.randrange(accounts)}",
+                  "terminal": f"terminal_{random.randrange(terminals)}", "amount": 10} for _ in range(1000)]
+        started = time.perf_counter()
+        for _ in range(5):
+            conn.execute(sql, batch)
+            conn.commit()
+        batch_rate = 5000 / (time.perf_counter() - started)
+    return (*percentiles(latencies), batch_rate)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--rows", type=int, default=10000000)
+    parser.add_argument("--months", type=int, default=36)
+    parser.add_argument("--accounts", type=int, default=200000)
+    parser.add_argument("--terminals", type=int, default=10000)
+    parser.add_argument("--queries", type=int, default=300, help="feature queries per table and shape")
+    parser.add_argument("--inserts", type=int, default=2000, help="single-row inserts per table")
+    parser.add_argument("--keep", action="store_true", help="keep the benchmark schema for later runs")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    if engine.dialect.name != "postgresql":
+        parser.error("partitioning needs Postgres")
+
+    if existing_rows(engine) != args.rows:
+        print(f"Building {args.rows:,} rows over {args.months} months in schema {SCHEMA}")
+        build(engine, args.rows, args.months, args.accounts, args.terminals)
+    else:
+        print(f"Reusing {args.rows:,} rows in schema {SCHEMA}")
+
+    now = datetime.now(timezone.utc)
+    windows = {"d1": now - timedelta(days=1), "d7": now - timedelta(days=7), "d30": now - timedelta(days=30)}
+    accounts = [f"BENCHACC{random.randrange(args.accounts)}" for _ in range(args.queries)]
+    terminals = [f"terminal_{random.randrange(args.terminals)}" for _ in range(args.queries)]
+
+    print(f"\n{'query':>18} {'table':>12} {'date bound':>10} | {'p50 ms':>8} {'p99 ms':>8} | {'partitions':>10}")
+    for label, template, keys in (("customer features", CUSTOMER_FEATURES, accounts),
+                                  ("terminal features", TERMINAL_FEATURES, terminals)):
+        for table, bounded in (("heap", False), ("heap", True), ("partitioned", False), ("partitioned", True)):
+            sql = template.format(table=f"{SCHEMA}.{table}", bound="AND date >= :d30" if bounded else "")
+            p50, p99 = time_queries(engine, sql, keys, windows)
+            scanned = partitions_scanned(engine, sql, keys[0], windows) if table == "partitioned" else "-"
+            print(f"{label:>18} {table:>12} {'yes' if bounded else 'no':>10} | {p50:>8.2f} {p99:>8.2f} | {scanned:>10}")
+
+    print(f"\n{'insert':>18} {'table':>12} | {'p50 ms':>8} {'p99 ms':>8} | {'batch rows/s':>12}")
+    for table in ("heap", "partitioned"):
+        p50, p99, rate = time_inserts(engine, table, args.inserts, args.accounts, args.terminals)
+        print(f"{'single row':>18} {table:>12} | {p50:>8.2f} {p99:>8.2f} | {rate:>12.0f}")
+
+    if not args.keep:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,19 @@
 # --- File: bank-app-backend/main.py ---
 from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+import sys
+import time
 import uvicorn 
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.db.base import Base, engine
+from app.db.base import Base, engine, read_router, replicas
+from app.db import replicas as replicas_module
+from app.db import query_counter as query_counter_module
+from app.db.async_base import dispose_async_engine
+from app.db.columns import add_missing_columns
+from bank_common.timing import begin_request
+from app.core.access_log import access_log
+from app.core.readiness import readiness
 
 # Import all routers
 from app.api.api_v1.endpoints import (
@@ -14,14 +24,23 @@ from app.api.api_v1.endpoints import (
     login,
     transactions,
     location,
-    app_data
+    app_data,
+    retention,
+    statements,
+    metrics
 )
 # Import all models to ensure tables are created
-from app.db.models import user as user_models, challenge as challenge_model,features as features_model
+from app.db.models import user as user_models, challenge as challenge_model,features as features_model, stats as stats_model, export as export_model, idempotency as idempotency_model, archive as archive_model
+from app.services.location_service import UserLocation
 
-user_models.Base.metadata.create_all(bind=engine)
-challenge_model.Base.metadata.create_all(bind=engine)
-features_model.Base.metadata.create_all(bind=engine)
+def create_tables():
+    """
+    Create missing tables (startup, not import): the shared Base and the challenge
+    model's own Base, then add columns introduced since a table was created.
+    """
+    Base.metadata.create_all(bind=engine)
+    challenge_model.Base.metadata.create_all(bind=engine)
+    add_missing_columns(engine)
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -32,30 +51,34 @@ app = FastAPI(
 app.include_router(location.router, prefix=settings.API_V1_STR, tags=["Location Tracking"])
 app.include_router(account.router, prefix=settings.API_V1_STR, tags=["Account Management"])
 
-# Also ensure the UserLocation table is created
-from app.services.location_service import UserLocation
-UserLocation.metadata.create_all(bind=engine)
+# Per-request SQL statement counts (X-DB-Query-Count header)
+query_counter_module.install(engine)
+for replica in replicas:
+    query_counter_module.install(replica.engine)
 
-# --- THIS IS THE DEFINITIVE DEBUGGING MIDDLEWARE ---
+# --- ACCESS LOG / REQUEST METRICS MIDDLEWARE ---
 @app.middleware("http")
 async def log_every_request(request: Request, call_next):
     """
-    This middleware intercepts EVERY request before it hits the endpoint logic.
-    It will run and print details for both the OPTIONS and POST requests.
+    Times every request into the per-route metrics and writes a sampled,
+    single-line access log record (see app/core/access_log.py).
     """
-    print("\n=============================================")
-    print("======= MIDDLEWARE: REQUEST RECEIVED ========")
-    print(f"METHOD: {request.method}")
-    print(f"URL: {request.url}")
-    print("HEADERS:")
-    for name, value in request.headers.items():
-        print(f"  {name}: {value}")
-    
-    response = await call_next(request)
-    
-    print("======= MIDDLEWARE: RESPONSE SENT ===========")
-    print(f"STATUS CODE: {response.status_code}")
-    print("=============================================\n")
+    started = time.perf_counter()
+    query_counter = query_counter_module.start()
+    timings = begin_request()
+    db_writes = replicas_module.begin_request()
+    try:
+        response = await call_next(request)
+    except Exception:
+        access_log.record(request, 500, (time.perf_counter() - started) * 1000, db_queries=query_counter.count)
+        raise
+    response.headers["X-DB-Query-Count"] = str(query_counter.count)
+    read_router.finish_request(request, response, db_writes)
+    if settings.SERVER_TIMING_ENABLED:
+        server_timing = timings.server_timing()
+        if server_timing:
+            response.headers["Server-Timing"] = server_timing
+    access_log.record(request, response.status_code, (time.perf_counter() - started) * 1000, db_queries=query_counter.count)
     return response
 # --------------------------------------------------------
 
@@ -68,10 +91,65 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+from app.services.retention_service import retention_scheduler
+from app.services.location_stats_service import location_stats
+from app.services.device_event_service import device_event_buffer
+from app.services.statement_export_service import statement_exports
+from app.services.balance_service import balance_engine, ledger_folder
+from app.services.transaction_partition_service import transaction_partitions
+from app.services.fraud_service import fraud_predictor
+from app.services import twilio_client
+
+# Heavy subsystems: warmed in the background after startup (see app/core/readiness.py)
+if settings.STARTUP_WARMUP:
+    readiness.register("fraud_model", warm=fraud_predictor.warm_up, is_warm=lambda: fraud_predictor.models_loaded)
+    readiness.register("twilio", warm=twilio_client.warm_up, is_warm=lambda: "twilio.rest" in sys.modules,
+                       required=False)
+else:
+    readiness.register("fraud_model", is_warm=lambda: fraud_predictor.models_loaded, required=False)
+    readiness.register("twilio", is_warm=lambda: "twilio.rest" in sys.modules, required=False)
+readiness.register("signature", is_warm=lambda: "cv2" in sys.modules, required=False)
+
+@app.on_event("startup")
+def start_background_jobs():
+    if settings.DB_CREATE_ALL_ON_STARTUP:
+        create_tables()
+    access_log.start()
+    read_router.start()
+    transaction_partitions.startup()
+    location_stats.warm_in_background()
+    device_event_buffer.start()
+    statement_exports.start()
+    if balance_engine.hot_accounts:
+        ledger_folder.start()
+    if settings.RETENTION_ENABLED:
+        retention_scheduler.start()
+    if settings.STARTUP_WARMUP:
+        readiness.warm_in_background()
+
+@app.on_event("shutdown")
+def stop_background_jobs():
+    retention_scheduler.stop()
+    device_event_buffer.stop()
+    statement_exports.stop()
+    ledger_folder.stop()
+    access_log.stop()
+    read_router.stop()
+
+@app.on_event("shutdown")
+async def close_async_engine():
+    await dispose_async_engine()
+
 @app.get("/", summary="Health Check")
 def read_root():
     return {"status": "Backend is running"}
 
+@app.get("/health/ready", summary="Readiness Check")
+def read_readiness():
+    """200 once every required subsystem is warm, 503 before; lists each subsystem's state."""
+    report = readiness.report()
+    return JSONResponse(status_code=200 if report["ready"] else 503, content=report)
+
 # Include all API routers
 # app.include_router(seedkey_auth.router, prefix=settings.API_V1_STR, tags=["Seedkey Authentication"])
 app.include_router(accounts.router, prefix=settings.API_V1_STR, tags=["Bank Accounts"])
@@ -80,6 +158,9 @@ app.include_router(login.router, prefix=settings.API_V1_STR, tags=["Login"])
 app.include_router(restore.router, prefix=settings.API_V1_STR, tags=["Restoration"])
 app.include_router(transactions.router, prefix=settings.API_V1_STR, tags=["Transactions"]) # MODIFIED: Include the new router
 app.include_router(app_data.router, prefix=settings.API_V1_STR, tags=["App Data Management"])
+app.include_router(retention.router, prefix=settings.API_V1_STR, tags=["Data Retention"])
+app.include_router(statements.router, prefix=settings.API_V1_STR, tags=["Statements"])
+app.include_router(metrics.router, prefix=settings.API_V1_STR, tags=["Metrics"])
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
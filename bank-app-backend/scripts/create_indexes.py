@@ -0,0 +1,45 @@
+# --- File: scripts/create_indexes.py ---
+"""
+Add the hot-query indexes (app/db/indexes.py) to an existing database
+without blocking writes, and drop the indexes they supersede. Columns added
+to existing tables (app/db/columns.py) are added first, as at app startup.
+
+    python -m scripts.create_indexes            # create what is missing
+    python -m scripts.create_indexes --check    # only list what is missing (exit 1 if any)
+    python -m scripts.create_indexes --keep-redundant
+
+Safe to re-run: existing valid indexes are skipped, and indexes left invalid
+by an interrupted run are rebuilt. Run from the backend directory with the
+usual .env present.
+"""
+import argparse
+import json
+import logging
+import sys
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true", help="list missing indexes and exit")
+    parser.add_argument("--keep-redundant", action="store_true", help="do not drop superseded indexes")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    from app.db.base import engine
+    from app.db.columns import add_missing_columns
+    from app.db.indexes import create_missing, missing_indexes
+
+    if args.check:
+        missing = missing_indexes(engine)
+        print(json.dumps({"missing": missing}, indent=2))
+        sys.exit(1 if missing else 0)
+
+    added_columns = add_missing_columns(engine)
+    if added_columns:
+        print(json.dumps({"added_columns": added_columns}, indent=2))
+    print(json.dumps(create_missing(engine, drop_redundant=not args.keep_redundant), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# --- File: scripts/import_profile.py ---
+"""
+Import-time profile of the backend app (what every worker pays before it
+can serve), with a budget check for CI.
+
+    python -m scripts.import_profile                       # top imports by cumulative time
+    python -m scripts.import_profile --budget-ms 3000 --output import-profile.json
+
+Runs `python -X importtime -c "import main"` in fresh interpreters
+(--repeat, best run kept) and fails (exit 1) when:
+
+  - importing main takes longer than --budget-ms, or
+  - a module that must load lazily (--lazy, default: torch, pandas, sklearn,
+    cv2, PIL, twilio.rest) is imported at startup
+
+Importing main needs the usual settings (.env or environment) but no
+database: tables are created at startup, not on import.
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_LAZY = "torch,pandas,sklearn,cv2,PIL,twilio.rest"
+
+
+def profile(module: str) -> List[Dict]:
+    """One fresh interpreter's -X importtime records: module, depth, self and cumulative ms."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-3000:]}")
+
+    records = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        records.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+        })
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    parser.add_argument("--lazy", default=DEFAULT_LAZY, help="comma-separated modules that must not load on import")
+    parser.add_argument("--output", default=None, help="write the profile as JSON")
+    args = parser.parse_args()
+
+    runs = [profile(args.module) for _ in range(args.repeat)]
+    records = min(runs, key=lambda run: next(r["cumulative_ms"] for r in run if r["module"] == args.module))
+    total_ms = next(r["cumulative_ms"] for r in records if r["module"] == args.module)
+    imported = {r["module"] for r in records}
+    eager = [name for name in args.lazy.split(",") if name and name in imported]
+
+    print(f"import {args.module}: {total_ms:.0f} ms (best of {args.repeat}), {len(records)} modules")
+    direct = sorted((r for r in records if r["depth"] == 1), key=lambda r: r["cumulative_ms"], reverse=True)
+    slowest = sorted(records, key=lambda r: r["self_ms"], reverse=True)
+    for title, key, rows in (("direct imports", "cumulative_ms", direct), ("slowest modules", "self_ms", slowest)):
+        print(f"\n{title} ({key.replace('_', ' ')}):")
+        for record in rows[:args.top]:
+            print(f"{record[key]:>10.1f}  {record['module']}")
+
+    failures = []
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        failures.append(f"import {args.module} took {total_ms:.0f} ms, budget {args.budget_ms:.0f} ms")
+    for name in eager:
+        record = next(r for r in records if r["module"] == name)
+        failures.append(f"{name} is imported at startup ({record['cumulative_ms']:.0f} ms); it must load lazily")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({
+            "module": args.module, "total_ms": total_ms, "modules": len(records),
+            "eager_lazy_modules": eager, "failures": failures, "records": records,
+        }, indent=2))
+
+    if failures:
+        print("\nFAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# --- File: scripts/partition_transactions.py ---
+"""
+Convert an existing heap `transactions` table to monthly range partitions,
+online, and optionally archive the months older than TRANSACTION_HOT_MONTHS.
+
+    python -m scripts.partition_transactions migrate --batch-size 50000
+    python -m scripts.partition_transactions archive
+    python -m scripts.partition_transactions status
+
+migrate copies the table into a partitioned shadow table in committed batches
+while the app keeps running, then takes a write lock for the final catch-up
+and the rename (see TransactionPartitionService.migrate). It can be re-run
+after an interruption and resumes where it stopped. The old table is kept as
+transactions_legacy unless --drop-legacy is given.
+
+archive runs the same maintenance as the retention scheduler: creates the
+upcoming partitions and moves old ones to the compressed archive tier.
+
+Run from the backend directory with the usual .env present.
+"""
+import argparse
+import json
+import logging
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["migrate", "archive", "status"])
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help="rows per copy transaction (default TRANSACTION_MIGRATION_BATCH_SIZE)")
+    parser.add_argument("--drop-legacy", action="store_true", help="drop the old heap table after the swap")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    from app.db.base import Base, SessionLocal, engine
+    from app.db.models import archive, user  # noqa: F401 (register the tables)
+    from app.services.transaction_partition_service import transaction_partitions
+
+    Base.metadata.create_all(engine, tables=[archive.TransactionArchiveMonth.__table__,
+                                             archive.TransactionArchiveChunk.__table__])
+
+    if args.command == "migrate":
+        report = transaction_partitions.migrate(args.batch_size, drop_legacy=args.drop_legacy)
+    else:
+        db = SessionLocal()
+        try:
+            if args.command == "archive":
+                report = transaction_partitions.maintain(db)
+            else:
+                report = transaction_partitions.status(db)
+        finally:
+            db.close()
+    print(json.dumps(report, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# --- File: scripts/publish_models.py ---
+"""
+Publish the fraud model artifacts (weights and scalers) to the shared model
+store (app/services/model_store.py) before the workers start, so they only
+map them; otherwise the first worker to load the models publishes them.
+
+    python -m scripts.publish_models            # publish what is missing or stale
+    python -m scripts.publish_models --force    # republish everything
+
+Run from the backend directory with the usual .env present, e.g. in the
+deploy step ahead of `uvicorn main:app --workers N`.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+
+ARTIFACTS = ["fraud_scaler_features", "fraud_scaler_error", "fraud_autoencoder", "fraud_classifier"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--force", action="store_true", help="republish even if the artifacts are current")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    from app.core.config import settings
+    from app.services.fraud_service import FraudPredictor
+    from app.services.model_store import model_store
+
+    if not settings.SHARED_MODEL_WEIGHTS:
+        print("SHARED_MODEL_WEIGHTS is off; workers load their own copies, nothing to publish")
+        return
+
+    if args.force:
+        for name in ARTIFACTS:
+            # Workers still mapping the old file keep it until they reload
+            if os.path.exists(model_store.path(name)):
+                os.unlink(model_store.path(name))
+
+    predictor = FraudPredictor()
+    try:
+        predictor.warm_up()
+    except RuntimeError as e:
+        print(f"Could not load the fraud models: {e}")
+        sys.exit(1)
+    if not predictor.shared_weights:
+        print("Models load on a GPU here; shared weights are CPU only, nothing published")
+        return
+
+    print(json.dumps({name: {"path": path, "bytes": os.path.getsize(path)}
+                      for name, path in model_store.attached().items()}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# --- File: scripts/worker_memory.py ---
+"""
+Memory of every worker of a running uvicorn (or gunicorn) master: private vs
+shared bytes per worker, and how much of each worker is model files mapped
+from the shared model store.
+
+    python -m scripts.worker_memory --pid <master pid>
+    python -m scripts.worker_memory --pid <master pid> --output memory.json
+
+PSS divides every shared page among the processes mapping it, so the PSS
+column adds up to what the master and its workers really occupy; the RSS
+column counts shared pages (libraries, mapped model weights) once per worker.
+Linux only (reads /proc).
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+from bank_common.memory import mapped_files, process_memory
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+COLUMNS = ("rss", "pss", "private", "shared")
+
+
+def children(pid: int):
+    """Direct child pids, from the parent field of /proc/<pid>/stat."""
+    found = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # pid (comm) state ppid ...; comm may contain spaces
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == pid:
+            found.append(int(entry))
+    return sorted(found)
+
+
+def measure(pid: int, models_dir: str) -> dict:
+    files = mapped_files([models_dir], pid) or {}
+    return {
+        "pid": pid,
+        "memory": process_memory(pid),
+        "models": {column: sum(f[column] for f in files.values()) for column in COLUMNS},
+        "model_files": files,
+    }
+
+
+def _mb(value: int) -> str:
+    return f"{value / 1048576:>12.1f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pid", type=int, required=True, help="uvicorn/gunicorn master process")
+    parser.add_argument("--models-dir", default=str(BACKEND_DIR / "app" / "ml_models"),
+                        help="mapped files under this directory count as model memory")
+    parser.add_argument("--output", default=None, help="write the measurements as JSON")
+    args = parser.parse_args()
+
+    if process_memory(args.pid) is None:
+        sys.exit(f"cannot read /proc/{args.pid}/smaps_rollup (not Linux, no such process, or no permission)")
+
+    processes = [dict(measure(args.pid, args.models_dir), role="master")]
+    processes += [dict(measure(pid, args.models_dir), role="worker") for pid in children(args.pid)]
+    processes = [p for p in processes if p["memory"] is not None]
+    totals = {column: sum(p["memory"][column] for p in processes) for column in COLUMNS}
+
+    headers = [f"{column} MB" for column in COLUMNS] + ["models rss MB", "models shr MB"]
+    print(f"{'role':<8}{'pid':>8}" + "".join(f"{header:>14}" for header in headers))
+    for p in processes:
+        values = [p["memory"][c] for c in COLUMNS] + [p["models"]["rss"], p["models"]["shared"]]
+        print(f"{p['role']:<8}{p['pid']:>8}" + "".join(f"  {_mb(value)}" for value in values))
+    print(f"{'total':<16}" + "".join(f"  {_mb(totals[c])}" for c in COLUMNS))
+    print(f"\nfootprint (sum of PSS): {totals['pss'] / 1048576:.1f} MB over {len(processes)} processes")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({"processes": processes, "totals": totals}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+# --- File: bank_common/__init__.py ---
+"""
+Code shared by bank-app-backend and the behaviour-analysis service.
+
+Both apps define a top-level `app` package and run as separate processes, so
+modules they have in common live here and each app installs this package
+(`-e` path entry in its requirements.txt). Nothing in it reads either app's
+settings; the apps build their configured instances from these classes.
+"""
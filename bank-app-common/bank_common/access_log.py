@@ -0,0 +1,188 @@
+# --- File: bank_common/access_log.py ---
+"""
+Access log and per-route request metrics for the HTTP middleware.
+
+Every request is counted into a per-(method, route) latency histogram and
+status-class counter (served by the metrics endpoint). A sample of requests,
+plus every 5xx and every slow request, is also written as one JSON line to
+the "access" logger. The request thread only puts the record on a bounded
+queue; a background writer thread serializes it and hands it to the logger,
+so the request path never blocks on stdout or pays for formatting. When the
+queue is full the record is dropped and counted instead.
+
+Only headers on the allow-list are logged, and credentials are never logged
+even if listed. Each app creates its own `access_log` instance from its
+ACCESS_LOG_* settings (app/core/access_log.py).
+"""
+import json
+import logging
+import queue
+import random
+import sys
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+from bank_common.timing import Histogram
+
+# Headers that are never written to the access log
+SENSITIVE_HEADERS = frozenset({"authorization", "cookie", "set-cookie", "proxy-authorization", "x-api-key"})
+
+# Route label for requests that matched no route (keeps the metric keys bounded)
+UNMATCHED_ROUTE = "<unmatched>"
+
+_encode = json.JSONEncoder(separators=(",", ":"), default=str).encode
+_STOP = object()
+
+
+class RouteStats:
+    __slots__ = ("latency", "statuses")
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.statuses: Dict[str, int] = {}
+
+    def to_dict(self) -> dict:
+        result = self.latency.to_dict()
+        result["statuses"] = dict(self.statuses)
+        return result
+
+
+class AccessLog:
+    def __init__(
+        self,
+        sample_rate: float,
+        slow_ms: float,
+        header_allowlist: Iterable[str],
+        queue_size: int = 10000,
+        logger_name: str = "access"
+    ):
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.header_allowlist = tuple(
+            h for h in (name.strip().lower() for name in header_allowlist)
+            if h and h not in SENSITIVE_HEADERS
+        )
+        self.dropped = 0
+        self._routes: Dict[Tuple[str, str], RouteStats] = {}
+        self._lock = threading.Lock()
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+        self.logger = logging.getLogger(logger_name)
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+
+    # -- writer thread --------------------------------------------------------
+
+    def start(self, stream=None) -> None:
+        """
+        Start the writer thread (idempotent). Unless logging has been configured
+        for the access logger already, records go to `stream` (default stdout).
+        """
+        with self._writer_lock:
+            if self._writer is not None:
+                return
+            if not self.logger.handlers:
+                handler = logging.StreamHandler(stream or sys.stdout)
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                self.logger.addHandler(handler)
+            self._writer = threading.Thread(target=self._run, name="access-log-writer", daemon=True)
+            self._writer.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Write out the queued records and stop the writer thread."""
+        with self._writer_lock:
+            if self._writer is None:
+                return
+            self._queue.put(_STOP)
+            self._writer.join(timeout)
+            self._writer = None
+
+    def _run(self) -> None:
+        while True:
+            entry = self._queue.get()
+            if entry is _STOP:
+                return
+            try:
+                self.logger.info(_encode(entry))
+            except Exception as e:
+                print(f"Access log write failed: {e}")
+
+    def _enqueue(self, entry: dict) -> None:
+        if self._writer is None:
+            self.start()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+
+    # -- per request ----------------------------------------------------------
+
+    def should_log(self, status_code: int, duration_ms: float) -> bool:
+        return (
+            status_code >= 500
+            or duration_ms >= self.slow_ms
+            or (self.sample_rate > 0 and random.random() < self.sample_rate)
+        )
+
+    def observe(self, method: str, route: str, status_code: int, duration_ms: float) -> None:
+        status_class = f"{status_code // 100}xx"
+        with self._lock:
+            stats = self._routes.get((method, route))
+            if stats is None:
+                stats = self._routes[(method, route)] = RouteStats()
+            stats.latency.observe(duration_ms)
+            stats.statuses[status_class] = stats.statuses.get(status_class, 0) + 1
+
+    def record(self, request, status_code: int, duration_ms: float, **extra) -> None:
+        """
+        Count the request and, if sampled, log it. `request` is the Starlette
+        Request; call after the response so the matched route is known.
+        """
+        scope = request.scope
+        route = scope.get("route")
+        route_path = getattr(route, "path", None) or UNMATCHED_ROUTE
+        method = scope["method"]
+        self.observe(method, route_path, status_code, duration_ms)
+
+        if not self.should_log(status_code, duration_ms):
+            return
+        client = scope.get("client")
+        entry = {
+            "ts": round(time.time(), 3),
+            "method": method,
+            "path": scope["path"],
+            "route": route_path,
+            "status": status_code,
+            "duration_ms": round(duration_ms, 3),
+            "client": client[0] if client else None
+        }
+        if extra:
+            entry.update(extra)
+        if self.header_allowlist:
+            headers = request.headers
+            logged = {name: headers[name] for name in self.header_allowlist if name in headers}
+            if logged:
+                entry["headers"] = logged
+        self._enqueue(entry)
+
+    # -- metrics --------------------------------------------------------------
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            routes: Dict[str, Dict[str, dict]] = {}
+            for (method, route), stats in sorted(self._routes.items(), key=lambda item: (item[0][1], item[0][0])):
+                routes.setdefault(route, {})[method] = stats.to_dict()
+        return {
+            "routes": routes,
+            "sample_rate": self.sample_rate,
+            "slow_ms": self.slow_ms,
+            "dropped_log_records": self.dropped
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+        self.dropped = 0
+
@@ -0,0 +1,83 @@
+# --- File: bank_common/memory.py ---
+"""
+Per-process memory accounting from /proc/<pid>/smaps (Linux): what a worker
+holds privately and what it shares with the other workers.
+
+  rss      resident bytes
+  pss      proportional set size: each shared page divided among the processes
+           mapping it, so the PSS of all workers adds up to their real footprint
+  private  pages mapped by this process only (Private_Clean + Private_Dirty)
+  shared   pages also mapped by another process (Shared_Clean + Shared_Dirty)
+  swap     swapped-out bytes
+
+`process_memory()` gives the totals; `mapped_files(prefixes)` breaks the same
+figures down per mapped file under the given directories (e.g. the shared
+model store). Elsewhere (no /proc) both return None.
+"""
+import os
+import re
+from typing import Dict, List, Optional
+
+_FIELD = re.compile(r"^(\w+):\s+(\d+) kB$")
+_FIELDS = {"Rss": "rss", "Pss": "pss", "Swap": "swap"}
+_PRIVATE = ("Private_Clean", "Private_Dirty")
+_SHARED = ("Shared_Clean", "Shared_Dirty")
+
+
+def _add(totals: Dict[str, int], field: str, kilobytes: int) -> None:
+    if field in _FIELDS:
+        totals[_FIELDS[field]] += kilobytes * 1024
+    elif field in _PRIVATE:
+        totals["private"] += kilobytes * 1024
+    elif field in _SHARED:
+        totals["shared"] += kilobytes * 1024
+
+
+def _empty() -> Dict[str, int]:
+    return {"rss": 0, "pss": 0, "private": 0, "shared": 0, "swap": 0}
+
+
+def process_memory(pid="self") -> Optional[Dict[str, int]]:
+    """Memory totals of one process, in bytes."""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+    totals = _empty()
+    for line in lines:
+        match = _FIELD.match(line.strip())
+        if match:
+            _add(totals, match.group(1), int(match.group(2)))
+    return totals
+
+
+def mapped_files(prefixes: List[str], pid="self") -> Optional[Dict[str, Dict[str, int]]]:
+    """Per-file memory of the mappings whose path starts with one of `prefixes`, in bytes."""
+    prefixes = tuple(os.path.abspath(prefix) for prefix in prefixes)
+    try:
+        with open(f"/proc/{pid}/smaps") as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+    files: Dict[str, Dict[str, int]] = {}
+    current = None
+    for line in lines:
+        match = _FIELD.match(line.strip())
+        if match:
+            if current is not None:
+                _add(current, match.group(1), int(match.group(2)))
+            continue
+        # Mapping header: address perms offset dev inode [path]
+        parts = line.split(None, 5)
+        path = parts[5].strip() if len(parts) == 6 else ""
+        current = files.setdefault(path, _empty()) if prefixes and path.startswith(prefixes) else None
+    return files
+
+
+def memory_report(prefixes: List[str] = ()) -> Dict[str, any]:
+    return {
+        "pid": os.getpid(),
+        "process": process_memory(),
+        "mapped_files": mapped_files(list(prefixes)) if prefixes else {},
+    }
@@ -0,0 +1,159 @@
+# --- File: bank_common/pool.py ---
+"""
+Connection pool configuration and telemetry.
+
+Engines are built with pool_options(settings), which applies the app's
+DB_POOL_* settings and a QueuePool subclass that times every checkout. register() hooks the
+pool events of an engine under a name ("primary", "replica", ...), and
+pool_metrics.snapshot() reports, per engine: pool size, connections in use,
+overflow in use, checkout wait histogram, checkout timeouts, new connections
+and invalidations (pre-ping failures and disconnects).
+"""
+import threading
+import time
+from typing import Dict
+
+from sqlalchemy import event
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from bank_common.timing import Histogram
+
+
+class PoolStats:
+    def __init__(self, engine):
+        self.engine = engine
+        self.checkout_wait = Histogram()
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.soft_invalidations = 0
+
+
+class PoolMetrics:
+    """Process-wide pool statistics keyed by engine name."""
+
+    def __init__(self):
+        self._stats: Dict[str, PoolStats] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, engine) -> None:
+        """Collect statistics for `engine` under `name`. Accepts sync or async engines."""
+        sync_engine = getattr(engine, "sync_engine", engine)
+        with self._lock:
+            if name in self._stats:
+                return
+            self._stats[name] = PoolStats(sync_engine)
+        sync_engine.pool.metrics_name = name
+
+        @event.listens_for(sync_engine, "connect")
+        def _on_connect(dbapi_connection, connection_record):
+            self._count(name, "connects")
+
+        @event.listens_for(sync_engine, "invalidate")
+        def _on_invalidate(dbapi_connection, connection_record, exception):
+            self._count(name, "invalidations")
+
+        @event.listens_for(sync_engine, "soft_invalidate")
+        def _on_soft_invalidate(dbapi_connection, connection_record, exception):
+            self._count(name, "soft_invalidations")
+
+    def _count(self, name: str, field: str) -> None:
+        stats = self._stats.get(name)
+        if stats is not None:
+            with self._lock:
+                setattr(stats, field, getattr(stats, field) + 1)
+
+    def observe_checkout(self, name: str, wait_ms: float, timed_out: bool) -> None:
+        stats = self._stats.get(name)
+        if stats is None:
+            return
+        with self._lock:
+            stats.checkout_wait.observe(wait_ms)
+            if timed_out:
+                stats.checkout_timeouts += 1
+            else:
+                stats.checkouts += 1
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            result = {}
+            for name, stats in self._stats.items():
+                pool = stats.engine.pool
+                entry = {
+                    "pool_class": type(pool).__name__,
+                    "checkouts": stats.checkouts,
+                    "checkout_timeouts": stats.checkout_timeouts,
+                    "checkout_wait_ms": stats.checkout_wait.to_dict(),
+                    "connects": stats.connects,
+                    "invalidations": stats.invalidations,
+                    "soft_invalidations": stats.soft_invalidations
+                }
+                if isinstance(pool, QueuePool):
+                    entry.update({
+                        "size": pool.size(),
+                        "in_use": pool.checkedout(),
+                        "idle": pool.checkedin(),
+                        # Negative while the pool has not opened pool_size connections yet
+                        "overflow": max(0, pool.overflow()),
+                        "max_overflow": pool._max_overflow,
+                        "timeout_seconds": pool.timeout()
+                    })
+                result[name] = entry
+            return result
+
+    def reset(self) -> None:
+        with self._lock:
+            for stats in self._stats.values():
+                stats.checkout_wait = Histogram()
+                stats.checkouts = stats.checkout_timeouts = 0
+                stats.connects = stats.invalidations = stats.soft_invalidations = 0
+
+
+class _TimedCheckoutMixin:
+    """Times how long each checkout waits for a connection (including opening a new one)."""
+    metrics_name = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except sa_exc.TimeoutError:
+            if self.metrics_name:
+                pool_metrics.observe_checkout(self.metrics_name, (time.perf_counter() - started) * 1000, True)
+            raise
+        if self.metrics_name:
+            pool_metrics.observe_checkout(self.metrics_name, (time.perf_counter() - started) * 1000, False)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep reporting under the same name
+        pool = super().recreate()
+        pool.metrics_name = self.metrics_name
+        return pool
+
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_options(settings, async_engine: bool = False) -> dict:
+    """create_engine() keyword arguments for the pool configured by `settings` (an app's DB_POOL_* values)."""
+    return {
+        "poolclass": TimedAsyncQueuePool if async_engine else TimedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_use_lifo": settings.DB_POOL_USE_LIFO,
+    }
+
+
+# Create global instance
+pool_metrics = PoolMetrics()
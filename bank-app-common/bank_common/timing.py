@@ -0,0 +1,157 @@
+# --- File: bank_common/timing.py ---
+"""
+Stage timers for request pipelines.
+
+    timer = StageTimer("transfer")
+    ...account lookups...
+    timer.mark("account_lookup")      # time since the previous mark
+    with timer.stage("ml_scoring"):   # or time an explicit block
+        ...
+
+Every stage duration is recorded into a per-(pipeline, stage) histogram in
+`stage_metrics` (served by the metrics endpoint). Timers created while a
+request is being handled also attach to that request, so the middleware can
+return them in a Server-Timing header.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+# Histogram bucket upper bounds in milliseconds (the last bucket is open-ended)
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram: O(1) memory per stage, quantiles to bucket precision."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, duration_ms: float) -> None:
+        self.counts[bisect_left(BUCKETS_MS, duration_ms)] += 1
+        self.count += 1
+        self.total_ms += duration_ms
+        if duration_ms > self.max_ms:
+            self.max_ms = duration_ms
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (max_ms for the open bucket)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return float(BUCKETS_MS[i]) if i < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": self.quantile(0.50),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "max_ms": round(self.max_ms, 3),
+            "buckets_ms": {
+                (f"le_{b}" if i < len(BUCKETS_MS) else "inf"): c
+                for i, (b, c) in enumerate(zip(BUCKETS_MS + (None,), self.counts))
+            }
+        }
+
+
+class StageMetrics:
+    """Process-wide registry of stage histograms keyed by (pipeline, stage)."""
+
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, pipeline: str, stage: str, duration_ms: float) -> None:
+        with self._lock:
+            histogram = self._histograms.get((pipeline, stage))
+            if histogram is None:
+                histogram = self._histograms[(pipeline, stage)] = Histogram()
+            histogram.observe(duration_ms)
+
+    def snapshot(self) -> Dict[str, Dict[str, dict]]:
+        with self._lock:
+            result: Dict[str, Dict[str, dict]] = {}
+            for (pipeline, stage), histogram in sorted(self._histograms.items()):
+                result.setdefault(pipeline, {})[stage] = histogram.to_dict()
+            return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+
+class RequestTimings:
+    """Stage timers created while handling one request."""
+
+    def __init__(self):
+        self.timers: List["StageTimer"] = []
+
+    def server_timing(self) -> str:
+        entries = []
+        for timer in self.timers:
+            for stage, duration_ms in timer.durations:
+                entries.append(f"{timer.pipeline}-{stage};dur={duration_ms:.1f}")
+        return ", ".join(entries)
+
+
+_current_request: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def begin_request() -> RequestTimings:
+    """Called by the HTTP middleware. Worker threads copy the context, so sync endpoints attach too."""
+    timings = RequestTimings()
+    _current_request.set(timings)
+    return timings
+
+
+class StageTimer:
+    def __init__(self, pipeline: str, metrics: Optional[StageMetrics] = None):
+        self.pipeline = pipeline
+        self.metrics = metrics or stage_metrics
+        self.durations: List[Tuple[str, float]] = []
+        self._last = time.perf_counter()
+        request_timings = _current_request.get()
+        if request_timings is not None:
+            request_timings.timers.append(self)
+
+    def _record(self, stage: str, duration_ms: float) -> None:
+        self.durations.append((stage, duration_ms))
+        self.metrics.observe(self.pipeline, stage, duration_ms)
+
+    def mark(self, stage: str) -> float:
+        """Record the time since the previous mark (or timer creation) as `stage`."""
+        now = time.perf_counter()
+        duration_ms = (now - self._last) * 1000
+        self._last = now
+        self._record(stage, duration_ms)
+        return duration_ms
+
+    @contextmanager
+    def stage(self, stage: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            self._last = now
+            self._record(stage, (now - started) * 1000)
+
+    def total_ms(self) -> float:
+        return sum(duration for _, duration in self.durations)
+
+
+# Create global instance
+stage_metrics = StageMetrics()
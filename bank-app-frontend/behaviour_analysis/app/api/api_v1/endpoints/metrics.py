@@ -0,0 +1,75 @@
+# --- File: bank-app-frontend/behaviour_analysis/app/api/api_v1/endpoints/metrics.py ---
+from fastapi import APIRouter
+
+from app.core.access_log import access_log
+from bank_common.memory import memory_report
+from bank_common.timing import stage_metrics
+from bank_common.pool import pool_metrics
+
+router = APIRouter()
+
+# Where the ML services keep the per-user model files (see ml_*behavior_service.py)
+MODEL_DIRS = ["app/ml_models", "../../bank-app-backend/app/ml_models"]
+
+@router.get("/metrics/stages")
+def get_stage_metrics():
+    """
+    Per-stage latency histograms for the behaviour verification pipelines:
+    count, average, p50/p95/p99 and max in ms.
+    """
+    return {
+        "status": "success",
+        "pipelines": stage_metrics.snapshot()
+    }
+
+@router.post("/metrics/stages/reset")
+def reset_stage_metrics():
+    """Clear all stage histograms."""
+    stage_metrics.reset()
+    return {"status": "success"}
+
+@router.get("/metrics/routes")
+def get_route_metrics():
+    """
+    Per-route latency histograms and status-class counts for every request
+    seen by this worker, plus the access-log sampling settings.
+    """
+    return {
+        "status": "success",
+        **access_log.snapshot()
+    }
+
+@router.post("/metrics/routes/reset")
+def reset_route_metrics():
+    """Clear the per-route request metrics."""
+    access_log.reset()
+    return {"status": "success"}
+
+@router.get("/metrics/pool")
+def get_pool_metrics():
+    """
+    Connection pool telemetry: size, connections in use, overflow in use,
+    checkout wait histogram, checkout timeouts, new connections and
+    invalidations.
+    """
+    return {
+        "status": "success",
+        "pools": pool_metrics.snapshot()
+    }
+
+@router.post("/metrics/pool/reset")
+def reset_pool_metrics():
+    """Clear the pool counters and wait histograms."""
+    pool_metrics.reset()
+    return {"status": "success"}
+
+@router.get("/metrics/memory")
+def get_memory_metrics():
+    """
+    Memory of the worker serving this request: RSS / PSS and private vs shared
+    bytes (Linux /proc), and per model file it currently has mapped.
+    """
+    return {
+        "status": "success",
+        **memory_report(MODEL_DIRS)
+    }
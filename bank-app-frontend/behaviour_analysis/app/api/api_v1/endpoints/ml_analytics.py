@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from typing import Dict
 import uuid
 
+from bank_common.timing import StageTimer
 from app.db.base import get_db
 from app.services.ml_behavior_service import MLBehaviorService
 from app.services.ml_restoration_behavior_service import MLRestorationBehaviorService
@@ -27,6 +28,7 @@ def verify_user_behavior(
     """
     Verify if user behavior is anomalous using trained ML model.
     """
+    timer = StageTimer("behavior_verify")
     print(f"\n🤖 ML BEHAVIOR VERIFICATION for user {request.customer_unique_id}")
     
     ml_service = MLBehaviorService(db)
@@ -43,16 +45,19 @@ def verify_user_behavior(
     print(f"Input metrics: {metrics}")
     
     # Perform anomaly detection
-    result = ml_service.predict_anomaly(request.customer_unique_id, metrics)
+    with timer.stage("prediction"):
+        result = ml_service.predict_anomaly(request.customer_unique_id, metrics)
     
     if not result['success']:
         print(f"❌ ML verification failed: {result.get('message', 'Unknown error')}")
         if result.get('requires_training', False):
             # Try to train model if enough data exists
-            training_result = ml_service.retrain_if_needed(request.customer_unique_id)
+            with timer.stage("training"):
+                training_result = ml_service.retrain_if_needed(request.customer_unique_id)
             if training_result['success']:
                 # Retry prediction after training
-                result = ml_service.predict_anomaly(request.customer_unique_id, metrics)
+                with timer.stage("retry_prediction"):
+                    result = ml_service.predict_anomaly(request.customer_unique_id, metrics)
     
     status_icon = "🚨" if result.get('is_anomaly', False) else "✅"
     print(f"{status_icon} ML Result: {'ANOMALY' if result.get('is_anomaly', False) else 'NORMAL'} "
@@ -68,6 +73,7 @@ def verify_user_restoration_behavior(
     """
     Verify if user restoration behavior is anomalous using trained ML model.
     """
+    timer = StageTimer("restoration_behavior_verify")
     print(f"\n🤖 ML RESTORATION BEHAVIOR VERIFICATION for user {request.customer_unique_id}")
 
     ml_service = MLRestorationBehaviorService(db)
@@ -84,16 +90,19 @@ def verify_user_restoration_behavior(
     print(f"Input metrics: {metrics}")
 
     # Perform anomaly detection
-    result = ml_service.predict_anomaly(request.customer_unique_id, metrics)
+    with timer.stage("prediction"):
+        result = ml_service.predict_anomaly(request.customer_unique_id, metrics)
 
     if not result['success']:
         print(f"❌ ML verification failed: {result.get('message', 'Unknown error')}")
         if result.get('requires_training', False):
             # Try to train model if enough data exists
-            training_result = ml_service.retrain_if_needed(request.customer_unique_id)
+            with timer.stage("training"):
+                training_result = ml_service.retrain_if_needed(request.customer_unique_id)
             if training_result['success']:
                 # Retry prediction after training
-                result = ml_service.predict_anomaly(request.customer_unique_id, metrics)
+                with timer.stage("retry_prediction"):
+                    result = ml_service.predict_anomaly(request.customer_unique_id, metrics)
 
     status_icon = "🚨" if result.get('is_anomaly', False) else "✅"
     print(f"{status_icon} ML Result: {'ANOMALY' if result.get('is_anomaly', False) else 'NORMAL'} "
@@ -0,0 +1,12 @@
+# --- File: bank-app-frontend/behaviour_analysis/app/core/access_log.py ---
+"""The app's access log (bank_common.access_log), configured from the ACCESS_LOG_* settings."""
+from app.core.config import settings
+from bank_common.access_log import AccessLog
+
+# Create global instance
+access_log = AccessLog(
+    sample_rate=settings.ACCESS_LOG_SAMPLE_RATE,
+    slow_ms=settings.ACCESS_LOG_SLOW_MS,
+    header_allowlist=settings.ACCESS_LOG_HEADERS.split(","),
+    queue_size=settings.ACCESS_LOG_QUEUE_SIZE
+)
@@ -9,6 +9,14 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     BACKEND_CORS_ORIGINS: str
     DATABASE_URL: str = "sqlite:///./behavioral_analysis.db"
+    # Connection pool: at most DB_POOL_SIZE + DB_MAX_OVERFLOW connections per
+    # worker, waiting up to DB_POOL_TIMEOUT seconds for one
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 10.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_USE_LIFO: bool = False
     RP_ID: str
     RP_NAME: str
     ORIGIN: AnyHttpUrl
@@ -18,6 +26,13 @@ class Settings(BaseSettings):
     TWILIO_PHONE_NUMBER: str
     PRIVATE_KEY: str
     JWT_SECRET: str = "your_jwt_secret_here"
+    # Access log: sampled JSON lines (5xx and slow requests are always logged)
+    ACCESS_LOG_SAMPLE_RATE: float = 0.1
+    ACCESS_LOG_SLOW_MS: float = 1000.0
+    ACCESS_LOG_HEADERS: str = "user-agent,x-forwarded-for,x-request-id"
+    ACCESS_LOG_QUEUE_SIZE: int = 10000
+    # Return per-stage durations in a Server-Timing response header
+    SERVER_TIMING_ENABLED: bool = False
 
     class Config:
         env_file = ".env"
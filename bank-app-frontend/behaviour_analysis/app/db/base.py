@@ -3,14 +3,16 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from app.core.config import settings
+from bank_common.pool import pool_metrics, pool_options
 
 # SQLite engine with specific configurations
 engine = create_engine(
     settings.DATABASE_URL,
     connect_args={"check_same_thread": False},  # Allow multiple threads
-    pool_pre_ping=True,
-    echo=False  # Set to True for SQL debugging
+    echo=False,  # Set to True for SQL debugging
+    **pool_options(settings)
 )
+pool_metrics.register("primary", engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
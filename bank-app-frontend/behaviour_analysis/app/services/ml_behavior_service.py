@@ -13,6 +13,10 @@ from datetime import datetime
 from app.db.models.behavior import UserBehavior
 from app.db.base import get_db
 
+# Model files are loaded with mmap_mode='r', so their numpy arrays (the
+# scaler's) are read from the page cache shared by all workers instead of
+# being copied into each; sklearn still copies the IsolationForest trees.
+
 class MLBehaviorService:
     def __init__(self, db: Session):
         self.db = db
@@ -164,7 +168,10 @@ class MLBehaviorService:
         }
         
         try:
-            joblib.dump(artifacts, model_path)
+            # Write aside and rename: other workers may have the old file mapped
+            tmp_path = f"{model_path}.{os.getpid()}.tmp"
+            joblib.dump(artifacts, tmp_path)
+            os.replace(tmp_path, model_path)
             print(f"\nModel successfully trained and saved: {model_path}")
             
             return {
@@ -198,7 +205,7 @@ class MLBehaviorService:
         
         try:
             # Load model artifacts
-            artifacts = joblib.load(model_path)
+            artifacts = joblib.load(model_path, mmap_mode='r')
             model = artifacts['model']
             scaler = artifacts['scaler']
             
@@ -266,7 +273,7 @@ class MLBehaviorService:
             }
         
         try:
-            artifacts = joblib.load(model_path)
+            artifacts = joblib.load(model_path, mmap_mode='r')
             return {
                 'model_exists': True,
                 'customer_id': artifacts.get('customer_id'),
@@ -301,7 +308,7 @@ class MLBehaviorService:
             reason = "Forced retrain requested"
         elif len(data) >= 40:  # Retrain every 40 sessions
             try:
-                artifacts = joblib.load(model_path)
+                artifacts = joblib.load(model_path, mmap_mode='r')
                 last_baseline_size = artifacts.get('baseline_size', 0)
                 if len(data) >= last_baseline_size + 40:  # Significant new data
                     needs_training = True
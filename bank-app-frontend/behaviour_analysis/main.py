@@ -1,14 +1,18 @@
 # --- File: bank-app-frontend/behaviour_analysis/main.py ---
 from fastapi import FastAPI, Request
+import time
 import uvicorn 
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
+from bank_common.timing import begin_request
+from app.core.access_log import access_log
 from app.db.base import Base, engine
 
 # Import all routers
 from app.api.api_v1.endpoints import (
     analytics,
-    ml_analytics
+    ml_analytics,
+    metrics
 )
 
 # Import only the models that exist
@@ -22,26 +26,25 @@ app = FastAPI(
     openapi_url=f"{settings.API_V1_STR}/openapi.json"
 )
 
-# --- THIS IS THE DEFINITIVE DEBUGGING MIDDLEWARE ---
+# --- ACCESS LOG / REQUEST METRICS MIDDLEWARE ---
 @app.middleware("http")
 async def log_every_request(request: Request, call_next):
     """
-    This middleware intercepts EVERY request before it hits the endpoint logic.
-    It will run and print details for both the OPTIONS and POST requests.
+    Times every request into the per-route metrics and writes a sampled,
+    single-line access log record (see app/core/access_log.py).
     """
-    print("\n=============================================")
-    print("======= MIDDLEWARE: REQUEST RECEIVED ========")
-    print(f"METHOD: {request.method}")
-    print(f"URL: {request.url}")
-    print("HEADERS:")
-    for name, value in request.headers.items():
-        print(f"  {name}: {value}")
-    
-    response = await call_next(request)
-    
-    print("======= MIDDLEWARE: RESPONSE SENT ===========")
-    print(f"STATUS CODE: {response.status_code}")
-    print("=============================================\n")
+    started = time.perf_counter()
+    timings = begin_request()
+    try:
+        response = await call_next(request)
+    except Exception:
+        access_log.record(request, 500, (time.perf_counter() - started) * 1000)
+        raise
+    if settings.SERVER_TIMING_ENABLED:
+        server_timing = timings.server_timing()
+        if server_timing:
+            response.headers["Server-Timing"] = server_timing
+    access_log.record(request, response.status_code, (time.perf_counter() - started) * 1000)
     return response
 # --------------------------------------------------------
 
@@ -54,6 +57,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+def start_access_log():
+    access_log.start()
+
+@app.on_event("shutdown")
+def stop_access_log():
+    access_log.stop()
+
 @app.get("/", summary="Health Check")
 def read_root():
     return {"status": "Backend is running"}
@@ -61,6 +72,7 @@ def read_root():
 # Include all API routers
 app.include_router(analytics.router, prefix=settings.API_V1_STR, tags=["Behavioral Analytics"])
 app.include_router(ml_analytics.router, prefix=settings.API_V1_STR, tags=["ML Behavioral Analytics"])
+app.include_router(metrics.router, prefix=settings.API_V1_STR, tags=["Metrics"])
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=3000)
\ No newline at end of file